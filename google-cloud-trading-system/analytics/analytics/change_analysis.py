@@ -107,7 +107,7 @@ class ChangeImpactAnalyzer:
                 recommendation = "Revert - Significant decline"
             
             # Update change record with results
-            cursor.execute("""
+            self.db.store.execute("""
                 UPDATE strategy_changes
                 SET trades_after = ?,
                     win_rate_after = ?,
@@ -126,7 +126,6 @@ class ChangeImpactAnalyzer:
                 recommendation,
                 change_id
             ))
-            self.db.conn.commit()
             
             analysis = {
                 'change_id': change_id,
@@ -118,7 +118,7 @@ class StrategyComparison:
             }
             
             # Store comparison
-            self.db.conn.execute("""
+            self.db.store.execute("""
                 INSERT INTO strategy_comparisons (
                     comparison_id, timestamp, strategy_a, strategy_b, time_period,
                     pl_difference, win_rate_difference, sharpe_difference, drawdown_difference,
@@ -133,7 +133,6 @@ class StrategyComparison:
                 t_stat, p_value, confidence_level, statistically_significant,
                 better_strategy, confidence_score, recommendation
             ))
-            self.db.conn.commit()
             
             logger.info(f"✅ Compared {strategy_a} vs {strategy_b}")
             return comparison
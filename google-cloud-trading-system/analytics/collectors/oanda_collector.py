@@ -8,7 +8,7 @@ import os
 import sys
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Any
 import time
 import uuid
 
@@ -16,6 +16,7 @@ import uuid
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
 
 from src.core.oanda_client import OandaClient
+from src.core.oanda_ingest import TransactionIngestor
 from analytics.database.models import PerformanceDatabase
 
 logger = logging.getLogger(__name__)
@@ -59,6 +60,10 @@ class ReadOnlyOandaCollector:
                 except Exception as e:
                     logger.error(f"❌ Failed to initialize client for {name}: {e}")
         
+        # Fills are paged from a per-account transaction cursor kept in the analytics database
+        self.ingestor = TransactionIngestor(db.store, self._write_trades)
+        self.account_names = {account_id: name for name, account_id in self.accounts.items() if account_id}
+        
         # Track last collection times
         self.last_trade_collection = {}
         self.last_snapshot_collection = {}
@@ -89,51 +94,31 @@ class ReadOnlyOandaCollector:
         except Exception as e:
             logger.error(f"❌ Data collection cycle failed: {e}")
     
-    def collect_closed_trades(self, account_name: str) -> int:
-        """Collect closed trades from OANDA for an account"""
+    def collect_closed_trades(self, account_name: str, full_resync: bool = False, days: int = 7) -> int:
+        """
+        Ingest new OANDA fills for an account, from its saved transaction cursor
+        
+        The first run (or a full re-sync) starts `days` back. Returns the number of trade
+        rows written - new trades, and trades whose fills changed them.
+        """
         try:
             if account_name not in self.clients:
                 return 0
             
             client = self.clients[account_name]
             account_id = self.accounts[account_name]
-            strategy_name = self.strategy_mapping[account_name]
-            
-            # Get trades since last collection (or last 7 days if first run)
-            since = self.last_trade_collection.get(account_name)
-            if not since:
-                since = datetime.now() - timedelta(days=7)
             
-            logger.info(f"📊 Collecting trades for {account_name} since {since}")
+            since = datetime.utcnow() - timedelta(days=days)
+            logger.info(f"📊 Collecting trades for {account_name} "
+                        f"({'full re-sync' if full_resync else 'since last transaction'})")
             
-            # Fetch closed trades from OANDA
             try:
-                response = client.api.transaction.list(
-                    accountID=account_id,
-                    from_time=since.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
-                )
-                
-                trades_collected = 0
-                
-                # Filter for ORDER_FILL transactions (completed trades)
-                if hasattr(response, 'transactions'):
-                    for txn in response.transactions:
-                        if txn.type == 'ORDER_FILL':
-                            # Convert to our trade format
-                            trade_data = self._parse_oanda_trade(
-                                txn, 
-                                account_id, 
-                                account_name, 
-                                strategy_name
-                            )
-                            
-                            if trade_data:
-                                self.db.store_trade(trade_data)
-                                trades_collected += 1
+                result = self.ingestor.ingest(client, account_id, from_time=since, full_resync=full_resync)
                 
                 # Update last collection time
                 self.last_trade_collection[account_name] = datetime.now()
                 
+                trades_collected = len(result['changed_trades'])
                 logger.info(f"✅ Collected {trades_collected} trades for {account_name}")
                 return trades_collected
                 
@@ -145,6 +130,10 @@ class ReadOnlyOandaCollector:
             logger.error(f"❌ Failed to collect trades for {account_name}: {e}")
             return 0
     
+    def resync_all_trades(self, days: int = 365) -> Dict[str, int]:
+        """Re-read `days` of history for every account; only rows that differ are rewritten"""
+        return {name: self.collect_closed_trades(name, full_resync=True, days=days) for name in self.clients}
+    
     def collect_account_snapshot(self, account_name: str) -> bool:
         """Collect current account state snapshot"""
         try:
@@ -227,46 +216,35 @@ class ReadOnlyOandaCollector:
             logger.error(f"❌ Failed to collect snapshot for {account_name}: {e}")
             return False
     
-    def _parse_oanda_trade(self, 
-                          transaction: Any, 
-                          account_id: str, 
-                          account_name: str,
-                          strategy_name: str) -> Optional[Dict[str, Any]]:
-        """Parse OANDA transaction into our trade format"""
-        try:
-            # Extract trade details
-            trade_id = str(transaction.id)
-            
-            # Determine if this is entry or exit
-            # Entry: positive units, Exit: negative units (or vice versa)
-            units = int(transaction.units)
-            side = 'BUY' if units > 0 else 'SELL'
-            
-            trade_data = {
-                'trade_id': trade_id,
-                'account_id': account_id,
-                'account_name': account_name,
-                'instrument': transaction.instrument,
-                'strategy_name': strategy_name,
-                'entry_time': transaction.time,
-                'entry_price': float(transaction.price),
-                'units': abs(units),
-                'side': side,
-                'entry_reason': transaction.reason if hasattr(transaction, 'reason') else 'OANDA_FILL',
-                'status': 'closed',  # ORDER_FILL means completed
-                # Additional fields would be populated by matching entry/exit
-                'realized_pl': float(transaction.pl) if hasattr(transaction, 'pl') else 0.0,
-                'commission': float(transaction.commission) if hasattr(transaction, 'commission') else 0.0,
-            }
-            
-            # Calculate net P&L
-            trade_data['net_pl'] = trade_data['realized_pl'] - trade_data['commission']
-            
-            return trade_data
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to parse transaction: {e}")
-            return None
+    def _write_trades(self, conn, trades: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Ingest callback: folded OANDA trades as analytics trade rows, upserted in the page's write"""
+        return self.db.upsert_trades(conn, [self._trade_row(trade) for trade in trades])
+    
+    def _trade_row(self, trade: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a folded OANDA trade into our trade format"""
+        account_id = trade['account_id']
+        account_name = self.account_names.get(account_id, account_id)
+        commission = trade['commission']
+        return {
+            'trade_id': f"{account_id}-{trade['oanda_trade_id']}",
+            'account_id': account_id,
+            'account_name': account_name,
+            'instrument': trade['instrument'],
+            'strategy_name': self.strategy_mapping.get(account_name, 'unknown'),
+            'entry_time': trade['entry_time'],
+            'entry_price': trade['entry_price'],
+            'units': trade['units'],
+            'side': trade['side'],
+            'entry_reason': trade['entry_reason'] or 'OANDA_FILL',
+            'exit_time': trade['exit_time'],
+            'exit_price': trade['exit_price'],
+            'exit_reason': trade['exit_reason'],
+            'realized_pl': trade['realized_pl'],
+            'commission': commission,
+            'net_pl': trade['realized_pl'] - commission,
+            'duration_seconds': trade['duration_seconds'],
+            'status': trade['status'],
+        }
     
     def _calculate_snapshot_metrics(self, recent_trades: List[Dict[str, Any]]) -> Dict[str, float]:
         """Calculate performance metrics from recent trades"""
@@ -351,6 +329,9 @@ class ReadOnlyOandaCollector:
                 name: time.isoformat() if (time := self.last_snapshot_collection.get(name)) else None
                 for name in self.clients
             },
+            'transaction_cursors': {
+                name: self.ingestor.get_cursor(self.accounts[name]) for name in self.clients
+            },
             'database_stats': self.db.get_database_stats()
         }
 
@@ -4,7 +4,6 @@ Database models and connection management
 Uses SQLite for analytics data storage
 """
 
-import sqlite3
 import logging
 from datetime import datetime
 from typing import Dict, List, Optional, Any, Tuple
@@ -12,6 +11,10 @@ from pathlib import Path
 import json
 import uuid
 
+from src.core.sqlite_store import get_sqlite_store
+from src.core.time_rollups import TimeRollups, apply_trade, apply_snapshot, equity_from_breakdown, resolution_for
+from src.core.oanda_ingest import upsert_rows
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,26 +24,32 @@ class PerformanceDatabase:
     def __init__(self, db_path: str = "analytics/analytics.db"):
         """Initialize database connection"""
         self.db_path = db_path
-        self.conn = None
+        self.store = None
+        self.rollups = None
         self._initialize_database()
     
+    @property
+    def conn(self):
+        """Read-only connection for the calling thread (writes go through self.store)"""
+        return self.store.thread_reader() if self.store is not None else None
+    
     def _initialize_database(self):
         """Create database and tables if they don't exist"""
         try:
             # Create directory if needed
             Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
             
-            # Connect to database
-            self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-            self.conn.row_factory = sqlite3.Row  # Enable column access by name
+            # Shared WAL store: one writer thread group-commits, reads use pooled connections
+            self.store = get_sqlite_store(self.db_path)
             
             # Read and execute schema
             schema_path = Path(__file__).parent / "schema.sql"
             with open(schema_path, 'r') as f:
                 schema = f.read()
-                self.conn.executescript(schema)
+                self.store.executescript(schema)
             
-            self.conn.commit()
+            # Time-bucket rollups, maintained by store_trade / store_snapshot
+            self.rollups = TimeRollups(self.store, backfill=self._backfill_rollups)
             logger.info(f"✅ Analytics database initialized: {self.db_path}")
             
         except Exception as e:
@@ -49,10 +58,44 @@ class PerformanceDatabase:
     
     def close(self):
         """Close database connection"""
-        if self.conn:
-            self.conn.close()
+        if self.store:
+            self.store.close()
             logger.info("✅ Database connection closed")
     
+    @staticmethod
+    def _apply_trade_rollup(conn, trade, sign: int = 1):
+        if trade is None or trade['status'] != 'closed':
+            return
+        try:
+            apply_trade(conn, trade['entry_time'], trade['net_pl'], trade['strategy_name'], trade['account_id'],
+                        trade['instrument'], trade['duration_seconds'], trade['commission'], sign)
+        except ValueError as e:
+            logger.warning(f"⚠️ Trade {trade['trade_id']} left out of rollups: {e}")
+    
+    @staticmethod
+    def _apply_snapshot_rollup(conn, snapshot):
+        if snapshot is None or snapshot['equity'] is None:
+            return
+        try:
+            apply_snapshot(conn, snapshot['account_id'], snapshot['timestamp'], snapshot['equity'], {
+                'balance': snapshot['balance'],
+                'equity': snapshot['equity'],
+                'unrealized_pl': snapshot['unrealized_pl'],
+                'daily_pl': snapshot['daily_pl'],
+            })
+        except ValueError as e:
+            logger.warning(f"⚠️ Snapshot {snapshot['snapshot_id']} left out of rollups: {e}")
+    
+    @classmethod
+    def _backfill_rollups(cls, conn) -> int:
+        trades = conn.execute("SELECT * FROM trades WHERE status = 'closed'").fetchall()
+        for trade in trades:
+            cls._apply_trade_rollup(conn, trade)
+        snapshots = conn.execute("SELECT * FROM account_snapshots").fetchall()
+        for snapshot in snapshots:
+            cls._apply_snapshot_rollup(conn, snapshot)
+        return len(trades) + len(snapshots)
+    
     # ========================================================================
     # TRADE METHODS
     # ========================================================================
@@ -61,19 +104,7 @@ class PerformanceDatabase:
         """Store a trade in the database"""
         try:
             trade_id = trade_data.get('trade_id', str(uuid.uuid4()))
-            
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                INSERT OR REPLACE INTO trades (
-                    trade_id, account_id, account_name, instrument, strategy_name,
-                    entry_time, entry_price, units, side, entry_reason,
-                    exit_time, exit_price, exit_reason,
-                    realized_pl, realized_pl_pct, commission, net_pl,
-                    risk_amount, risk_pct, r_multiple,
-                    market_regime, volatility_score, spread_at_entry, news_sentiment,
-                    duration_seconds, bars_held, status
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
+            row = (
                 trade_id,
                 trade_data.get('account_id'),
                 trade_data.get('account_name'),
@@ -101,15 +132,47 @@ class PerformanceDatabase:
                 trade_data.get('duration_seconds'),
                 trade_data.get('bars_held'),
                 trade_data.get('status', 'closed')
-            ))
+            )
+            
+            def store(conn):
+                # A replaced trade's earlier rollup contribution is taken back out first
+                select = "SELECT * FROM trades WHERE trade_id = ?"
+                self._apply_trade_rollup(conn, conn.execute(select, (trade_id,)).fetchone(), sign=-1)
+                conn.execute("""
+                    INSERT OR REPLACE INTO trades (
+                        trade_id, account_id, account_name, instrument, strategy_name,
+                        entry_time, entry_price, units, side, entry_reason,
+                        exit_time, exit_price, exit_reason,
+                        realized_pl, realized_pl_pct, commission, net_pl,
+                        risk_amount, risk_pct, r_multiple,
+                        market_regime, volatility_score, spread_at_entry, news_sentiment,
+                        duration_seconds, bars_held, status
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, row)
+                self._apply_trade_rollup(conn, conn.execute(select, (trade_id,)).fetchone())
+            
+            self.store.write(store)
             
-            self.conn.commit()
             logger.info(f"✅ Stored trade: {trade_id}")
             return trade_id
             
         except Exception as e:
             logger.error(f"❌ Failed to store trade: {e}")
-            self.conn.rollback()
+            raise
+    
+    def upsert_trades(self, conn, trades: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Bulk store_trade inside an open write: one executemany, unchanged rows untouched"""
+        return upsert_rows(conn, 'trades', trades, apply=self._apply_trade_rollup)
+    
+    def store_trades(self, trades: List[Dict[str, Any]]) -> int:
+        """Store many trades in one transaction; returns how many were new or changed"""
+        try:
+            written = self.store.write(lambda conn: self.upsert_trades(conn, trades))
+            logger.info(f"✅ Stored {len(written)}/{len(trades)} trades")
+            return len(written)
+            
+        except Exception as e:
+            logger.error(f"❌ Failed to store trades: {e}")
             raise
     
     def get_trades(self, 
@@ -149,10 +212,7 @@ class PerformanceDatabase:
             if limit:
                 query += f" LIMIT {limit}"
             
-            cursor = self.conn.cursor()
-            cursor.execute(query, params)
-            
-            trades = [dict(row) for row in cursor.fetchall()]
+            trades = [dict(row) for row in self.store.query(query, params)]
             return trades
             
         except Exception as e:
@@ -168,78 +228,78 @@ class PerformanceDatabase:
         try:
             snapshot_id = snapshot_data.get('snapshot_id', str(uuid.uuid4()))
             
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                INSERT INTO account_snapshots (
-                    snapshot_id, timestamp, account_id, account_name,
-                    balance, equity, margin_used, margin_available, unrealized_pl,
-                    open_positions, open_trades, pending_orders,
-                    daily_pl, daily_trades, daily_wins, daily_losses,
-                    total_trades, total_wins, total_losses, win_rate,
-                    avg_win, avg_loss, profit_factor,
-                    max_drawdown, max_drawdown_pct, current_drawdown,
-                    sharpe_ratio, sortino_ratio, calmar_ratio,
-                    daily_return, weekly_return, monthly_return, ytd_return,
-                    metadata
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                snapshot_id,
-                snapshot_data.get('timestamp', datetime.now().isoformat()),
-                snapshot_data.get('account_id'),
-                snapshot_data.get('account_name'),
-                snapshot_data.get('balance'),
-                snapshot_data.get('equity'),
-                snapshot_data.get('margin_used', 0.0),
-                snapshot_data.get('margin_available', 0.0),
-                snapshot_data.get('unrealized_pl', 0.0),
-                snapshot_data.get('open_positions', 0),
-                snapshot_data.get('open_trades', 0),
-                snapshot_data.get('pending_orders', 0),
-                snapshot_data.get('daily_pl', 0.0),
-                snapshot_data.get('daily_trades', 0),
-                snapshot_data.get('daily_wins', 0),
-                snapshot_data.get('daily_losses', 0),
-                snapshot_data.get('total_trades', 0),
-                snapshot_data.get('total_wins', 0),
-                snapshot_data.get('total_losses', 0),
-                snapshot_data.get('win_rate', 0.0),
-                snapshot_data.get('avg_win', 0.0),
-                snapshot_data.get('avg_loss', 0.0),
-                snapshot_data.get('profit_factor', 0.0),
-                snapshot_data.get('max_drawdown', 0.0),
-                snapshot_data.get('max_drawdown_pct', 0.0),
-                snapshot_data.get('current_drawdown', 0.0),
-                snapshot_data.get('sharpe_ratio', 0.0),
-                snapshot_data.get('sortino_ratio', 0.0),
-                snapshot_data.get('calmar_ratio', 0.0),
-                snapshot_data.get('daily_return', 0.0),
-                snapshot_data.get('weekly_return', 0.0),
-                snapshot_data.get('monthly_return', 0.0),
-                snapshot_data.get('ytd_return', 0.0),
-                json.dumps(snapshot_data.get('metadata', {}))
-            ))
+            def store(conn):
+                conn.execute("""
+                    INSERT INTO account_snapshots (
+                        snapshot_id, timestamp, account_id, account_name,
+                        balance, equity, margin_used, margin_available, unrealized_pl,
+                        open_positions, open_trades, pending_orders,
+                        daily_pl, daily_trades, daily_wins, daily_losses,
+                        total_trades, total_wins, total_losses, win_rate,
+                        avg_win, avg_loss, profit_factor,
+                        max_drawdown, max_drawdown_pct, current_drawdown,
+                        sharpe_ratio, sortino_ratio, calmar_ratio,
+                        daily_return, weekly_return, monthly_return, ytd_return,
+                        metadata
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (
+                    snapshot_id,
+                    snapshot_data.get('timestamp', datetime.now().isoformat()),
+                    snapshot_data.get('account_id'),
+                    snapshot_data.get('account_name'),
+                    snapshot_data.get('balance'),
+                    snapshot_data.get('equity'),
+                    snapshot_data.get('margin_used', 0.0),
+                    snapshot_data.get('margin_available', 0.0),
+                    snapshot_data.get('unrealized_pl', 0.0),
+                    snapshot_data.get('open_positions', 0),
+                    snapshot_data.get('open_trades', 0),
+                    snapshot_data.get('pending_orders', 0),
+                    snapshot_data.get('daily_pl', 0.0),
+                    snapshot_data.get('daily_trades', 0),
+                    snapshot_data.get('daily_wins', 0),
+                    snapshot_data.get('daily_losses', 0),
+                    snapshot_data.get('total_trades', 0),
+                    snapshot_data.get('total_wins', 0),
+                    snapshot_data.get('total_losses', 0),
+                    snapshot_data.get('win_rate', 0.0),
+                    snapshot_data.get('avg_win', 0.0),
+                    snapshot_data.get('avg_loss', 0.0),
+                    snapshot_data.get('profit_factor', 0.0),
+                    snapshot_data.get('max_drawdown', 0.0),
+                    snapshot_data.get('max_drawdown_pct', 0.0),
+                    snapshot_data.get('current_drawdown', 0.0),
+                    snapshot_data.get('sharpe_ratio', 0.0),
+                    snapshot_data.get('sortino_ratio', 0.0),
+                    snapshot_data.get('calmar_ratio', 0.0),
+                    snapshot_data.get('daily_return', 0.0),
+                    snapshot_data.get('weekly_return', 0.0),
+                    snapshot_data.get('monthly_return', 0.0),
+                    snapshot_data.get('ytd_return', 0.0),
+                    json.dumps(snapshot_data.get('metadata', {}))
+                ))
+                self._apply_snapshot_rollup(conn, conn.execute(
+                    "SELECT * FROM account_snapshots WHERE snapshot_id = ?", (snapshot_id,)).fetchone())
+            
+            self.store.write(store)
             
-            self.conn.commit()
             logger.info(f"✅ Stored snapshot: {snapshot_id}")
             return snapshot_id
             
         except Exception as e:
             logger.error(f"❌ Failed to store snapshot: {e}")
-            self.conn.rollback()
             raise
     
     def get_latest_snapshot(self, account_id: str) -> Optional[Dict[str, Any]]:
         """Get the most recent snapshot for an account"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
+            row = self.store.query_one("""
                 SELECT * FROM account_snapshots
                 WHERE account_id = ?
                 ORDER BY timestamp DESC
                 LIMIT 1
             """, (account_id,))
             
-            row = cursor.fetchone()
             return dict(row) if row else None
             
         except Exception as e:
@@ -255,8 +315,7 @@ class PerformanceDatabase:
         try:
             change_id = change_data.get('change_id', str(uuid.uuid4()))
             
-            cursor = self.conn.cursor()
-            cursor.execute("""
+            self.store.execute("""
                 INSERT INTO strategy_changes (
                     change_id, timestamp, strategy_name, account_id,
                     parameter_changed, old_value, new_value, change_reason, changed_by,
@@ -280,13 +339,11 @@ class PerformanceDatabase:
                 json.dumps(change_data.get('metadata', {}))
             ))
             
-            self.conn.commit()
             logger.info(f"✅ Stored strategy change: {change_id}")
             return change_id
             
         except Exception as e:
             logger.error(f"❌ Failed to store strategy change: {e}")
-            self.conn.rollback()
             raise
     
     # ========================================================================
@@ -298,8 +355,7 @@ class PerformanceDatabase:
         try:
             metric_id = metrics_data.get('metric_id', str(uuid.uuid4()))
             
-            cursor = self.conn.cursor()
-            cursor.execute("""
+            self.store.execute("""
                 INSERT OR REPLACE INTO strategy_metrics (
                     metric_id, timestamp, strategy_name, account_id, time_period,
                     total_trades, winning_trades, losing_trades, break_even_trades, win_rate,
@@ -357,13 +413,11 @@ class PerformanceDatabase:
                 json.dumps(metrics_data.get('metadata', {}))
             ))
             
-            self.conn.commit()
             logger.info(f"✅ Stored strategy metrics: {metric_id}")
             return metric_id
             
         except Exception as e:
             logger.error(f"❌ Failed to store strategy metrics: {e}")
-            self.conn.rollback()
             raise
     
     def get_strategy_metrics(self, 
@@ -384,10 +438,7 @@ class PerformanceDatabase:
             
             query += " ORDER BY timestamp DESC LIMIT 1"
             
-            cursor = self.conn.cursor()
-            cursor.execute(query, params)
-            
-            row = cursor.fetchone()
+            row = self.store.query_one(query, params)
             return dict(row) if row else None
             
         except Exception as e:
@@ -399,18 +450,10 @@ class PerformanceDatabase:
     # ========================================================================
     
     def get_equity_curve(self, account_id: str, days: int = 30) -> List[Tuple[datetime, float]]:
-        """Get equity curve for an account"""
+        """Get equity curve for an account (closing equity per hour, or per day beyond a month)"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                SELECT timestamp, equity
-                FROM account_snapshots
-                WHERE account_id = ?
-                AND datetime(timestamp) >= datetime('now', '-' || ? || ' days')
-                ORDER BY timestamp ASC
-            """, (account_id, days))
-            
-            return [(row['timestamp'], row['equity']) for row in cursor.fetchall()]
+            points = self.rollups.snapshots(account_id, days=days, bucket=resolution_for(days))
+            return [(point['last_time'], point['close']) for point in points]
             
         except Exception as e:
             logger.error(f"❌ Failed to get equity curve: {e}")
@@ -422,56 +465,56 @@ class PerformanceDatabase:
                          days: int = 30) -> List[float]:
         """Get daily returns for analysis"""
         try:
-            query = """
-                SELECT SUM(net_pl) as daily_pl
-                FROM trades
-                WHERE status = 'closed'
-                AND date(entry_time) >= date('now', '-' || ? || ' days')
-            """
-            params = [days]
-            
-            if strategy_name:
-                query += " AND strategy_name = ?"
-                params.append(strategy_name)
-            
-            if account_id:
-                query += " AND account_id = ?"
-                params.append(account_id)
-            
-            query += " GROUP BY date(entry_time) ORDER BY date(entry_time)"
-            
-            cursor = self.conn.cursor()
-            cursor.execute(query, params)
-            
-            return [row['daily_pl'] for row in cursor.fetchall()]
+            breakdown = self.rollups.breakdown('day', days=days, strategy_id=strategy_name, account_id=account_id)
+            return [day['pnl'] for day in breakdown]
             
         except Exception as e:
             logger.error(f"❌ Failed to get daily returns: {e}")
             return []
     
+    def get_period_breakdown(self,
+                             bucket: str = 'day',
+                             strategy_name: Optional[str] = None,
+                             account_id: Optional[str] = None,
+                             instrument: Optional[str] = None,
+                             days: int = 30) -> List[Dict[str, Any]]:
+        """Per-hour/day/week/month trade statistics with the running equity curve, from the rollups"""
+        try:
+            breakdown = self.rollups.breakdown(bucket, days=days, strategy_id=strategy_name,
+                                               account_id=account_id, instrument=instrument)
+            for period, point in zip(breakdown, equity_from_breakdown(breakdown)):
+                period['cumulative_pnl'] = point['cumulative_pnl']
+                period['drawdown'] = point['drawdown']
+            return breakdown
+            
+        except Exception as e:
+            logger.error(f"❌ Failed to get period breakdown: {e}")
+            return []
+    
     def get_database_stats(self) -> Dict[str, int]:
         """Get database statistics"""
         try:
-            cursor = self.conn.cursor()
-            
-            stats = {}
-            
-            # Count trades
-            cursor.execute("SELECT COUNT(*) as count FROM trades")
-            stats['total_trades'] = cursor.fetchone()['count']
-            
-            # Count snapshots
-            cursor.execute("SELECT COUNT(*) as count FROM account_snapshots")
-            stats['total_snapshots'] = cursor.fetchone()['count']
-            
-            # Count changes
-            cursor.execute("SELECT COUNT(*) as count FROM strategy_changes")
-            stats['total_changes'] = cursor.fetchone()['count']
-            
-            # Count metrics
-            cursor.execute("SELECT COUNT(*) as count FROM strategy_metrics")
-            stats['total_metrics'] = cursor.fetchone()['count']
-            
+            with self.store.read() as conn:
+                cursor = conn.cursor()
+                
+                stats = {}
+                
+                # Count trades
+                cursor.execute("SELECT COUNT(*) as count FROM trades")
+                stats['total_trades'] = cursor.fetchone()['count']
+                
+                # Count snapshots
+                cursor.execute("SELECT COUNT(*) as count FROM account_snapshots")
+                stats['total_snapshots'] = cursor.fetchone()['count']
+                
+                # Count changes
+                cursor.execute("SELECT COUNT(*) as count FROM strategy_changes")
+                stats['total_changes'] = cursor.fetchone()['count']
+                
+                # Count metrics
+                cursor.execute("SELECT COUNT(*) as count FROM strategy_metrics")
+                stats['total_metrics'] = cursor.fetchone()['count']
+                
             return stats
             
         except Exception as e:
@@ -14,6 +14,11 @@ from datetime import datetime
 # Add src to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
+# Optional -X importtime style startup report (IMPORT_TIME_REPORT=true): hook in before the heavy imports
+if os.getenv('IMPORT_TIME_REPORT', 'false').lower() == 'true':
+    from src.core.lazy_imports import install_import_timer
+    install_import_timer()
+
 # Setup logging for cloud
 logging.basicConfig(
     level=logging.INFO,
@@ -21,18 +26,19 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Import analytics modules
-try:
-    from src.analytics.trade_database import get_trade_database
-    from src.analytics.trade_logger import get_trade_logger
-    from src.analytics.strategy_version_manager import get_strategy_version_manager
-    from src.analytics.analytics_dashboard import get_analytics_dashboard
-    from src.analytics.data_archiver import get_data_archiver
-    ANALYTICS_ENABLED = True
-    logger.info("✅ Analytics modules imported successfully")
-except ImportError as e:
-    ANALYTICS_ENABLED = False
-    logger.warning(f"⚠️ Analytics not available: {e}")
+# Analytics modules - imported on first use
+from src.core.lazy_imports import lazy_import, module_available, log_import_report
+ANALYTICS_ENABLED = all(module_available(f'src.analytics.{name}') for name in (
+    'trade_database', 'trade_logger', 'strategy_version_manager', 'analytics_dashboard', 'data_archiver'))
+get_trade_database = lazy_import('src.analytics.trade_database', attr='get_trade_database')
+get_trade_logger = lazy_import('src.analytics.trade_logger', attr='get_trade_logger')
+get_strategy_version_manager = lazy_import('src.analytics.strategy_version_manager', attr='get_strategy_version_manager')
+get_analytics_dashboard = lazy_import('src.analytics.analytics_dashboard', attr='get_analytics_dashboard')
+get_data_archiver = lazy_import('src.analytics.data_archiver', attr='get_data_archiver')
+if ANALYTICS_ENABLED:
+    logger.info("✅ Analytics modules available (loaded on first use)")
+else:
+    logger.warning("⚠️ Analytics not available")
 
 def start_analytics_dashboard_cloud():
     """Start analytics dashboard for cloud deployment"""
@@ -415,6 +421,10 @@ def main():
         logger.info("📊 Main Dashboard: http://localhost:{}/".format(port))
         logger.info("📈 Analytics Dashboard: http://localhost:{}/analytics/".format(port))
         
+        log_import_report()
+        from src.core.tick_journal import start_tick_journal
+        start_tick_journal()
+        
         # Start Flask app with SocketIO
         socketio.run(app, host='0.0.0.0', port=port, debug=False, allow_unsafe_werkzeug=True)
         
@@ -11,6 +11,7 @@ import yaml
 import logging
 import json
 import itertools
+import functools
 from datetime import datetime, timedelta
 import pytz
 from typing import Dict, List, Tuple
@@ -38,6 +39,8 @@ except Exception as e:
 
 from src.core.oanda_client import OandaClient
 from src.core.data_feed import MarketData
+from src.core.candle_store import get_candle_store
+from src.core.sweep_engine import SweepEngine
 from src.core.ftmo_risk_manager import FTMORiskManager
 from src.strategies.momentum_trading import MomentumTradingStrategy
 
@@ -51,17 +54,12 @@ def fetch_oanda_data(client, instrument, days=14):
     count = min(5000, days * candles_per_day)
     
     try:
-        response = client.get_candles(
-            instrument=instrument,
-            granularity=granularity,
-            count=count
-        )
+        candles = get_candle_store(client).get_recent_candles(instrument, granularity, count, price='BA')
         
-        if not response or 'candles' not in response:
+        if not candles:
             logger.error(f"  ❌ No data returned")
             return None
         
-        candles = response['candles']
         logger.info(f"  ✅ {len(candles)} {granularity} candles retrieved")
         
         # Process candles
@@ -312,6 +310,37 @@ def simple_backtest(data, params):
         'final_balance': balance
     }
 
+def evaluate_ftmo_params(params, data):
+    """Backtest one parameter set and score it for the FTMO challenge"""
+    result = simple_backtest(data, params)
+    
+    # Calculate FTMO fitness
+    fitness = 0
+    
+    # Win rate component (60% weight)
+    if result['win_rate'] >= 65:
+        fitness += 0.6 * (result['win_rate'] / 100)
+    else:
+        fitness += 0.3 * (result['win_rate'] / 100)  # Penalty for < 65%
+    
+    # Trade frequency (20% weight) - target 20-40 trades
+    trade_score = 1 - abs(result['trades'] - 30) / 50
+    fitness += 0.2 * max(0, trade_score)
+    
+    # Profitability (10% weight)
+    if result['profit_pips'] > 0:
+        fitness += 0.1
+    
+    # Max drawdown (10% weight) - lower is better
+    dd_score = 1 - (result['max_dd'] / 10)  # Normalize to 10% max
+    fitness += 0.1 * max(0, dd_score)
+    
+    return {
+        'params': params,
+        'fitness': fitness,
+        **result
+    }
+
 def optimize_for_ftmo():
     """Run comprehensive optimization for FTMO challenge"""
     
@@ -351,45 +380,13 @@ def optimize_for_ftmo():
     logger.info(f"📊 Testing {total_combos} parameter combinations...")
     logger.info(f"   Estimated time: {total_combos * 0.5 / 60:.1f} minutes\n")
     
-    # Test each combination
-    results = []
-    
-    for i, params in enumerate(param_combos, 1):
-        if i % 100 == 0 or i == 1:
-            logger.info(f"  Progress: {i}/{total_combos} ({i*100//total_combos}%)")
-        
-        try:
-            result = simple_backtest(data, params)
-            
-            # Calculate FTMO fitness
-            fitness = 0
-            
-            # Win rate component (60% weight)
-            if result['win_rate'] >= 65:
-                fitness += 0.6 * (result['win_rate'] / 100)
-            else:
-                fitness += 0.3 * (result['win_rate'] / 100)  # Penalty for < 65%
-            
-            # Trade frequency (20% weight) - target 20-40 trades
-            trade_score = 1 - abs(result['trades'] - 30) / 50
-            fitness += 0.2 * max(0, trade_score)
-            
-            # Profitability (10% weight)
-            if result['profit_pips'] > 0:
-                fitness += 0.1
-            
-            # Max drawdown (10% weight) - lower is better
-            dd_score = 1 - (result['max_dd'] / 10)  # Normalize to 10% max
-            fitness += 0.1 * max(0, dd_score)
-            
-            results.append({
-                'params': params,
-                'fitness': fitness,
-                **result
-            })
-            
-        except Exception as e:
-            logger.debug(f"  Error testing combo {i}: {e}")
+    # Test each combination on a process pool
+    engine = SweepEngine(
+        functools.partial(evaluate_ftmo_params, data=data),
+        checkpoint_path=os.getenv('FTMO_SWEEP_CHECKPOINT'),
+        name='FTMO'
+    )
+    results = engine.run(param_combos)
     
     # Sort by fitness
     results.sort(key=lambda x: x['fitness'], reverse=True)
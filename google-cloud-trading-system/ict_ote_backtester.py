@@ -13,7 +13,6 @@ import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass, asdict
-import requests
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -23,11 +22,19 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 try:
     from src.strategies.ict_ote_strategy import ICTOTEStrategy, ICTLevel
     from src.core.data_feed import MarketData
+    from src.core.oanda_client import OandaClient
+    from src.core.candle_store import get_candle_store
+    from src.core.ohlcv_arrays import OHLCVArrays, load_ohlcv
+    from src.core.bar_iterator import AlignedBarIterator
 except ImportError:
     # Try direct import
     sys.path.insert(0, os.path.dirname(__file__))
     from strategies.ict_ote_strategy import ICTOTEStrategy, ICTLevel
     from core.data_feed import MarketData
+    from core.oanda_client import OandaClient
+    from core.candle_store import get_candle_store
+    from core.ohlcv_arrays import OHLCVArrays, load_ohlcv
+    from core.bar_iterator import AlignedBarIterator
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -108,6 +115,9 @@ class ICTOTEBacktester:
         self.equity_curve: List[Dict] = []
         self.metrics: Optional[BacktestMetrics] = None
         
+        # Memory-mapped bars behind each fetched DataFrame
+        self.ohlcv_arrays: Dict[str, OHLCVArrays] = {}
+        
         logger.info("🚀 ICT OTE Backtester initialized")
         logger.info(f"📊 Instruments: {config.instruments}")
         logger.info(f"📅 Period: {config.start_date.strftime('%Y-%m-%d')} to {config.end_date.strftime('%Y-%m-%d')}")
@@ -117,41 +127,16 @@ class ICTOTEBacktester:
         try:
             logger.info(f"📥 Fetching historical data for {instrument}...")
             
-            # Calculate total candles needed
-            days = (self.config.end_date - self.config.start_date).days
-            count = min(days * 96, 5000)  # M15 = 96 candles per day, max 5000
-            
-            url = f"{self.base_url}/v3/instruments/{instrument}/candles"
-            params = {
-                'count': count,
-                'granularity': self.config.granularity,
-                'price': 'M',
-                'from': self.config.start_date.strftime('%Y-%m-%dT%H:%M:%S.000000000Z'),
-                'to': self.config.end_date.strftime('%Y-%m-%dT%H:%M:%S.000000000Z')
-            }
-            
-            response = requests.get(url, headers=self.headers, params=params, timeout=30)
-            
-            if response.status_code == 200:
-                data = response.json()
-                candles = data.get('candles', [])
-                
-                # Convert to DataFrame
-                df_data = []
-                for candle in candles:
-                    if 'mid' in candle and candle['mid']:
-                        df_data.append({
-                            'timestamp': pd.to_datetime(candle['time']),
-                            'open': float(candle['mid']['o']),
-                            'high': float(candle['mid']['h']),
-                            'low': float(candle['mid']['l']),
-                            'close': float(candle['mid']['c']),
-                            'volume': int(candle['volume'])
-                        })
-                
-                df = pd.DataFrame(df_data)
-                df.set_index('timestamp', inplace=True)
-                df.sort_index(inplace=True)
+            # Served from the local candle store; only missing ranges hit OANDA
+            # Account ID comes from the unified credential loader / OANDA_ACCOUNT_ID
+            store = get_candle_store(OandaClient(api_key=self.api_key))
+            arrays = load_ohlcv(instrument, self.config.granularity,
+                                self.config.start_date, self.config.end_date, price='M', store=store)
+            
+            if len(arrays):
+                # Columns are views over the memory-mapped arrays; no per-candle parsing
+                self.ohlcv_arrays[instrument] = arrays
+                df = arrays.to_dataframe()
                 
                 # Add technical indicators
                 df = self._add_technical_indicators(df)
@@ -160,7 +145,7 @@ class ICTOTEBacktester:
                 return df
                 
             else:
-                logger.error(f"❌ Failed to fetch {instrument}: HTTP {response.status_code}")
+                logger.error(f"❌ Failed to fetch {instrument}: no candles available")
                 return pd.DataFrame()
                 
         except Exception as e:
@@ -243,16 +228,11 @@ class ICTOTEBacktester:
             
             # Pre-fill strategy with historical data
             for instrument, df in historical_data.items():
-                strategy.price_history[instrument] = []
-                for _, row in df.iterrows():
-                    strategy.price_history[instrument].append({
-                        'timestamp': row.name.isoformat(),
-                        'open': row['open'],
-                        'high': row['high'],
-                        'low': row['low'],
-                        'close': row['close'],
-                        'volume': row['volume']
-                    })
+                strategy.price_history[instrument] = [
+                    {'timestamp': ts.isoformat(), 'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+                    for ts, o, h, l, c, v in zip(df.index, df['open'].tolist(), df['high'].tolist(),
+                                                 df['low'].tolist(), df['close'].tolist(), df['volume'].tolist())
+                ]
                 
                 # Analyze ICT levels
                 strategy._analyze_ict_levels(instrument)
@@ -265,32 +245,19 @@ class ICTOTEBacktester:
                 'drawdown': 0.0
             })
             
-            # Process each time step
-            all_timestamps = set()
-            for df in historical_data.values():
-                all_timestamps.update(df.index)
-            
-            for timestamp in sorted(all_timestamps):
+            # Process each time step on the merged multi-instrument timeline
+            bars = AlignedBarIterator(
+                {instrument: self.ohlcv_arrays[instrument] for instrument in historical_data},
+                min_spread=0.0001
+            )
+            for bar, market_data_dict in bars.snapshots():
+                timestamp = pd.Timestamp(bar.time_ns, tz='UTC')
+                
                 # Check for trade exits first
-                self._check_trade_exits(timestamp, historical_data, balance, positions)
+                self._check_trade_exits(timestamp, market_data_dict, balance, positions)
                 
                 # Generate new signals
-                for instrument, df in historical_data.items():
-                    if timestamp not in df.index:
-                        continue
-                    
-                    row = df.loc[timestamp]
-                    
-                    # Create market data
-                    market_data = MarketData(
-                        instrument=instrument,
-                        bid=row['close'],
-                        ask=row['close'] + 0.0001,
-                        timestamp=timestamp,
-                        spread=0.0001,
-                        session='LONDON'
-                    )
-                    
+                for instrument, market_data in market_data_dict.items():
                     # Generate signals
                     signals = strategy.analyze_market({instrument: market_data})
                     
@@ -313,7 +280,7 @@ class ICTOTEBacktester:
                         
                         # Execute trade
                         trade = self._execute_trade(
-                            signal, timestamp, row, position_size, atr
+                            signal, timestamp, market_data, position_size, atr
                         )
                         
                         if trade:
@@ -353,7 +320,7 @@ class ICTOTEBacktester:
             logger.error(f"❌ Backtest failed: {e}")
             return None
     
-    def _execute_trade(self, signal, timestamp: datetime, row: pd.Series, 
+    def _execute_trade(self, signal, timestamp: datetime, market_data: MarketData, 
                       position_size: float, atr: float) -> Optional[Trade]:
         """Execute a trade based on signal"""
         try:
@@ -425,22 +392,17 @@ class ICTOTEBacktester:
             logger.error(f"❌ Trade execution failed: {e}")
             return None
     
-    def _check_trade_exits(self, timestamp: datetime, historical_data: Dict[str, pd.DataFrame], 
+    def _check_trade_exits(self, timestamp: datetime, market_data_dict: Dict[str, MarketData], 
                           balance: float, positions: Dict) -> None:
         """Check for trade exits based on stop loss, take profit, or time"""
         try:
             trades_to_close = []
             
             for trade_timestamp, trade in positions.items():
-                if trade.instrument not in historical_data:
-                    continue
-                
-                df = historical_data[trade.instrument]
-                if timestamp not in df.index:
+                if trade.instrument not in market_data_dict:
                     continue
                 
-                row = df.loc[timestamp]
-                current_price = row['close']
+                current_price = market_data_dict[trade.instrument].bid
                 
                 # Check stop loss
                 if trade.side == 'BUY' and current_price <= trade.stop_loss:
@@ -7,13 +7,13 @@ Comprehensive optimization system for ICT Optimal Trade Entry strategy
 import os
 import sys
 import json
+import functools
 import logging
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass, asdict
-import requests
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -22,6 +22,10 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from strategies.ict_ote_strategy import ICTOTEStrategy, ICTLevel
 from core.data_feed import MarketData
+from core.oanda_client import OandaClient
+from core.candle_store import get_candle_store
+from core.ohlcv_arrays import load_ohlcv
+from core.sweep_engine import SweepEngine
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -82,6 +86,19 @@ class MonteCarloResult:
     max_consecutive_wins: int
     simulations: List[float]
 
+def _bar_market_data(instrument: str, timestamp, close: float) -> MarketData:
+    """MarketData for a mid-only bar, with the fixed 1-pip ask the simulation assumes"""
+    return MarketData(
+        pair=instrument,
+        bid=close,
+        ask=close + 0.0001,
+        timestamp=timestamp.isoformat(),
+        is_live=False,
+        data_source='OANDA_Historical',
+        spread=0.0001,
+        last_update_age=0
+    )
+
 class ICTOTEOptimizer:
     """Comprehensive ICT OTE Strategy Optimizer"""
     
@@ -108,47 +125,20 @@ class ICTOTEOptimizer:
         try:
             logger.info(f"📥 Fetching historical data for {instrument}...")
             
-            # Calculate total candles needed
-            days = (self.config.end_date - self.config.start_date).days
-            count = min(days * 96, 5000)  # M15 = 96 candles per day, max 5000
+            # Served from the local candle store; only missing ranges hit OANDA
+            # Account ID comes from the unified credential loader / OANDA_ACCOUNT_ID
+            store = get_candle_store(OandaClient(api_key=self.api_key))
+            arrays = load_ohlcv(instrument, granularity,
+                                self.config.start_date, self.config.end_date, price='M', store=store)
             
-            url = f"{self.base_url}/v3/instruments/{instrument}/candles"
-            params = {
-                'count': count,
-                'granularity': granularity,
-                'price': 'M',
-                'from': self.config.start_date.strftime('%Y-%m-%dT%H:%M:%S.000000000Z'),
-                'to': self.config.end_date.strftime('%Y-%m-%dT%H:%M:%S.000000000Z')
-            }
-            
-            response = requests.get(url, headers=self.headers, params=params, timeout=30)
-            
-            if response.status_code == 200:
-                data = response.json()
-                candles = data.get('candles', [])
-                
-                # Convert to DataFrame
-                df_data = []
-                for candle in candles:
-                    if 'mid' in candle and candle['mid']:
-                        df_data.append({
-                            'timestamp': pd.to_datetime(candle['time']),
-                            'open': float(candle['mid']['o']),
-                            'high': float(candle['mid']['h']),
-                            'low': float(candle['mid']['l']),
-                            'close': float(candle['mid']['c']),
-                            'volume': int(candle['volume'])
-                        })
-                
-                df = pd.DataFrame(df_data)
-                df.set_index('timestamp', inplace=True)
-                df.sort_index(inplace=True)
-                
+            if len(arrays):
+                # Columns are views over the memory-mapped arrays; no per-candle parsing
+                df = arrays.to_dataframe()
                 logger.info(f"✅ {instrument}: {len(df)} candles loaded")
                 return df
                 
             else:
-                logger.error(f"❌ Failed to fetch {instrument}: HTTP {response.status_code}")
+                logger.error(f"❌ Failed to fetch {instrument}: no candles available")
                 return pd.DataFrame()
                 
         except Exception as e:
@@ -189,16 +179,11 @@ class ICTOTEOptimizer:
                     continue
                 
                 # Pre-fill strategy with historical data
-                strategy.price_history[instrument] = []
-                for _, row in df.iterrows():
-                    strategy.price_history[instrument].append({
-                        'timestamp': row.name.isoformat(),
-                        'open': row['open'],
-                        'high': row['high'],
-                        'low': row['low'],
-                        'close': row['close'],
-                        'volume': row['volume']
-                    })
+                strategy.price_history[instrument] = [
+                    {'timestamp': ts.isoformat(), 'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+                    for ts, o, h, l, c, v in zip(df.index, df['open'].tolist(), df['high'].tolist(),
+                                                 df['low'].tolist(), df['close'].tolist(), df['volume'].tolist())
+                ]
                 
                 # Analyze ICT levels
                 strategy._analyze_ict_levels(instrument)
@@ -208,16 +193,9 @@ class ICTOTEOptimizer:
                 if df.empty:
                     continue
                 
-                for timestamp, row in df.iterrows():
+                for timestamp, close in zip(df.index, df['close'].tolist()):
                     # Create market data
-                    market_data = MarketData(
-                        instrument=instrument,
-                        bid=row['close'],
-                        ask=row['close'] + 0.0001,
-                        timestamp=timestamp,
-                        spread=0.0001,
-                        session='LONDON'
-                    )
+                    market_data = _bar_market_data(instrument, timestamp, close)
                     
                     # Generate signals
                     signals = strategy.analyze_market({instrument: market_data})
@@ -415,8 +393,9 @@ class ICTOTEOptimizer:
         
         return combinations
     
-    def run_optimization(self, n_combinations: int = 50) -> Dict[str, Any]:
-        """Run parameter optimization"""
+    def run_optimization(self, n_combinations: int = 50, workers: Optional[int] = None,
+                         checkpoint_path: Optional[str] = None) -> Dict[str, Any]:
+        """Run parameter optimization (backtests fan out over a process pool)"""
         logger.info(f"🔧 Starting optimization with {n_combinations} combinations...")
         
         # Fetch historical data
@@ -430,16 +409,19 @@ class ICTOTEOptimizer:
             logger.error("❌ No historical data available for optimization")
             return {}
         
-        # Generate parameter combinations
-        combinations = self.generate_parameter_combinations(n_combinations)
-        
         # Run backtests
-        results = []
-        for i, params in enumerate(combinations):
-            logger.info(f"🔄 Running backtest {i+1}/{len(combinations)}...")
-            result = self.run_single_backtest(params, historical_data)
-            if result:
-                results.append(result)
+        engine = SweepEngine(
+            functools.partial(self.run_single_backtest, historical_data=historical_data),
+            workers=workers,
+            checkpoint_path=checkpoint_path,
+            encode=asdict,
+            decode=lambda stored: BacktestResult(**stored),
+            name='ICT OTE'
+        )
+        
+        # Generate parameter combinations (a resumed run reuses the checkpointed ones)
+        combinations = engine.plan(lambda: self.generate_parameter_combinations(n_combinations))
+        results = engine.run(combinations)
         
         # Find best parameters
         if results:
@@ -506,29 +488,17 @@ class ICTOTEOptimizer:
                     continue
                 
                 # Pre-fill strategy
-                strategy.price_history[instrument] = []
-                for _, row in df.iterrows():
-                    strategy.price_history[instrument].append({
-                        'timestamp': row.name.isoformat(),
-                        'open': row['open'],
-                        'high': row['high'],
-                        'low': row['low'],
-                        'close': row['close'],
-                        'volume': row['volume']
-                    })
+                strategy.price_history[instrument] = [
+                    {'timestamp': ts.isoformat(), 'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+                    for ts, o, h, l, c, v in zip(df.index, df['open'].tolist(), df['high'].tolist(),
+                                                 df['low'].tolist(), df['close'].tolist(), df['volume'].tolist())
+                ]
                 
                 strategy._analyze_ict_levels(instrument)
                 
                 # Generate signals for this instrument
-                for timestamp, row in df.iterrows():
-                    market_data = MarketData(
-                        instrument=instrument,
-                        bid=row['close'],
-                        ask=row['close'] + 0.0001,
-                        timestamp=timestamp,
-                        spread=0.0001,
-                        session='LONDON'
-                    )
+                for timestamp, close in zip(df.index, df['close'].tolist()):
+                    market_data = _bar_market_data(instrument, timestamp, close)
                     
                     signals = strategy.analyze_market({instrument: market_data})
                     for signal in signals:
@@ -536,7 +506,7 @@ class ICTOTEOptimizer:
                             'timestamp': timestamp,
                             'instrument': instrument,
                             'signal': signal,
-                            'price': row['close']
+                            'price': close
                         })
             
             # Randomly select trades for this simulation
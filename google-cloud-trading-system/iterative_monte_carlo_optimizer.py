@@ -14,6 +14,7 @@ os.chdir(repo_root)
 from universal_backtest_fix import load_credentials, OandaClient, get_historical_data, run_backtest
 from src.strategies.gbp_usd_optimized import get_strategy_rank_1
 from src.core.order_manager import TradeSignal, OrderSide
+from src.core.sweep_engine import SweepEngine
 
 pairs = ['GBP_USD','XAU_USD','USD_JPY','EUR_USD','NZD_USD','AUD_USD']
 
@@ -23,6 +24,7 @@ if not load_credentials():
 client = OandaClient()
 now = datetime.now(pytz.UTC)
 span_days = 14
+min_trades_per_pair = 10
 
 def enable_backtest_mode(strategy, confidence=0.15):
     if hasattr(strategy, '_is_trading_session'):
@@ -119,10 +121,108 @@ def get_ranges(iteration):
     }
     return ranges, base_confidence
 
+# Per-pair candle history, set before each sweep; forked workers inherit it
+hist_by_pair = {}
+
+def evaluate_candidate(cand):
+    """Backtest one random configuration across M5/M15/M30 (runs in a sweep worker)"""
+    pair, confidence = cand['pair'], cand['confidence']
+    ef, es, rlo, rhi, atrm, rr = cand['ef'], cand['es'], cand['rlo'], cand['rhi'], cand['atrm'], cand['rr']
+    hist_m5, hist_m15, hist_m30 = hist_by_pair[pair]
+
+    try:
+        s = get_strategy_rank_1()
+        enable_backtest_mode(s, confidence)
+        patch_create_trade_signal(s, confidence)
+        s.instrument = pair
+        s.instruments = [pair]
+        s.ema_fast = int(ef)
+        s.ema_slow = int(es)
+        s.rsi_oversold = float(rlo)
+        s.rsi_overbought = float(rhi)
+        s.atr_multiplier = float(atrm)
+        s.risk_reward_ratio = float(rr)
+        
+        # Initialize EMA history for new periods
+        s.ema_history = {s.ema_fast: [], s.ema_slow: []}
+
+        # Run all granularities with error handling
+        res5 = {'trades':0,'total_profit':0,'profit_factor':0,'win_rate':0}
+        res15 = {'trades':0,'total_profit':0,'profit_factor':0,'win_rate':0}
+        res30 = {'trades':0,'total_profit':0,'profit_factor':0,'win_rate':0}
+        
+        if hist_m5 and len(hist_m5) > max(s.ema_slow, s.rsi_period, s.atr_period) + 10:
+            try:
+                res5 = run_backtest(s, {pair: hist_m5}, days=span_days)
+            except Exception as e:
+                pass  # Skip on error
+        
+        if hist_m15 and len(hist_m15) > max(s.ema_slow, s.rsi_period, s.atr_period) + 10:
+            try:
+                # Reset strategy state for new timeframe
+                s.price_history = []
+                s.ema_history = {s.ema_fast: [], s.ema_slow: []}
+                s.rsi_history = []
+                s.atr_history = []
+                res15 = run_backtest(s, {pair: hist_m15}, days=span_days)
+            except Exception as e:
+                pass
+        
+        if hist_m30 and len(hist_m30) > max(s.ema_slow, s.rsi_period, s.atr_period) + 10:
+            try:
+                # Reset strategy state for new timeframe
+                s.price_history = []
+                s.ema_history = {s.ema_fast: [], s.ema_slow: []}
+                s.rsi_history = []
+                s.atr_history = []
+                res30 = run_backtest(s, {pair: hist_m30}, days=span_days)
+            except Exception as e:
+                pass
+    except Exception as e:
+        # Skip this candidate on error
+        return None
+    
+    trades = (res5.get('trades',0) or 0) + (res15.get('trades',0) or 0) + (res30.get('trades',0) or 0)
+    pnl = (res5.get('total_profit',0) or 0) + (res15.get('total_profit',0) or 0) + (res30.get('total_profit',0) or 0)
+    pf = max(res5.get('profit_factor',0) or 0, res15.get('profit_factor',0) or 0, res30.get('profit_factor',0) or 0)
+    
+    # Weighted win rate
+    total_trades = trades
+    if total_trades > 0:
+        wr5 = res5.get('win_rate', 0) or 0
+        wr15 = res15.get('win_rate', 0) or 0
+        wr30 = res30.get('win_rate', 0) or 0
+        trades5 = res5.get('trades', 0) or 0
+        trades15 = res15.get('trades', 0) or 0
+        trades30 = res30.get('trades', 0) or 0
+        wr = ((wr5 * trades5) + (wr15 * trades15) + (wr30 * trades30)) / total_trades if total_trades > 0 else 0
+    else:
+        wr = 0
+
+    if trades < min_trades_per_pair:
+        score = -1000 + trades
+    else:
+        score = pnl + max(0.0, (pf-1.0))*400 + (wr-35)*0.5 + min(trades/3, 30)
+
+    return {
+        'score': score,
+        'trades': trades,
+        'win_rate': wr,
+        'profit_factor': pf,
+        'pnl_pips': pnl,
+        'cfg': {
+            'ema_fast': ef,
+            'ema_slow': es,
+            'rsi_oversold': rlo,
+            'rsi_overbought': rhi,
+            'atr_multiplier': atrm,
+            'rr': rr,
+        }
+    }
+
 results = {}
 iteration = 0
 max_iterations = 10
-min_trades_per_pair = 10
 
 print(f"[{datetime.now().strftime('%H:%M:%S')}] Starting iterative optimization...", file=sys.stderr)
 print(f"Target: {min_trades_per_pair} trades minimum per pair", file=sys.stderr)
@@ -180,10 +280,11 @@ while iteration < max_iterations:
             all_viable = False
             continue
 
-        candidates = []
+        hist_by_pair[pair] = (hist_m5, hist_m15, hist_m30)
         iters = 500 + (iteration * 100)  # More iterations each round
         r = ranges_dict[pair]
 
+        sweep = []
         for i in range(iters):
             ef = random.randint(*r['ef'])
             es = random.randint(max(ef+2, r['es'][0]), r['es'][1])
@@ -191,96 +292,10 @@ while iteration < max_iterations:
             rhi = random.uniform(max(rlo+5, r['rsi_hi'][0]), r['rsi_hi'][1])
             atrm = random.uniform(*r['atr'])
             rr = random.uniform(*r['rr'])
+            sweep.append({'pair': pair, 'confidence': confidence,
+                          'ef': ef, 'es': es, 'rlo': rlo, 'rhi': rhi, 'atrm': atrm, 'rr': rr})
 
-            try:
-                s = get_strategy_rank_1()
-                enable_backtest_mode(s, confidence)
-                patch_create_trade_signal(s, confidence)
-                s.instrument = pair
-                s.instruments = [pair]
-                s.ema_fast = int(ef)
-                s.ema_slow = int(es)
-                s.rsi_oversold = float(rlo)
-                s.rsi_overbought = float(rhi)
-                s.atr_multiplier = float(atrm)
-                s.risk_reward_ratio = float(rr)
-                
-                # Initialize EMA history for new periods
-                s.ema_history = {s.ema_fast: [], s.ema_slow: []}
-
-                # Run all granularities with error handling
-                res5 = {'trades':0,'total_profit':0,'profit_factor':0,'win_rate':0}
-                res15 = {'trades':0,'total_profit':0,'profit_factor':0,'win_rate':0}
-                res30 = {'trades':0,'total_profit':0,'profit_factor':0,'win_rate':0}
-                
-                if hist_m5 and len(hist_m5) > max(s.ema_slow, s.rsi_period, s.atr_period) + 10:
-                    try:
-                        res5 = run_backtest(s, {pair: hist_m5}, days=span_days)
-                    except Exception as e:
-                        pass  # Skip on error
-                
-                if hist_m15 and len(hist_m15) > max(s.ema_slow, s.rsi_period, s.atr_period) + 10:
-                    try:
-                        # Reset strategy state for new timeframe
-                        s.price_history = []
-                        s.ema_history = {s.ema_fast: [], s.ema_slow: []}
-                        s.rsi_history = []
-                        s.atr_history = []
-                        res15 = run_backtest(s, {pair: hist_m15}, days=span_days)
-                    except Exception as e:
-                        pass
-                
-                if hist_m30 and len(hist_m30) > max(s.ema_slow, s.rsi_period, s.atr_period) + 10:
-                    try:
-                        # Reset strategy state for new timeframe
-                        s.price_history = []
-                        s.ema_history = {s.ema_fast: [], s.ema_slow: []}
-                        s.rsi_history = []
-                        s.atr_history = []
-                        res30 = run_backtest(s, {pair: hist_m30}, days=span_days)
-                    except Exception as e:
-                        pass
-            except Exception as e:
-                # Skip this iteration on error
-                continue
-            
-            trades = (res5.get('trades',0) or 0) + (res15.get('trades',0) or 0) + (res30.get('trades',0) or 0)
-            pnl = (res5.get('total_profit',0) or 0) + (res15.get('total_profit',0) or 0) + (res30.get('total_profit',0) or 0)
-            pf = max(res5.get('profit_factor',0) or 0, res15.get('profit_factor',0) or 0, res30.get('profit_factor',0) or 0)
-            
-            # Weighted win rate
-            total_trades = trades
-            if total_trades > 0:
-                wr5 = res5.get('win_rate', 0) or 0
-                wr15 = res15.get('win_rate', 0) or 0
-                wr30 = res30.get('win_rate', 0) or 0
-                trades5 = res5.get('trades', 0) or 0
-                trades15 = res15.get('trades', 0) or 0
-                trades30 = res30.get('trades', 0) or 0
-                wr = ((wr5 * trades5) + (wr15 * trades15) + (wr30 * trades30)) / total_trades if total_trades > 0 else 0
-            else:
-                wr = 0
-
-            if trades < min_trades_per_pair:
-                score = -1000 + trades
-            else:
-                score = pnl + max(0.0, (pf-1.0))*400 + (wr-35)*0.5 + min(trades/3, 30)
-
-            candidates.append({
-                'score': score,
-                'trades': trades,
-                'win_rate': wr,
-                'profit_factor': pf,
-                'pnl_pips': pnl,
-                'cfg': {
-                    'ema_fast': ef,
-                    'ema_slow': es,
-                    'rsi_oversold': rlo,
-                    'rsi_overbought': rhi,
-                    'atr_multiplier': atrm,
-                    'rr': rr,
-                }
-            })
+        candidates = SweepEngine(evaluate_candidate, name=f"{pair} iter{iteration}").run(sweep)
 
         candidates.sort(key=lambda x: x['score'], reverse=True)
         top = candidates[:10]
@@ -11,6 +11,11 @@ if _os.getenv('EVENTLET_DISABLED', 'false').lower() not in ('1', 'true', 'yes'):
     import eventlet
     eventlet.monkey_patch(all=True, socket=True)
 
+# Optional -X importtime style startup report (IMPORT_TIME_REPORT=true): hook in before the heavy imports
+if _os.getenv('IMPORT_TIME_REPORT', 'false').lower() == 'true':
+    from src.core.lazy_imports import install_import_timer
+    install_import_timer()
+
 import os
 import sys
 import logging
@@ -112,18 +117,19 @@ def _get_live_logs(limit: int = 200):
         # Never fail monitoring endpoint
         return []
 
-# Import analytics modules
-try:
-    from src.analytics.trade_database import get_trade_database
-    from src.analytics.trade_logger import get_trade_logger
-    from src.analytics.strategy_version_manager import get_strategy_version_manager
-    from src.analytics.analytics_dashboard import start_analytics_dashboard
-    from src.analytics.data_archiver import get_data_archiver
-    ANALYTICS_ENABLED = True
-    logger.info("✅ Analytics modules imported successfully")
-except ImportError as e:
-    ANALYTICS_ENABLED = False
-    logger.warning(f"⚠️ Analytics not available: {e}")
+# Analytics modules - imported on first use (the dashboard module pulls in a second Flask app)
+from src.core.lazy_imports import lazy_import, module_available
+ANALYTICS_ENABLED = all(module_available(f'src.analytics.{name}') for name in (
+    'trade_database', 'trade_logger', 'strategy_version_manager', 'analytics_dashboard', 'data_archiver'))
+get_trade_database = lazy_import('src.analytics.trade_database', attr='get_trade_database')
+get_trade_logger = lazy_import('src.analytics.trade_logger', attr='get_trade_logger')
+get_strategy_version_manager = lazy_import('src.analytics.strategy_version_manager', attr='get_strategy_version_manager')
+start_analytics_dashboard = lazy_import('src.analytics.analytics_dashboard', attr='start_analytics_dashboard')
+get_data_archiver = lazy_import('src.analytics.data_archiver', attr='get_data_archiver')
+if ANALYTICS_ENABLED:
+    logger.info("✅ Analytics modules available (loaded on first use)")
+else:
+    logger.warning("⚠️ Analytics not available")
 
 # Import TradeTracker
 try:
@@ -338,6 +344,10 @@ def get_scanner():
             from src.core.simple_timer_scanner import get_simple_scanner
             app.config['scanner'] = get_simple_scanner()
             logger.info("✅ Scanner initialized")
+            from src.core.lazy_imports import log_import_report
+            log_import_report()
+            from src.core.tick_journal import start_tick_journal
+            start_tick_journal()
         except Exception as e:
             logger.error(f"❌ Scanner init failed: {e}")
             logger.exception("Full traceback:")
@@ -787,6 +797,54 @@ def health_scheduler():
         logger.error(f"❌ API Scheduler health error: {e}")
         return jsonify({'status': 'error', 'error': str(e), 'jobs': [], 'last_run': {}}), 500
 
+@app.route('/api/perf')
+def api_perf():
+    """Hot-path latency histograms (rolling window) plus recent scan phase timings."""
+    try:
+        from src.core.perf_profiler import get_profiler
+        payload = get_profiler().snapshot()
+        scanner = app.config.get('scanner')
+        if scanner is not None:
+            payload['scan_phases'] = list(getattr(scanner, 'scan_phase_timings', []))[-10:]
+            evaluator = getattr(scanner, 'evaluator', None)
+            if evaluator is not None:
+                payload['strategy_evaluation'] = evaluator.get_stats()
+        from src.core.lazy_imports import import_time_report
+        from src.core.price_cache import get_price_cache_stats
+        payload['imports'] = import_time_report()
+        payload['price_cache'] = get_price_cache_stats()
+        from src.core.sqlite_store import get_sqlite_store_stats
+        payload['sqlite'] = get_sqlite_store_stats()
+        from src.core.tick_journal import journal_enabled, get_tick_journal
+        if journal_enabled():
+            payload['tick_journal'] = get_tick_journal().get_stats()
+        payload['status'] = 'success'
+        payload['timestamp'] = datetime.now().isoformat()
+        return jsonify(payload)
+    except Exception as e:
+        logger.error(f"❌ API perf error: {e}")
+        return jsonify({'status': 'error', 'error': str(e)}), 500
+
+@app.route('/api/perf/profile', methods=['GET', 'POST'])
+def api_perf_profile():
+    """POST arms cProfile for the next N scans (?scans=N); GET returns captured profiles."""
+    try:
+        from src.core.perf_profiler import get_profiler
+        profiler = get_profiler()
+        if request.method == 'POST':
+            data = request.get_json(silent=True) or {}
+            scans = int(data.get('scans', request.args.get('scans', 1)))
+            pending = profiler.profile_next(min(max(scans, 1), 10))
+            return jsonify({'status': 'success', 'profile_pending': pending})
+        return jsonify({
+            'status': 'success',
+            'profile_pending': profiler.profile_requests,
+            'profiles': profiler.snapshot(include_profiles=True)['profiles'],
+        })
+    except Exception as e:
+        logger.error(f"❌ API perf profile error: {e}")
+        return jsonify({'status': 'error', 'error': str(e)}), 500
+
 @app.route('/')
 def home():
     """Home route - serves the main trading dashboard (non-blocking)"""
@@ -5245,7 +5303,7 @@ def get_live_performance_data_cached():
         return _performance_cache['data']
     
     try:
-        from src.core.oanda_client import OandaClient
+        from src.core.async_oanda_client import get_accounts_snapshot
         
         accounts_config = {
             'PRIMARY': (os.getenv('PRIMARY_ACCOUNT'), 'Ultra Strict Forex'),
@@ -5259,11 +5317,20 @@ def get_live_performance_data_cached():
         total_realized = 0
         total_trades = 0
         
+        # Fetch every account concurrently - roughly one round trip regardless of account count
+        snapshots = get_accounts_snapshot(
+            [account_id for account_id, _ in accounts_config.values()],
+            api_key=os.getenv('OANDA_API_KEY'),
+            environment=os.getenv('OANDA_ENVIRONMENT')
+        )
+        
         for name, (account_id, strategy) in accounts_config.items():
             try:
-                client = OandaClient(os.getenv('OANDA_API_KEY'), account_id, os.getenv('OANDA_ENVIRONMENT'))
-                account_info = client.get_account_info()
-                open_trades = client.get_open_trades()
+                snapshot = snapshots.get(account_id) or {'error': 'account not configured'}
+                if 'error' in snapshot:
+                    raise RuntimeError(snapshot['error'])
+                account_info = snapshot['account']
+                open_trades = snapshot['open_trades']
                 
                 trades_list = []
                 for trade in open_trades:
@@ -16,6 +16,7 @@ import numpy as np
 from datetime import datetime, timedelta
 import pytz
 import json
+import functools
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, 
@@ -38,6 +39,7 @@ except Exception as e:
 # Import core modules
 from src.core.historical_fetcher import get_historical_fetcher
 from validate_strategy import StrategyValidator
+from src.core.sweep_engine import SweepEngine
 
 # Import contextual modules
 try:
@@ -129,7 +131,9 @@ class ContextualMonteCarloOptimizer:
     def optimize(self, iterations: int = 1000, 
                 session_filter: bool = True, 
                 news_filter: bool = True,
-                target_trades_per_day: float = 5.0) -> List[Dict]:
+                target_trades_per_day: float = 5.0,
+                workers: Optional[int] = None,
+                checkpoint_path: Optional[str] = None) -> List[Dict]:
         """
         Run Monte Carlo optimization with contextual awareness
         
@@ -138,6 +142,8 @@ class ContextualMonteCarloOptimizer:
             session_filter: Whether to include session quality in optimization
             news_filter: Whether to include news filtering in optimization
             target_trades_per_day: Target number of trades per day
+            workers: Worker processes (default SWEEP_WORKERS or CPU count)
+            checkpoint_path: JSONL checkpoint file for resuming long runs
             
         Returns:
             List of top 10 parameter configurations
@@ -182,94 +188,41 @@ class ContextualMonteCarloOptimizer:
         logger.info("")
         logger.info(f"Testing {iterations} random configurations...")
         
-        results = []
-        days_in_data = self.lookback_days
-        
-        for i in range(iterations):
-            if (i + 1) % 100 == 0:
-                logger.info(f"  Progress: {i+1}/{iterations}...")
-            
-            # Generate random configuration
-            test_config = {
-                'min_adx': random.uniform(*param_ranges['min_adx']),
-                'min_momentum': random.uniform(*param_ranges['min_momentum']),
-                'min_volume': random.uniform(*param_ranges['min_volume']),
-                'quality_threshold': random.uniform(*param_ranges['quality_threshold'])
-            }
-            
-            # Add session parameters if enabled
-            if session_filter:
-                test_config['min_session_quality'] = random.uniform(*param_ranges['min_session_quality'])
-                test_config['only_trade_london_ny'] = random.uniform(*param_ranges['only_trade_london_ny']) > 0.5
-            
-            # Add news parameters if enabled
-            if news_filter:
-                test_config['avoid_high_impact_news'] = random.uniform(*param_ranges['avoid_high_impact_news']) > 0.5
-            
-            try:
-                # Load strategy with test configuration
-                module = __import__(self.strategy_module, fromlist=[self.strategy_function])
-                get_strategy = getattr(module, self.strategy_function)
-                strategy = get_strategy()
-                
-                # Apply test configuration
-                if hasattr(strategy, 'min_adx'):
-                    strategy.min_adx = test_config['min_adx']
-                if hasattr(strategy, 'min_momentum'):
-                    strategy.min_momentum = test_config['min_momentum']
-                if hasattr(strategy, 'min_volume'):
-                    strategy.min_volume = test_config['min_volume']
-                if hasattr(strategy, 'min_quality_score'):
-                    strategy.min_quality_score = test_config['quality_threshold']
+        engine = SweepEngine(
+            functools.partial(self._evaluate_config, session_filter=session_filter,
+                              news_filter=news_filter, target_trades_per_day=target_trades_per_day),
+            workers=workers,
+            checkpoint_path=checkpoint_path,
+            name=self.strategy_name
+        )
+        
+        def generate_configs():
+            # Random configurations drawn up front; each is evaluated in a worker
+            test_configs = []
+            for i in range(iterations):
+                # Generate random configuration
+                test_config = {
+                    'min_adx': random.uniform(*param_ranges['min_adx']),
+                    'min_momentum': random.uniform(*param_ranges['min_momentum']),
+                    'min_volume': random.uniform(*param_ranges['min_volume']),
+                    'quality_threshold': random.uniform(*param_ranges['quality_threshold'])
+                }
                 
-                # Apply session parameters if enabled
+                # Add session parameters if enabled
                 if session_filter:
-                    if hasattr(strategy, 'min_session_quality'):
-                        strategy.min_session_quality = test_config['min_session_quality']
-                    if hasattr(strategy, 'only_trade_london_ny'):
-                        strategy.only_trade_london_ny = test_config['only_trade_london_ny']
+                    test_config['min_session_quality'] = random.uniform(*param_ranges['min_session_quality'])
+                    test_config['only_trade_london_ny'] = random.uniform(*param_ranges['only_trade_london_ny']) > 0.5
                 
-                # Apply news parameters if enabled
+                # Add news parameters if enabled
                 if news_filter:
-                    if hasattr(strategy, 'avoid_high_impact_news'):
-                        strategy.avoid_high_impact_news = test_config['avoid_high_impact_news']
-                
-                # Reset strategy state
-                if hasattr(strategy, 'price_history'):
-                    strategy.price_history = {inst: [] for inst in self.instruments}
-                if hasattr(strategy, 'daily_trade_count'):
-                    strategy.daily_trade_count = 0
-                if hasattr(strategy, 'daily_signals'):
-                    strategy.daily_signals = []
-                
-                # Add contextual filters to strategy
-                self._add_contextual_filters(strategy, session_filter, news_filter)
-                
-                # Test this configuration
-                backtest_results = self.validator.run_strategy_backtest(strategy, self.historical_data)
+                    test_config['avoid_high_impact_news'] = random.uniform(*param_ranges['avoid_high_impact_news']) > 0.5
                 
-                signals_generated = backtest_results['signals_generated']
-                avg_quality = backtest_results['avg_quality']
-                
-                # Calculate signals per day
-                signals_per_day = signals_generated / days_in_data if days_in_data > 0 else 0
-                
-                # Calculate fitness score
-                # Enhanced multi-objective fitness function
-                fitness = self._calculate_fitness(signals_per_day, avg_quality, target_trades_per_day)
-                
-                results.append({
-                    'config': test_config,
-                    'signals': signals_generated,
-                    'signals_per_day': signals_per_day,
-                    'avg_quality': avg_quality,
-                    'fitness': fitness
-                })
-                
-            except Exception as e:
-                # Skip failed configurations
-                logger.debug(f"Config {i} failed: {e}")
-                continue
+                test_configs.append(test_config)
+            return test_configs
+        
+        # With a checkpoint, a resumed run reuses the configurations drawn by the first run
+        test_configs = engine.plan(generate_configs)
+        results = engine.run(test_configs)
         
         # Sort by fitness (best first)
         results.sort(key=lambda x: x['fitness'], reverse=True)
@@ -281,6 +234,68 @@ class ContextualMonteCarloOptimizer:
         
         return top_10
     
+    def _evaluate_config(self, test_config: Dict, session_filter: bool, news_filter: bool,
+                         target_trades_per_day: float) -> Dict:
+        """Backtest one configuration on a fresh strategy instance (runs in a sweep worker)"""
+        # Load strategy with test configuration
+        module = __import__(self.strategy_module, fromlist=[self.strategy_function])
+        get_strategy = getattr(module, self.strategy_function)
+        strategy = get_strategy()
+        
+        # Apply test configuration
+        if hasattr(strategy, 'min_adx'):
+            strategy.min_adx = test_config['min_adx']
+        if hasattr(strategy, 'min_momentum'):
+            strategy.min_momentum = test_config['min_momentum']
+        if hasattr(strategy, 'min_volume'):
+            strategy.min_volume = test_config['min_volume']
+        if hasattr(strategy, 'min_quality_score'):
+            strategy.min_quality_score = test_config['quality_threshold']
+        
+        # Apply session parameters if enabled
+        if session_filter:
+            if hasattr(strategy, 'min_session_quality'):
+                strategy.min_session_quality = test_config['min_session_quality']
+            if hasattr(strategy, 'only_trade_london_ny'):
+                strategy.only_trade_london_ny = test_config['only_trade_london_ny']
+        
+        # Apply news parameters if enabled
+        if news_filter:
+            if hasattr(strategy, 'avoid_high_impact_news'):
+                strategy.avoid_high_impact_news = test_config['avoid_high_impact_news']
+        
+        # Reset strategy state
+        if hasattr(strategy, 'price_history'):
+            strategy.price_history = {inst: [] for inst in self.instruments}
+        if hasattr(strategy, 'daily_trade_count'):
+            strategy.daily_trade_count = 0
+        if hasattr(strategy, 'daily_signals'):
+            strategy.daily_signals = []
+        
+        # Add contextual filters to strategy
+        self._add_contextual_filters(strategy, session_filter, news_filter)
+        
+        # Test this configuration
+        backtest_results = self.validator.run_strategy_backtest(strategy, self.historical_data)
+        
+        signals_generated = backtest_results['signals_generated']
+        avg_quality = backtest_results['avg_quality']
+        
+        # Calculate signals per day
+        signals_per_day = signals_generated / self.lookback_days if self.lookback_days > 0 else 0
+        
+        # Calculate fitness score
+        # Enhanced multi-objective fitness function
+        fitness = self._calculate_fitness(signals_per_day, avg_quality, target_trades_per_day)
+        
+        return {
+            'config': test_config,
+            'signals': signals_generated,
+            'signals_per_day': signals_per_day,
+            'avg_quality': avg_quality,
+            'fitness': fitness
+        }
+    
     def _add_contextual_filters(self, strategy, session_filter: bool, news_filter: bool):
         """Add contextual filters to strategy for backtest"""
         if not hasattr(strategy, 'original_generate_signal'):
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+SQLite Storage Benchmark
+Signal-insert throughput and dashboard read latency under contention: connect-per-write (old TradeTracker) vs SQLiteStore
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import tempfile
+import threading
+from datetime import datetime
+
+import numpy as np
+
+# Add project root to path
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from src.core.sqlite_store import SQLiteStore
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS signals (
+        signal_id TEXT PRIMARY KEY, timestamp TEXT NOT NULL, instrument TEXT NOT NULL,
+        signal_type TEXT NOT NULL, entry_price REAL NOT NULL, confidence REAL NOT NULL, strategy TEXT NOT NULL
+    )
+"""
+INSERT = "INSERT INTO signals VALUES (?, ?, ?, ?, ?, ?, ?)"
+READ = "SELECT instrument, COUNT(*), AVG(confidence) FROM signals GROUP BY instrument"
+
+
+def _row(writer: int, i: int):
+    return (f"w{writer}-{i}", datetime.now().isoformat(), ('EUR_USD', 'GBP_USD', 'XAU_USD')[i % 3],
+            'BUY', 1.1 + i / 1e5, 0.7, 'momentum')
+
+
+def legacy_backend(path: str):
+    """What the stores did before: a fresh connection, rollback journal and a commit per write"""
+    conn = sqlite3.connect(path)
+    conn.execute(SCHEMA)
+    conn.commit()
+    conn.close()
+
+    def write(row):
+        conn = sqlite3.connect(path, timeout=30)
+        conn.execute(INSERT, row)
+        conn.commit()
+        conn.close()
+
+    def read():
+        conn = sqlite3.connect(path, timeout=30)
+        conn.execute(READ).fetchall()
+        conn.close()
+
+    return write, read, None
+
+
+def store_backend(path: str):
+    store = SQLiteStore(path)
+    store.executescript(SCHEMA)
+
+    def write(row):
+        store.execute(INSERT, row)
+
+    def read():
+        store.query(READ)
+
+    return write, read, store
+
+
+def run(backend, writers: int, writes: int, readers: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        write, read, store = backend(os.path.join(tmp, 'bench.db'))
+        stop = threading.Event()
+        latencies = []
+        errors = []
+
+        def writer(n):
+            for i in range(writes):
+                try:
+                    write(_row(n, i))
+                except sqlite3.Error as e:
+                    errors.append(e)
+
+        def reader():
+            local = []
+            while not stop.is_set():
+                started = time.perf_counter()
+                try:
+                    read()
+                except sqlite3.Error as e:
+                    errors.append(e)
+                local.append(time.perf_counter() - started)
+            latencies.extend(local)
+
+        reader_threads = [threading.Thread(target=reader) for _ in range(readers)]
+        writer_threads = [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+        for thread in reader_threads:
+            thread.start()
+        started = time.perf_counter()
+        for thread in writer_threads:
+            thread.start()
+        for thread in writer_threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        stop.set()
+        for thread in reader_threads:
+            thread.join()
+        if store is not None:
+            store.close()
+
+    ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {'writes_per_sec': writers * writes / elapsed, 'reads': len(latencies),
+            'read_p50_ms': float(np.percentile(ms, 50)), 'read_p99_ms': float(np.percentile(ms, 99)),
+            'errors': len(errors)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--writes', type=int, default=250, help='writes per writer thread')
+    parser.add_argument('--readers', type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{args.writers} writer threads x {args.writes} inserts, {args.readers} dashboard readers")
+    print(f"{'backend':<22}{'writes/s':>10}{'reads':>8}{'read p50 ms':>13}{'read p99 ms':>13}{'errors':>8}")
+    for name, backend in (('connect-per-write', legacy_backend), ('SQLiteStore (WAL)', store_backend)):
+        result = run(backend, args.writers, args.writes, args.readers)
+        print(f"{name:<22}{result['writes_per_sec']:>10.0f}{result['reads']:>8}"
+              f"{result['read_p50_ms']:>13.2f}{result['read_p99_ms']:>13.2f}{result['errors']:>8}")
+
+
+if __name__ == '__main__':
+    main()
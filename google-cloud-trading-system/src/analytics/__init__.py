@@ -7,6 +7,7 @@ Provides comprehensive trade tracking, metrics calculation, and performance anal
 from .trade_database import TradeDatabase, get_trade_database
 from .trade_logger import TradeLogger, get_trade_logger
 from .metrics_calculator import MetricsCalculator, get_metrics_calculator
+from .metrics_accumulator import MetricsAccumulator, MetricsAccumulatorManager, get_metrics_accumulator_manager
 from .strategy_version_manager import StrategyVersionManager, get_strategy_version_manager
 
 __all__ = [
@@ -16,6 +17,9 @@ __all__ = [
     'get_trade_logger',
     'MetricsCalculator',
     'get_metrics_calculator',
+    'MetricsAccumulator',
+    'MetricsAccumulatorManager',
+    'get_metrics_accumulator_manager',
     'StrategyVersionManager',
     'get_strategy_version_manager',
 ]
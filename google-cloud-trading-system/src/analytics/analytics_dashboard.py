@@ -15,8 +15,10 @@ import json
 from .trade_database import get_trade_database
 from .trade_logger import get_trade_logger
 from .metrics_calculator import get_metrics_calculator
+from .metrics_accumulator import get_metrics_accumulator_manager, SCOPES
 from .strategy_version_manager import get_strategy_version_manager
 from .data_archiver import get_data_archiver
+from ..core.time_rollups import equity_from_breakdown
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +32,7 @@ class AnalyticsDashboard:
         self.db = get_trade_database()
         self.trade_logger = get_trade_logger()
         self.metrics_calc = get_metrics_calculator()
+        self.accumulators = get_metrics_accumulator_manager()
         self.version_manager = get_strategy_version_manager()
         self.archiver = get_data_archiver()
         
@@ -141,12 +144,17 @@ class AnalyticsDashboard:
         def api_strategy_metrics(strategy_id):
             """Get comprehensive metrics for a strategy"""
             try:
-                # Get closed trades
-                days = int(request.args.get('days', 90))
-                closed_trades = self.db.get_closed_trades(strategy_id, days=days)
-                
-                # Calculate metrics
-                metrics = self.metrics_calc.calculate_all_metrics(closed_trades, strategy_id)
+                if 'days' in request.args:
+                    # A window needs its trades: full recomputation over that period
+                    days = int(request.args['days'])
+                    closed_trades = self.db.get_closed_trades(strategy_id, days=days)
+                    metrics = self.metrics_calc.calculate_all_metrics(closed_trades, strategy_id)
+                    closed_count = len(closed_trades)
+                else:
+                    # All-time metrics straight from the accumulator
+                    days = None
+                    metrics = self.accumulators.get_metrics('strategy', strategy_id)
+                    closed_count = metrics['closed_trades']
                 
                 # Get open trades
                 open_trades = self.db.get_open_trades(strategy_id)
@@ -160,7 +168,7 @@ class AnalyticsDashboard:
                     'current_version': current_version,
                     'metrics': metrics,
                     'open_trades_count': len(open_trades),
-                    'closed_trades_count': len(closed_trades),
+                    'closed_trades_count': closed_count,
                     'period_days': days
                 })
                 
@@ -168,6 +176,40 @@ class AnalyticsDashboard:
                 logger.error(f"❌ Error getting strategy metrics: {e}")
                 return jsonify({'success': False, 'error': str(e)}), 500
         
+        @self.app.route('/api/metrics/<scope>/<scope_id>')
+        def api_scope_metrics(scope, scope_id):
+            """All-time metrics for a strategy, account or instrument (read from its accumulator)"""
+            try:
+                if scope not in SCOPES:
+                    return jsonify({'success': False, 'error': f'scope must be one of {list(SCOPES)}'}), 400
+                
+                return jsonify({
+                    'success': True,
+                    'scope': scope,
+                    'scope_id': scope_id,
+                    'metrics': self.accumulators.get_metrics(scope, scope_id)
+                })
+                
+            except Exception as e:
+                logger.error(f"❌ Error getting {scope} metrics: {e}")
+                return jsonify({'success': False, 'error': str(e)}), 500
+        
+        @self.app.route('/api/metrics/rebuild', methods=['POST'])
+        def api_rebuild_metrics():
+            """Recompute every accumulator from the trade history"""
+            try:
+                trades = self.accumulators.rebuild_all()
+                
+                return jsonify({
+                    'success': True,
+                    'trades': trades,
+                    'stats': self.accumulators.get_stats()
+                })
+                
+            except Exception as e:
+                logger.error(f"❌ Error rebuilding metrics: {e}")
+                return jsonify({'success': False, 'error': str(e)}), 500
+        
         @self.app.route('/api/strategy/<strategy_id>/trades')
         def api_strategy_trades(strategy_id):
             """Get trade list for a strategy"""
@@ -211,23 +253,20 @@ class AnalyticsDashboard:
                 # Get daily snapshots
                 snapshots = self.db.get_daily_snapshots(strategy_id, days=days)
                 
-                # If no snapshots, calculate from trades
+                # If no snapshots, read the daily rollups (one row per day, however many trades)
                 if not snapshots:
-                    closed_trades = self.db.get_closed_trades(strategy_id, days=days)
-                    daily_metrics = self.metrics_calc.calculate_daily_breakdown(closed_trades, days=days)
+                    breakdown = self.db.rollups.breakdown('day', days=days, strategy_id=strategy_id)
                     
                     # Convert to snapshot format
                     snapshots = []
-                    for date, metrics in daily_metrics.items():
+                    for day, point in zip(breakdown, equity_from_breakdown(breakdown)):
                         snapshots.append({
-                            'date': date,
-                            'trades_count': metrics.get('total_trades', 0),
-                            'net_pnl': metrics.get('total_pnl', 0),
-                            'win_rate': metrics.get('win_rate', 0),
-                            'max_drawdown': metrics.get('max_drawdown', 0)
+                            'date': day['period'],
+                            'trades_count': day['trades'],
+                            'net_pnl': day['pnl'],
+                            'win_rate': day['win_rate'],
+                            'max_drawdown': point['drawdown']
                         })
-                    
-                    snapshots.sort(key=lambda x: x['date'])
                 
                 # Calculate cumulative P&L
                 cumulative_pnl = 0
@@ -246,6 +285,34 @@ class AnalyticsDashboard:
                 logger.error(f"❌ Error getting performance chart data: {e}")
                 return jsonify({'success': False, 'error': str(e)}), 500
         
+        @self.app.route('/api/strategy/<strategy_id>/breakdown')
+        def api_strategy_breakdown(strategy_id):
+            """Hourly/daily/weekly/monthly breakdown and equity curve from the rollup tables"""
+            try:
+                bucket = request.args.get('bucket', 'day')
+                days = int(request.args.get('days', 30))
+                filters = {
+                    'strategy_id': strategy_id,
+                    'account_id': request.args.get('account_id'),
+                    'instrument': request.args.get('instrument'),
+                }
+                periods = self.db.rollups.breakdown(bucket, days=days, **filters)
+                
+                return jsonify({
+                    'success': True,
+                    'strategy_id': strategy_id,
+                    'bucket': bucket,
+                    'periods': periods,
+                    'equity_curve': equity_from_breakdown(periods),
+                    'period_days': days
+                })
+                
+            except ValueError as e:
+                return jsonify({'success': False, 'error': str(e)}), 400
+            except Exception as e:
+                logger.error(f"❌ Error getting strategy breakdown: {e}")
+                return jsonify({'success': False, 'error': str(e)}), 500
+        
         @self.app.route('/api/strategy/<strategy_id>/versions')
         def api_strategy_versions(strategy_id):
             """Get version history for a strategy"""
@@ -402,6 +469,22 @@ class AnalyticsDashboard:
                 logger.error(f"❌ Error getting database stats: {e}")
                 return jsonify({'success': False, 'error': str(e)}), 500
         
+        @self.app.route('/api/archive/metrics')
+        def api_archive_metrics():
+            """Long-horizon metrics over archived trades (filters: strategy_id, instrument, start, end)"""
+            try:
+                filters = {key: request.args.get(key) for key in ('strategy_id', 'instrument', 'start', 'end')}
+                
+                return jsonify({
+                    'success': True,
+                    'filters': filters,
+                    'metrics': self.archiver.get_archive_metrics(**filters)
+                })
+                
+            except Exception as e:
+                logger.error(f"❌ Error getting archive metrics: {e}")
+                return jsonify({'success': False, 'error': str(e)}), 500
+        
         @self.app.route('/api/health')
         def api_health():
             """Health check endpoint"""
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 Data Archiver - 90-Day Retention Management
-Automatically archives old trades to compressed files
+Automatically archives old trades to columnar month/strategy partitions
 """
 
 import os
@@ -13,6 +13,7 @@ from typing import Dict, List, Optional, Any
 import threading
 
 from .trade_database import get_trade_database
+from .trade_archive import TradeArchive
 
 logger = logging.getLogger(__name__)
 
@@ -20,9 +21,9 @@ logger = logging.getLogger(__name__)
 class DataArchiver:
     """Manage trade data archival and retention"""
     
-    def __init__(self, archive_dir: Optional[str] = None):
+    def __init__(self, archive_dir: Optional[str] = None, db=None):
         """Initialize data archiver"""
-        self.db = get_trade_database()
+        self.db = db or get_trade_database()
         
         if archive_dir is None:
             # Default archive directory
@@ -31,6 +32,7 @@ class DataArchiver:
         
         self.archive_dir = archive_dir
         os.makedirs(self.archive_dir, exist_ok=True)
+        self.archive = TradeArchive(self.archive_dir)
         
         self._lock = threading.Lock()
         logger.info(f"✅ Data archiver initialized: {archive_dir}")
@@ -61,21 +63,14 @@ class DataArchiver:
                         'archive_file': None
                     }
                 
-                # Group by month
-                trades_by_month = self._group_trades_by_month(trades_to_archive)
+                # One new part per month/strategy partition; trades archived by an earlier,
+                # interrupted run are recognised and not written twice
+                result = self.archive.append(trades_to_archive)
+                archived_count = result['written'] + result['skipped']
                 
-                archived_count = 0
-                archive_files = []
-                
-                # Archive each month's trades
-                for month_key, trades in trades_by_month.items():
-                    archive_file = self._archive_month_trades(month_key, trades)
-                    if archive_file:
-                        archived_count += len(trades)
-                        archive_files.append(archive_file)
-                
-                # Delete archived trades from database
-                deleted_count = self.db.delete_old_trades(days)
+                # Only delete what is safely in the archive; trades it cannot take (no usable
+                # entry_time) stay in SQLite without holding back the rest
+                deleted_count = self.db.delete_trades(result['trade_ids'])
                 
                 # Optimize database
                 self.db.vacuum_database()
@@ -86,7 +81,7 @@ class DataArchiver:
                     'success': True,
                     'archived_count': archived_count,
                     'deleted_count': deleted_count,
-                    'archive_files': archive_files,
+                    'archive_files': result['partitions'],
                     'timestamp': datetime.now().isoformat()
                 }
                 
@@ -112,57 +107,9 @@ class DataArchiver:
             
             return [dict(row) for row in cursor.fetchall()]
     
-    def _group_trades_by_month(self, trades: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
-        """Group trades by month (YYYY-MM)"""
-        trades_by_month = {}
-        
-        for trade in trades:
-            try:
-                entry_time = trade.get('entry_time', '')
-                if entry_time:
-                    dt = datetime.fromisoformat(entry_time)
-                    month_key = dt.strftime('%Y-%m')
-                    
-                    if month_key not in trades_by_month:
-                        trades_by_month[month_key] = []
-                    
-                    trades_by_month[month_key].append(trade)
-            except:
-                pass
-        
-        return trades_by_month
-    
-    def _archive_month_trades(self, month_key: str, trades: List[Dict[str, Any]]) -> Optional[str]:
-        """Archive a month's worth of trades to compressed file"""
-        try:
-            # Create archive filename
-            archive_filename = f"trades_{month_key}.json.gz"
-            archive_path = os.path.join(self.archive_dir, archive_filename)
-            
-            # Check if archive already exists
-            if os.path.exists(archive_path):
-                # Append to existing archive
-                existing_trades = self._load_archive(archive_path)
-                trades = existing_trades + trades
-            
-            # Prepare archive data
-            archive_data = {
-                'month': month_key,
-                'archived_at': datetime.now().isoformat(),
-                'trade_count': len(trades),
-                'trades': trades
-            }
-            
-            # Write compressed JSON
-            with gzip.open(archive_path, 'wt', encoding='utf-8') as f:
-                json.dump(archive_data, f, indent=2)
-            
-            logger.info(f"✅ Archived {len(trades)} trades to {archive_filename}")
-            return archive_path
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to archive month {month_key}: {e}")
-            return None
+    def _legacy_path(self, month_key: str) -> str:
+        """Pre-columnar archive of a month (still readable, never written)"""
+        return os.path.join(self.archive_dir, f"trades_{month_key}.json.gz")
     
     def _load_archive(self, archive_path: str) -> List[Dict[str, Any]]:
         """Load trades from existing archive"""
@@ -174,42 +121,84 @@ class DataArchiver:
             logger.error(f"❌ Failed to load archive {archive_path}: {e}")
             return []
     
-    def restore_trades_from_archive(self, month_key: str) -> Dict[str, Any]:
+    def _month_trades(self, month_key: str, **filters) -> List[Dict[str, Any]]:
+        """A month's archived trades from the columnar partitions and any legacy file"""
+        trades = list(self.archive.iter_trades(month=month_key, **filters))
+        legacy_path = self._legacy_path(month_key)
+        if os.path.exists(legacy_path):
+            strategy_id, instrument = filters.get('strategy_id'), filters.get('instrument')
+            trades += [t for t in self._load_archive(legacy_path)
+                       if (not strategy_id or t.get('strategy_id') == strategy_id)
+                       and (not instrument or t.get('instrument') == instrument)]
+        return trades
+    
+    def migrate_legacy_archives(self) -> Dict[str, Any]:
+        """Rewrite trades_YYYY-MM.json.gz files into the columnar layout, removing each once it is in"""
+        migrated = {}
+        for filename in sorted(os.listdir(self.archive_dir)):
+            if filename.startswith('trades_') and filename.endswith('.json.gz'):
+                month_key = filename[len('trades_'):-len('.json.gz')]
+                trades = self._load_archive(self._legacy_path(month_key))
+                result = self.archive.append(trades)
+                if result['written'] + result['skipped'] == len(trades):
+                    os.remove(self._legacy_path(month_key))
+                    migrated[month_key] = len(trades)
+        if migrated:
+            logger.info(f"✅ Migrated {sum(migrated.values())} trades from {len(migrated)} legacy archives")
+        return {'success': True, 'migrated': migrated}
+    
+    def query_archive(self, strategy_id: Optional[str] = None, instrument: Optional[str] = None,
+                      start: Optional[str] = None, end: Optional[str] = None,
+                      columns: Optional[List[str]] = None, as_arrays: bool = False) -> Any:
+        """
+        Read archived trades without restoring them
+        
+        Only partitions and parts that can match the strategy/instrument/entry-time filters
+        are opened, and only the requested columns are decompressed. as_arrays returns
+        {column: numpy array} for backtest comparisons; otherwise a list of trade dicts.
+        """
+        if as_arrays:
+            return self.archive.scan(strategy_id=strategy_id, instrument=instrument, start=start, end=end,
+                                     columns=columns)
+        return list(self.archive.iter_trades(strategy_id=strategy_id, instrument=instrument, start=start,
+                                             end=end, columns=columns))
+    
+    def get_archive_metrics(self, strategy_id: Optional[str] = None, instrument: Optional[str] = None,
+                            start: Optional[str] = None, end: Optional[str] = None) -> Dict[str, Any]:
+        """Long-horizon performance metrics computed straight from the archive columns"""
+        return self.archive.metrics(strategy_id=strategy_id, instrument=instrument, start=start, end=end)
+    
+    def restore_trades_from_archive(self, month_key: str, strategy_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Restore trades from archive back to database
         
         Args:
             month_key: Month in YYYY-MM format
+            strategy_id: Restore only this strategy's partition
             
         Returns:
             Summary of restoration
         """
         with self._lock:
             try:
-                archive_filename = f"trades_{month_key}.json.gz"
-                archive_path = os.path.join(self.archive_dir, archive_filename)
-                
-                if not os.path.exists(archive_path):
+                if month_key not in self.archive.months() and not os.path.exists(self._legacy_path(month_key)):
                     return {
                         'success': False,
-                        'error': f"Archive not found: {archive_filename}"
+                        'error': f"Archive not found: {month_key}"
                     }
                 
-                logger.info(f"🔄 Restoring trades from {archive_filename}...")
-                
-                # Load archive
-                with gzip.open(archive_path, 'rt', encoding='utf-8') as f:
-                    archive_data = json.load(f)
+                logger.info(f"🔄 Restoring trades from archive {month_key}...")
                 
-                trades = archive_data.get('trades', [])
+                trades = self._month_trades(month_key, strategy_id=strategy_id)
                 
                 # Restore to database
+                from .trade_database import TradeRecord
+                record_fields = set(TradeRecord.__dataclass_fields__)
                 restored_count = 0
                 for trade_dict in trades:
                     try:
-                        # Convert dict to TradeRecord
-                        from .trade_database import TradeRecord
-                        trade = TradeRecord(**trade_dict)
+                        # Convert dict to TradeRecord (created_at/updated_at are the table's own)
+                        trade = TradeRecord(**{k: v for k, v in trade_dict.items() if k in record_fields})
                         
                         # Insert into database
                         if self.db.insert_trade(trade):
@@ -234,10 +223,23 @@ class DataArchiver:
                 }
     
     def list_archives(self) -> List[Dict[str, Any]]:
-        """List all available archives"""
+        """List all available archives (columnar months from their manifests, plus legacy files)"""
         try:
             archives = []
             
+            for month_key in self.archive.months():
+                summary = self.archive.month_summary(month_key)
+                archives.append({
+                    'filename': f"month={month_key}",
+                    'month': month_key,
+                    'format': 'columnar',
+                    'trade_count': summary['trade_count'],
+                    'strategies': summary['strategies'],
+                    'file_size_mb': summary['size_bytes'] / (1024 * 1024),
+                    'archived_at': summary['archived_at'],
+                    'filepath': os.path.join(self.archive_dir, f"month={month_key}")
+                })
+            
             for filename in os.listdir(self.archive_dir):
                 if filename.startswith('trades_') and filename.endswith('.json.gz'):
                     filepath = os.path.join(self.archive_dir, filename)
@@ -261,6 +263,7 @@ class DataArchiver:
                     archives.append({
                         'filename': filename,
                         'month': month_key,
+                        'format': 'json',
                         'trade_count': trade_count,
                         'file_size_mb': file_size / (1024 * 1024),
                         'archived_at': archived_at,
@@ -289,7 +292,8 @@ class DataArchiver:
                 'total_trades_archived': total_trades,
                 'total_size_mb': total_size_mb,
                 'archives': archives,
-                'archive_directory': self.archive_dir
+                'archive_directory': self.archive_dir,
+                'reads': self.archive.get_stats()
             }
             
         except Exception as e:
@@ -297,41 +301,34 @@ class DataArchiver:
             return {}
     
     def delete_archive(self, month_key: str) -> bool:
-        """Delete an archive file (permanent)"""
+        """Delete a month's archive, columnar and legacy (permanent)"""
         try:
-            archive_filename = f"trades_{month_key}.json.gz"
-            archive_path = os.path.join(self.archive_dir, archive_filename)
+            deleted = self.archive.delete_month(month_key)
+            
+            legacy_path = self._legacy_path(month_key)
+            if os.path.exists(legacy_path):
+                os.remove(legacy_path)
+                deleted = True
             
-            if not os.path.exists(archive_path):
-                logger.warning(f"⚠️ Archive not found: {archive_filename}")
+            if not deleted:
+                logger.warning(f"⚠️ Archive not found: {month_key}")
                 return False
             
-            os.remove(archive_path)
-            logger.info(f"✅ Deleted archive: {archive_filename}")
+            logger.info(f"✅ Deleted archive: {month_key}")
             return True
             
         except Exception as e:
             logger.error(f"❌ Error deleting archive: {e}")
             return False
     
-    def export_archive_to_csv(self, month_key: str, output_path: Optional[str] = None) -> Optional[str]:
+    def export_archive_to_csv(self, month_key: str, output_path: Optional[str] = None,
+                              strategy_id: Optional[str] = None) -> Optional[str]:
         """Export archived trades to CSV for analysis"""
         try:
-            archive_filename = f"trades_{month_key}.json.gz"
-            archive_path = os.path.join(self.archive_dir, archive_filename)
-            
-            if not os.path.exists(archive_path):
-                logger.error(f"❌ Archive not found: {archive_filename}")
-                return None
-            
-            # Load archive
-            with gzip.open(archive_path, 'rt', encoding='utf-8') as f:
-                archive_data = json.load(f)
-            
-            trades = archive_data.get('trades', [])
+            trades = self._month_trades(month_key, strategy_id=strategy_id)
             
             if not trades:
-                logger.warning(f"⚠️ No trades in archive {archive_filename}")
+                logger.warning(f"⚠️ No archived trades for {month_key}")
                 return None
             
             # Generate CSV
@@ -344,7 +341,7 @@ class DataArchiver:
             fieldnames = list(trades[0].keys())
             
             with open(output_path, 'w', newline='') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+                writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction='ignore')
                 writer.writeheader()
                 writer.writerows(trades)
             
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+Metrics Accumulator - Incremental Trading Metrics
+Running sums, Welford variance, running peak/drawdown and streak counters per strategy, account and instrument
+"""
+
+import os
+import json
+import math
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+
+from .trade_archive import TradeArchive, METRIC_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+SCOPES = ('strategy', 'account', 'instrument')
+SCOPE_COLUMNS = {'strategy': 'strategy_id', 'account': 'account_id', 'instrument': 'instrument'}
+
+# Columns of the strategy_metrics row the accumulator owns
+STRATEGY_METRICS_COLUMNS = (
+    'closed_trades', 'wins', 'losses', 'win_rate', 'total_pnl', 'avg_win', 'avg_loss',
+    'largest_win', 'largest_loss', 'max_drawdown', 'current_drawdown', 'profit_factor',
+    'sharpe_ratio', 'sortino_ratio', 'calmar_ratio', 'recovery_factor', 'avg_trade_duration_seconds',
+    'consecutive_wins', 'consecutive_losses', 'max_consecutive_wins', 'max_consecutive_losses',
+    'risk_reward_ratio',
+)
+
+SESSIONS = ('london', 'ny', 'asian')
+
+
+def _session(hour: int) -> str:
+    """Same session split as MetricsCalculator: London 8-16, NY to 21, Asian otherwise (GMT)"""
+    if 8 <= hour < 16:
+        return 'london'
+    if 13 <= hour < 21:
+        return 'ny'
+    return 'asian'
+
+
+class MetricsAccumulator:
+    """
+    Every MetricsCalculator statistic, kept as running state and updated in O(1) per closed trade.
+
+    Trades must be added in exit order (streaks and drawdown depend on it); rebuilds sort by
+    exit_time. Mean and variance of P&L use Welford's update, as does the downside deviation
+    over losing trades, so Sharpe and Sortino match np.std over the full list.
+    """
+
+    __slots__ = (
+        'trades', 'wins', 'losses', 'total_pnl', 'wins_sum', 'losses_sum', 'largest_win', 'largest_loss',
+        'mean', 'm2', 'neg_count', 'neg_mean', 'neg_m2',
+        'equity', 'peak', 'max_drawdown', 'current_drawdown', 'drawdown_sum', 'drawdown_points',
+        'win_streak', 'loss_streak', 'max_win_streak', 'max_loss_streak',
+        'duration_sum', 'duration_count', 'min_duration', 'max_duration',
+        'rr_sum', 'rr_count', 'slippage_sum', 'commission_sum',
+        'sessions', 'hours', 'weekdays', 'last_trade_id', 'last_exit_time',
+    )
+
+    def __init__(self):
+        self.trades = 0
+        self.wins = 0
+        self.losses = 0
+        self.total_pnl = 0.0
+        self.wins_sum = 0.0
+        self.losses_sum = 0.0
+        self.largest_win = 0.0
+        self.largest_loss = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.neg_count = 0
+        self.neg_mean = 0.0
+        self.neg_m2 = 0.0
+        # The equity curve starts at 0, which counts as one drawdown point of 0
+        self.equity = 0.0
+        self.peak = 0.0
+        self.max_drawdown = 0.0
+        self.current_drawdown = 0.0
+        self.drawdown_sum = 0.0
+        self.drawdown_points = 1
+        self.win_streak = 0
+        self.loss_streak = 0
+        self.max_win_streak = 0
+        self.max_loss_streak = 0
+        self.duration_sum = 0
+        self.duration_count = 0
+        self.min_duration = 0
+        self.max_duration = 0
+        self.rr_sum = 0.0
+        self.rr_count = 0
+        self.slippage_sum = 0.0
+        self.commission_sum = 0.0
+        self.sessions = {name: [0.0, 0, 0] for name in SESSIONS}  # pnl, trades, wins
+        self.hours: Dict[str, List[float]] = {}  # hour -> [pnl, trades]
+        self.weekdays: Dict[str, List[float]] = {}
+        self.last_trade_id: Optional[str] = None
+        self.last_exit_time: Optional[str] = None
+
+    def add(self, trade: Dict[str, Any]):
+        """Fold one closed trade (a trades-table row) into the running state"""
+        pnl = trade.get('realized_pnl') or 0.0
+        self.trades += 1
+        self.total_pnl += pnl
+
+        if pnl > 0:
+            self.wins += 1
+            self.wins_sum += pnl
+            self.largest_win = max(self.largest_win, pnl)
+            self.win_streak += 1
+            self.loss_streak = 0
+            self.max_win_streak = max(self.max_win_streak, self.win_streak)
+        else:
+            self.losses += 1
+            self.losses_sum += pnl
+            self.largest_loss = max(self.largest_loss, -pnl)
+            self.loss_streak += 1
+            self.win_streak = 0
+            self.max_loss_streak = max(self.max_loss_streak, self.loss_streak)
+
+        delta = pnl - self.mean
+        self.mean += delta / self.trades
+        self.m2 += delta * (pnl - self.mean)
+        if pnl < 0:
+            self.neg_count += 1
+            delta = pnl - self.neg_mean
+            self.neg_mean += delta / self.neg_count
+            self.neg_m2 += delta * (pnl - self.neg_mean)
+
+        self.equity += pnl
+        if self.equity > self.peak:
+            self.peak = self.equity
+            self.current_drawdown = 0.0
+        else:
+            self.current_drawdown = self.equity - self.peak
+            self.drawdown_sum += self.current_drawdown
+            self.drawdown_points += 1
+            self.max_drawdown = min(self.max_drawdown, self.current_drawdown)
+
+        duration = trade.get('trade_duration_seconds')
+        if duration:
+            self.min_duration = duration if not self.duration_count else min(self.min_duration, duration)
+            self.max_duration = max(self.max_duration, duration)
+            self.duration_sum += duration
+            self.duration_count += 1
+
+        if trade.get('stop_loss') and trade.get('take_profit'):
+            entry = trade.get('entry_price') or 0
+            risk = abs(entry - trade['stop_loss'])
+            if risk > 0:
+                self.rr_sum += abs(trade['take_profit'] - entry) / risk
+                self.rr_count += 1
+        self.slippage_sum += trade.get('execution_slippage') or 0.0
+        self.commission_sum += trade.get('commission') or 0.0
+
+        if trade.get('entry_time'):
+            try:
+                entry_dt = datetime.fromisoformat(trade['entry_time'])
+                session = self.sessions[_session(entry_dt.hour)]
+                session[0] += pnl
+                session[1] += 1
+                session[2] += 1 if pnl > 0 else 0
+                for buckets, key in ((self.hours, str(entry_dt.hour)), (self.weekdays, entry_dt.strftime('%A'))):
+                    bucket = buckets.setdefault(key, [0.0, 0])
+                    bucket[0] += pnl
+                    bucket[1] += 1
+            except ValueError:
+                pass
+
+        self.last_trade_id = trade.get('trade_id')
+        self.last_exit_time = trade.get('exit_time')
+
+    @classmethod
+    def from_trades(cls, trades: Iterable[Dict[str, Any]]) -> 'MetricsAccumulator':
+        """Rebuild from history (closed trades, any order)"""
+        acc = cls()
+        for trade in sorted(trades, key=lambda t: t.get('exit_time') or ''):
+            acc.add(trade)
+        return acc
+
+    def metrics(self) -> Dict[str, Any]:
+        """The MetricsCalculator result, read from the running state"""
+        n = self.trades
+        std = math.sqrt(self.m2 / n) if n else 0.0
+        downside = math.sqrt(self.neg_m2 / self.neg_count) if self.neg_count else std
+        enough = n >= 2
+        drawdown_ratio = (self.total_pnl / abs(self.max_drawdown)) if self.max_drawdown != 0 and enough else None
+
+        metrics = {
+            'total_trades': n,
+            'closed_trades': n,
+            'wins': self.wins,
+            'losses': self.losses,
+            'win_rate': (self.wins / n * 100) if n else 0.0,
+            'total_pnl': self.total_pnl,
+            'avg_win': (self.wins_sum / self.wins) if self.wins else 0.0,
+            'avg_loss': abs(self.losses_sum / self.losses) if self.losses else 0.0,
+            'largest_win': self.largest_win,
+            'largest_loss': self.largest_loss,
+            'total_wins_sum': self.wins_sum,
+            'total_losses_sum': abs(self.losses_sum),
+            'profit_factor': (self.wins_sum / abs(self.losses_sum)) if self.losses_sum else 0.0,
+            'risk_reward_ratio': (self.rr_sum / self.rr_count) if self.rr_count else 0.0,
+            'avg_slippage': (self.slippage_sum / n) if n else 0.0,
+            'total_commission': self.commission_sum,
+            'avg_trade_duration_seconds': int(self.duration_sum / self.duration_count) if self.duration_count else 0,
+            'min_trade_duration_seconds': self.min_duration,
+            'max_trade_duration_seconds': self.max_duration,
+            'sharpe_ratio': (self.mean / std) if enough and std > 0 else None,
+            'sortino_ratio': (self.mean / downside) if enough and downside > 0 else None,
+            'calmar_ratio': drawdown_ratio,
+            'recovery_factor': drawdown_ratio,
+            'consecutive_wins': self.win_streak,
+            'consecutive_losses': self.loss_streak,
+            'max_consecutive_wins': self.max_win_streak,
+            'max_consecutive_losses': self.max_loss_streak,
+            'max_drawdown': self.max_drawdown,
+            'current_drawdown': self.current_drawdown,
+            'avg_drawdown': self.drawdown_sum / self.drawdown_points,
+            'hourly_pnl': {int(h): {'pnl': v[0], 'trades': v[1]} for h, v in self.hours.items()},
+            'weekday_pnl': {d: {'pnl': v[0], 'trades': v[1]} for d, v in self.weekdays.items()},
+            'best_hour': None,
+            'worst_hour': None,
+            'last_exit_time': self.last_exit_time,
+        }
+        if self.hours:
+            averages = {int(h): v[0] / v[1] for h, v in self.hours.items()}
+            metrics['best_hour'] = max(averages.items(), key=lambda x: x[1])[0]
+            metrics['worst_hour'] = min(averages.items(), key=lambda x: x[1])[0]
+        for name, (pnl, trades, wins) in self.sessions.items():
+            metrics[f'{name}_session_pnl'] = pnl
+            metrics[f'{name}_session_trades'] = trades
+            metrics[f'{name}_session_win_rate'] = (wins / trades * 100) if trades else 0
+        return metrics
+
+    def to_state(self) -> str:
+        return json.dumps({name: getattr(self, name) for name in self.__slots__})
+
+    @classmethod
+    def from_state(cls, state: str) -> 'MetricsAccumulator':
+        acc = cls()
+        for name, value in json.loads(state).items():
+            if name in cls.__slots__:
+                setattr(acc, name, value)
+        return acc
+
+
+class MetricsAccumulatorManager:
+    """
+    Accumulators for every strategy, account and instrument, kept in memory and in the trade database.
+
+    A trade close updates its three accumulators and persists them, together with the strategy's
+    strategy_metrics row, in one write. An accumulator with no saved state is rebuilt from the
+    trades table the first time it is used. Rebuilds also fold in the closed trades the
+    DataArchiver has moved to the columnar archive (by default the 'archives' directory next
+    to the trade database), reading only the columns the metrics need.
+    """
+
+    def __init__(self, db=None, archive=None):
+        if db is None:
+            from .trade_database import get_trade_database
+            db = get_trade_database()
+        self.db = db
+        self.archive = archive
+        self._archive_dir = None if archive is not None else os.path.join(
+            os.path.dirname(os.path.abspath(getattr(db, 'db_path', None) or '.')), 'archives')
+        self._accumulators: Dict[Tuple[str, str], MetricsAccumulator] = {}
+        self._lock = threading.RLock()
+        self.stats = {'updates': 0, 'loads': 0, 'rebuilds': 0}
+        logger.info("✅ Metrics accumulators initialized")
+
+    def get(self, scope: str, scope_id: str) -> MetricsAccumulator:
+        """The accumulator for a scope, loaded from its saved state or rebuilt from history"""
+        key = (scope, scope_id)
+        with self._lock:
+            acc = self._accumulators.get(key)
+            if acc is None:
+                state = self.db.get_metrics_accumulator(scope, scope_id)
+                if state is not None:
+                    acc = MetricsAccumulator.from_state(state)
+                    self.stats['loads'] += 1
+                else:
+                    acc = self._rebuild(scope, scope_id)
+                self._accumulators[key] = acc
+            return acc
+
+    def _archived_trades(self, column: Optional[str] = None, value: Optional[str] = None,
+                         extra_columns: Tuple[str, ...] = ()) -> List[Dict[str, Any]]:
+        """Archived closed trades (optionally of one strategy, account or instrument), metric columns only"""
+        if self.archive is None:
+            # Created by the DataArchiver on its first run, possibly after this manager
+            if not (self._archive_dir and os.path.isdir(self._archive_dir)):
+                return []
+            self.archive = TradeArchive(self._archive_dir)
+        columns = METRIC_COLUMNS + tuple(name for name in (column,) + extra_columns
+                                         if name and name not in METRIC_COLUMNS)
+        # Strategy and instrument filters prune archive partitions and parts; accounts are filtered here
+        filters = {column: value} if column in ('strategy_id', 'instrument') else {}
+        try:
+            trades = self.archive.iter_trades(columns=columns, **filters)
+            return [trade for trade in trades if column is None or trade.get(column) == value]
+        except Exception as e:
+            logger.warning(f"⚠️ Archived trades left out of metrics rebuild: {e}")
+            return []
+
+    @staticmethod
+    def _with_archived(trades: List[Dict[str, Any]], archived: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # An archival interrupted before its delete leaves trades in both places
+        live = {trade.get('trade_id') for trade in trades}
+        return [trade for trade in archived if trade.get('trade_id') not in live] + trades
+
+    def _rebuild(self, scope: str, scope_id: str) -> MetricsAccumulator:
+        column = SCOPE_COLUMNS[scope]
+        acc = MetricsAccumulator.from_trades(self._with_archived(self.db.get_closed_trades_by(column, scope_id),
+                                                                 self._archived_trades(column, scope_id)))
+        self.stats['rebuilds'] += 1
+        if acc.trades:
+            self._save([(scope, scope_id, acc)])
+            logger.info(f"✅ Rebuilt {scope} metrics for {scope_id} from {acc.trades} trades")
+        return acc
+
+    def record_close(self, trade: Dict[str, Any], open_trades: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Fold a just-closed trade into its strategy, account and instrument accumulators.
+
+        Returns the strategy metrics. Call once per trade, after the close that moved it from open
+        to closed in the trades table (TradeDatabase.update_trade_exit(only_open=True)); trades
+        already stored as closed are never passed here. Since the trade is already in the table,
+        an accumulator rebuilt while handling it has counted it; last_trade_id stops it being
+        added twice.
+        """
+        with self._lock:
+            touched = []
+            for scope in SCOPES:
+                scope_id = trade.get(SCOPE_COLUMNS[scope])
+                if not scope_id:
+                    continue
+                acc = self.get(scope, scope_id)
+                if acc.last_trade_id != trade.get('trade_id'):
+                    acc.add(trade)
+                touched.append((scope, scope_id, acc))
+            self.stats['updates'] += 1
+            self._save(touched, open_trades)
+            strategy = self._accumulators.get(('strategy', trade.get('strategy_id')))
+            return strategy.metrics() if strategy else {}
+
+    def _save(self, touched: List[Tuple[str, str, MetricsAccumulator]], open_trades: Optional[int] = None):
+        states = []
+        strategy_rows = {}
+        for scope, scope_id, acc in touched:
+            states.append((scope, scope_id, acc.to_state(), acc.trades, acc.last_exit_time))
+            if scope == 'strategy':
+                row = self.strategy_row(acc)
+                if open_trades is not None:
+                    row['open_trades'] = open_trades
+                    row['total_trades'] = acc.trades + open_trades
+                strategy_rows[scope_id] = row
+        self.db.save_metrics_accumulators(states, strategy_rows)
+
+    @staticmethod
+    def strategy_row(acc: MetricsAccumulator) -> Dict[str, Any]:
+        """The strategy_metrics columns for an accumulator"""
+        metrics = acc.metrics()
+        return {column: metrics[column] for column in STRATEGY_METRICS_COLUMNS}
+
+    def get_metrics(self, scope: str, scope_id: str) -> Dict[str, Any]:
+        if scope not in SCOPE_COLUMNS:
+            raise ValueError(f"Unknown metrics scope: {scope}")
+        return self.get(scope, scope_id).metrics()
+
+    def rebuild_scopes(self, trades: Iterable[Dict[str, Any]]) -> int:
+        """Rebuild every accumulator the trades belong to (bulk imports arrive out of exit order)"""
+        keys = {(scope, trade.get(SCOPE_COLUMNS[scope])) for trade in trades for scope in SCOPES
+                if trade.get(SCOPE_COLUMNS[scope])}
+        with self._lock:
+            for scope, scope_id in keys:
+                self._accumulators[(scope, scope_id)] = self._rebuild(scope, scope_id)
+        return len(keys)
+
+    def rebuild_all(self) -> int:
+        """Recompute every accumulator from the full trade history in one pass; returns trades folded"""
+        trades = self._with_archived(self.db.get_closed_trades_by(),
+                                     self._archived_trades(extra_columns=tuple(SCOPE_COLUMNS.values())))
+        rebuilt: Dict[Tuple[str, str], MetricsAccumulator] = {}
+        for trade in sorted(trades, key=lambda t: t.get('exit_time') or ''):
+            for scope in SCOPES:
+                scope_id = trade.get(SCOPE_COLUMNS[scope])
+                if scope_id:
+                    rebuilt.setdefault((scope, scope_id), MetricsAccumulator()).add(trade)
+        with self._lock:
+            self._accumulators = rebuilt
+            self._save([(scope, scope_id, acc) for (scope, scope_id), acc in rebuilt.items()])
+            self.stats['rebuilds'] += len(rebuilt)
+        logger.info(f"✅ Rebuilt {len(rebuilt)} metrics accumulators from {len(trades)} trades")
+        return len(trades)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats['accumulators'] = len(self._accumulators)
+        return stats
+
+
+# Singleton instance
+_metrics_accumulator_manager_instance = None
+_metrics_accumulator_manager_lock = threading.Lock()
+
+
+def get_metrics_accumulator_manager() -> MetricsAccumulatorManager:
+    """Get singleton metrics accumulator manager instance"""
+    global _metrics_accumulator_manager_instance
+
+    if _metrics_accumulator_manager_instance is None:
+        with _metrics_accumulator_manager_lock:
+            if _metrics_accumulator_manager_instance is None:
+                _metrics_accumulator_manager_instance = MetricsAccumulatorManager()
+
+    return _metrics_accumulator_manager_instance
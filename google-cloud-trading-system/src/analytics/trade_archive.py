@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Columnar Trade Archive
+Month/strategy-partitioned column files with per-part zone maps, append-only writes and filtered, projected reads
+"""
+
+import os
+import re
+import json
+import shutil
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = '_manifest.json'
+
+# trades-table columns by storage type; nullable numbers are stored as float64 with NaN for NULL
+STRING_COLUMNS = ('trade_id', 'account_id', 'strategy_id', 'instrument', 'direction', 'entry_time', 'exit_time',
+                  'exit_reason', 'tags', 'notes', 'created_at', 'updated_at', 'oanda_trade_id')
+FLOAT_COLUMNS = ('position_size', 'entry_price', 'stop_loss', 'take_profit', 'exit_price', 'realized_pnl',
+                 'pnl_pips', 'commission', 'execution_slippage')
+INT_COLUMNS = ('strategy_version', 'trade_duration_seconds', 'is_closed')
+COLUMNS = STRING_COLUMNS + FLOAT_COLUMNS + INT_COLUMNS
+
+# What MetricsAccumulator.add reads - all a metrics scan needs to decompress
+METRIC_COLUMNS = ('trade_id', 'entry_time', 'exit_time', 'realized_pnl', 'trade_duration_seconds', 'stop_loss',
+                  'take_profit', 'entry_price', 'execution_slippage', 'commission')
+
+TimeLike = Union[str, datetime]
+
+
+def _time_key(value: Optional[TimeLike]) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    return value.isoformat()
+
+
+def _month_of(entry_time: str) -> Optional[str]:
+    try:
+        return datetime.fromisoformat(entry_time).strftime('%Y-%m')
+    except (TypeError, ValueError):
+        return None
+
+
+def _partition_name(strategy_id: str) -> str:
+    return 'strategy=' + re.sub(r'[^A-Za-z0-9_.-]', '_', strategy_id or 'unknown')
+
+
+def _to_columns(trades: Sequence[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    columns = {}
+    for name in STRING_COLUMNS:
+        columns[name] = np.array([str(t.get(name) or '') for t in trades], dtype=str)
+    for name in FLOAT_COLUMNS + INT_COLUMNS:
+        columns[name] = np.array([np.nan if t.get(name) is None else float(t[name]) for t in trades],
+                                 dtype=np.float64)
+    return columns
+
+
+def _empty_columns(names: Sequence[str]) -> Dict[str, np.ndarray]:
+    return {name: np.array([], dtype=str if name in STRING_COLUMNS else np.float64) for name in names}
+
+
+def rows_from_columns(columns: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """Column arrays back to trade dicts: NaN and '' become None, integer columns become int"""
+    names = list(columns)
+    count = len(columns[names[0]]) if names else 0
+    converted = []
+    for name in names:
+        values = columns[name].tolist()
+        if name in STRING_COLUMNS:
+            converted.append([v or None for v in values])
+        elif name in INT_COLUMNS:
+            converted.append([None if v != v else int(v) for v in values])
+        else:
+            converted.append([None if v != v else v for v in values])
+    return [dict(zip(names, row)) for row in zip(*converted)] if count else []
+
+
+class TradeArchive:
+    """
+    Closed trades stored column-wise, partitioned by entry month and strategy.
+
+    archive_dir/month=YYYY-MM/strategy=<id>/part-NNNNN.npz holds one compressed .npy per
+    column; appending writes a new part and never rewrites old ones. Each partition's
+    manifest keeps a zone map per part (rows, entry/exit time range, instruments), so a
+    scan skips whole partitions by month and strategy and whole parts by time range or
+    instrument before opening any file. Inside a part only the filter columns and the
+    requested columns are decompressed.
+    """
+
+    def __init__(self, archive_dir: str):
+        self.archive_dir = archive_dir
+        os.makedirs(self.archive_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self.stats = {'parts_written': 0, 'rows_written': 0, 'duplicates_skipped': 0,
+                      'parts_read': 0, 'parts_skipped': 0, 'rows_scanned': 0, 'rows_returned': 0}
+
+    def _partition_dir(self, month: str, strategy_id: str) -> str:
+        return os.path.join(self.archive_dir, f"month={month}", _partition_name(strategy_id))
+
+    @staticmethod
+    def _read_manifest(partition_dir: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(partition_dir, MANIFEST)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write_json(path: str, data: Dict[str, Any]):
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    def months(self) -> List[str]:
+        return sorted(name[len('month='):] for name in os.listdir(self.archive_dir)
+                      if name.startswith('month=') and os.path.isdir(os.path.join(self.archive_dir, name)))
+
+    def partitions(self, month: str = None, strategy_id: str = None,
+                   start: TimeLike = None, end: TimeLike = None) -> List[Dict[str, Any]]:
+        """Manifests of the partitions a query can touch (pruned by month directory and strategy)"""
+        start, end = _time_key(start), _time_key(end)
+        selected = []
+        for partition_month in self.months():
+            if month and partition_month != month:
+                continue
+            if (start and partition_month < start[:7]) or (end and partition_month > end[:7]):
+                continue
+            month_dir = os.path.join(self.archive_dir, f"month={partition_month}")
+            for name in sorted(os.listdir(month_dir)):
+                if strategy_id and name != _partition_name(strategy_id):
+                    continue
+                manifest = self._read_manifest(os.path.join(month_dir, name))
+                if manifest is None or (strategy_id and manifest['strategy_id'] != strategy_id):
+                    continue
+                manifest['path'] = os.path.join(month_dir, name)
+                selected.append(manifest)
+        return selected
+
+    def append(self, trades: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Archive closed trades: one new part per (month, strategy) touched.
+
+        Trades already in a partition are skipped (only its trade_id column is read), so
+        re-running an archival that stopped before deleting from SQLite is harmless. The
+        result's trade_ids are every trade now safely in the archive (written or skipped);
+        trades with no usable entry_time are not among them.
+        """
+        groups: Dict[tuple, List[Dict[str, Any]]] = {}
+        for trade in trades:
+            month = _month_of(trade.get('entry_time'))
+            if month is None:
+                logger.warning(f"⚠️ Trade {trade.get('trade_id')} has no usable entry_time; not archived")
+                continue
+            groups.setdefault((month, trade.get('strategy_id') or 'unknown'), []).append(trade)
+
+        written = 0
+        skipped = 0
+        partitions = []
+        trade_ids = []
+        with self._lock:
+            for (month, strategy_id), group in sorted(groups.items()):
+                partition_dir = self._partition_dir(month, strategy_id)
+                os.makedirs(partition_dir, exist_ok=True)
+                manifest = self._read_manifest(partition_dir) or {'month': month, 'strategy_id': strategy_id,
+                                                                  'parts': []}
+                existing = set()
+                for part in manifest['parts']:
+                    with np.load(os.path.join(partition_dir, part['file'])) as data:
+                        existing.update(data['trade_id'].tolist())
+                fresh = [t for t in group if t.get('trade_id') not in existing]
+                skipped += len(group) - len(fresh)
+                if not fresh:
+                    trade_ids.extend(t.get('trade_id') for t in group)
+                    continue
+
+                columns = _to_columns(fresh)
+                part_file = f"part-{len(manifest['parts']):05d}.npz"
+                tmp = os.path.join(partition_dir, part_file + '.tmp')
+                with open(tmp, 'wb') as f:
+                    np.savez_compressed(f, **columns)
+                os.replace(tmp, os.path.join(partition_dir, part_file))
+
+                entries = columns['entry_time'].tolist()
+                exits = [t for t in columns['exit_time'].tolist() if t]
+                manifest['parts'].append({
+                    'file': part_file,
+                    'rows': len(fresh),
+                    'entry_min': min(entries),
+                    'entry_max': max(entries),
+                    'exit_min': min(exits, default=None),
+                    'exit_max': max(exits, default=None),
+                    'instruments': sorted(set(columns['instrument'].tolist())),
+                    'written_at': datetime.now().isoformat(),
+                })
+                manifest['rows'] = sum(part['rows'] for part in manifest['parts'])
+                self._write_json(os.path.join(partition_dir, MANIFEST), manifest)
+
+                written += len(fresh)
+                trade_ids.extend(t.get('trade_id') for t in group)
+                partitions.append(partition_dir)
+                self.stats['parts_written'] += 1
+            self.stats['rows_written'] += written
+            self.stats['duplicates_skipped'] += skipped
+
+        if written:
+            logger.info(f"✅ Archived {written} trades into {len(partitions)} partitions")
+        return {'written': written, 'skipped': skipped, 'partitions': partitions, 'trade_ids': trade_ids}
+
+    def scan(self, strategy_id: str = None, instrument: Union[str, Sequence[str]] = None,
+             start: TimeLike = None, end: TimeLike = None, month: str = None,
+             columns: Sequence[str] = None) -> Dict[str, np.ndarray]:
+        """
+        Column arrays for archived trades matching every filter given.
+
+        start/end bound entry_time (ISO strings compare in time order). Partitions and parts
+        whose zone maps cannot match are never opened.
+        """
+        columns = list(columns or COLUMNS)
+        unknown = set(columns) - set(COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown archive columns: {sorted(unknown)}")
+        start, end = _time_key(start), _time_key(end)
+        instruments = None
+        if instrument:
+            instruments = [instrument] if isinstance(instrument, str) else list(instrument)
+
+        chunks: Dict[str, List[np.ndarray]] = {name: [] for name in columns}
+        for manifest in self.partitions(month, strategy_id, start, end):
+            for part in manifest['parts']:
+                if ((start and part['entry_max'] < start) or (end and part['entry_min'] > end)
+                        or (instruments and not set(instruments) & set(part['instruments']))):
+                    self.stats['parts_skipped'] += 1
+                    continue
+                self.stats['parts_read'] += 1
+                self.stats['rows_scanned'] += part['rows']
+                with np.load(os.path.join(manifest['path'], part['file'])) as data:
+                    mask = None
+                    if instruments:
+                        mask = np.isin(data['instrument'], instruments)
+                    if start or end:
+                        entry = data['entry_time']
+                        in_range = np.ones(len(entry), dtype=bool)
+                        if start:
+                            in_range &= entry >= start
+                        if end:
+                            in_range &= entry <= end
+                        mask = in_range if mask is None else mask & in_range
+                    if mask is not None and not mask.any():
+                        continue
+                    for name in columns:
+                        if name in data.files:
+                            values = data[name]
+                        else:  # Column added after this part was written: empty/NaN, as for NULL
+                            values = np.full(len(data['trade_id']), '' if name in STRING_COLUMNS else np.nan)
+                        chunks[name].append(values if mask is None else values[mask])
+
+        if not any(chunks[name] for name in columns[:1]):
+            return _empty_columns(columns)
+        result = {name: np.concatenate(chunks[name]) for name in columns}
+        self.stats['rows_returned'] += len(result[columns[0]])
+        return result
+
+    def iter_trades(self, **filters) -> Iterator[Dict[str, Any]]:
+        """Matching trades as dicts (the same shape as trades-table rows)"""
+        yield from rows_from_columns(self.scan(**filters))
+
+    def metrics(self, **filters) -> Dict[str, Any]:
+        """MetricsCalculator-equivalent metrics over archived trades, without restoring them"""
+        from .metrics_accumulator import MetricsAccumulator
+        filters['columns'] = METRIC_COLUMNS
+        return MetricsAccumulator.from_trades(self.iter_trades(**filters)).metrics()
+
+    def delete_month(self, month: str) -> bool:
+        month_dir = os.path.join(self.archive_dir, f"month={month}")
+        if not os.path.isdir(month_dir):
+            return False
+        with self._lock:
+            shutil.rmtree(month_dir)
+        return True
+
+    def month_summary(self, month: str) -> Dict[str, Any]:
+        """Row count, strategies and size of a month, from manifests and file sizes only"""
+        manifests = self.partitions(month=month)
+        size = 0
+        for manifest in manifests:
+            size += sum(os.path.getsize(os.path.join(manifest['path'], part['file'])) for part in manifest['parts'])
+        return {
+            'month': month,
+            'trade_count': sum(manifest.get('rows', 0) for manifest in manifests),
+            'strategies': [manifest['strategy_id'] for manifest in manifests],
+            'parts': sum(len(manifest['parts']) for manifest in manifests),
+            'size_bytes': size,
+            'archived_at': max((part['written_at'] for m in manifests for part in m['parts']), default=''),
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats['months'] = len(self.months())
+        return stats
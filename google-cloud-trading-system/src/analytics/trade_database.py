@@ -14,8 +14,17 @@ from contextlib import contextmanager
 from dataclasses import dataclass, asdict
 import threading
 
+from ..core.sqlite_store import get_sqlite_store
+from ..core.time_rollups import TimeRollups, apply_trade
+from ..core.oanda_ingest import SQLITE_MAX_PARAMS, create_ingest_tables, upsert_rows
+from .trade_archive import TradeArchive
+
 logger = logging.getLogger(__name__)
 
+# What _apply_rollup reads from an archived trade
+ROLLUP_COLUMNS = ('trade_id', 'entry_time', 'realized_pnl', 'strategy_id', 'account_id', 'instrument',
+                  'trade_duration_seconds', 'commission')
+
 
 @dataclass
 class TradeRecord:
@@ -42,6 +51,7 @@ class TradeRecord:
     tags: Optional[str] = None
     notes: Optional[str] = None
     is_closed: bool = False
+    oanda_trade_id: Optional[str] = None
 
 
 class TradeDatabase:
@@ -60,178 +70,246 @@ class TradeDatabase:
             db_path = os.path.join(data_dir, 'trading.db')
         
         self.db_path = db_path
-        self._local = threading.local()
+        # Shared WAL store: writes are group-committed on its writer thread, reads use pooled connections
+        self.store = get_sqlite_store(db_path)
         
         # Initialize database
         self._create_schema()
+        # Hourly/daily/weekly/monthly rollups, updated in the same write that closes a trade
+        self.rollups = TimeRollups(self.store, backfill=self._backfill_rollups)
         logger.info(f"✅ Trade database initialized: {db_path}")
     
     @contextmanager
     def get_connection(self):
-        """Get thread-safe database connection"""
-        if not hasattr(self._local, 'conn'):
-            self._local.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-            self._local.conn.row_factory = sqlite3.Row
-        
+        """Get a pooled read-only connection (writes go through self.store)"""
         try:
-            yield self._local.conn
+            with self.store.read() as conn:
+                yield conn
         except Exception as e:
-            self._local.conn.rollback()
             logger.error(f"❌ Database error: {e}")
             raise
     
     def _create_schema(self):
         """Create database schema with all tables"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Trades table - complete trade records
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS trades (
-                    trade_id TEXT PRIMARY KEY,
-                    account_id TEXT NOT NULL,
-                    strategy_id TEXT NOT NULL,
-                    strategy_version INTEGER NOT NULL,
-                    instrument TEXT NOT NULL,
-                    direction TEXT NOT NULL,
-                    position_size REAL NOT NULL,
-                    entry_price REAL NOT NULL,
-                    entry_time TEXT NOT NULL,
-                    stop_loss REAL,
-                    take_profit REAL,
-                    exit_price REAL,
-                    exit_time TEXT,
-                    exit_reason TEXT,
-                    realized_pnl REAL,
-                    pnl_pips REAL,
-                    commission REAL DEFAULT 0.0,
-                    execution_slippage REAL DEFAULT 0.0,
-                    trade_duration_seconds INTEGER,
-                    tags TEXT,
-                    notes TEXT,
-                    is_closed INTEGER DEFAULT 0,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Strategy versions table - track configuration changes
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS strategy_versions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    strategy_id TEXT NOT NULL,
-                    version INTEGER NOT NULL,
-                    parameters_snapshot TEXT NOT NULL,
-                    deployed_timestamp TEXT NOT NULL,
-                    description TEXT,
-                    config_hash TEXT NOT NULL,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(strategy_id, version)
-                )
-            """)
-            
-            # Daily snapshots table - daily performance summaries
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS daily_snapshots (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    date TEXT NOT NULL,
-                    strategy_id TEXT NOT NULL,
-                    trades_count INTEGER DEFAULT 0,
-                    wins INTEGER DEFAULT 0,
-                    losses INTEGER DEFAULT 0,
-                    win_rate REAL DEFAULT 0.0,
-                    net_pnl REAL DEFAULT 0.0,
-                    max_drawdown REAL DEFAULT 0.0,
-                    sharpe_ratio REAL,
-                    profit_factor REAL,
-                    avg_win REAL,
-                    avg_loss REAL,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(date, strategy_id)
-                )
-            """)
-            
-            # Strategy metrics table - rolling metrics per strategy
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS strategy_metrics (
-                    strategy_id TEXT PRIMARY KEY,
-                    total_trades INTEGER DEFAULT 0,
-                    open_trades INTEGER DEFAULT 0,
-                    closed_trades INTEGER DEFAULT 0,
-                    wins INTEGER DEFAULT 0,
-                    losses INTEGER DEFAULT 0,
-                    win_rate REAL DEFAULT 0.0,
-                    total_pnl REAL DEFAULT 0.0,
-                    avg_win REAL DEFAULT 0.0,
-                    avg_loss REAL DEFAULT 0.0,
-                    largest_win REAL DEFAULT 0.0,
-                    largest_loss REAL DEFAULT 0.0,
-                    max_drawdown REAL DEFAULT 0.0,
-                    current_drawdown REAL DEFAULT 0.0,
-                    profit_factor REAL DEFAULT 0.0,
-                    sharpe_ratio REAL,
-                    sortino_ratio REAL,
-                    calmar_ratio REAL,
-                    recovery_factor REAL,
-                    avg_trade_duration_seconds INTEGER,
-                    consecutive_wins INTEGER DEFAULT 0,
-                    consecutive_losses INTEGER DEFAULT 0,
-                    max_consecutive_wins INTEGER DEFAULT 0,
-                    max_consecutive_losses INTEGER DEFAULT 0,
-                    risk_reward_ratio REAL,
-                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Create indexes for performance
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_trades_strategy 
-                ON trades(strategy_id, is_closed)
-            """)
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_trades_entry_time 
-                ON trades(entry_time)
-            """)
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_trades_account 
-                ON trades(account_id)
-            """)
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_trades_instrument 
-                ON trades(instrument)
-            """)
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_snapshots_date 
-                ON daily_snapshots(date, strategy_id)
-            """)
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_versions_strategy 
-                ON strategy_versions(strategy_id, version)
-            """)
-            
-            conn.commit()
-            logger.info("✅ Database schema created with all indexes")
+        self.store.write(self._create_tables)
+        logger.info("✅ Database schema created with all indexes")
+    
+    @staticmethod
+    def _create_tables(conn: sqlite3.Connection):
+        cursor = conn.cursor()
+        
+        # Trades table - complete trade records
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS trades (
+                trade_id TEXT PRIMARY KEY,
+                account_id TEXT NOT NULL,
+                strategy_id TEXT NOT NULL,
+                strategy_version INTEGER NOT NULL,
+                instrument TEXT NOT NULL,
+                direction TEXT NOT NULL,
+                position_size REAL NOT NULL,
+                entry_price REAL NOT NULL,
+                entry_time TEXT NOT NULL,
+                stop_loss REAL,
+                take_profit REAL,
+                exit_price REAL,
+                exit_time TEXT,
+                exit_reason TEXT,
+                realized_pnl REAL,
+                pnl_pips REAL,
+                commission REAL DEFAULT 0.0,
+                execution_slippage REAL DEFAULT 0.0,
+                trade_duration_seconds INTEGER,
+                tags TEXT,
+                notes TEXT,
+                is_closed INTEGER DEFAULT 0,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                oanda_trade_id TEXT
+            )
+        """)
+        # Databases created before trades carried their OANDA trade ID
+        if 'oanda_trade_id' not in {row[1] for row in cursor.execute("PRAGMA table_info(trades)")}:
+            cursor.execute("ALTER TABLE trades ADD COLUMN oanda_trade_id TEXT")
+        
+        # Strategy versions table - track configuration changes
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS strategy_versions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                strategy_id TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                parameters_snapshot TEXT NOT NULL,
+                deployed_timestamp TEXT NOT NULL,
+                description TEXT,
+                config_hash TEXT NOT NULL,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(strategy_id, version)
+            )
+        """)
+        
+        # Daily snapshots table - daily performance summaries
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS daily_snapshots (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                date TEXT NOT NULL,
+                strategy_id TEXT NOT NULL,
+                trades_count INTEGER DEFAULT 0,
+                wins INTEGER DEFAULT 0,
+                losses INTEGER DEFAULT 0,
+                win_rate REAL DEFAULT 0.0,
+                net_pnl REAL DEFAULT 0.0,
+                max_drawdown REAL DEFAULT 0.0,
+                sharpe_ratio REAL,
+                profit_factor REAL,
+                avg_win REAL,
+                avg_loss REAL,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(date, strategy_id)
+            )
+        """)
+        
+        # Strategy metrics table - rolling metrics per strategy
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS strategy_metrics (
+                strategy_id TEXT PRIMARY KEY,
+                total_trades INTEGER DEFAULT 0,
+                open_trades INTEGER DEFAULT 0,
+                closed_trades INTEGER DEFAULT 0,
+                wins INTEGER DEFAULT 0,
+                losses INTEGER DEFAULT 0,
+                win_rate REAL DEFAULT 0.0,
+                total_pnl REAL DEFAULT 0.0,
+                avg_win REAL DEFAULT 0.0,
+                avg_loss REAL DEFAULT 0.0,
+                largest_win REAL DEFAULT 0.0,
+                largest_loss REAL DEFAULT 0.0,
+                max_drawdown REAL DEFAULT 0.0,
+                current_drawdown REAL DEFAULT 0.0,
+                profit_factor REAL DEFAULT 0.0,
+                sharpe_ratio REAL,
+                sortino_ratio REAL,
+                calmar_ratio REAL,
+                recovery_factor REAL,
+                avg_trade_duration_seconds INTEGER,
+                consecutive_wins INTEGER DEFAULT 0,
+                consecutive_losses INTEGER DEFAULT 0,
+                max_consecutive_wins INTEGER DEFAULT 0,
+                max_consecutive_losses INTEGER DEFAULT 0,
+                risk_reward_ratio REAL,
+                updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Metrics accumulators - running state per strategy, account and instrument
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS metrics_accumulators (
+                scope TEXT NOT NULL,
+                scope_id TEXT NOT NULL,
+                state TEXT NOT NULL,
+                trades INTEGER DEFAULT 0,
+                last_exit_time TEXT,
+                updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (scope, scope_id)
+            )
+        """)
+        
+        # Create indexes for performance
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_trades_strategy 
+            ON trades(strategy_id, is_closed)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_trades_entry_time 
+            ON trades(entry_time)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_trades_account 
+            ON trades(account_id)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_trades_instrument 
+            ON trades(instrument)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_trades_oanda 
+            ON trades(account_id, oanda_trade_id)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_snapshots_date 
+            ON daily_snapshots(date, strategy_id)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_versions_strategy 
+            ON strategy_versions(strategy_id, version)
+        """)
+        
+        # OANDA transaction cursors and fills for bulk imports and position sync
+        create_ingest_tables(conn)
+    
+    @staticmethod
+    def _apply_rollup(conn: sqlite3.Connection, trade: Dict[str, Any], sign: int = 1):
+        try:
+            apply_trade(conn, trade['entry_time'], trade['realized_pnl'], trade['strategy_id'],
+                        trade['account_id'], trade['instrument'], trade['trade_duration_seconds'],
+                        trade['commission'], sign)
+        except ValueError as e:
+            logger.warning(f"⚠️ Trade {trade['trade_id']} left out of rollups: {e}")
+    
+    @classmethod
+    def _backfill_rollups(cls, conn: sqlite3.Connection) -> int:
+        trades = conn.execute("SELECT * FROM trades WHERE is_closed = 1").fetchall()
+        for trade in trades:
+            cls._apply_rollup(conn, trade)
+        return len(trades)
+    
+    def _archived_rollup_trades(self, archive=None) -> List[Dict[str, Any]]:
+        """Closed trades the DataArchiver moved out (by default to 'archives' next to this database)"""
+        if archive is None:
+            archive_dir = os.path.join(os.path.dirname(os.path.abspath(self.db_path)), 'archives')
+            if not os.path.isdir(archive_dir):
+                return []
+            archive = TradeArchive(archive_dir)
+        try:
+            return list(archive.iter_trades(columns=ROLLUP_COLUMNS))
+        except Exception as e:
+            logger.warning(f"⚠️ Archived trades left out of rollups rebuild: {e}")
+            return []
+    
+    def rebuild_rollups(self, archive=None) -> int:
+        """Recompute the rollups from the trades table and the archived trades"""
+        archived = self._archived_rollup_trades(archive)
+        
+        def rebuild(conn: sqlite3.Connection):
+            conn.execute("DELETE FROM trade_rollups")
+            count = self._backfill_rollups(conn)
+            # An archival interrupted before its delete leaves trades in both places
+            live = {row['trade_id'] for row in conn.execute("SELECT trade_id FROM trades")}
+            for trade in archived:
+                if trade['trade_id'] not in live:
+                    self._apply_rollup(conn, trade)
+                    count += 1
+            return count
+        
+        count = self.store.write(rebuild)
+        logger.info(f"✅ Rollups rebuilt from {count} trades")
+        return count
     
     def insert_trade(self, trade: TradeRecord) -> bool:
         """Insert new trade record"""
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                trade_dict = asdict(trade)
-                trade_dict['is_closed'] = 1 if trade.is_closed else 0
-                
-                columns = ', '.join(trade_dict.keys())
-                placeholders = ', '.join(['?' for _ in trade_dict])
-                
-                cursor.execute(
-                    f"INSERT INTO trades ({columns}) VALUES ({placeholders})",
-                    list(trade_dict.values())
-                )
-                
-                conn.commit()
-                logger.info(f"✅ Trade logged: {trade.trade_id} ({trade.strategy_id})")
-                return True
+            trade_dict = asdict(trade)
+            trade_dict['is_closed'] = 1 if trade.is_closed else 0
+            
+            columns = ', '.join(trade_dict.keys())
+            placeholders = ', '.join(['?' for _ in trade_dict])
+            
+            self.store.execute(
+                f"INSERT INTO trades ({columns}) VALUES ({placeholders})",
+                list(trade_dict.values())
+            )
+            
+            logger.info(f"✅ Trade logged: {trade.trade_id} ({trade.strategy_id})")
+            return True
                 
         except sqlite3.IntegrityError:
             logger.warning(f"⚠️ Trade {trade.trade_id} already exists")
@@ -243,39 +321,90 @@ class TradeDatabase:
     def update_trade_exit(self, trade_id: str, exit_price: float, 
                          exit_time: str, exit_reason: str, 
                          realized_pnl: float, pnl_pips: float,
-                         trade_duration_seconds: int) -> bool:
-        """Update trade with exit information"""
+                         trade_duration_seconds: int, only_open: bool = False) -> bool:
+        """
+        Update trade with exit information
+        
+        With only_open, a trade already stored as closed is left alone and False is
+        returned, so of two racing closes exactly one succeeds (and is counted once).
+        """
+        def close(conn: sqlite3.Connection) -> int:
+            trade = conn.execute("SELECT * FROM trades WHERE trade_id = ?", (trade_id,)).fetchone()
+            if trade is None:
+                return 0
+            if trade['is_closed'] and only_open:
+                return -1
+            if trade['is_closed']:
+                # Re-closing replaces the trade's earlier contribution
+                self._apply_rollup(conn, trade, sign=-1)
+            conn.execute("""
+                UPDATE trades 
+                SET exit_price = ?,
+                    exit_time = ?,
+                    exit_reason = ?,
+                    realized_pnl = ?,
+                    pnl_pips = ?,
+                    trade_duration_seconds = ?,
+                    is_closed = 1,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE trade_id = ?
+            """, (exit_price, exit_time, exit_reason, realized_pnl, 
+                  pnl_pips, trade_duration_seconds, trade_id))
+            closed = dict(trade)
+            closed.update(realized_pnl=realized_pnl, trade_duration_seconds=trade_duration_seconds)
+            self._apply_rollup(conn, closed)
+            return 1
+        
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute("""
-                    UPDATE trades 
-                    SET exit_price = ?,
-                        exit_time = ?,
-                        exit_reason = ?,
-                        realized_pnl = ?,
-                        pnl_pips = ?,
-                        trade_duration_seconds = ?,
-                        is_closed = 1,
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE trade_id = ?
-                """, (exit_price, exit_time, exit_reason, realized_pnl, 
-                      pnl_pips, trade_duration_seconds, trade_id))
-                
-                conn.commit()
+            rowcount = self.store.write(close)
+            
+            if rowcount > 0:
+                logger.info(f"✅ Trade closed: {trade_id} (P&L: {realized_pnl:.2f})")
+                return True
+            elif rowcount < 0:
+                logger.warning(f"⚠️ Trade {trade_id} already closed")
+                return False
+            else:
+                logger.warning(f"⚠️ Trade {trade_id} not found for update")
+                return False
                 
-                if cursor.rowcount > 0:
-                    logger.info(f"✅ Trade closed: {trade_id} (P&L: {realized_pnl:.2f})")
-                    return True
-                else:
-                    logger.warning(f"⚠️ Trade {trade_id} not found for update")
-                    return False
-                    
         except Exception as e:
             logger.error(f"❌ Failed to update trade exit: {e}")
             return False
     
+    @classmethod
+    def _apply_closed_rollup(cls, conn: sqlite3.Connection, trade: Dict[str, Any], sign: int = 1):
+        if trade['is_closed']:
+            cls._apply_rollup(conn, trade, sign)
+    
+    def upsert_trades(self, conn: sqlite3.Connection, trades: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Insert or update trade rows inside an open write; unchanged rows are not touched.
+        
+        A row with an oanda_trade_id updates the trade already stored for that account and
+        OANDA trade (e.g. one logged live when it was placed) instead of adding a second one;
+        the stored trade keeps its trade_id, strategy and version.
+        """
+        self._match_oanda_trades(conn, trades)
+        return upsert_rows(conn, 'trades', trades, apply=self._apply_closed_rollup)
+    
+    @staticmethod
+    def _match_oanda_trades(conn: sqlite3.Connection, trades: List[Dict[str, Any]]):
+        by_account: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for trade in trades:
+            if trade.get('oanda_trade_id'):
+                by_account.setdefault(trade['account_id'], {})[str(trade['oanda_trade_id'])] = trade
+        for account_id, wanted in by_account.items():
+            ids = list(wanted)
+            for i in range(0, len(ids), SQLITE_MAX_PARAMS):
+                chunk = ids[i:i + SQLITE_MAX_PARAMS]
+                for row in conn.execute(f"""
+                    SELECT trade_id, strategy_id, strategy_version, oanda_trade_id FROM trades
+                    WHERE account_id = ? AND oanda_trade_id IN ({', '.join('?' for _ in chunk)})
+                """, [account_id] + chunk):
+                    wanted[row['oanda_trade_id']].update(trade_id=row['trade_id'], strategy_id=row['strategy_id'],
+                                                         strategy_version=row['strategy_version'])
+    
     def get_trade(self, trade_id: str) -> Optional[Dict[str, Any]]:
         """Get single trade by ID"""
         try:
@@ -342,6 +471,33 @@ class TradeDatabase:
             logger.error(f"❌ Failed to get closed trades: {e}")
             return []
     
+    def get_closed_trades_by(self, column: Optional[str] = None,
+                             value: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Full closed-trade history in exit order, optionally for one strategy, account or instrument"""
+        if column not in (None, 'strategy_id', 'account_id', 'instrument'):
+            raise ValueError(f"Cannot filter trades by {column}")
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                if column:
+                    cursor.execute(f"""
+                        SELECT * FROM trades 
+                        WHERE is_closed = 1 AND {column} = ?
+                        ORDER BY exit_time
+                    """, (value,))
+                else:
+                    cursor.execute("""
+                        SELECT * FROM trades 
+                        WHERE is_closed = 1 
+                        ORDER BY exit_time
+                    """)
+                
+                return [dict(row) for row in cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"❌ Failed to get closed trades: {e}")
+            return []
+    
     def get_trades_by_date_range(self, start_date: str, end_date: str,
                                  strategy_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get trades within date range"""
@@ -373,20 +529,16 @@ class TradeDatabase:
                                config_hash: str, description: str = "") -> bool:
         """Insert new strategy version"""
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute("""
-                    INSERT INTO strategy_versions 
-                    (strategy_id, version, parameters_snapshot, deployed_timestamp, 
-                     description, config_hash)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (strategy_id, version, json.dumps(parameters_snapshot),
-                      datetime.now().isoformat(), description, config_hash))
-                
-                conn.commit()
-                logger.info(f"✅ Strategy version saved: {strategy_id} v{version}")
-                return True
+            self.store.execute("""
+                INSERT INTO strategy_versions 
+                (strategy_id, version, parameters_snapshot, deployed_timestamp, 
+                 description, config_hash)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (strategy_id, version, json.dumps(parameters_snapshot),
+                  datetime.now().isoformat(), description, config_hash))
+            
+            logger.info(f"✅ Strategy version saved: {strategy_id} v{version}")
+            return True
                 
         except sqlite3.IntegrityError:
             logger.warning(f"⚠️ Strategy version {strategy_id} v{version} already exists")
@@ -442,41 +594,37 @@ class TradeDatabase:
                              metrics: Dict[str, Any]) -> bool:
         """Insert or update daily snapshot"""
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute("""
-                    INSERT INTO daily_snapshots 
-                    (date, strategy_id, trades_count, wins, losses, win_rate,
-                     net_pnl, max_drawdown, sharpe_ratio, profit_factor,
-                     avg_win, avg_loss)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ON CONFLICT(date, strategy_id) DO UPDATE SET
-                        trades_count = excluded.trades_count,
-                        wins = excluded.wins,
-                        losses = excluded.losses,
-                        win_rate = excluded.win_rate,
-                        net_pnl = excluded.net_pnl,
-                        max_drawdown = excluded.max_drawdown,
-                        sharpe_ratio = excluded.sharpe_ratio,
-                        profit_factor = excluded.profit_factor,
-                        avg_win = excluded.avg_win,
-                        avg_loss = excluded.avg_loss,
-                        created_at = CURRENT_TIMESTAMP
-                """, (date, strategy_id, 
-                      metrics.get('trades_count', 0),
-                      metrics.get('wins', 0),
-                      metrics.get('losses', 0),
-                      metrics.get('win_rate', 0.0),
-                      metrics.get('net_pnl', 0.0),
-                      metrics.get('max_drawdown', 0.0),
-                      metrics.get('sharpe_ratio'),
-                      metrics.get('profit_factor'),
-                      metrics.get('avg_win'),
-                      metrics.get('avg_loss')))
-                
-                conn.commit()
-                return True
+            self.store.execute("""
+                INSERT INTO daily_snapshots 
+                (date, strategy_id, trades_count, wins, losses, win_rate,
+                 net_pnl, max_drawdown, sharpe_ratio, profit_factor,
+                 avg_win, avg_loss)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(date, strategy_id) DO UPDATE SET
+                    trades_count = excluded.trades_count,
+                    wins = excluded.wins,
+                    losses = excluded.losses,
+                    win_rate = excluded.win_rate,
+                    net_pnl = excluded.net_pnl,
+                    max_drawdown = excluded.max_drawdown,
+                    sharpe_ratio = excluded.sharpe_ratio,
+                    profit_factor = excluded.profit_factor,
+                    avg_win = excluded.avg_win,
+                    avg_loss = excluded.avg_loss,
+                    created_at = CURRENT_TIMESTAMP
+            """, (date, strategy_id, 
+                  metrics.get('trades_count', 0),
+                  metrics.get('wins', 0),
+                  metrics.get('losses', 0),
+                  metrics.get('win_rate', 0.0),
+                  metrics.get('net_pnl', 0.0),
+                  metrics.get('max_drawdown', 0.0),
+                  metrics.get('sharpe_ratio'),
+                  metrics.get('profit_factor'),
+                  metrics.get('avg_win'),
+                  metrics.get('avg_loss')))
+            
+            return True
                 
         except Exception as e:
             logger.error(f"❌ Failed to upsert daily snapshot: {e}")
@@ -504,26 +652,22 @@ class TradeDatabase:
                                metrics: Dict[str, Any]) -> bool:
         """Insert or update strategy metrics"""
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                # Build dynamic SQL based on provided metrics
-                columns = ['strategy_id'] + list(metrics.keys()) + ['updated_at']
-                values = [strategy_id] + list(metrics.values()) + [datetime.now().isoformat()]
-                
-                placeholders = ', '.join(['?' for _ in columns])
-                update_clause = ', '.join([f"{k} = excluded.{k}" for k in metrics.keys()])
-                
-                cursor.execute(f"""
-                    INSERT INTO strategy_metrics ({', '.join(columns)})
-                    VALUES ({placeholders})
-                    ON CONFLICT(strategy_id) DO UPDATE SET
-                        {update_clause},
-                        updated_at = excluded.updated_at
-                """, values)
-                
-                conn.commit()
-                return True
+            # Build dynamic SQL based on provided metrics
+            columns = ['strategy_id'] + list(metrics.keys()) + ['updated_at']
+            values = [strategy_id] + list(metrics.values()) + [datetime.now().isoformat()]
+            
+            placeholders = ', '.join(['?' for _ in columns])
+            update_clause = ', '.join([f"{k} = excluded.{k}" for k in metrics.keys()])
+            
+            self.store.execute(f"""
+                INSERT INTO strategy_metrics ({', '.join(columns)})
+                VALUES ({placeholders})
+                ON CONFLICT(strategy_id) DO UPDATE SET
+                    {update_clause},
+                    updated_at = excluded.updated_at
+            """, values)
+            
+            return True
                 
         except Exception as e:
             logger.error(f"❌ Failed to upsert strategy metrics: {e}")
@@ -556,36 +700,87 @@ class TradeDatabase:
             logger.error(f"❌ Failed to get all strategy metrics: {e}")
             return []
     
+    def get_metrics_accumulator(self, scope: str, scope_id: str) -> Optional[str]:
+        """Saved accumulator state for a strategy, account or instrument"""
+        row = self.store.query_one(
+            "SELECT state FROM metrics_accumulators WHERE scope = ? AND scope_id = ?", (scope, scope_id))
+        return row['state'] if row else None
+    
+    def save_metrics_accumulators(self, states: List[Tuple[str, str, str, int, Optional[str]]],
+                                  strategy_rows: Dict[str, Dict[str, Any]]):
+        """Accumulator states and their strategy_metrics rows, written in one transaction"""
+        now = datetime.now().isoformat()
+        
+        def save(conn: sqlite3.Connection):
+            conn.executemany("""
+                INSERT INTO metrics_accumulators (scope, scope_id, state, trades, last_exit_time, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(scope, scope_id) DO UPDATE SET
+                    state = excluded.state,
+                    trades = excluded.trades,
+                    last_exit_time = excluded.last_exit_time,
+                    updated_at = excluded.updated_at
+            """, [state + (now,) for state in states])
+            for strategy_id, metrics in strategy_rows.items():
+                columns = ['strategy_id'] + list(metrics.keys()) + ['updated_at']
+                update_clause = ', '.join([f"{k} = excluded.{k}" for k in metrics.keys()])
+                conn.execute(f"""
+                    INSERT INTO strategy_metrics ({', '.join(columns)})
+                    VALUES ({', '.join(['?' for _ in columns])})
+                    ON CONFLICT(strategy_id) DO UPDATE SET
+                        {update_clause},
+                        updated_at = excluded.updated_at
+                """, [strategy_id] + list(metrics.values()) + [now])
+        
+        self.store.write(save)
+    
     def delete_old_trades(self, days: int = 90) -> int:
-        """Delete trades older than specified days (for archival)"""
+        """Delete trades older than specified days (for archival; their rollups are kept)"""
         try:
             cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
             
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    DELETE FROM trades 
-                    WHERE entry_time < ? AND is_closed = 1
-                """, (cutoff_date,))
-                
-                deleted_count = cursor.rowcount
-                conn.commit()
-                
-                if deleted_count > 0:
-                    logger.info(f"✅ Archived {deleted_count} old trades (>{days} days)")
-                
-                return deleted_count
+            deleted_count = self.store.execute("""
+                DELETE FROM trades 
+                WHERE entry_time < ? AND is_closed = 1
+            """, (cutoff_date,))
+            
+            if deleted_count > 0:
+                logger.info(f"✅ Archived {deleted_count} old trades (>{days} days)")
+            
+            return deleted_count
                 
         except Exception as e:
             logger.error(f"❌ Failed to delete old trades: {e}")
             return 0
     
+    def delete_trades(self, trade_ids: List[str]) -> int:
+        """Delete the given closed trades (archived by the DataArchiver; their rollups are kept)"""
+        ids = list(dict.fromkeys(trade_id for trade_id in trade_ids if trade_id))
+        
+        def delete(conn: sqlite3.Connection) -> int:
+            deleted = 0
+            for i in range(0, len(ids), SQLITE_MAX_PARAMS):
+                chunk = ids[i:i + SQLITE_MAX_PARAMS]
+                deleted += conn.execute(f"""
+                    DELETE FROM trades
+                    WHERE is_closed = 1 AND trade_id IN ({', '.join('?' for _ in chunk)})
+                """, chunk).rowcount
+            return deleted
+        
+        try:
+            deleted_count = self.store.write(delete) if ids else 0
+            if deleted_count > 0:
+                logger.info(f"✅ Deleted {deleted_count} archived trades")
+            return deleted_count
+        except Exception as e:
+            logger.error(f"❌ Failed to delete archived trades: {e}")
+            return 0
+    
     def vacuum_database(self):
         """Optimize database (reclaim space after deletions)"""
         try:
-            with self.get_connection() as conn:
-                conn.execute("VACUUM")
-                logger.info("✅ Database vacuumed and optimized")
+            self.store.write(lambda conn: conn.execute("VACUUM"), transaction=False)
+            logger.info("✅ Database vacuumed and optimized")
         except Exception as e:
             logger.error(f"❌ Failed to vacuum database: {e}")
     
@@ -621,8 +816,10 @@ class TradeDatabase:
                 min_date, max_date = cursor.fetchone()
                 stats['earliest_trade'] = min_date
                 stats['latest_trade'] = max_date
-                
-                return stats
+            
+            stats['storage'] = self.store.get_stats()
+            stats['rollups'] = self.rollups.get_stats()
+            return stats
                 
         except Exception as e:
             logger.error(f"❌ Failed to get database stats: {e}")
@@ -16,6 +16,8 @@ import uuid
 from .trade_database import get_trade_database, TradeRecord
 from .strategy_version_manager import get_strategy_version_manager
 from .metrics_calculator import get_metrics_calculator
+from .metrics_accumulator import get_metrics_accumulator_manager
+from ..core.oanda_ingest import TransactionIngestor, EXIT_REASONS, fills_from_transactions, get_cursor, set_cursor
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +30,7 @@ class TradeLogger:
         self.db = get_trade_database()
         self.version_manager = get_strategy_version_manager()
         self.metrics_calc = get_metrics_calculator()
+        self.accumulators = get_metrics_accumulator_manager()
         
         # Track open positions for exit detection
         self._open_positions = {}  # trade_id -> position_info
@@ -96,7 +99,9 @@ class TradeLogger:
                 take_profit=take_profit,
                 commission=commission,
                 execution_slippage=slippage,
-                is_closed=False
+                is_closed=False,
+                # Lets an OANDA import update this row instead of adding the same trade again
+                oanda_trade_id=str(oanda_trade_id) if oanda_trade_id else None
             )
             
             # Insert into database
@@ -181,7 +186,8 @@ class TradeLogger:
                 exit_reason=exit_reason,
                 realized_pnl=pnl,
                 pnl_pips=pnl_pips,
-                trade_duration_seconds=duration_seconds
+                trade_duration_seconds=duration_seconds,
+                only_open=True  # The stored state decides: a trade closed meanwhile is not counted again
             )
             
             if success:
@@ -189,8 +195,11 @@ class TradeLogger:
                 with self._position_lock:
                     self._open_positions.pop(trade_id, None)
                 
-                # Update strategy metrics
-                self._update_strategy_metrics(trade['strategy_id'])
+                # Update strategy, account and instrument metrics
+                trade.update(exit_price=exit_price, exit_time=exit_time.isoformat(), exit_reason=exit_reason,
+                             realized_pnl=pnl, pnl_pips=pnl_pips, trade_duration_seconds=duration_seconds,
+                             is_closed=1)
+                self._update_strategy_metrics(trade)
                 
                 logger.info(f"✅ Trade exit logged: {trade_id} (P&L: {pnl:.2f}, {exit_reason})")
                 return True
@@ -235,25 +244,15 @@ class TradeLogger:
         unique_id = str(uuid.uuid4())[:8]
         return f"{strategy_id}_{account_id}_{timestamp}_{unique_id}"
     
-    def _update_strategy_metrics(self, strategy_id: str):
-        """Update cached metrics for a strategy"""
+    def _update_strategy_metrics(self, trade: Dict[str, Any]):
+        """Fold a closed trade into its metrics accumulators (O(1), no history scan)"""
+        strategy_id = trade['strategy_id']
         try:
-            # Get all closed trades for this strategy
-            closed_trades = self.db.get_closed_trades(strategy_id, days=90)
-            open_trades = self.db.get_open_trades(strategy_id)
+            # Indexed lookup of the few open trades; closed history is not read
+            open_trades = len(self.db.get_open_trades(strategy_id))
             
-            if not closed_trades:
-                return
-            
-            # Calculate metrics
-            metrics = self.metrics_calc.calculate_all_metrics(closed_trades, strategy_id)
-            
-            # Add open trade count
-            metrics['open_trades'] = len(open_trades)
-            metrics['total_trades'] = len(closed_trades) + len(open_trades)
-            
-            # Upsert to database
-            self.db.upsert_strategy_metrics(strategy_id, metrics)
+            # Accumulators and the strategy_metrics row are persisted together
+            self.accumulators.record_close(trade, open_trades=open_trades)
             
             logger.info(f"✅ Updated metrics for {strategy_id}")
             
@@ -264,6 +263,10 @@ class TradeLogger:
         """
         Sync with OANDA to detect position closes
         This should be called periodically
+        
+        Trades with an OANDA trade ID are closed from the fills after the account's sync
+        cursor (one request when nothing happened); only the rest are checked against
+        open positions.
         """
         if oanda_client is None:
             # Try to import and get OANDA client
@@ -280,6 +283,9 @@ class TradeLogger:
             with self._position_lock:
                 open_positions = dict(self._open_positions)
             
+            if hasattr(oanda_client, 'iter_transaction_pages'):
+                open_positions = self._sync_from_transactions(oanda_client, open_positions)
+            
             # Group by account
             accounts_to_check = {}
             for trade_id, pos_info in open_positions.items():
@@ -323,6 +329,38 @@ class TradeLogger:
         except Exception as e:
             logger.error(f"❌ Error in OANDA sync: {e}")
     
+    def _sync_from_transactions(self, oanda_client, open_positions: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Close tracked trades the client's account has filled closes for; returns the positions left to check"""
+        account_id = oanda_client.account_id
+        tracked = {str(pos_info['oanda_trade_id']): trade_id for trade_id, pos_info in open_positions.items()
+                   if pos_info['account_id'] == account_id and pos_info.get('oanda_trade_id')}
+        if not tracked:
+            return open_positions
+        
+        source = f"sync:{account_id}"
+        since_id = get_cursor(self.db.store, source)
+        from_time = None
+        if since_id is None:
+            # First sync: start at the oldest tracked entry (entry times are local, OANDA wants UTC)
+            oldest = min(datetime.fromisoformat(open_positions[trade_id]['entry_time']) for trade_id in tracked.values())
+            from_time = datetime.utcnow() - (datetime.now() - oldest) - timedelta(minutes=1)
+        
+        closes = {}
+        last_id = since_id
+        for transactions, cursor in oanda_client.iter_transaction_pages(since_id=since_id, from_time=from_time):
+            for fill in fills_from_transactions(transactions, account_id):
+                if fill[3] == 'close' and fill[2] in tracked:
+                    closes[fill[2]] = fill
+            last_id = cursor
+        
+        for oanda_trade_id, fill in closes.items():
+            self.log_trade_exit(tracked[oanda_trade_id], fill[7], EXIT_REASONS.get(fill[11], 'MANUAL'), pnl=fill[8])
+        if last_id is not None:
+            self.db.store.write(lambda conn: set_cursor(conn, source, last_id))
+        
+        return {trade_id: pos_info for trade_id, pos_info in open_positions.items()
+                if trade_id not in tracked.values()}
+    
     def start_sync_monitoring(self, oanda_client=None):
         """Start background thread for position synchronization"""
         if self._sync_running:
@@ -373,14 +411,11 @@ class TradeLogger:
             metrics = self.db.get_strategy_metrics(strategy_id)
             
             if not metrics:
-                # Calculate fresh metrics
-                closed_trades = self.db.get_closed_trades(strategy_id, days=90)
-                open_trades = self.db.get_open_trades(strategy_id)
-                
-                if closed_trades:
-                    metrics = self.metrics_calc.calculate_all_metrics(closed_trades, strategy_id)
-                    metrics['open_trades'] = len(open_trades)
-                    self.db.upsert_strategy_metrics(strategy_id, metrics)
+                # No row yet: the accumulator rebuilds from history (and saves the row) if there is any
+                acc = self.accumulators.get('strategy', strategy_id)
+                if acc.trades:
+                    metrics = self.accumulators.get_metrics('strategy', strategy_id)
+                    metrics['open_trades'] = len(self.db.get_open_trades(strategy_id))
                 else:
                     metrics = {'strategy_id': strategy_id, 'total_trades': 0}
             
@@ -407,6 +442,10 @@ class TradeLogger:
         """
         Import historical trades from OANDA API
         
+        Pages ORDER_FILL transactions from the account's import cursor (or `days` back on
+        the first run) and upserts them a page per transaction; re-running only writes
+        trades that are new or changed.
+        
         Returns:
             Number of trades imported
         """
@@ -416,22 +455,56 @@ class TradeLogger:
             # Get strategy version
             strategy_version = self.version_manager.initialize_strategy_if_needed(strategy_id)
             
-            # Get transactions from OANDA
-            from_date = (datetime.now() - timedelta(days=days)).isoformat()
+            def write_trades(conn, trades):
+                rows = [self._oanda_trade_row(trade, strategy_id, strategy_version) for trade in trades]
+                return self.db.upsert_trades(conn, rows)
             
-            # This would use OANDA's transaction API
-            # For now, placeholder for actual implementation
-            logger.warning("⚠️ Historical import from OANDA not fully implemented")
+            ingestor = TransactionIngestor(self.db.store, write_trades, source='import')
+            result = ingestor.ingest(oanda_client, account_id,
+                                     from_time=datetime.utcnow() - timedelta(days=days))
+            imported = result['changed_trades']
             
-            # Would fetch transactions, parse them, and insert as TradeRecords
-            imported_count = 0
+            # History lands out of exit order, so the touched accumulators are rebuilt rather than added to
+            closed = [trade for trade in imported if trade['is_closed']]
+            if closed:
+                self.accumulators.rebuild_scopes(closed)
+                # Live-logged trades the import just closed are no longer open
+                with self._position_lock:
+                    for trade in closed:
+                        self._open_positions.pop(trade['trade_id'], None)
             
-            return imported_count
+            logger.info(f"✅ Imported {len(imported)} trades for {strategy_id} ({len(closed)} closed)")
+            return len(imported)
             
         except Exception as e:
             logger.error(f"❌ Error importing historical trades: {e}")
             return 0
     
+    def _oanda_trade_row(self, trade: Dict[str, Any], strategy_id: str, strategy_version: int) -> Dict[str, Any]:
+        """A folded OANDA trade as a trades-table row"""
+        closed = trade['status'] == 'closed'
+        return {
+            'trade_id': f"oanda_{trade['account_id']}_{trade['oanda_trade_id']}",
+            'oanda_trade_id': str(trade['oanda_trade_id']),
+            'account_id': trade['account_id'],
+            'strategy_id': strategy_id,
+            'strategy_version': strategy_version,
+            'instrument': trade['instrument'],
+            'direction': trade['side'],
+            'position_size': trade['units'],
+            'entry_price': trade['entry_price'],
+            'entry_time': trade['entry_time'],
+            'exit_price': trade['exit_price'] if closed else None,
+            'exit_time': trade['exit_time'] if closed else None,
+            'exit_reason': trade['exit_reason'],
+            'realized_pnl': trade['realized_pl'] if closed else None,
+            'pnl_pips': self._calculate_pips(trade['entry_price'], trade['exit_price'], trade['instrument'],
+                                             trade['side']) if closed else None,
+            'commission': trade['commission'],
+            'trade_duration_seconds': trade['duration_seconds'],
+            'is_closed': 1 if closed else 0,
+        }
+    
     def generate_daily_snapshot(self, strategy_id: str, date: Optional[str] = None):
         """Generate daily performance snapshot"""
         if date is None:
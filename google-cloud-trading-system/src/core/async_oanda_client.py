@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Async OANDA API Client
+aiohttp mirror of OandaClient plus concurrent multi-account snapshot fan-out
+"""
+
+import os
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any
+
+from .oanda_client import OandaClient, OandaAccount, OandaPrice, OandaOrder
+from .rate_limiter import get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    aiohttp = None
+    AIOHTTP_AVAILABLE = False
+    logger.warning("⚠️ aiohttp not available - multi-account snapshots will use a thread pool")
+
+
+class AsyncOandaClient:
+    """
+    Async counterpart of OandaClient (pricing, candles, account, trades, orders).
+
+    Shares OandaClient's parsing helpers and the process-wide token bucket for the
+    API token, so async and sync traffic are rate limited together. Pass a shared
+    aiohttp session to fan out across many accounts over one connection pool.
+    """
+
+    def __init__(self, api_key: str = None, account_id: str = None, environment: str = None,
+                 session: Optional['aiohttp.ClientSession'] = None):
+        if not AIOHTTP_AVAILABLE:
+            raise ImportError("aiohttp is required for AsyncOandaClient")
+
+        try:
+            from .unified_credential_loader import get_oanda_api_key, get_oanda_account_id, ensure_credentials_loaded
+            ensure_credentials_loaded()
+            self.api_key = api_key or get_oanda_api_key()
+            self.account_id = account_id or get_oanda_account_id()
+        except Exception as e:
+            logger.debug(f"Unified credential loader not available: {e}")
+            self.api_key = api_key or os.getenv('OANDA_API_KEY')
+            self.account_id = account_id or os.getenv('OANDA_ACCOUNT_ID') or os.getenv('PRIMARY_ACCOUNT')
+        self.environment = environment or os.getenv('OANDA_ENVIRONMENT', 'practice')
+        if not self.api_key or not self.account_id:
+            raise ValueError("API key and account ID must be provided")
+
+        if self.environment == 'practice':
+            self.base_url = 'https://api-fxpractice.oanda.com'
+        else:
+            self.base_url = 'https://api-fxtrade.oanda.com'
+
+        self.accounts_endpoint = f"{self.base_url}/v3/accounts"
+        self.pricing_endpoint = f"{self.base_url}/v3/accounts/{self.account_id}/pricing"
+        self.orders_endpoint = f"{self.base_url}/v3/accounts/{self.account_id}/orders"
+        self.positions_endpoint = f"{self.base_url}/v3/accounts/{self.account_id}/positions"
+        self.trades_endpoint = f"{self.base_url}/v3/accounts/{self.account_id}/trades"
+        self.instruments_endpoint = f"{self.base_url}/v3/instruments"
+
+        self.headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        }
+
+        self.rate_limiter = get_rate_limiter(self.api_key)
+        self.rate_limit_timeout = float(os.getenv('OANDA_RATE_LIMIT_TIMEOUT', '30'))
+
+        self._session = session
+        self._owns_session = session is None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def _get_session(self) -> 'aiohttp.ClientSession':
+        if self._session is None or self._session.closed:
+            self._session = create_session()
+            self._owns_session = True
+        return self._session
+
+    async def close(self):
+        """Close the aiohttp session if this client created it"""
+        if self._owns_session and self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def _make_request(self, method: str, url: str, data: Optional[Dict] = None,
+                            params: Optional[Dict] = None, priority: Optional[int] = None) -> Dict:
+        """Authenticated request with the same retry/backoff settings as OandaClient"""
+        if priority is None:
+            priority = OandaClient._request_priority(method, url)
+        attempts = int(os.getenv('OANDA_HTTP_RETRIES', '3'))
+        backoff_base = float(os.getenv('OANDA_HTTP_BACKOFF', '0.5'))
+        timeout = aiohttp.ClientTimeout(total=float(os.getenv('OANDA_HTTP_TIMEOUT', '8')))
+        session = self._get_session()
+        last_exc = None
+
+        for i in range(1, attempts + 1):
+            if not await self.rate_limiter.acquire_async(priority, timeout=self.rate_limit_timeout):
+                logger.warning(f"⚠️ Rate limiter wait exceeded {self.rate_limit_timeout}s, proceeding")
+            try:
+                async with session.request(method.upper(), url, headers=self.headers, json=data,
+                                           params=params, timeout=timeout) as response:
+                    response.raise_for_status()
+                    return await response.json(content_type=None)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                last_exc = e
+                logger.error(f"❌ OANDA async request error (attempt {i}/{attempts}): {e}")
+                if i < attempts:
+                    await asyncio.sleep(backoff_base * i)
+        raise last_exc
+
+    async def get_account_info(self) -> OandaAccount:
+        """Get account information"""
+        response = await self._make_request('GET', f"{self.accounts_endpoint}/{self.account_id}")
+        return OandaClient._parse_account(response['account'])
+
+    async def get_current_prices(self, instruments: List[str]) -> Dict[str, OandaPrice]:
+        """Get current prices for instruments"""
+        params = {'instruments': ','.join(instruments), 'includeHomeConversions': 'false'}
+        response = await self._make_request('GET', self.pricing_endpoint, params=params)
+        return OandaClient._parse_prices(response)
+
+    async def get_candles(self, instrument: str, granularity: str = 'M1', count: int = 50,
+                          price: str = 'BA') -> Dict[str, Any]:
+        """Fetch recent candles for an instrument (raw OANDA JSON)"""
+        params = {'granularity': granularity, 'count': str(int(count)), 'price': price}
+        return await self._make_request('GET', f"{self.instruments_endpoint}/{instrument}/candles", params=params)
+
+    async def get_open_trades(self) -> List[Dict[str, Any]]:
+        """Return raw open trades list from OANDA"""
+        response = await self._make_request('GET', self.trades_endpoint, params={'state': 'OPEN'})
+        return response.get('trades', [])
+
+    async def get_positions(self) -> List[Dict[str, Any]]:
+        """Return raw open positions list from OANDA"""
+        response = await self._make_request('GET', f"{self.base_url}/v3/accounts/{self.account_id}/openPositions")
+        return response.get('positions', [])
+
+    async def place_market_order(self, instrument: str, units: int, stop_loss: Optional[float] = None,
+                                 take_profit: Optional[float] = None) -> OandaOrder:
+        """Place a market order"""
+        order_data = OandaClient._market_order_payload(instrument, units, stop_loss, take_profit)
+        response = await self._make_request('POST', self.orders_endpoint, order_data)
+        order = OandaClient._parse_market_order_response(response, stop_loss, take_profit)
+        logger.info(f"✅ Market order placed (async): {instrument} {units} units")
+        return order
+
+    async def close_trade(self, trade_id: str, units: Optional[int] = None) -> Dict:
+        """Close a specific trade (full or partial)"""
+        data = {'units': str(units) if units else 'ALL'}
+        return await self._make_request('PUT', f"{self.trades_endpoint}/{trade_id}/close", data)
+
+    async def get_snapshot(self, include_trades: bool = True) -> Dict[str, Any]:
+        """Account info and open trades fetched concurrently"""
+        if include_trades:
+            account, trades = await asyncio.gather(self.get_account_info(), self.get_open_trades())
+        else:
+            account, trades = await self.get_account_info(), []
+        return {'account': account, 'open_trades': trades}
+
+
+def create_session() -> 'aiohttp.ClientSession':
+    """aiohttp session with a keep-alive connection pool sized like HttpSessionPool"""
+    connector = aiohttp.TCPConnector(
+        limit=int(os.getenv('OANDA_HTTP_POOL_MAXSIZE', '20')),
+        keepalive_timeout=float(os.getenv('OANDA_HTTP_KEEPALIVE_TIMEOUT', '30'))
+    )
+    return aiohttp.ClientSession(connector=connector)
+
+
+async def fetch_accounts_snapshot(account_ids: List[str], api_key: str = None, environment: str = None,
+                                  include_trades: bool = True,
+                                  credentials: Optional[Dict[str, Dict[str, str]]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch account info (and open trades) for every account concurrently.
+
+    credentials optionally maps account_id -> {'api_key': ..., 'environment': ...}
+    for accounts that do not use the default token. Each result is either
+    {'account': OandaAccount, 'open_trades': [...]} or {'error': str}.
+    """
+    credentials = credentials or {}
+    results: Dict[str, Dict[str, Any]] = {}
+
+    async with create_session() as session:
+        clients = []
+        for account_id in account_ids:
+            creds = credentials.get(account_id, {})
+            try:
+                clients.append((account_id, AsyncOandaClient(
+                    api_key=creds.get('api_key') or api_key,
+                    account_id=account_id,
+                    environment=creds.get('environment') or environment,
+                    session=session
+                )))
+            except Exception as e:
+                results[account_id] = {'error': str(e)}
+
+        snapshots = await asyncio.gather(
+            *(client.get_snapshot(include_trades) for _, client in clients),
+            return_exceptions=True
+        )
+        for (account_id, _), snapshot in zip(clients, snapshots):
+            if isinstance(snapshot, Exception):
+                logger.error(f"❌ Snapshot failed for {account_id}: {snapshot}")
+                results[account_id] = {'error': str(snapshot)}
+            else:
+                results[account_id] = snapshot
+    return results
+
+
+def _snapshot_with_threads(account_ids: List[str], api_key: str, environment: str,
+                           include_trades: bool,
+                           credentials: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, Any]]:
+    """Fallback fan-out over sync OandaClients when aiohttp is unavailable"""
+    def fetch(account_id):
+        creds = credentials.get(account_id, {})
+        try:
+            client = OandaClient(creds.get('api_key') or api_key, account_id,
+                                 creds.get('environment') or environment)
+            account = client.get_account_info()
+            trades = client.get_open_trades() if include_trades else []
+            return account_id, {'account': account, 'open_trades': trades}
+        except Exception as e:
+            return account_id, {'error': str(e)}
+
+    with ThreadPoolExecutor(max_workers=max(1, min(len(account_ids), 16))) as pool:
+        return dict(pool.map(fetch, account_ids))
+
+
+def run_coroutine_sync(coro):
+    """Run a coroutine from sync code, even if this thread already has a running loop"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    result: Dict[str, Any] = {}
+
+    def runner():
+        try:
+            result['value'] = asyncio.run(coro)
+        except BaseException as e:
+            result['error'] = e
+
+    thread = threading.Thread(target=runner, daemon=True)
+    thread.start()
+    thread.join()
+    if 'error' in result:
+        raise result['error']
+    return result['value']
+
+
+def get_accounts_snapshot(account_ids: List[str], api_key: str = None, environment: str = None,
+                          include_trades: bool = True,
+                          credentials: Optional[Dict[str, Dict[str, str]]] = None) -> Dict[str, Dict[str, Any]]:
+    """Sync entry point: N-account snapshot in roughly one round trip"""
+    account_ids = [a for a in account_ids if a]
+    if not account_ids:
+        return {}
+    credentials = credentials or {}
+    if not AIOHTTP_AVAILABLE:
+        return _snapshot_with_threads(account_ids, api_key, environment, include_trades, credentials)
+    return run_coroutine_sync(
+        fetch_accounts_snapshot(account_ids, api_key, environment, include_trades, credentials)
+    )
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Tick-to-OHLC Bar Aggregator
+Builds bid/ask/mid OHLC + tick-volume bars for several granularities at once from exchange timestamps
+"""
+
+import os
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .candle_store import GRANULARITY_SECONDS, OHLC, ns_to_oanda, to_ns
+from .ohlcv_arrays import OHLCVArrays
+from .ring_buffer import RingBuffer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BAR_GRANULARITIES = tuple(
+    g.strip() for g in os.getenv('STREAM_BAR_GRANULARITIES', 'M1,M5,M15,H1').split(',') if g.strip()
+)
+
+SIDES = ('bid', 'ask', 'mid')
+
+# One completed bar per record (time is the bar open, int64 ns)
+BAR_DTYPE = np.dtype([('time', 'i8'), ('volume', 'i8')] +
+                     [(f"{side}_{f}", 'f8') for side in SIDES for f in OHLC])
+
+
+@dataclass
+class Bar:
+    """One OHLC bar; prices are [o, h, l, c] per side and volume is the tick count"""
+    instrument: str
+    granularity: str
+    time_ns: int
+    bid: List[float]
+    ask: List[float]
+    mid: List[float]
+    volume: int = 1
+    complete: bool = False
+    source: str = 'ticks'  # 'ticks' when built from the stream, 'candles' when reconciled from OANDA
+
+    @classmethod
+    def from_tick(cls, instrument: str, granularity: str, time_ns: int, bid: float, ask: float) -> 'Bar':
+        mid = (bid + ask) / 2
+        return cls(instrument, granularity, time_ns, [bid] * 4, [ask] * 4, [mid] * 4)
+
+    @classmethod
+    def from_record(cls, instrument: str, granularity: str, record: Tuple, source: str = 'candles') -> 'Bar':
+        time_ns, volume, *prices = record
+        return cls(instrument, granularity, int(time_ns), list(prices[0:4]), list(prices[4:8]),
+                   list(prices[8:12]), int(volume), True, source)
+
+    @property
+    def timestamp(self) -> str:
+        return ns_to_oanda(self.time_ns)
+
+    def update(self, bid: float, ask: float):
+        for values, price in ((self.bid, bid), (self.ask, ask), (self.mid, (bid + ask) / 2)):
+            if price > values[1]:
+                values[1] = price
+            if price < values[2]:
+                values[2] = price
+            values[3] = price
+        self.volume += 1
+
+    def record(self) -> Tuple:
+        return (self.time_ns, self.volume, *self.bid, *self.ask, *self.mid)
+
+    def to_candle(self) -> Dict[str, Any]:
+        """OANDA candle dict (price='MBA' shape)"""
+        candle = {'time': self.timestamp, 'volume': self.volume, 'complete': self.complete}
+        for side in SIDES:
+            candle[side] = dict(zip(OHLC, getattr(self, side)))
+        return candle
+
+
+def _candle_record(candle: Dict[str, Any]) -> Optional[Tuple]:
+    """BAR_DTYPE record for an OANDA candle with bid and ask (mid derived when absent)"""
+    if 'bid' not in candle or 'ask' not in candle:
+        return None
+    bid = [float(candle['bid'][f]) for f in OHLC]
+    ask = [float(candle['ask'][f]) for f in OHLC]
+    if 'mid' in candle:
+        mid = [float(candle['mid'][f]) for f in OHLC]
+    else:
+        mid = [(b + a) / 2 for b, a in zip(bid, ask)]
+    return (to_ns(candle['time']), int(candle.get('volume', 0)), *bid, *ask, *mid)
+
+
+class BarAggregator:
+    """
+    Aggregates ticks into bars for every configured granularity in one pass.
+
+    Bars are bucketed by the tick's exchange timestamp, not the local clock,
+    and a bar closes when the first tick of a later bucket arrives (or when
+    close_due() is called for a quiet market). Ticks older than the bar they
+    would belong to are counted as late and dropped. Completed bars are kept
+    in fixed-size rings per (instrument, granularity); subscribers get each
+    Bar as it closes. After a stream reconnect, reconcile() merges OANDA
+    candles in: missed bars are inserted (and emitted), differing bars are
+    corrected, and OANDA wins.
+    """
+
+    def __init__(self, granularities=DEFAULT_BAR_GRANULARITIES, history: int = None):
+        unknown = [g for g in granularities if g not in GRANULARITY_SECONDS]
+        if unknown:
+            raise ValueError(f"Unknown granularities: {unknown}")
+        self.granularities = tuple(granularities)
+        self.steps = {g: GRANULARITY_SECONDS[g] * 1_000_000_000 for g in self.granularities}
+        self.history = history or int(os.getenv('STREAM_BAR_HISTORY', '500'))
+
+        self.current: Dict[Tuple[str, str], Bar] = {}
+        self.completed: Dict[Tuple[str, str], RingBuffer] = {}
+        self.closed_through: Dict[Tuple[str, str], int] = {}  # End (ns) of the last closed bar
+        self.subscribers: List[Tuple[Optional[str], Callable[[Bar], None]]] = []
+        self.lock = threading.Lock()
+
+        self.stats = {'ticks': 0, 'bars_closed': 0, 'late_ticks': 0, 'gap_bars': 0, 'corrected_bars': 0}
+
+    def subscribe(self, callback: Callable[[Bar], None], granularity: Optional[str] = None):
+        """Call callback(bar) for every closed bar (of one granularity, or all)"""
+        if granularity is not None and granularity not in self.steps:
+            raise ValueError(f"Granularity {granularity} is not aggregated")
+        self.subscribers.append((granularity, callback))
+
+    def _ring(self, key: Tuple[str, str]) -> RingBuffer:
+        ring = self.completed.get(key)
+        if ring is None:
+            ring = self.completed[key] = RingBuffer(self.history, dtype=BAR_DTYPE)
+        return ring
+
+    def _close(self, key: Tuple[str, str], bar: Bar):
+        bar.complete = True
+        self._ring(key).append(bar.record())
+        self.closed_through[key] = bar.time_ns + self.steps[bar.granularity]
+        self.stats['bars_closed'] += 1
+
+    def _emit(self, bars: List[Bar]):
+        for bar in bars:
+            for granularity, callback in self.subscribers:
+                if granularity is None or granularity == bar.granularity:
+                    try:
+                        callback(bar)
+                    except Exception as e:
+                        logger.error(f"❌ Bar callback error ({bar.instrument} {bar.granularity}): {e}")
+
+    def on_tick(self, instrument: str, bid: float, ask: float, time_ns: int) -> List[Bar]:
+        """Add one tick to every granularity; returns (and emits) the bars it closed"""
+        closed = []
+        with self.lock:
+            self.stats['ticks'] += 1
+            for granularity, step in self.steps.items():
+                key = (instrument, granularity)
+                start = time_ns - time_ns % step
+                bar = self.current.get(key)
+                if bar is not None and start == bar.time_ns:
+                    bar.update(bid, ask)
+                    continue
+                if (bar is not None and start < bar.time_ns) or start < self.closed_through.get(key, start):
+                    self.stats['late_ticks'] += 1
+                    continue
+                if bar is not None:
+                    self._close(key, bar)
+                    closed.append(bar)
+                self.current[key] = Bar.from_tick(instrument, granularity, start, bid, ask)
+        self._emit(closed)
+        return closed
+
+    def close_due(self, now_ns: int) -> List[Bar]:
+        """Close bars whose period ended by now_ns without a later tick (quiet markets)"""
+        closed = []
+        with self.lock:
+            for key, bar in list(self.current.items()):
+                if bar.time_ns + self.steps[bar.granularity] <= now_ns:
+                    self._close(key, bar)
+                    closed.append(bar)
+                    del self.current[key]
+        self._emit(closed)
+        return closed
+
+    def reconcile(self, instrument: str, granularity: str, candles: List[Dict[str, Any]]) -> List[Bar]:
+        """Merge OANDA bid/ask candles into the bar history; returns (and emits) the inserted gap bars"""
+        if granularity not in self.steps:
+            return []
+        key = (instrument, granularity)
+        step = self.steps[granularity]
+        inserted = []
+        with self.lock:
+            rows = {record[0]: record for record in self._ring(key).tolist()}
+            live = self.current.get(key)
+            for candle in candles:
+                record = _candle_record(candle)
+                if record is None:
+                    continue
+                time_ns = record[0]
+                if not candle.get('complete', True):
+                    if live is None or live.time_ns < time_ns:
+                        # The bar in progress began while disconnected: start from OANDA's view of it
+                        self.current[key] = live = Bar.from_record(instrument, granularity, record, source='ticks')
+                        live.complete = False
+                    elif live.time_ns == time_ns:
+                        # Widen the live bar to cover ticks missed before the reconnect
+                        for i, side in enumerate(SIDES):
+                            prices = getattr(live, side)
+                            prices[0] = record[2 + 4 * i]
+                            prices[1] = max(prices[1], record[3 + 4 * i])
+                            prices[2] = min(prices[2], record[4 + 4 * i])
+                        live.volume = max(live.volume, record[1])
+                    continue
+                if live is not None and live.time_ns <= time_ns:
+                    if live.time_ns < time_ns:
+                        # OANDA has no candle for the live bar's period: close it as built from ticks
+                        live.complete = True
+                        rows.setdefault(live.time_ns, live.record())
+                        inserted.append(live)
+                    # A complete candle for the live bar's period supersedes the partial one
+                    del self.current[key]
+                    live = None
+                if time_ns in rows:
+                    if rows[time_ns] != record:
+                        self.stats['corrected_bars'] += 1
+                else:
+                    inserted.append(Bar.from_record(instrument, granularity, record))
+                rows[time_ns] = record
+                self.closed_through[key] = max(self.closed_through.get(key, 0), time_ns + step)
+
+            ring = self.completed[key] = RingBuffer(self.history, dtype=BAR_DTYPE)
+            ring.extend([rows[t] for t in sorted(rows)])
+            inserted = sorted({bar.time_ns: bar for bar in inserted}.values(), key=lambda bar: bar.time_ns)
+            self.stats['gap_bars'] += len(inserted)
+        if inserted:
+            logger.info(f"🧩 Reconciled {instrument} {granularity}: {len(inserted)} missed bars inserted")
+        self._emit(inserted)
+        return inserted
+
+    def current_bar(self, instrument: str, granularity: str) -> Optional[Bar]:
+        return self.current.get((instrument, granularity))
+
+    def get_arrays(self, instrument: str, granularity: str) -> OHLCVArrays:
+        """Completed bars as OHLCVArrays (a copy, safe to keep across ticks)"""
+        with self.lock:
+            view = self._ring((instrument, granularity)).view()
+            columns = {name: np.array(view[name]) for name in BAR_DTYPE.names}
+        return OHLCVArrays.from_columns(instrument, granularity, columns)
+
+    def get_candles(self, instrument: str, granularity: str, count: int = 100,
+                    include_current: bool = False) -> List[Dict[str, Any]]:
+        """Last count bars as OANDA candle dicts (oldest first)"""
+        with self.lock:
+            records = self._ring((instrument, granularity))[-count:].tolist() if count > 0 else []
+            bars = [Bar.from_record(instrument, granularity, record) for record in records]
+            live = self.current.get((instrument, granularity))
+            if include_current and live is not None:
+                bars = (bars + [live])[-count:]
+        return [bar.to_candle() for bar in bars]
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats['granularities'] = list(self.granularities)
+        stats['series'] = len(self.completed)
+        return stats
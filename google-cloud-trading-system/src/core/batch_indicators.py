@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Vectorized Batch Indicators
+Whole-history NumPy indicator kernels for backtest mode, matching the strategies' per-scan pandas calculations
+"""
+
+import logging
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+logger = logging.getLogger(__name__)
+
+# Documented parity with the per-scan pandas calculations. Rolling sums are
+# evaluated in a different order than pandas' running sums, so values agree
+# to this relative tolerance rather than bit-for-bit.
+PARITY_RTOL = 1e-9
+
+
+def history_lengths(n: int, window: int) -> np.ndarray:
+    """len(price_history) at each bar when the strategy trims to the last window values"""
+    return np.minimum(np.arange(1, n + 1), window)
+
+
+def rolling_mean(values: np.ndarray, period: int) -> np.ndarray:
+    """pandas rolling(period).mean(): NaN until full, and NaN if any input in the window is NaN"""
+    out = np.full(len(values), np.nan)
+    if len(values) >= period:
+        out[period - 1:] = sliding_window_view(values, period).mean(axis=1)
+    return out
+
+
+def rolling_std(values: np.ndarray, period: int, ddof: int = 1) -> np.ndarray:
+    """pandas rolling(period).std(ddof)"""
+    out = np.full(len(values), np.nan)
+    if len(values) >= period and period > ddof:
+        out[period - 1:] = sliding_window_view(values, period).std(axis=1, ddof=ddof)
+    return out
+
+
+def close_true_range(closes: np.ndarray) -> np.ndarray:
+    """Close-only true range |close - prev close|; the first bar is 0, as pandas' max(skipna) gives"""
+    tr = np.zeros(len(closes))
+    tr[1:] = np.abs(np.diff(closes))
+    return tr
+
+
+def close_atr(closes: np.ndarray, period: int) -> np.ndarray:
+    """Rolling mean of the close-only true range"""
+    return rolling_mean(close_true_range(closes), period)
+
+
+def abs_return_std(closes: np.ndarray, period: int) -> np.ndarray:
+    """Rolling std of |pct_change| (the strategies' ATR fallback before scaling by price)"""
+    returns = np.full(len(closes), np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns[1:] = np.abs(np.diff(closes) / closes[:-1])
+    return rolling_std(returns, period)
+
+
+def close_adx(closes: np.ndarray, period: int) -> np.ndarray:
+    """Close-only ADX with rolling-mean smoothing (NaN wherever the pandas version is NaN)"""
+    tr = close_true_range(closes)
+    up = np.zeros(len(closes))
+    up[1:] = np.diff(closes)
+    down = -up
+    dm_plus = np.where((up > down) & (up > 0), up, 0.0)
+    dm_minus = np.where((down > up) & (down > 0), down, 0.0)
+
+    tr_smooth = rolling_mean(tr, period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        di_plus = 100 * (rolling_mean(dm_plus, period) / tr_smooth)
+        di_minus = 100 * (rolling_mean(dm_minus, period) / tr_smooth)
+        dx = 100 * np.abs(di_plus - di_minus) / (di_plus + di_minus)
+    dx[~np.isfinite(dx)] = np.nan
+    return rolling_mean(dx, period)
+
+
+def sma_rsi(closes: np.ndarray, period: int) -> np.ndarray:
+    """RSI from rolling-mean gains/losses; 100 with no losses, NaN when flat"""
+    change = np.zeros(len(closes))
+    change[1:] = np.diff(closes)
+    gain = rolling_mean(np.where(change > 0, change, 0.0), period)
+    loss = rolling_mean(np.where(change < 0, -change, 0.0), period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 - (100 / (1 + gain / loss))
+
+
+def _window_columns(closes: np.ndarray, window: int):
+    """Column t of the (n, window) matrix whose row i is the trimmed history at bar i, NaN-padded on the left"""
+    padded = np.concatenate([np.full(window - 1, np.nan), np.asarray(closes, dtype=np.float64)])
+    matrix = sliding_window_view(padded, window)
+    for t in range(window):
+        yield matrix[:, t]
+
+
+def windowed_ema(closes: np.ndarray, span: int, window: int, adjust: bool = False) -> np.ndarray:
+    """
+    pd.Series(history).ewm(span).mean().iloc[-1] for every bar.
+
+    The strategies recompute an EMA over their trimmed history, so the value at
+    bar i is seeded at the start of that bar's window rather than at bar 0.
+    The recursion runs once down the window, vectorized across all bars.
+    """
+    alpha = 2.0 / (span + 1.0)
+    n = len(closes)
+    if not adjust:
+        state = np.full(n, np.nan)
+        for x in _window_columns(closes, window):
+            state = np.where(np.isnan(state), x, state + alpha * (x - state))
+        return state
+
+    decay = 1.0 - alpha
+    num, den = np.zeros(n), np.zeros(n)
+    for x in _window_columns(closes, window):
+        valid = ~np.isnan(x)
+        num = np.where(valid, decay * num + np.where(valid, x, 0.0), num)
+        den = np.where(valid, decay * den + 1.0, den)
+    return num / den
+
+
+def windowed_macd(closes: np.ndarray, window: int, fast: int = 12, slow: int = 26,
+                  signal: int = 9) -> Tuple[np.ndarray, np.ndarray]:
+    """MACD line and signal (pandas ewm adjust=True) over each bar's trimmed history"""
+    decays = [1.0 - 2.0 / (span + 1.0) for span in (fast, slow, signal)]
+    n = len(closes)
+    num = [np.zeros(n) for _ in decays]
+    den = [np.zeros(n) for _ in decays]
+    macd = np.full(n, np.nan)
+    for x in _window_columns(closes, window):
+        valid = ~np.isnan(x)
+        for k in (0, 1):
+            num[k] = np.where(valid, decays[k] * num[k] + np.where(valid, x, 0.0), num[k])
+            den[k] = np.where(valid, decays[k] * den[k] + 1.0, den[k])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            macd = num[0] / den[0] - num[1] / den[1]
+        num[2] = np.where(valid, decays[2] * num[2] + np.where(valid, macd, 0.0), num[2])
+        den[2] = np.where(valid, decays[2] * den[2] + 1.0, den[2])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return macd, num[2] / den[2]
+
+
+def trailing_volatility(closes: np.ndarray, lookback: int) -> np.ndarray:
+    """np.std(last lookback) / np.mean(last lookback); NaN until lookback bars exist"""
+    out = np.full(len(closes), np.nan)
+    if len(closes) >= lookback:
+        view = sliding_window_view(closes, lookback)
+        out[lookback - 1:] = view.std(axis=1) / view.mean(axis=1)
+    return out
+
+
+class PrecomputedIndicators:
+    """
+    Indicator columns for one instrument's full backtest close series.
+
+    Row i holds what the strategy would compute after the close at position i
+    has been appended to its price history (trimmed to window values).
+    row_for() checks that the strategy's live history really is that slice
+    before handing out a row, so a driver that feeds history differently
+    silently falls back to the per-scan calculation. NaN means "not
+    precomputed for this bar" and callers compute that value themselves.
+    """
+
+    def __init__(self, closes: np.ndarray, columns: Dict[str, np.ndarray], window: int):
+        self.closes = np.asarray(closes, dtype=np.float64)
+        self.columns = columns
+        self.window = window
+        self._lengths = history_lengths(len(self.closes), window)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.closes)
+
+    def row(self, position: int) -> Dict[str, float]:
+        return {name: float(values[position]) for name, values in self.columns.items()}
+
+    def row_for(self, history: Sequence[float], position: Optional[int]) -> Optional[Dict[str, float]]:
+        """The row at position if history is exactly the trimmed series ending there, else None"""
+        if position is None or not 0 <= position < len(self.closes) or not history:
+            self.misses += 1
+            return None
+        length = int(self._lengths[position])
+        if (len(history) != length or history[-1] != self.closes[position]
+                or history[0] != self.closes[position - length + 1]):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self.row(position)
+
+
+def interleaved_closes(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """One series with first[i], second[i] per bar (drivers that append two values per bar)"""
+    out = np.empty(2 * len(first), dtype=np.float64)
+    out[0::2] = first
+    out[1::2] = second
+    return out
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Persistent Candle Store
+Local columnar cache of OANDA candles with incremental gap-fill for backtests and prefill
+"""
+
+import os
+import json
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple, Any, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Seconds per OANDA granularity
+GRANULARITY_SECONDS = {
+    'S5': 5, 'S10': 10, 'S15': 15, 'S30': 30,
+    'M1': 60, 'M2': 120, 'M4': 240, 'M5': 300, 'M10': 600, 'M15': 900, 'M30': 1800,
+    'H1': 3600, 'H2': 7200, 'H3': 10800, 'H4': 14400, 'H6': 21600, 'H8': 28800, 'H12': 43200,
+    'D': 86400, 'W': 604800
+}
+
+# OANDA rejects candle requests spanning more than this many candles
+OANDA_MAX_CANDLES = 5000
+
+# Default store location, anchored to the package directory rather than the working directory
+DEFAULT_ROOT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                                'data', 'candle_store')
+
+# Price component letter -> OANDA candle key
+PRICE_COMPONENTS = {'M': 'mid', 'B': 'bid', 'A': 'ask'}
+OHLC = ('o', 'h', 'l', 'c')
+
+TimeLike = Union[datetime, str, int, float]
+
+
+def to_ns(value: TimeLike) -> int:
+    """Convert datetime / OANDA timestamp string / epoch ns to int64 nanoseconds (UTC)"""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, float):
+        return int(value * 1e9)
+    if isinstance(value, str):
+        return int(np.datetime64(value.rstrip('Z').split('+')[0], 'ns').astype(np.int64))
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return int(np.datetime64(value, 'ns').astype(np.int64))
+
+
+def ns_to_oanda(ns: int) -> str:
+    """Format int64 nanoseconds as an OANDA RFC3339 timestamp"""
+    return f"{np.datetime_as_string(np.datetime64(int(ns), 'ns'), unit='ns')}Z"
+
+
+def normalize_price(price: str) -> str:
+    """Canonical component string, e.g. 'ab' -> 'BA', 'mba' -> 'MBA'"""
+    normalized = ''.join(c for c in 'MBA' if c in (price or 'M').upper())
+    return normalized or 'M'
+
+
+def column_names(price: str) -> List[str]:
+    """Column names stored for a price component string"""
+    columns = ['time', 'volume']
+    for component in normalize_price(price):
+        columns.extend(f"{PRICE_COMPONENTS[component]}_{field}" for field in OHLC)
+    return columns
+
+
+class CandleStore:
+    """
+    On-disk candle cache keyed by (instrument, granularity, price components).
+
+    Each series is a directory of per-column .npy files (time as int64 ns, OHLC as
+    float64, volume as int64) plus a coverage index of time ranges already fetched.
+    Requests only hit OANDA for ranges not yet covered, paging past the 5000-candle
+    cap; covered ranges are served with no network I/O. Weekend/holiday gaps are
+    recorded as covered so they are never re-requested.
+    """
+
+    def __init__(self, root_dir: str = None, client=None):
+        self.root_dir = root_dir or os.getenv('CANDLE_STORE_DIR', DEFAULT_ROOT_DIR)
+        self.client = client
+        self.series: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        self.lock = threading.RLock()
+        self.key_locks: Dict[Tuple[str, str, str], threading.Lock] = {}
+
+        # Stats
+        self.network_requests = 0
+        self.candles_fetched = 0
+        self.range_hits = 0
+        self.range_misses = 0
+
+        os.makedirs(self.root_dir, exist_ok=True)
+        logger.info(f"✅ CandleStore initialized: {self.root_dir}")
+
+    # ------------------------------------------------------------------ storage
+    def _key(self, instrument: str, granularity: str, price: str) -> Tuple[str, str, str]:
+        if granularity not in GRANULARITY_SECONDS:
+            raise ValueError(f"Unsupported granularity: {granularity}")
+        return (instrument, granularity, normalize_price(price))
+
+    def _key_lock(self, key) -> threading.Lock:
+        with self.lock:
+            if key not in self.key_locks:
+                self.key_locks[key] = threading.Lock()
+            return self.key_locks[key]
+
+    def series_dir(self, instrument: str, granularity: str, price: str = 'M') -> str:
+        """Directory holding the column files for a series"""
+        instrument, granularity, price = self._key(instrument, granularity, price)
+        return os.path.join(self.root_dir, instrument.replace('/', '_'), f"{granularity}_{price}")
+
+    def _empty_columns(self, price: str) -> Dict[str, np.ndarray]:
+        columns = {}
+        for name in column_names(price):
+            dtype = np.int64 if name in ('time', 'volume') else np.float64
+            columns[name] = np.empty(0, dtype=dtype)
+        return columns
+
+    def _load(self, key) -> Dict[str, Any]:
+        """Load a series (columns + coverage) into memory, once"""
+        series = self.series.get(key)
+        if series is not None:
+            return series
+
+        path = self.series_dir(*key)
+        columns = self._empty_columns(key[2])
+        coverage: List[List[int]] = []
+        meta_path = os.path.join(path, 'meta.json')
+        if os.path.exists(meta_path):
+            try:
+                with open(meta_path, 'r') as f:
+                    coverage = json.load(f).get('coverage', [])
+                for name in columns:
+                    columns[name] = np.load(os.path.join(path, f"{name}.npy"))
+            except Exception as e:
+                logger.error(f"❌ Corrupt candle series {path}, rebuilding: {e}")
+                columns = self._empty_columns(key[2])
+                coverage = []
+
+        series = {'columns': columns, 'coverage': coverage}
+        self.series[key] = series
+        return series
+
+    def _save(self, key, series: Dict[str, Any]):
+        """Persist columns atomically (write temp file, then rename)"""
+        path = self.series_dir(*key)
+        os.makedirs(path, exist_ok=True)
+        for name, values in series['columns'].items():
+            tmp_path = os.path.join(path, f".{name}.tmp.npy")
+            np.save(tmp_path, values)
+            os.replace(tmp_path, os.path.join(path, f"{name}.npy"))
+        tmp_meta = os.path.join(path, '.meta.json.tmp')
+        with open(tmp_meta, 'w') as f:
+            json.dump({
+                'instrument': key[0],
+                'granularity': key[1],
+                'price': key[2],
+                'count': int(len(series['columns']['time'])),
+                'coverage': series['coverage'],
+                'updated_at': datetime.now(timezone.utc).isoformat()
+            }, f)
+        os.replace(tmp_meta, os.path.join(path, 'meta.json'))
+
+    # ----------------------------------------------------------------- coverage
+    @staticmethod
+    def _merge_coverage(coverage: List[List[int]], start_ns: int, end_ns: int) -> List[List[int]]:
+        ranges = sorted(coverage + [[start_ns, end_ns]])
+        merged: List[List[int]] = []
+        for s, e in ranges:
+            if merged and s <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], e)
+            else:
+                merged.append([s, e])
+        return merged
+
+    @staticmethod
+    def _missing_ranges(coverage: List[List[int]], start_ns: int, end_ns: int) -> List[Tuple[int, int]]:
+        missing = []
+        cursor = start_ns
+        for s, e in sorted(coverage):
+            if e <= cursor:
+                continue
+            if s >= end_ns:
+                break
+            if s > cursor:
+                missing.append((cursor, s))
+            cursor = max(cursor, e)
+            if cursor >= end_ns:
+                break
+        if cursor < end_ns:
+            missing.append((cursor, end_ns))
+        return missing
+
+    # ----------------------------------------------------------------- fetching
+    def _get_client(self):
+        if self.client is None:
+            from .oanda_client import OandaClient
+            self.client = OandaClient()
+        return self.client
+
+    def _parse_candles(self, candles: List[Dict], price: str) -> Tuple[Dict[str, np.ndarray], Optional[int]]:
+        """Convert complete OANDA candles to columns; also return first incomplete candle time"""
+        rows = {name: [] for name in column_names(price)}
+        incomplete_ns = None
+        for candle in candles:
+            time_ns = to_ns(candle['time'])
+            if not candle.get('complete', True):
+                incomplete_ns = time_ns
+                break
+            rows['time'].append(time_ns)
+            rows['volume'].append(int(candle.get('volume', 0)))
+            for component in normalize_price(price):
+                values = candle.get(PRICE_COMPONENTS[component]) or {}
+                for field in OHLC:
+                    rows[f"{PRICE_COMPONENTS[component]}_{field}"].append(float(values.get(field, 0.0)))
+        columns = {}
+        for name, values in rows.items():
+            dtype = np.int64 if name in ('time', 'volume') else np.float64
+            columns[name] = np.asarray(values, dtype=dtype)
+        return columns, incomplete_ns
+
+    def _fetch_range(self, instrument: str, granularity: str, price: str,
+                     start_ns: int, end_ns: int) -> Tuple[Dict[str, np.ndarray], int]:
+        """Fetch [start_ns, end_ns) from OANDA in <=5000-candle pages.
+
+        Returns the fetched columns and the time up to which the range is now covered.
+        """
+        client = self._get_client()
+        step_ns = GRANULARITY_SECONDS[granularity] * 1_000_000_000
+        pages: List[Dict[str, np.ndarray]] = []
+        cursor = start_ns
+
+        while cursor < end_ns:
+            span = (end_ns - cursor) // step_ns
+            if span <= OANDA_MAX_CANDLES:
+                page_end = end_ns
+                response = client.get_candles(instrument, granularity=granularity, price=price,
+                                              from_time=ns_to_oanda(cursor), to_time=ns_to_oanda(end_ns))
+            else:
+                page_end = None
+                response = client.get_candles(instrument, granularity=granularity, price=price,
+                                              count=OANDA_MAX_CANDLES, from_time=ns_to_oanda(cursor))
+            self.network_requests += 1
+
+            candles = (response or {}).get('candles', [])
+            columns, incomplete_ns = self._parse_candles(candles, price)
+            if len(columns['time']):
+                pages.append(columns)
+                self.candles_fetched += len(columns['time'])
+
+            if incomplete_ns is not None:
+                # Live bar still forming - coverage stops where it starts
+                cursor = incomplete_ns
+                break
+            if page_end is not None:
+                cursor = page_end
+                break
+            if len(candles) < OANDA_MAX_CANDLES:
+                # Fewer than a full page: no more data up to now
+                cursor = end_ns
+                break
+            cursor = int(columns['time'][-1]) + step_ns
+
+        if pages:
+            fetched = {name: np.concatenate([p[name] for p in pages]) for name in pages[0]}
+        else:
+            fetched = self._empty_columns(price)
+        return fetched, min(cursor, end_ns)
+
+    @staticmethod
+    def _merge_columns(existing: Dict[str, np.ndarray], new: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Merge by timestamp; newly fetched values win on duplicates"""
+        if not len(new['time']):
+            return existing
+        if not len(existing['time']):
+            order = np.argsort(new['time'], kind='stable')
+            return {name: values[order] for name, values in new.items()}
+        combined = {name: np.concatenate([existing[name], new[name]]) for name in existing}
+        # Reverse so np.unique keeps the last (newest) occurrence of each timestamp
+        reversed_times = combined['time'][::-1]
+        _, first_idx = np.unique(reversed_times, return_index=True)
+        keep = len(reversed_times) - 1 - first_idx
+        return {name: values[keep] for name, values in combined.items()}
+
+    def ensure_range(self, instrument: str, granularity: str, start: TimeLike, end: TimeLike = None,
+                     price: str = 'M') -> int:
+        """Fetch any part of [start, end) not already stored. Returns candles fetched."""
+        key = self._key(instrument, granularity, price)
+        now_ns = to_ns(datetime.now(timezone.utc))
+        start_ns = to_ns(start)
+        end_ns = min(to_ns(end) if end is not None else now_ns, now_ns)
+        if start_ns >= end_ns:
+            return 0
+
+        with self._key_lock(key):
+            series = self._load(key)
+            missing = self._missing_ranges(series['coverage'], start_ns, end_ns)
+            if not missing:
+                self.range_hits += 1
+                return 0
+
+            self.range_misses += 1
+            fetched_total = 0
+            for gap_start, gap_end in missing:
+                try:
+                    fetched, covered_until = self._fetch_range(instrument, granularity, key[2], gap_start, gap_end)
+                except Exception as e:
+                    logger.error(f"❌ Candle gap-fill failed for {instrument} {granularity}: {e}")
+                    break
+                series['columns'] = self._merge_columns(series['columns'], fetched)
+                if covered_until > gap_start:
+                    series['coverage'] = self._merge_coverage(series['coverage'], gap_start, covered_until)
+                fetched_total += len(fetched['time'])
+                if covered_until < gap_end:
+                    break
+
+            self._save(key, series)
+            logger.info(f"📥 CandleStore {instrument} {granularity} {key[2]}: fetched {fetched_total} candles "
+                        f"for {len(missing)} gap(s), {len(series['columns']['time'])} stored")
+            return fetched_total
+
+    # ------------------------------------------------------------------ reading
+    def get_arrays(self, instrument: str, granularity: str, start: TimeLike, end: TimeLike = None,
+                   price: str = 'M', fetch: bool = True) -> Dict[str, np.ndarray]:
+        """Columns for [start, end) as NumPy array views (time in int64 ns)"""
+        if fetch:
+            self.ensure_range(instrument, granularity, start, end, price)
+        key = self._key(instrument, granularity, price)
+        with self._key_lock(key):
+            columns = self._load(key)['columns']
+        times = columns['time']
+        lo = int(np.searchsorted(times, to_ns(start), side='left'))
+        hi = len(times) if end is None else int(np.searchsorted(times, to_ns(end), side='left'))
+        return {name: values[lo:hi] for name, values in columns.items()}
+
+    def get_candles(self, instrument: str, granularity: str, start: TimeLike, end: TimeLike = None,
+                    price: str = 'M', fetch: bool = True) -> List[Dict[str, Any]]:
+        """Candles for [start, end) in OANDA's JSON shape (drop-in for get_candles()['candles'])"""
+        return self._to_oanda_candles(self.get_arrays(instrument, granularity, start, end, price, fetch), price)
+
+    def get_recent_candles(self, instrument: str, granularity: str, count: int, price: str = 'M',
+                           fetch: bool = True) -> List[Dict[str, Any]]:
+        """Last `count` complete candles, fetching only what is missing since the last call"""
+        window = timedelta(seconds=GRANULARITY_SECONDS[granularity] * int(count))
+        # Pad the lookback so weekends/holidays still leave `count` trading bars
+        if window < timedelta(days=3):
+            window += timedelta(days=3)
+        else:
+            window = window * 7 / 5 + timedelta(days=2)
+        start = datetime.now(timezone.utc) - window
+        arrays = self.get_arrays(instrument, granularity, start, None, price, fetch)
+        arrays = {name: values[-int(count):] for name, values in arrays.items()}
+        return self._to_oanda_candles(arrays, price)
+
+    @staticmethod
+    def _to_oanda_candles(arrays: Dict[str, np.ndarray], price: str) -> List[Dict[str, Any]]:
+        components = [PRICE_COMPONENTS[c] for c in normalize_price(price)]
+        times = np.datetime_as_string(arrays['time'].astype('datetime64[ns]'), unit='ns')
+        volumes = arrays['volume'].tolist()
+        columns = {f"{comp}_{field}": arrays[f"{comp}_{field}"].tolist() for comp in components for field in OHLC}
+        candles = []
+        for i, time_str in enumerate(times):
+            candle = {'time': f"{time_str}Z", 'volume': volumes[i], 'complete': True}
+            for comp in components:
+                candle[comp] = {field: columns[f"{comp}_{field}"][i] for field in OHLC}
+            candles.append(candle)
+        return candles
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            loaded = {f"{k[0]}:{k[1]}:{k[2]}": int(len(s['columns']['time'])) for k, s in self.series.items()}
+        return {
+            'root_dir': self.root_dir,
+            'network_requests': self.network_requests,
+            'candles_fetched': self.candles_fetched,
+            'range_hits': self.range_hits,
+            'range_misses': self.range_misses,
+            'series_loaded': loaded
+        }
+
+
+# Global instance
+_candle_store = None
+_candle_store_lock = threading.Lock()
+
+def get_candle_store(client=None) -> CandleStore:
+    """Get the shared candle store (optionally attaching an OANDA client for gap-fill)"""
+    global _candle_store
+    if _candle_store is None:
+        with _candle_store_lock:
+            if _candle_store is None:
+                _candle_store = CandleStore(client=client)
+    if client is not None and _candle_store.client is None:
+        _candle_store.client = client
+    return _candle_store
@@ -15,6 +15,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from .streaming_data_feed import get_optimized_data_feed
 from .candle_based_scanner import get_candle_scanner
 from .persistent_history import get_persistent_history
+from .tick_journal import start_tick_journal, journal_enabled, get_tick_journal
 from .optimized_telegram import get_optimized_telegram
 from .optimization_loader import load_optimization_results
 
@@ -51,6 +52,9 @@ class CompleteOptimizedSystem:
         try:
             logger.info("🚀 Starting Complete Optimized Trading System...")
             
+            # Record the session's ticks and bars (TICK_JOURNAL_ENABLED=true)
+            start_tick_journal()
+            
             # Start data feed (streaming)
             self.data_feed.start()
             time.sleep(3)  # Let streaming establish
@@ -97,6 +101,8 @@ class CompleteOptimizedSystem:
             
             # Save all histories
             self.history_manager.save_all_histories()
+            if journal_enabled():
+                get_tick_journal().close()
             
             # Send shutdown notification
             self.notifier.send_immediate(
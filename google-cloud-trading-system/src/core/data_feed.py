@@ -15,6 +15,7 @@ import queue
 import time
 
 from .oanda_client import OandaClient, OandaPrice, get_oanda_client
+from .market_data_bus import MarketDataBus, get_market_data_bus
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -46,10 +47,13 @@ class DataValidationResult:
     validation_errors: List[str]
     timestamp: datetime
 
+# Instruments every LiveDataFeed watches in addition to the ones it is given
+DEFAULT_INSTRUMENTS = ['EUR_USD', 'GBP_USD', 'USD_JPY', 'AUD_USD', 'XAU_USD']
+
 class LiveDataFeed:
     """Production live data feed manager for OANDA market data"""
     
-    def __init__(self, account_id: str = None, instruments: List[str] = None):
+    def __init__(self, account_id: str = None, instruments: List[str] = None, bus: Optional[MarketDataBus] = None):
         """Initialize live data feed with optional account-specific settings"""
         from .dynamic_account_manager import get_account_manager
         
@@ -60,8 +64,9 @@ class LiveDataFeed:
                            if account_id else get_oanda_client())
         
         # Configuration
-        self.instruments = instruments or ['EUR_USD', 'GBP_USD', 'USD_JPY', 'AUD_USD', 'XAU_USD']
+        self.instruments = list(instruments) if instruments else list(DEFAULT_INSTRUMENTS)
         self.market_data: Dict[str, MarketData] = {}
+        self.bus = bus or get_market_data_bus()  # Every fetched price is published once for all consumers
         
         # Data validation settings
         self.max_data_age_seconds = int(os.getenv('MAX_DATA_AGE_SECONDS', '300'))  # 5 minutes
@@ -155,10 +160,13 @@ class LiveDataFeed:
                 logger.info(f"📊 Fetched prices at {fetch_time.isoformat()}: {list(prices.keys())}")
                 
                 # Convert to MarketData format
+                updates = {}
                 for instrument, oanda_price in prices.items():
                     market_data = self._convert_to_market_data(oanda_price)
-                    self.market_data[instrument] = market_data
+                    updates[instrument] = market_data
                     logger.debug(f"  ✓ {instrument}: bid={oanda_price.bid:.5f}, age={market_data.last_update_age}s")
+                self.market_data.update(updates)
+                self.bus.publish_ticks(updates)
                 
                 # Notify callbacks
                 self._notify_data_callbacks()
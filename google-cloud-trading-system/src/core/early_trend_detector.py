@@ -5,6 +5,7 @@ Uses leading indicators instead of lagging indicators
 """
 
 import logging
+import threading
 from typing import Dict, List, Optional, Tuple
 import numpy as np
 
@@ -385,12 +386,15 @@ class EarlyTrendDetector:
 
 # Global instance
 _early_trend_detector = None
+_early_trend_detector_lock = threading.Lock()
 
 
 def get_early_trend_detector() -> EarlyTrendDetector:
     """Get the global early trend detector instance"""
     global _early_trend_detector
     if _early_trend_detector is None:
-        _early_trend_detector = EarlyTrendDetector()
+        with _early_trend_detector_lock:
+            if _early_trend_detector is None:
+                _early_trend_detector = EarlyTrendDetector()
     return _early_trend_detector
 
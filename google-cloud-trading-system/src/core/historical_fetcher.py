@@ -7,9 +7,9 @@ Get recent historical candles from OANDA for strategy validation
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
-import requests
 
 from .oanda_client import get_oanda_client
+from .candle_store import get_candle_store
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -49,30 +49,12 @@ class HistoricalDataFetcher:
             List of candle dicts with OHLC data
         """
         try:
-            # Use OANDA client's internal method
-            url = f"{self.client.base_url}/v3/instruments/{instrument}/candles"
-            
-            params = {
-                'count': count,
-                'granularity': granularity,
-                'price': 'MBA'  # Mid, Bid, Ask
-            }
-            
-            headers = {
-                'Authorization': f'Bearer {self.client.api_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            response = requests.get(url, headers=headers, params=params, timeout=15)
-            
-            if response.status_code == 200:
-                data = response.json()
-                candles = data.get('candles', [])
-                logger.info(f"✅ Fetched {len(candles)} candles for {instrument}")
-                return candles
-            else:
-                logger.error(f"❌ Failed to fetch candles for {instrument}: {response.status_code}")
-                return []
+            # Served from the local candle store; only candles since the last call hit OANDA
+            candles = get_candle_store(self.client).get_recent_candles(
+                instrument, granularity, count, price='MBA'  # Mid, Bid, Ask
+            )
+            logger.info(f"✅ Fetched {len(candles)} candles for {instrument}")
+            return candles
                 
         except Exception as e:
             logger.error(f"❌ Error fetching candles for {instrument}: {e}")
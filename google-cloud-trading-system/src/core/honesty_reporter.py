@@ -5,6 +5,7 @@ No sugar-coating, no false confidence, just honest assessment
 """
 
 import logging
+import threading
 import os
 import json
 from datetime import datetime, timedelta
@@ -392,12 +393,15 @@ class HonestyReporter:
 
 # Global instances (one per strategy)
 _honesty_reporters: Dict[str, HonestyReporter] = {}
+_honesty_reporters_lock = threading.Lock()
 
 
 def get_honesty_reporter(strategy_name: str) -> HonestyReporter:
     """Get or create honesty reporter instance for a strategy"""
     global _honesty_reporters
     if strategy_name not in _honesty_reporters:
-        _honesty_reporters[strategy_name] = HonestyReporter(strategy_name)
+        with _honesty_reporters_lock:
+            if strategy_name not in _honesty_reporters:
+                _honesty_reporters[strategy_name] = HonestyReporter(strategy_name)
     return _honesty_reporters[strategy_name]
 
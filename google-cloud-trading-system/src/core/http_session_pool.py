@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Pooled HTTP Sessions for OANDA API
+Process-wide keep-alive sessions so every OandaClient reuses TCP/TLS connections
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import deque
+from typing import Dict, Any, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+class HttpSessionPool:
+    """
+    One pooled requests.Session per host, shared by every OandaClient in the process.
+
+    DynamicAccountManager creates one OandaClient per account; they all talk to the
+    same api-fx*.oanda.com host, so they share a single connection pool here instead
+    of opening a fresh TCP+TLS connection per request.
+    """
+
+    def __init__(self, pool_connections: int = None, pool_maxsize: int = None,
+                 keep_alive: bool = None, connect_retries: int = None,
+                 backoff_factor: float = None):
+        self.pool_connections = pool_connections or int(os.getenv('OANDA_HTTP_POOL_CONNECTIONS', '4'))
+        self.pool_maxsize = pool_maxsize or int(os.getenv('OANDA_HTTP_POOL_MAXSIZE', '20'))
+        self.keep_alive = keep_alive if keep_alive is not None else _env_bool('OANDA_HTTP_KEEPALIVE', True)
+        self.connect_retries = connect_retries if connect_retries is not None else int(os.getenv('OANDA_HTTP_CONNECT_RETRIES', '2'))
+        self.backoff_factor = backoff_factor if backoff_factor is not None else float(os.getenv('OANDA_HTTP_CONNECT_BACKOFF', '0.2'))
+
+        self.sessions: Dict[str, requests.Session] = {}
+        self.lock = threading.Lock()
+
+        # Request accounting (latencies in seconds)
+        self.request_count = 0
+        self.error_count = 0
+        self.latencies = deque(maxlen=int(os.getenv('OANDA_HTTP_LATENCY_SAMPLES', '1000')))
+
+        logger.info(f"✅ HttpSessionPool initialized (pool_maxsize={self.pool_maxsize}, keep_alive={self.keep_alive})")
+
+    def _build_session(self) -> requests.Session:
+        """Create a session with pooled adapters and connect-only retries"""
+        # Only retry connection establishment: read/status retries would replay
+        # non-idempotent order POSTs, and OandaClient already retries at app level.
+        retry = Retry(
+            total=self.connect_retries,
+            connect=self.connect_retries,
+            read=0,
+            status=0,
+            redirect=0,
+            backoff_factor=self.backoff_factor,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=retry,
+            pool_block=False
+        )
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        if not self.keep_alive:
+            session.headers['Connection'] = 'close'
+        return session
+
+    def get_session(self, url_or_host: str) -> requests.Session:
+        """Get (or lazily create) the pooled session for a host"""
+        host = urlparse(url_or_host).hostname if '://' in url_or_host else url_or_host
+        session = self.sessions.get(host)
+        if session is None:
+            with self.lock:
+                session = self.sessions.get(host)
+                if session is None:
+                    session = self._build_session()
+                    self.sessions[host] = session
+                    logger.debug(f"🔌 Created pooled session for {host}")
+        return session
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Issue a request through the pooled session for the URL's host"""
+        session = self.get_session(url)
+        start = time.perf_counter()
+        try:
+            return session.request(method.upper(), url, **kwargs)
+        except requests.exceptions.RequestException:
+            with self.lock:
+                self.error_count += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.request_count += 1
+                self.latencies.append(elapsed)
+
+    def _connection_counts(self) -> Dict[str, Dict[str, int]]:
+        """Read new-connection vs request counters from the urllib3 pools"""
+        counts: Dict[str, Dict[str, int]] = {}
+        for host, session in list(self.sessions.items()):
+            new_connections = 0
+            requests_sent = 0
+            for adapter in set(session.adapters.values()):
+                pool_manager = getattr(adapter, 'poolmanager', None)
+                if pool_manager is None:
+                    continue
+                for key in list(pool_manager.pools.keys()):
+                    pool = pool_manager.pools.get(key)
+                    if pool is None:
+                        continue
+                    new_connections += getattr(pool, 'num_connections', 0)
+                    requests_sent += getattr(pool, 'num_requests', 0)
+            counts[host] = {
+                'new_connections': new_connections,
+                'requests': requests_sent,
+                'reused_connections': max(0, requests_sent - new_connections)
+            }
+        return counts
+
+    @staticmethod
+    def _percentile(samples, pct: float) -> Optional[float]:
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Connection reuse and latency statistics"""
+        with self.lock:
+            latencies = list(self.latencies)
+            request_count = self.request_count
+            error_count = self.error_count
+
+        hosts = self._connection_counts()
+        new_total = sum(h['new_connections'] for h in hosts.values())
+        reused_total = sum(h['reused_connections'] for h in hosts.values())
+        total = new_total + reused_total
+
+        p50 = self._percentile(latencies, 50)
+        p95 = self._percentile(latencies, 95)
+        return {
+            'requests': request_count,
+            'errors': error_count,
+            'new_connections': new_total,
+            'reused_connections': reused_total,
+            'reuse_ratio': round(reused_total / total, 4) if total else 0.0,
+            'latency_p50_ms': round(p50 * 1000, 2) if p50 is not None else None,
+            'latency_p95_ms': round(p95 * 1000, 2) if p95 is not None else None,
+            'pool_maxsize': self.pool_maxsize,
+            'keep_alive': self.keep_alive,
+            'hosts': hosts
+        }
+
+    def close(self):
+        """Close all pooled sessions"""
+        with self.lock:
+            for session in self.sessions.values():
+                try:
+                    session.close()
+                except Exception:
+                    pass
+            self.sessions.clear()
+
+
+# Global instance
+_session_pool = None
+_session_pool_lock = threading.Lock()
+
+def get_http_session_pool() -> HttpSessionPool:
+    """Get the process-wide HTTP session pool"""
+    global _session_pool
+    if _session_pool is None:
+        with _session_pool_lock:
+            if _session_pool is None:
+                _session_pool = HttpSessionPool()
+    return _session_pool
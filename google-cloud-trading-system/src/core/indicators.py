@@ -0,0 +1,537 @@
+#!/usr/bin/env python3
+"""
+Incremental Indicator Engine
+Stateful O(1)-per-bar EMA, RSI, ATR, ADX and rolling mean/std with snapshot/restore
+"""
+
+import abc
+import math
+import logging
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Input series a single-input indicator can be fed from each bar
+SOURCES = ('close', 'change', 'abs_change', 'abs_return', 'range')
+
+SMOOTHING = ('sma', 'wilder')
+
+
+class _RunningSum:
+    """Compensated (Neumaier) running sum so long add/remove streams do not drift"""
+
+    __slots__ = ('total', 'compensation')
+
+    def __init__(self):
+        self.total = 0.0
+        self.compensation = 0.0
+
+    def add(self, value: float):
+        t = self.total + value
+        if abs(self.total) >= abs(value):
+            self.compensation += (self.total - t) + value
+        else:
+            self.compensation += (value - t) + self.total
+        self.total = t
+
+    @property
+    def value(self) -> float:
+        return self.total + self.compensation
+
+
+class _Window:
+    """Fixed-size window with a compensated running sum"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.values: deque = deque(maxlen=period)
+        self.sum = _RunningSum()
+
+    def push(self, value: float):
+        if len(self.values) == self.period:
+            self.sum.add(-self.values[0])
+        self.values.append(value)
+        self.sum.add(value)
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.period
+
+    @property
+    def mean(self) -> float:
+        return self.sum.value / len(self.values)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {'values': list(self.values)}
+
+    def restore(self, state: Dict[str, Any]):
+        self.values = deque(state['values'], maxlen=self.period)
+        self.sum = _RunningSum()
+        for value in self.values:
+            self.sum.add(value)
+
+
+class Indicator(abc.ABC):
+    """
+    Base class: update() consumes one bar and returns the current value.
+
+    value is None until the indicator has enough bars. Every indicator takes
+    update(close, high=None, low=None); close-only feeds leave high/low unset.
+    """
+
+    def __init__(self, period: int):
+        if period < 1:
+            raise ValueError("period must be >= 1")
+        self.period = int(period)
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.value: Optional[float] = None
+        self._prev_close: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.value is not None
+
+    @abc.abstractmethod
+    def update(self, close: float, high: Optional[float] = None, low: Optional[float] = None) -> Optional[float]:
+        """Consume one bar and return the current value"""
+
+    def _state(self) -> Dict[str, Any]:
+        return {}
+
+    def _load(self, state: Dict[str, Any]):
+        pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-serialisable state; restore() resumes exactly where this left off"""
+        state = {'type': type(self).__name__, 'period': self.period, 'count': self.count,
+                 'value': self.value, 'prev_close': self._prev_close}
+        state.update(self._state())
+        return state
+
+    def restore(self, state: Dict[str, Any]) -> 'Indicator':
+        if state.get('type') != type(self).__name__ or state.get('period') != self.period:
+            raise ValueError(f"Snapshot of {state.get('type')}({state.get('period')}) "
+                             f"does not match {type(self).__name__}({self.period})")
+        self.count = state['count']
+        self.value = state['value']
+        self._prev_close = state['prev_close']
+        self._load(state)
+        return self
+
+
+class _SourceIndicator(Indicator):
+    """Single-input indicator fed from a derived per-bar series (see SOURCES)"""
+
+    def __init__(self, period: int, source: str = 'close'):
+        if source not in SOURCES:
+            raise ValueError(f"Unknown source '{source}', expected one of {SOURCES}")
+        self.source = source
+        super().__init__(period)
+
+    def _source_value(self, close: float, high: Optional[float], low: Optional[float]) -> Optional[float]:
+        prev = self._prev_close
+        self._prev_close = close
+        if self.source == 'close':
+            return close
+        if self.source == 'range':
+            return (close if high is None else high) - (close if low is None else low)
+        if prev is None:
+            return None
+        if self.source == 'change':
+            return close - prev
+        if self.source == 'abs_change':
+            return abs(close - prev)
+        return abs(close - prev) / prev if prev else None
+
+    def update(self, close: float, high: Optional[float] = None, low: Optional[float] = None) -> Optional[float]:
+        self.count += 1
+        x = self._source_value(close, high, low)
+        if x is not None:
+            self._push(x)
+        return self.value
+
+    @abc.abstractmethod
+    def _push(self, x: float):
+        """Consume one input of the source series"""
+
+
+class RollingMean(_SourceIndicator):
+    """Simple moving average over the last period inputs (pandas rolling(period).mean())"""
+
+    def reset(self):
+        super().reset()
+        self._window = _Window(self.period)
+
+    def _push(self, x: float):
+        self._window.push(x)
+        if self._window.full:
+            self.value = self._window.mean
+
+    def _state(self):
+        return {'window': self._window.snapshot()}
+
+    def _load(self, state):
+        self._window.restore(state['window'])
+
+
+class RollingStd(_SourceIndicator):
+    """Rolling standard deviation (pandas rolling(period).std(ddof)) via add/remove Welford updates"""
+
+    def __init__(self, period: int, source: str = 'close', ddof: int = 1):
+        self.ddof = ddof
+        super().__init__(period, source)
+
+    def reset(self):
+        super().reset()
+        self._values: deque = deque()
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._same_run = 0  # Trailing inputs equal to the last one
+
+    def _push(self, x: float):
+        if len(self._values) == self.period:
+            old = self._values.popleft()
+            n = len(self._values)
+            if n:
+                old_mean = self._mean
+                self._mean = (old_mean * (n + 1) - old) / n
+                self._m2 -= (old - old_mean) * (old - self._mean)
+            else:
+                self._mean, self._m2 = 0.0, 0.0
+        self._same_run = self._same_run + 1 if self._values and x == self._values[-1] else 1
+        self._values.append(x)
+        n = len(self._values)
+        delta = x - self._mean
+        self._mean += delta / n
+        self._m2 += delta * (x - self._mean)
+        if n == self.period and n > self.ddof:
+            # A window of identical inputs is exactly 0, as in pandas, not a removal residual
+            self.value = 0.0 if self._same_run >= n else math.sqrt(max(self._m2, 0.0) / (n - self.ddof))
+
+    def _state(self):
+        return {'values': list(self._values)}
+
+    def _load(self, state):
+        self._values = deque()
+        self._mean, self._m2 = 0.0, 0.0
+        values = state['values']
+        self._same_run = 0
+        # Rebuild the moments from the stored window
+        for x in values:
+            self._same_run = self._same_run + 1 if self._values and x == self._values[-1] else 1
+            self._values.append(x)
+            n = len(self._values)
+            delta = x - self._mean
+            self._mean += delta / n
+            self._m2 += delta * (x - self._mean)
+
+
+class EMA(_SourceIndicator):
+    """Exponential moving average, pandas ewm(span=period, adjust=False): seeded with the first input"""
+
+    def reset(self):
+        super().reset()
+        self.alpha = 2.0 / (self.period + 1.0)
+
+    def _push(self, x: float):
+        self.value = x if self.value is None else self.value + self.alpha * (x - self.value)
+
+
+class RSI(Indicator):
+    """
+    Relative Strength Index on closes.
+
+    smoothing='sma' averages gains/losses over a rolling window (the form the
+    strategies use); 'wilder' seeds with that average and then smooths with
+    alpha=1/period. 100 when there are no losses; None when price is flat.
+    """
+
+    def __init__(self, period: int = 14, smoothing: str = 'wilder'):
+        if smoothing not in SMOOTHING:
+            raise ValueError(f"Unknown smoothing '{smoothing}'")
+        self.smoothing = smoothing
+        super().__init__(period)
+
+    def reset(self):
+        super().reset()
+        self._gains = _Window(self.period)
+        self._losses = _Window(self.period)
+        self._avg_gain: Optional[float] = None
+        self._avg_loss: Optional[float] = None
+
+    def update(self, close: float, high: Optional[float] = None, low: Optional[float] = None) -> Optional[float]:
+        self.count += 1
+        prev, self._prev_close = self._prev_close, close
+        if prev is None:
+            return self.value
+        change = close - prev
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+
+        if self.smoothing == 'wilder' and self._avg_gain is not None:
+            self._avg_gain += (gain - self._avg_gain) / self.period
+            self._avg_loss += (loss - self._avg_loss) / self.period
+        else:
+            self._gains.push(gain)
+            self._losses.push(loss)
+            if not self._gains.full:
+                return self.value
+            self._avg_gain, self._avg_loss = self._gains.mean, self._losses.mean
+
+        if self._avg_loss == 0:
+            self.value = 100.0 if self._avg_gain > 0 else None
+        else:
+            self.value = 100.0 - 100.0 / (1.0 + self._avg_gain / self._avg_loss)
+        return self.value
+
+    def _state(self):
+        return {'gains': self._gains.snapshot(), 'losses': self._losses.snapshot(),
+                'avg_gain': self._avg_gain, 'avg_loss': self._avg_loss}
+
+    def _load(self, state):
+        self._gains.restore(state['gains'])
+        self._losses.restore(state['losses'])
+        self._avg_gain, self._avg_loss = state['avg_gain'], state['avg_loss']
+
+
+def _true_range(close: float, high: Optional[float], low: Optional[float], prev_close: float) -> float:
+    high = close if high is None else high
+    low = close if low is None else low
+    return max(high - low, abs(high - prev_close), abs(low - prev_close))
+
+
+class ATR(Indicator):
+    """
+    Average True Range.
+
+    With close-only input the true range reduces to |close - prev close|.
+    smoothing='sma' is a rolling mean of TR; 'wilder' seeds with that mean and
+    then applies atr += (tr - atr) / period.
+    """
+
+    def __init__(self, period: int = 14, smoothing: str = 'wilder'):
+        if smoothing not in SMOOTHING:
+            raise ValueError(f"Unknown smoothing '{smoothing}'")
+        self.smoothing = smoothing
+        super().__init__(period)
+
+    def reset(self):
+        super().reset()
+        self._window = _Window(self.period)
+
+    def update(self, close: float, high: Optional[float] = None, low: Optional[float] = None) -> Optional[float]:
+        self.count += 1
+        prev, self._prev_close = self._prev_close, close
+        if prev is None:
+            return self.value
+        tr = _true_range(close, high, low, prev)
+        if self.smoothing == 'wilder' and self.value is not None:
+            self.value += (tr - self.value) / self.period
+        else:
+            self._window.push(tr)
+            if self._window.full:
+                self.value = self._window.mean
+        return self.value
+
+    def _state(self):
+        return {'window': self._window.snapshot()}
+
+    def _load(self, state):
+        self._window.restore(state['window'])
+
+
+class ADX(Indicator):
+    """
+    Average Directional Index with +DI/-DI.
+
+    smoothing='sma' matches the strategies' pandas version (rolling means of
+    TR/DM and of DX; any undefined DX in the window leaves ADX undefined).
+    'wilder' is the classic Wilder smoothing with a mean-of-DX seed.
+    """
+
+    def __init__(self, period: int = 14, smoothing: str = 'wilder'):
+        if smoothing not in SMOOTHING:
+            raise ValueError(f"Unknown smoothing '{smoothing}'")
+        self.smoothing = smoothing
+        super().__init__(period)
+
+    def reset(self):
+        super().reset()
+        self._prev_high: Optional[float] = None
+        self._prev_low: Optional[float] = None
+        self._tr = _Window(self.period)
+        self._dm_plus = _Window(self.period)
+        self._dm_minus = _Window(self.period)
+        self._smooth: Optional[List[float]] = None  # Wilder [tr, dm+, dm-]
+        self._dx = _Window(self.period)
+        self._dx_undefined: deque = deque(maxlen=self.period)
+        self.plus_di: Optional[float] = None
+        self.minus_di: Optional[float] = None
+
+    def update(self, close: float, high: Optional[float] = None, low: Optional[float] = None) -> Optional[float]:
+        self.count += 1
+        high = close if high is None else high
+        low = close if low is None else low
+        prev_close, prev_high, prev_low = self._prev_close, self._prev_high, self._prev_low
+        self._prev_close, self._prev_high, self._prev_low = close, high, low
+        if prev_close is None:
+            return self.value
+
+        tr = _true_range(close, high, low, prev_close)
+        up, down = high - prev_high, prev_low - low
+        dm_plus = up if up > down and up > 0 else 0.0
+        dm_minus = down if down > up and down > 0 else 0.0
+
+        if self.smoothing == 'wilder' and self._smooth is not None:
+            p = self.period
+            self._smooth = [s + (x - s) / p for s, x in zip(self._smooth, (tr, dm_plus, dm_minus))]
+        else:
+            self._tr.push(tr)
+            self._dm_plus.push(dm_plus)
+            self._dm_minus.push(dm_minus)
+            if not self._tr.full:
+                return self.value
+            self._smooth = [self._tr.mean, self._dm_plus.mean, self._dm_minus.mean]
+
+        tr_s, plus_s, minus_s = self._smooth
+        dx = None
+        if tr_s > 0:
+            self.plus_di = 100.0 * plus_s / tr_s
+            self.minus_di = 100.0 * minus_s / tr_s
+            di_sum = self.plus_di + self.minus_di
+            if di_sum > 0:
+                dx = 100.0 * abs(self.plus_di - self.minus_di) / di_sum
+        else:
+            self.plus_di = self.minus_di = None
+
+        if self.smoothing == 'wilder':
+            dx = 0.0 if dx is None else dx
+            if self.value is not None:
+                self.value += (dx - self.value) / self.period
+            else:
+                self._dx.push(dx)
+                if self._dx.full:
+                    self.value = self._dx.mean
+        else:
+            self._dx.push(0.0 if dx is None else dx)
+            self._dx_undefined.append(dx is None)
+            self.value = self._dx.mean if self._dx.full and not any(self._dx_undefined) else None
+        return self.value
+
+    def _state(self):
+        return {'prev_high': self._prev_high, 'prev_low': self._prev_low,
+                'tr': self._tr.snapshot(), 'dm_plus': self._dm_plus.snapshot(),
+                'dm_minus': self._dm_minus.snapshot(), 'smooth': self._smooth,
+                'dx': self._dx.snapshot(), 'dx_undefined': list(self._dx_undefined),
+                'plus_di': self.plus_di, 'minus_di': self.minus_di}
+
+    def _load(self, state):
+        self._prev_high, self._prev_low = state['prev_high'], state['prev_low']
+        self._tr.restore(state['tr'])
+        self._dm_plus.restore(state['dm_plus'])
+        self._dm_minus.restore(state['dm_minus'])
+        self._smooth = state['smooth']
+        self._dx.restore(state['dx'])
+        self._dx_undefined = deque(state['dx_undefined'], maxlen=self.period)
+        self.plus_di, self.minus_di = state['plus_di'], state['minus_di']
+
+
+def _bar_fields(item: Any):
+    """(close, high, low) from a float or a candle dict"""
+    if isinstance(item, dict):
+        close = float(item['close'])
+        return close, float(item.get('high', close)), float(item.get('low', close))
+    return float(item), None, None
+
+
+class IndicatorSet:
+    """
+    Named indicators fed from one bar stream (one instrument).
+
+    Call update() as each bar is appended, or sync() with the strategy's own
+    history list before reading: sync() feeds only the bars appended since the
+    last call, and replays the whole list if the history was replaced by
+    something it cannot line up with (e.g. a prefill or a reset in backtests).
+    Bars may be floats (closes) or candle dicts with close/high/low.
+
+    sync() lines up on the bar objects it was fed before falling back to bar
+    values, so a flat close appended after a run of identical closes (equal
+    value, new object) is still seen as a new bar.
+    """
+
+    TAIL = 4  # bars remembered to line the stream up with a history list
+    MAX_GAP = 16  # new bars searched for before falling back to a replay
+
+    def __init__(self, **indicators: Indicator):
+        self.indicators: Dict[str, Indicator] = indicators
+        self.count = 0
+        self._tail: deque = deque(maxlen=self.TAIL)
+        self.replays = 0
+
+    def __getitem__(self, name: str) -> Indicator:
+        return self.indicators[name]
+
+    def value(self, name: str) -> Optional[float]:
+        return self.indicators[name].value
+
+    def reset(self):
+        for indicator in self.indicators.values():
+            indicator.reset()
+        self.count = 0
+        self._tail.clear()
+
+    def update(self, bar: Any) -> 'IndicatorSet':
+        close, high, low = _bar_fields(bar)
+        for indicator in self.indicators.values():
+            indicator.update(close, high, low)
+        self.count += 1
+        self._tail.append(bar)
+        return self
+
+    def _aligned(self, history: Sequence[Any], new: int, identical: bool) -> bool:
+        m = min(len(self._tail), len(history) - new)
+        # A stream that has seen fewer bars than the history holds is missing some
+        if m <= 0 or self.count < len(history) - new:
+            return False
+        end = len(history) - new
+        pairs = zip(list(self._tail)[-m:], history[end - m:end])
+        if identical:
+            return all(a is b for a, b in pairs)
+        return all(a is b or a == b for a, b in pairs)
+
+    def sync(self, history: Sequence[Any]) -> 'IndicatorSet':
+        """Bring the indicators up to date with a history list maintained elsewhere"""
+        if not history:
+            if self.count:
+                self.reset()
+            return self
+        if self.count:
+            # Equal values alone are ambiguous in a flat run; the same objects are not
+            for identical in (True, False):
+                for new in range(0, min(self.MAX_GAP, len(history)) + 1):
+                    if self._aligned(history, new, identical):
+                        for bar in history[len(history) - new:]:
+                            self.update(bar)
+                        return self
+        self.reset()
+        self.replays += 1
+        for bar in history:
+            self.update(bar)
+        return self
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'tail': list(self._tail),
+            'indicators': {name: indicator.snapshot() for name, indicator in self.indicators.items()}
+        }
+
+    def restore(self, state: Dict[str, Any]) -> 'IndicatorSet':
+        for name, indicator in self.indicators.items():
+            indicator.restore(state['indicators'][name])
+        self.count = state['count']
+        self._tail = deque(state['tail'], maxlen=self.TAIL)
+        return self
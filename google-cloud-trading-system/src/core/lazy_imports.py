@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Lazy Imports & Import-Time Report
+Defer heavy optional subsystems until first use and measure what startup actually spends on imports
+"""
+
+import os
+import sys
+import time
+import logging
+import threading
+import importlib
+import importlib.util
+import importlib.machinery
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_lazy_loads: Dict[str, Dict[str, Any]] = {}
+_lazy_lock = threading.Lock()
+_available: Dict[str, bool] = {}
+
+
+def module_available(name: str, package: str = None) -> bool:
+    """True if the module can be found, without executing it (parent packages are imported)"""
+    try:
+        absolute = importlib.util.resolve_name(name, package) if name.startswith('.') else name
+    except (ImportError, ValueError):
+        return False
+    if absolute not in _available:
+        try:
+            _available[absolute] = absolute in sys.modules or importlib.util.find_spec(absolute) is not None
+        except (ImportError, ValueError):
+            _available[absolute] = False
+    return _available[absolute]
+
+
+class LazyAttribute:
+    """
+    Stand-in for `from module import attr` that imports on first use.
+
+    Attribute access and calls are forwarded to the real object, so a
+    lazily imported getter or module-level singleton is used exactly like
+    the eager import it replaces. An import failure raises ImportError at
+    the point of use (callers already guard optional subsystems with
+    try/except). Use resolve() to get the underlying object.
+    """
+
+    __slots__ = ('_module', '_attr', '_target', '_lock')
+
+    def __init__(self, module: str, attr: Optional[str] = None):
+        object.__setattr__(self, '_module', module)
+        object.__setattr__(self, '_attr', attr)
+        object.__setattr__(self, '_target', None)
+        object.__setattr__(self, '_lock', threading.Lock())
+
+    def _resolve(self) -> Any:
+        target = self._target
+        if target is not None:
+            return target
+        with self._lock:
+            if self._target is None:
+                started = time.perf_counter()
+                module = importlib.import_module(self._module)
+                target = getattr(module, self._attr) if self._attr else module
+                elapsed = time.perf_counter() - started
+                object.__setattr__(self, '_target', target)
+                _record_lazy_load(self._module, elapsed)
+            return self._target
+
+    def __getattr__(self, item: str) -> Any:
+        return getattr(self._resolve(), item)
+
+    def __setattr__(self, item: str, value: Any):
+        setattr(self._resolve(), item, value)
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return self._resolve()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self._target is not None else 'not loaded'
+        return f"<lazy {self._module}{'.' + self._attr if self._attr else ''} ({state})>"
+
+
+def lazy_import(name: str, package: str = None, attr: str = None) -> LazyAttribute:
+    """Lazy equivalent of `import name` / `from name import attr` (relative names need package)"""
+    absolute = importlib.util.resolve_name(name, package) if name.startswith('.') else name
+    return LazyAttribute(absolute, attr)
+
+
+def resolve(obj: Any) -> Any:
+    """The real object behind a lazy import (imports it now); other objects are returned unchanged"""
+    return obj._resolve() if isinstance(obj, LazyAttribute) else obj
+
+
+def _record_lazy_load(module: str, seconds: float):
+    with _lazy_lock:
+        entry = _lazy_loads.setdefault(module, {'loads': 0, 'ms': 0.0, 'thread': threading.current_thread().name})
+        entry['loads'] += 1
+        entry['ms'] += seconds * 1000
+    try:
+        from .perf_profiler import get_profiler
+        get_profiler().record('import.lazy', seconds)
+    except Exception:
+        pass
+    logger.debug(f"📦 Lazy import {module}: {seconds * 1000:.1f}ms")
+
+
+def lazy_load_times() -> Dict[str, Dict[str, Any]]:
+    """Modules imported on first use so far, with the time each import took"""
+    with _lazy_lock:
+        return {name: {**entry, 'ms': round(entry['ms'], 1)} for name, entry in _lazy_loads.items()}
+
+
+_FILE_LOADERS = (importlib.machinery.SourceFileLoader, importlib.machinery.SourcelessFileLoader,
+                 importlib.machinery.ExtensionFileLoader)
+
+
+class ImportTimer:
+    """
+    Meta-path hook recording per-module import times, like `python -X importtime`.
+
+    Wraps exec_module on each file-backed loader, so self time excludes
+    nested imports and cumulative includes them. Builtin and frozen
+    modules are not timed. Install it as early as possible (before the
+    imports you want to measure); it costs a few microseconds per import.
+    """
+
+    def __init__(self):
+        self.records: List[tuple] = []  # (module, self_us, cumulative_us, depth, thread)
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self:
+                continue
+            find_spec = getattr(finder, 'find_spec', None)
+            if find_spec is None:
+                continue
+            spec = find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        loader = spec.loader
+        if isinstance(loader, _FILE_LOADERS) and 'exec_module' not in vars(loader):
+            loader.exec_module = self._timed(fullname, loader.exec_module)
+        return spec
+
+    def _timed(self, fullname: str, exec_module):
+        def exec_module_timed(module):
+            stack = self.local.__dict__.setdefault('stack', [])
+            frame = [time.perf_counter_ns(), 0]
+            stack.append(frame)
+            try:
+                exec_module(module)
+            finally:
+                stack.pop()
+                cumulative = time.perf_counter_ns() - frame[0]
+                if stack:
+                    stack[-1][1] += cumulative
+                with self.lock:
+                    self.records.append((fullname, (cumulative - frame[1]) // 1000, cumulative // 1000,
+                                         len(stack), threading.current_thread().name))
+        return exec_module_timed
+
+    def report(self, limit: int = 25) -> Dict[str, Any]:
+        """Slowest imports by cumulative time, plus the total spent in top-level imports"""
+        with self.lock:
+            records = list(self.records)
+        slowest = sorted(records, key=lambda r: r[2], reverse=True)[:limit]
+        return {
+            'modules': len(records),
+            'total_ms': round(sum(r[2] for r in records if r[3] == 0) / 1000, 1),
+            'self_ms': round(sum(r[1] for r in records) / 1000, 1),
+            'slowest': [{'module': r[0], 'self_ms': round(r[1] / 1000, 1), 'cumulative_ms': round(r[2] / 1000, 1),
+                         'thread': r[4]} for r in slowest],
+            'lazy': lazy_load_times(),
+        }
+
+    def format_report(self, limit: int = 25) -> str:
+        """The slowest imports in `-X importtime` layout"""
+        with self.lock:
+            records = list(self.records)
+        lines = ["import time: self [us] | cumulative | imported package"]
+        for name, self_us, cumulative_us, depth, _ in sorted(records, key=lambda r: r[2], reverse=True)[:limit]:
+            lines.append(f"import time: {self_us:>9} | {cumulative_us:>10} | {'  ' * depth}{name}")
+        return "\n".join(lines)
+
+
+_import_timer: Optional[ImportTimer] = None
+
+
+def install_import_timer(force: bool = False) -> Optional[ImportTimer]:
+    """Install the import timer when IMPORT_TIME_REPORT=true (or force); idempotent"""
+    global _import_timer
+    if _import_timer is None and (force or os.getenv('IMPORT_TIME_REPORT', 'false').lower() == 'true'):
+        _import_timer = ImportTimer()
+        sys.meta_path.insert(0, _import_timer)
+        logger.info("⏱️ Import timing enabled")
+    return _import_timer
+
+
+def get_import_timer() -> Optional[ImportTimer]:
+    return _import_timer
+
+
+def import_time_report(limit: int = 25) -> Dict[str, Any]:
+    """Import-time report for /api/perf (lazy loads only unless the timer is installed)"""
+    if _import_timer is None:
+        return {'enabled': False, 'lazy': lazy_load_times()}
+    return {'enabled': True, **_import_timer.report(limit)}
+
+
+def log_import_report(limit: int = 15):
+    """Log the slowest startup imports once startup finishes"""
+    if _import_timer is None:
+        return
+    report = _import_timer.report(limit)
+    logger.info(f"⏱️ Startup imports: {report['modules']} modules, {report['total_ms']:.0f}ms\n"
+                f"{_import_timer.format_report(limit)}")
@@ -5,6 +5,7 @@ Tracks losing conditions and adjusts risk (NEVER relaxes entry thresholds)
 """
 
 import logging
+import threading
 import json
 import os
 from datetime import datetime, timedelta
@@ -339,12 +340,15 @@ class LossLearner:
 
 # Global instances (one per strategy)
 _loss_learners: Dict[str, LossLearner] = {}
+_loss_learners_lock = threading.Lock()
 
 
 def get_loss_learner(strategy_name: str) -> LossLearner:
     """Get or create loss learner instance for a strategy"""
     global _loss_learners
     if strategy_name not in _loss_learners:
-        _loss_learners[strategy_name] = LossLearner(strategy_name)
+        with _loss_learners_lock:
+            if strategy_name not in _loss_learners:
+                _loss_learners[strategy_name] = LossLearner(strategy_name)
     return _loss_learners[strategy_name]
 
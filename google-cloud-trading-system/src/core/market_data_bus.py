@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+In-Process Market Data Bus
+One upstream feed fans ticks and bars out to strategies, accounts and the dashboard
+"""
+
+import os
+import logging
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Queue policies when a subscriber falls behind
+COALESCE = 'coalesce'        # Keep only the newest pending event per (kind, instrument[, granularity])
+DROP_OLDEST = 'drop_oldest'  # Bounded FIFO; the oldest pending event is discarded
+DROP_NEWEST = 'drop_newest'  # Bounded FIFO; new events are refused while full
+POLICIES = (COALESCE, DROP_OLDEST, DROP_NEWEST)
+
+TICK = 'tick'
+BAR = 'bar'
+
+
+@dataclass(frozen=True)
+class BusEvent:
+    """One published update: kind is 'tick' (data = MarketData) or 'bar' (data = Bar)"""
+    kind: str
+    instrument: str
+    data: Any
+    seq: int
+
+
+def _coalesce_key(event: BusEvent) -> Tuple:
+    """Events that supersede each other: ticks per instrument, bars per instrument and granularity"""
+    if event.kind == BAR:
+        return event.kind, event.instrument, getattr(event.data, 'granularity', None)
+    return event.kind, event.instrument
+
+
+class Subscription:
+    """
+    A consumer's bounded inbox on the bus.
+
+    Publishing never blocks on a slow consumer: when the inbox is full the
+    policy decides what is lost, and the counts are kept in stats. With a
+    callback, a dedicated worker thread drains the inbox and calls
+    callback(event); otherwise the owner pulls with get()/drain().
+    """
+
+    def __init__(self, bus: 'MarketDataBus', name: str, instruments: Optional[Iterable[str]],
+                 kinds: Tuple[str, ...], maxsize: int, policy: str,
+                 callback: Optional[Callable[[BusEvent], None]] = None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy {policy!r} (expected one of {POLICIES})")
+        self.bus = bus
+        self.name = name
+        self.instruments = frozenset(instruments) if instruments is not None else None
+        self.kinds = frozenset(kinds)
+        self.maxsize = max(1, int(maxsize))
+        self.policy = policy
+        self.callback = callback
+
+        self._pending = OrderedDict() if policy == COALESCE else deque()
+        self._ready = threading.Condition(threading.Lock())
+        self.closed = False
+        self.stats = {'delivered': 0, 'dropped': 0, 'coalesced': 0}
+
+        self.worker: Optional[threading.Thread] = None
+        if callback is not None:
+            self.worker = threading.Thread(target=self._run_callback, name=f"bus-{name}", daemon=True)
+            self.worker.start()
+
+    def wants(self, event: BusEvent) -> bool:
+        return event.kind in self.kinds and (self.instruments is None or event.instrument in self.instruments)
+
+    def offer(self, event: BusEvent):
+        """Called by the publisher; never blocks beyond the inbox lock"""
+        with self._ready:
+            if self.closed:
+                return
+            pending = self._pending
+            if self.policy == COALESCE:
+                key = _coalesce_key(event)
+                if key in pending:
+                    pending[key] = event
+                    self.stats['coalesced'] += 1
+                else:
+                    if len(pending) >= self.maxsize:
+                        pending.popitem(last=False)
+                        self.stats['dropped'] += 1
+                    pending[key] = event
+            elif len(pending) >= self.maxsize:
+                self.stats['dropped'] += 1
+                if self.policy == DROP_NEWEST:
+                    return
+                pending.popleft()
+                pending.append(event)
+            else:
+                pending.append(event)
+            self._ready.notify()
+
+    def _pop(self) -> BusEvent:
+        if self.policy == COALESCE:
+            return self._pending.popitem(last=False)[1]
+        return self._pending.popleft()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[BusEvent]:
+        """Next event, waiting up to timeout seconds; None on timeout or close"""
+        with self._ready:
+            if not self._pending and not self.closed:
+                self._ready.wait(timeout)
+            if not self._pending:
+                return None
+            self.stats['delivered'] += 1
+            return self._pop()
+
+    def drain(self, max_items: Optional[int] = None) -> List[BusEvent]:
+        """Everything pending right now (without waiting)"""
+        with self._ready:
+            count = len(self._pending) if max_items is None else min(max_items, len(self._pending))
+            events = [self._pop() for _ in range(count)]
+            self.stats['delivered'] += len(events)
+            return events
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def _run_callback(self):
+        while not self.closed:
+            event = self.get(timeout=1.0)
+            if event is None:
+                continue
+            try:
+                self.callback(event)
+            except Exception as e:
+                logger.error(f"❌ Bus subscriber {self.name} error: {e}")
+
+    def close(self):
+        with self._ready:
+            self.closed = True
+            self._pending.clear()
+            self._ready.notify_all()
+        if self.worker is not None and self.worker is not threading.current_thread():
+            self.worker.join(timeout=2)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats.update({'name': self.name, 'policy': self.policy, 'depth': len(self._pending),
+                      'maxsize': self.maxsize})
+        return stats
+
+
+class MarketDataBus:
+    """
+    Fan-out point for live market data.
+
+    The upstream feed publishes each tick or bar once; the bus keeps the
+    latest value per instrument and pushes the event into every matching
+    subscriber's inbox. Latest-value snapshots are copy-on-write: publishing
+    swaps in a new read-only mapping, so snapshot() and latest() are plain
+    attribute reads with no lock, and a snapshot never changes under the
+    reader.
+    """
+
+    def __init__(self, default_maxsize: int = None):
+        self.default_maxsize = default_maxsize or int(os.getenv('MARKET_BUS_QUEUE_SIZE', '256'))
+        self._publish_lock = threading.Lock()
+        self._subscribers: Tuple[Subscription, ...] = ()
+        self._latest: Mapping[str, Any] = MappingProxyType({})
+        self._latest_bars: Mapping[Tuple[str, str], Any] = MappingProxyType({})
+        self._seq = 0
+        self.published = {TICK: 0, BAR: 0}
+
+    def subscribe(self, name: str, instruments: Optional[Iterable[str]] = None,
+                  kinds: Iterable[str] = (TICK,), maxsize: int = None, policy: str = COALESCE,
+                  callback: Optional[Callable[[BusEvent], None]] = None) -> Subscription:
+        """Register a consumer; instruments=None means all instruments"""
+        subscription = Subscription(self, name, instruments, tuple(kinds), maxsize or self.default_maxsize,
+                                    policy, callback)
+        with self._publish_lock:
+            self._subscribers = self._subscribers + (subscription,)
+        logger.info(f"✅ Market data bus subscriber: {name} ({policy}, {', '.join(sorted(subscription.kinds))})")
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._publish_lock:
+            self._subscribers = tuple(s for s in self._subscribers if s is not subscription)
+        subscription.close()
+
+    def _fan_out(self, events: List[BusEvent]):
+        for subscription in self._subscribers:
+            for event in events:
+                if subscription.wants(event):
+                    subscription.offer(event)
+
+    def publish_ticks(self, market_data: Dict[str, Any]):
+        """Publish a batch of latest prices (instrument -> MarketData) with one snapshot swap"""
+        if not market_data:
+            return
+        with self._publish_lock:
+            latest = dict(self._latest)
+            events = []
+            for instrument, data in market_data.items():
+                self._seq += 1
+                latest[instrument] = data
+                events.append(BusEvent(TICK, instrument, data, self._seq))
+            self._latest = MappingProxyType(latest)
+            self.published[TICK] += len(events)
+            self._fan_out(events)
+
+    def publish_tick(self, instrument: str, market_data: Any):
+        self.publish_ticks({instrument: market_data})
+
+    def publish_bar(self, bar: Any):
+        """Publish a closed bar (anything with instrument and granularity attributes)"""
+        with self._publish_lock:
+            self._seq += 1
+            bars = dict(self._latest_bars)
+            bars[(bar.instrument, bar.granularity)] = bar
+            self._latest_bars = MappingProxyType(bars)
+            self.published[BAR] += 1
+            self._fan_out([BusEvent(BAR, bar.instrument, bar, self._seq)])
+
+    def snapshot(self, instruments: Optional[Iterable[str]] = None) -> Mapping[str, Any]:
+        """Latest MarketData per instrument (read-only, consistent, lock-free)"""
+        latest = self._latest
+        if instruments is None:
+            return latest
+        return {inst: latest[inst] for inst in instruments if inst in latest}
+
+    def latest(self, instrument: str) -> Optional[Any]:
+        return self._latest.get(instrument)
+
+    def latest_bar(self, instrument: str, granularity: str) -> Optional[Any]:
+        return self._latest_bars.get((instrument, granularity))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'instruments': len(self._latest),
+            'published': dict(self.published),
+            'subscribers': [s.get_stats() for s in self._subscribers],
+        }
+
+
+# Global instance
+_market_data_bus = None
+_bus_lock = threading.Lock()
+
+
+def get_market_data_bus() -> MarketDataBus:
+    """Get the process-wide market data bus"""
+    global _market_data_bus
+    if _market_data_bus is None:
+        with _bus_lock:
+            if _market_data_bus is None:
+                _market_data_bus = MarketDataBus()
+    return _market_data_bus
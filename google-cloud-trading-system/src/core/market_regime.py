@@ -6,6 +6,7 @@ and adapts trading criteria accordingly
 """
 
 import logging
+import threading
 import numpy as np
 from typing import Dict, List, Optional, Tuple
 from collections import defaultdict
@@ -323,12 +324,15 @@ class MarketRegimeDetector:
 
 # Global instance
 _market_regime_detector = None
+_market_regime_detector_lock = threading.Lock()
 
 def get_market_regime_detector() -> MarketRegimeDetector:
     """Get the global market regime detector instance"""
     global _market_regime_detector
     if _market_regime_detector is None:
-        _market_regime_detector = MarketRegimeDetector()
+        with _market_regime_detector_lock:
+            if _market_regime_detector is None:
+                _market_regime_detector = MarketRegimeDetector()
     return _market_regime_detector
 
 
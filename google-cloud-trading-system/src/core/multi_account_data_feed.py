@@ -7,13 +7,12 @@ FIXED: Added missing get_latest_data method
 
 import os
 import logging
-import threading
-import queue
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 
-from .data_feed import LiveDataFeed, MarketData
+from .data_feed import LiveDataFeed, MarketData, DEFAULT_INSTRUMENTS
+from .market_data_bus import MarketDataBus, get_market_data_bus
 from .dynamic_account_manager import get_account_manager
 
 # Setup logging
@@ -23,25 +22,26 @@ logger = logging.getLogger(__name__)
 class MultiAccountDataFeed:
     """Production multi-account market data feed system - FIXED"""
     
-    def __init__(self):
+    def __init__(self, bus: Optional[MarketDataBus] = None):
         """Initialize multi-account data feed"""
         self.account_manager = get_account_manager()
+        self.bus = bus or get_market_data_bus()
+        # Accounts share one upstream feed; each account sees its own instruments on the bus
+        self.upstream: Optional[LiveDataFeed] = None
         self.data_feeds: Dict[str, LiveDataFeed] = {}
-        self.market_data: Dict[str, Dict[str, MarketData]] = {}
+        self.account_instruments: Dict[str, List[str]] = {}
         
         # Streaming control
         self.streaming = False
-        self.stream_threads: Dict[str, threading.Thread] = {}
-        self.data_queues: Dict[str, queue.Queue] = {}
         
         # Initialize data feeds for each account
         self._initialize_data_feeds()
         
         logger.info("✅ Multi-account data feed initialized")
-        logger.info(f"📊 Active feeds: {len(self.data_feeds)}")
+        logger.info(f"📊 Active feeds: {len(self.data_feeds)} accounts on 1 upstream feed")
     
     def _initialize_data_feeds(self):
-        """Initialize data feeds for each active account"""
+        """Register each active account on one shared upstream data feed"""
         for account_id in self.account_manager.get_active_accounts():
             try:
                 # Get account configuration
@@ -49,19 +49,9 @@ class MultiAccountDataFeed:
                 if not config:
                     continue
                 
-                # Create data feed for this account
-                data_feed = LiveDataFeed(account_id)
-                
-                # Get instruments for this account
+                # Same instruments a per-account LiveDataFeed used to watch
                 instruments = config.instruments
-                if instruments:
-                    data_feed.add_instruments(instruments)
-                
-                self.data_feeds[account_id] = data_feed
-                self.market_data[account_id] = {}
-                
-                # Create data queue for streaming
-                self.data_queues[account_id] = queue.Queue()
+                self.account_instruments[account_id] = list(dict.fromkeys(DEFAULT_INSTRUMENTS + list(instruments or [])))
                 
                 # Get account name for logging
                 account_name = config.account_name
@@ -70,6 +60,24 @@ class MultiAccountDataFeed:
                 
             except Exception as e:
                 logger.error(f"❌ Failed to initialize data feed for {account_id}: {e}")
+        
+        if not self.account_instruments:
+            return
+        
+        # One REST poller for the union of all accounts' instruments
+        all_instruments = list(dict.fromkeys(inst for insts in self.account_instruments.values() for inst in insts))
+        primary_account = next(iter(self.account_instruments))
+        try:
+            self.upstream = LiveDataFeed(primary_account, instruments=all_instruments, bus=self.bus)
+        except Exception as e:
+            logger.error(f"❌ Failed to initialize upstream data feed: {e}")
+            return
+        self.data_feeds = {account_id: self.upstream for account_id in self.account_instruments}
+    
+    @property
+    def market_data(self) -> Dict[str, Dict[str, MarketData]]:
+        """Latest market data per account, read from the bus"""
+        return {account_id: self.get_market_data(account_id) for account_id in self.account_instruments}
     
     def start(self):
         """Start all data feeds"""
@@ -79,24 +87,12 @@ class MultiAccountDataFeed:
         
         self.streaming = True
         
-        for account_id in self.data_feeds:
+        if self.upstream is not None:
             try:
-                # Start individual data feed
-                self.data_feeds[account_id].start()
-                
-                # Start streaming thread
-                stream_thread = threading.Thread(
-                    target=self._stream_data,
-                    args=(account_id,),
-                    daemon=True
-                )
-                stream_thread.start()
-                self.stream_threads[account_id] = stream_thread
-                
-                logger.info(f"✅ Started streaming for account {account_id}")
-                
+                self.upstream.start()
+                logger.info(f"✅ Started upstream data feed for {len(self.account_instruments)} accounts")
             except Exception as e:
-                logger.error(f"❌ Failed to start data feed for {account_id}: {e}")
+                logger.error(f"❌ Failed to start upstream data feed: {e}")
         
         logger.info("✅ Multi-account data feed started")
     
@@ -108,109 +104,43 @@ class MultiAccountDataFeed:
         
         self.streaming = False
         
-        for account_id in self.data_feeds:
+        if self.upstream is not None:
             try:
-                # Stop individual data feed
-                self.data_feeds[account_id].stop()
-                
-                # Wait for stream thread to finish
-                if account_id in self.stream_threads:
-                    self.stream_threads[account_id].join(timeout=5)
-                
-                logger.info(f"✅ Stopped streaming for account {account_id}")
-                
+                self.upstream.stop()
+                logger.info("✅ Stopped upstream data feed")
             except Exception as e:
-                logger.error(f"❌ Failed to stop data feed for {account_id}: {e}")
-        
-        # Clear threads
-        self.stream_threads.clear()
+                logger.error(f"❌ Failed to stop upstream data feed: {e}")
         
         logger.info("✅ Multi-account data feed stopped")
     
-    def _stream_data(self, account_id: str):
-        """Stream data for specific account"""
-        try:
-            data_feed = self.data_feeds[account_id]
-            data_queue = self.data_queues[account_id]
-            
-            while self.streaming:
-                try:
-                    # Get latest market data
-                    latest_data = data_feed.get_latest_data()
-                    
-                    if latest_data:
-                        # Update market data cache
-                        for instrument, data in latest_data.items():
-                            self.market_data[account_id][instrument] = data
-                    
-                    # Small delay to prevent excessive CPU usage
-                    threading.Event().wait(1)
-                    
-                except Exception as e:
-                    logger.error(f"❌ Streaming error for {account_id}: {e}")
-                    threading.Event().wait(5)  # Wait longer on error
-                    
-        except Exception as e:
-            logger.error(f"❌ Stream thread error for {account_id}: {e}")
-    
     def get_market_data(self, account_id: str) -> Dict[str, MarketData]:
         """Get current market data for specific account"""
         try:
-            return self.market_data.get(account_id, {})
+            instruments = self.account_instruments.get(account_id)
+            if instruments is None:
+                return {}
+            return self.bus.snapshot(instruments)
         except Exception as e:
             logger.error(f"❌ Failed to get market data for {account_id}: {e}")
             return {}
     
     def get_latest_data(self, account_id: str) -> Dict[str, Any]:
         """Get latest market data for specific account - LIVE DATA ONLY"""
-        try:
-            data_feed = self.data_feeds.get(account_id)
-            if not data_feed:
-                return {}
-            
-            # Get latest data from the individual data feed - KEEP AS MarketData OBJECTS
-            latest_data = data_feed.get_latest_data()
-            
-            # Return MarketData objects directly (not converted to dictionaries)
-            return latest_data
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to get latest data for {account_id}: {e}")
-            return {}
+        # MarketData objects straight from the bus snapshot (not converted to dictionaries)
+        return self.get_market_data(account_id)
     
     def get_all_market_data(self) -> Dict[str, Dict[str, MarketData]]:
         """Get current market data for all accounts"""
-        return self.market_data.copy()
+        return self.market_data
     
     def get_latest_prices(self, instruments: Optional[List[str]] = None) -> Dict[str, MarketData]:
         """Return latest MarketData per instrument across all accounts.
 
         If instruments is provided, only those instruments are returned (when available).
-        Chooses the most recently updated MarketData among accounts for each instrument.
+        All accounts share one upstream, so this is the bus snapshot.
         """
         try:
-            result: Dict[str, MarketData] = {}
-            # Iterate all accounts and collect best (most recent) data per instrument
-            for account_id, account_data in self.market_data.items():
-                for instrument, md in account_data.items():
-                    if instruments is not None and instrument not in instruments:
-                        continue
-                    # Pick if not present or newer
-                    if instrument not in result:
-                        result[instrument] = md
-                    else:
-                        try:
-                            current_ts = getattr(result[instrument], 'timestamp', None)
-                            new_ts = getattr(md, 'timestamp', None)
-                            if new_ts and (not current_ts or new_ts > current_ts):
-                                result[instrument] = md
-                        except Exception:
-                            # If timestamps not comparable, keep existing
-                            pass
-            # If specific instruments requested, ensure keys exist only for those found
-            if instruments is not None:
-                result = {k: v for k, v in result.items() if k in instruments}
-            return result
+            return dict(self.bus.snapshot(instruments))
         except Exception as e:
             logger.error(f"❌ Failed to get latest prices: {e}")
             return {}
@@ -218,8 +148,9 @@ class MultiAccountDataFeed:
     def get_instrument_data(self, account_id: str, instrument: str) -> Optional[MarketData]:
         """Get current data for specific instrument on specific account"""
         try:
-            account_data = self.market_data.get(account_id, {})
-            return account_data.get(instrument)
+            if instrument not in self.account_instruments.get(account_id, []):
+                return None
+            return self.bus.latest(instrument)
         except Exception as e:
             logger.error(f"❌ Failed to get instrument data for {account_id}/{instrument}: {e}")
             return None
@@ -248,11 +179,12 @@ class MultiAccountDataFeed:
                     'error': 'Data feed not found'
                 }
             
+            account_data = self.get_market_data(account_id)
             return {
                 'account_id': account_id,
                 'status': 'active' if self.streaming else 'stopped',
-                'instruments': list(self.market_data.get(account_id, {}).keys()),
-                'data_count': len(self.market_data.get(account_id, {})),
+                'instruments': list(account_data.keys()),
+                'data_count': len(account_data),
                 'streaming': self.streaming,
                 'last_update': datetime.now().isoformat()
             }
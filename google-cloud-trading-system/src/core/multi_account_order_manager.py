@@ -13,6 +13,7 @@ from dataclasses import dataclass
 
 from .order_manager import OrderManager, TradeSignal, OrderSide, TradeExecution
 from .dynamic_account_manager import get_account_manager, AccountConfig
+from .async_oanda_client import get_accounts_snapshot
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -263,10 +264,39 @@ class MultiAccountOrderManager:
             return {}
     
     def get_all_accounts_stats(self) -> Dict[str, Dict]:
-        """Get daily trading statistics for all accounts"""
+        """Get daily trading statistics for all accounts (fetched concurrently)"""
+        account_ids = list(self.order_managers.keys())
+        credentials = {}
+        for account_id in account_ids:
+            config = self.account_manager.get_account_config(account_id)
+            if config:
+                credentials[account_id] = {'api_key': config.api_key, 'environment': config.environment}
+        
+        try:
+            snapshots = get_accounts_snapshot(account_ids, include_trades=False, credentials=credentials)
+        except Exception as e:
+            logger.error(f"❌ Concurrent account snapshot failed, falling back to serial: {e}")
+            return {account_id: self.get_daily_stats(account_id) for account_id in account_ids}
+        
         stats = {}
-        for account_id in self.order_managers:
-            stats[account_id] = self.get_daily_stats(account_id)
+        for account_id in account_ids:
+            snapshot = snapshots.get(account_id, {})
+            account_info = snapshot.get('account')
+            if account_info is None:
+                logger.error(f"❌ Failed to get daily stats for {account_id}: {snapshot.get('error')}")
+                stats[account_id] = {}
+                continue
+            stats[account_id] = {
+                'account_id': account_id,
+                'balance': account_info.balance,
+                'margin_used': account_info.margin_used,
+                'margin_available': account_info.margin_available,
+                'open_positions': account_info.open_position_count,
+                'open_trades': account_info.open_trade_count,
+                'unrealized_pl': account_info.unrealized_pl,
+                'realized_pl': account_info.realized_pl,
+                'timestamp': datetime.now().isoformat()
+            }
         return stats
     
     def get_trading_metrics(self, account_id: str) -> Dict[str, Any]:
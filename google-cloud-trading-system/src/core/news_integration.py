@@ -15,6 +15,8 @@ from dataclasses import dataclass
 import threading
 import time
 
+from .perf_profiler import profiled
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -541,6 +543,7 @@ class SafeNewsIntegration:
         
         return (pos_count - neg_count) / (pos_count + neg_count)
     
+    @profiled('news.analysis')
     def get_news_analysis(self, currency_pairs: List[str] = None) -> Dict[str, Any]:
         """Get news analysis for trading decisions"""
         try:
@@ -638,6 +641,7 @@ class SafeNewsIntegration:
                 'opportunities': []
             }
     
+    @profiled('news.pause_check')
     def should_pause_trading(self, currency_pairs: List[str] = None, ignore_skip: bool = False) -> bool:
         """Check if trading should be paused based on news.
 
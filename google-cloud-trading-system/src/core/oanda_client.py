@@ -9,17 +9,27 @@ import json
 import time
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Iterator, Tuple
 import requests
 from dataclasses import dataclass, asdict
 import threading
 import queue
 import re
 
+from .http_session_pool import get_http_session_pool
+from .perf_profiler import profiled
+from .price_cache import get_price_cache
+from .rate_limiter import (
+    get_rate_limiter, LANE_NAMES, PRIORITY_ORDER, PRIORITY_PRICE, PRIORITY_DASHBOARD
+)
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# OANDA returns at most this many transactions per page / sinceid call
+TRANSACTION_PAGE_SIZE = 1000
+
 @dataclass
 class OandaAccount:
     """OANDA account information"""
@@ -43,6 +53,11 @@ class OandaPrice:
     timestamp: datetime
     spread: float
     is_live: bool = True
+    # Staleness metadata, filled in by the shared price cache
+    fetched_at: Optional[datetime] = None
+    age_seconds: float = 0.0
+    stale: bool = False
+    source: str = 'api'
 
 @dataclass
 class OandaOrder:
@@ -119,6 +134,7 @@ class OandaClient:
         self.orders_endpoint = f"{self.base_url}/v3/accounts/{self.account_id}/orders"
         self.positions_endpoint = f"{self.base_url}/v3/accounts/{self.account_id}/positions"
         self.trades_endpoint = f"{self.base_url}/v3/accounts/{self.account_id}/trades"
+        self.transactions_endpoint = f"{self.base_url}/v3/accounts/{self.account_id}/transactions"
         self.instruments_endpoint = f"{self.base_url}/v3/instruments"
         
         # Headers for API requests
@@ -127,12 +143,14 @@ class OandaClient:
             'Content-Type': 'application/json'
         }
         
-        # Rate limiting
-        self.last_request_time = 0
-        self.min_request_interval = 0.1  # 100ms between requests
+        # Rate limiting - shared token bucket per API token across all clients/threads
+        self.rate_limiter = get_rate_limiter(self.api_key)
+        self.rate_limit_timeout = float(os.getenv('OANDA_RATE_LIMIT_TIMEOUT', '30'))
         
         # Data storage
         self.current_prices: Dict[str, OandaPrice] = {}
+        # Latest prices shared by every client on this account, with coalesced fetches
+        self.price_cache = get_price_cache(self.pricing_endpoint)
         self.account_info: Optional[OandaAccount] = None
         self.positions: Dict[str, OandaPosition] = {}
         self.orders: Dict[str, OandaOrder] = {}
@@ -145,13 +163,19 @@ class OandaClient:
         logger.info(f"✅ OANDA client initialized for {self.environment} environment")
         logger.info(f"📊 Account ID: {self.account_id}")
     
-    def _rate_limit(self):
-        """Enforce rate limiting"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.min_request_interval:
-            time.sleep(self.min_request_interval - time_since_last)
-        self.last_request_time = time.time()
+    def _rate_limit(self, priority: int = PRIORITY_DASHBOARD):
+        """Enforce rate limiting via the process-wide token bucket for this API token"""
+        if not self.rate_limiter.acquire(priority, timeout=self.rate_limit_timeout):
+            logger.warning(f"⚠️ Rate limiter wait exceeded {self.rate_limit_timeout}s ({LANE_NAMES.get(priority)}), proceeding")
+    
+    @staticmethod
+    def _request_priority(method: str, url: str) -> int:
+        """Orders first, then price/candle polls, then account/dashboard reads"""
+        if method.upper() in ('POST', 'PUT', 'DELETE'):
+            return PRIORITY_ORDER
+        if '/pricing' in url or '/candles' in url:
+            return PRIORITY_PRICE
+        return PRIORITY_DASHBOARD
 
     @staticmethod
     def _parse_oanda_time(timestamp_str: str) -> datetime:
@@ -184,6 +208,120 @@ class OandaClient:
         except Exception:
             return datetime.utcnow()
     
+    @staticmethod
+    def _price_dp(instrument: str) -> int:
+        """Price precision OANDA accepts for an instrument"""
+        if instrument.endswith('_JPY') or instrument == 'USD_JPY':
+            return 3
+        if instrument == 'XAU_USD':
+            return 2
+        return 5
+
+    @staticmethod
+    def _parse_account(account_data: Dict[str, Any]) -> OandaAccount:
+        """Build OandaAccount from the 'account' object of GET /accounts/{id}"""
+        return OandaAccount(
+            account_id=account_data['id'],
+            currency=account_data['currency'],
+            balance=float(account_data['balance']),
+            unrealized_pl=float(account_data.get('unrealizedPL', 0.0)),
+            realized_pl=float(account_data.get('realizedPL', 0.0)),
+            margin_used=float(account_data.get('marginUsed', 0.0)),
+            margin_available=float(account_data.get('marginAvailable', 0.0)),
+            open_trade_count=int(account_data.get('openTradeCount', 0)),
+            open_position_count=int(account_data.get('openPositionCount', 0)),
+            pending_order_count=int(account_data.get('pendingOrderCount', 0))
+        )
+
+    @classmethod
+    def _parse_prices(cls, response: Dict[str, Any]) -> Dict[str, OandaPrice]:
+        """Build OandaPrice objects from a pricing response"""
+        prices = {}
+        for price_data in response['prices']:
+            instrument = price_data['instrument']
+            bid = float(price_data['bids'][0]['price'])
+            ask = float(price_data['asks'][0]['price'])
+            prices[instrument] = OandaPrice(
+                instrument=instrument,
+                bid=bid,
+                ask=ask,
+                timestamp=cls._parse_oanda_time(price_data['time']),
+                spread=ask - bid,
+                is_live=True
+            )
+        return prices
+
+    @classmethod
+    def _market_order_payload(cls, instrument: str, units: int, stop_loss: Optional[float] = None,
+                              take_profit: Optional[float] = None) -> Dict[str, Any]:
+        """Build the MARKET order body with instrument-precision protective prices"""
+        dp = cls._price_dp(instrument)
+        stop_loss_rounded = float(f"{stop_loss:.{dp}f}") if stop_loss is not None else None
+        take_profit_rounded = float(f"{take_profit:.{dp}f}") if take_profit is not None else None
+
+        order_data = {
+            'order': {
+                'type': 'MARKET',
+                'instrument': instrument,
+                'units': str(units),
+                'timeInForce': 'IOC',  # Immediate or Cancel (less strict than FOK)
+                'positionFill': 'DEFAULT'
+            }
+        }
+        
+        # Add stop loss if provided
+        if stop_loss_rounded:
+            order_data['order']['stopLossOnFill'] = {
+                'price': str(stop_loss_rounded)
+            }
+        
+        # Add take profit if provided
+        if take_profit_rounded:
+            order_data['order']['takeProfitOnFill'] = {
+                'price': str(take_profit_rounded)
+            }
+        return order_data
+
+    @classmethod
+    def _parse_market_order_response(cls, response: Dict[str, Any], stop_loss: Optional[float],
+                                     take_profit: Optional[float]) -> OandaOrder:
+        """Build OandaOrder from a MARKET order response"""
+        # OANDA may return different shapes; support both create and fill transactions
+        order_create = response.get('orderCreateTransaction') or response.get('orderCancelTransaction')
+        order_fill = response.get('orderFillTransaction')
+        if not order_create and not order_fill:
+            raise ValueError(f"Unexpected order response: {response}")
+
+        # Choose base transaction for instrument/units/type
+        base_txn = order_create or order_fill
+        order_fill = order_fill or {}
+        order_id = base_txn['id']
+        instrument = base_txn.get('instrument') or order_fill.get('instrument')
+        units_value = int(base_txn.get('units') or order_fill.get('units') or 0)
+        side = 'buy' if units_value > 0 else 'sell'
+        order_type = base_txn.get('type', 'MARKET')
+        time_in_force = base_txn.get('timeInForce', 'FOK')
+        create_time = cls._parse_oanda_time(base_txn['time'])
+        status = 'FILLED' if order_fill else base_txn.get('state', 'PENDING')
+        fill_time = None
+        if order_fill and 'time' in order_fill:
+            fill_time = cls._parse_oanda_time(order_fill['time'])
+
+        return OandaOrder(
+            order_id=order_id,
+            instrument=instrument,
+            units=units_value,
+            side=side,
+            type=order_type,
+            price=None,  # Market orders don't have fixed price here
+            stop_loss=stop_loss,
+            take_profit=take_profit,
+            time_in_force=time_in_force,
+            status=status,
+            create_time=create_time,
+            fill_time=fill_time
+        )
+    
     def _is_cloud_environment(self) -> bool:
         """Detect if running in Google Cloud environment"""
         return bool(
@@ -193,9 +331,13 @@ class OandaClient:
             os.getenv('GAE_SERVICE')  # GAE service name
         )
     
-    def _make_request(self, method: str, url: str, data: Optional[Dict] = None) -> Dict:
+    @profiled('oanda.http')
+    def _make_request(self, method: str, url: str, data: Optional[Dict] = None,
+                      priority: Optional[int] = None) -> Dict:
         """Make authenticated request to OANDA API with retries and DNS-safe handling"""
-        self._rate_limit()
+        if priority is None:
+            priority = self._request_priority(method, url)
+        self._rate_limit(priority)
         attempts = int(os.getenv('OANDA_HTTP_RETRIES', '3'))
         backoff_base = float(os.getenv('OANDA_HTTP_BACKOFF', '0.5'))
         last_exc = None
@@ -222,21 +364,24 @@ class OandaClient:
         # Use standard headers (no IP substitution)
         headers_with_host = self.headers
         
-        # Use standard requests (no custom adapter needed if we pre-resolved)
-        session = requests
+        # Pooled keep-alive session shared by every OandaClient in the process
+        session_pool = get_http_session_pool()
         
         try:
             for i in range(1, attempts + 1):
                 try:
+                    if i > 1:
+                        # Retries count against the shared token bucket too
+                        self._rate_limit(priority)
                     timeout = float(os.getenv('OANDA_HTTP_TIMEOUT', '8'))
                     if method.upper() == 'GET':
-                        response = session.get(url, headers=headers_with_host, timeout=timeout)
+                        response = session_pool.request('GET', url, headers=headers_with_host, timeout=timeout)
                     elif method.upper() == 'POST':
-                        response = session.post(url, headers=headers_with_host, json=data, timeout=timeout)
+                        response = session_pool.request('POST', url, headers=headers_with_host, json=data, timeout=timeout)
                     elif method.upper() == 'PUT':
-                        response = session.put(url, headers=headers_with_host, json=data, timeout=timeout)
+                        response = session_pool.request('PUT', url, headers=headers_with_host, json=data, timeout=timeout)
                     elif method.upper() == 'DELETE':
-                        response = session.delete(url, headers=headers_with_host, timeout=timeout)
+                        response = session_pool.request('DELETE', url, headers=headers_with_host, timeout=timeout)
                     else:
                         raise ValueError(f"Unsupported HTTP method: {method}")
                     response.raise_for_status()
@@ -268,19 +413,7 @@ class OandaClient:
             url = f"{self.accounts_endpoint}/{self.account_id}"
             response = self._make_request('GET', url)
             
-            account_data = response['account']
-            self.account_info = OandaAccount(
-                account_id=account_data['id'],
-                currency=account_data['currency'],
-                balance=float(account_data['balance']),
-                unrealized_pl=float(account_data.get('unrealizedPL', 0.0)),
-                realized_pl=float(account_data.get('realizedPL', 0.0)),
-                margin_used=float(account_data.get('marginUsed', 0.0)),
-                margin_available=float(account_data.get('marginAvailable', 0.0)),
-                open_trade_count=int(account_data.get('openTradeCount', 0)),
-                open_position_count=int(account_data.get('openPositionCount', 0)),
-                pending_order_count=int(account_data.get('pendingOrderCount', 0))
-            )
+            self.account_info = self._parse_account(response['account'])
             
             logger.info(f"✅ Account info retrieved - Balance: {self.account_info.balance} {self.account_info.currency}")
             return self.account_info
@@ -298,9 +431,15 @@ class OandaClient:
         prices = self.get_current_prices([instrument], force_refresh=True)
         return prices.get(instrument)
     
+    @profiled('oanda.prices')
     def get_current_prices(self, instruments: List[str], force_refresh: bool = False) -> Dict[str, OandaPrice]:
         """Get current prices for instruments with optional cache bypass
         
+        Prices younger than their instrument's TTL (OANDA_PRICE_CACHE_TTL, 5s)
+        come from the shared cache; misses are fetched in one batched call,
+        and concurrent misses for the same instruments share a single request.
+        Each price carries fetched_at/age_seconds/stale/source.
+        
         Args:
             instruments: List of instrument names (e.g., ['EUR_USD', 'GBP_USD'])
             force_refresh: If True, always fetch from API. If False, may return cached data.
@@ -308,88 +447,56 @@ class OandaClient:
         Returns:
             Dictionary mapping instrument name to OandaPrice object
         """
-        try:
-            # If force_refresh is False and we have cached prices, check if they're recent enough
-            if not force_refresh and self.current_prices:
-                # Check if cached prices are < 5 seconds old
-                now = datetime.now()
-                all_fresh = True
-                for inst in instruments:
-                    if inst in self.current_prices:
-                        cached_price = self.current_prices[inst]
-                        # Handle timezone-aware timestamps
-                        if cached_price.timestamp.tzinfo is not None:
-                            now = now.replace(tzinfo=cached_price.timestamp.tzinfo)
-                        age = (now - cached_price.timestamp).total_seconds()
-                        if age > 5:
-                            all_fresh = False
-                            break
-                    else:
-                        all_fresh = False
-                        break
-                
-                if all_fresh:
-                    logger.debug(f"📦 Returning cached prices (< 5s old) for {len(instruments)} instruments")
-                    return {inst: self.current_prices[inst] for inst in instruments if inst in self.current_prices}
-            
-            # Make fresh API call
-            logger.debug(f"🔄 Making fresh API call for {len(instruments)} instruments (force_refresh={force_refresh})")
-            
-            params = {
-                'instruments': ','.join(instruments),
-                'includeHomeConversions': 'false'
-            }
-            
-            url = f"{self.pricing_endpoint}?{'&'.join([f'{k}={v}' for k, v in params.items()])}"
-            response = self._make_request('GET', url)
-            
-            prices = {}
-            for price_data in response['prices']:
-                instrument = price_data['instrument']
-                bid = float(price_data['bids'][0]['price'])
-                ask = float(price_data['asks'][0]['price'])
-                timestamp = self._parse_oanda_time(price_data['time'])
-                
-                price = OandaPrice(
-                    instrument=instrument,
-                    bid=bid,
-                    ask=ask,
-                    timestamp=timestamp,
-                    spread=ask - bid,
-                    is_live=True
-                )
-                
-                prices[instrument] = price
-                self.current_prices[instrument] = price
-            
-            logger.info(f"✅ Retrieved FRESH prices for {len(prices)} instruments from OANDA API")
-            return prices
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to get current prices: {e}")
-            # Fallback to cached prices if available
-            if self.current_prices:
-                fallback = {inst: self.current_prices[inst] for inst in instruments if inst in self.current_prices}
-                if fallback:
-                    logger.warning(f"⚠️ Returning cached prices for {len(fallback)} instruments due to API failure")
-                    return fallback
-            return {}
-
-    def get_candles(self, instrument: str, granularity: str = 'M1', count: int = 50, price: str = 'BA') -> Dict[str, Any]:
+        prices = self.price_cache.get(instruments, self._fetch_prices, force_refresh=force_refresh)
+        self.current_prices.update(prices)
+        stale = sum(1 for price in prices.values() if price.stale)
+        if stale:
+            logger.warning(f"⚠️ Returning {stale} stale cached prices (last fetch failed)")
+        return prices
+    
+    def _fetch_prices(self, instruments: List[str]) -> Dict[str, OandaPrice]:
+        """One pricing call for instruments (the price cache merges concurrent misses into it)"""
+        logger.debug(f"🔄 Making fresh API call for {len(instruments)} instruments")
+        
+        params = {
+            'instruments': ','.join(instruments),
+            'includeHomeConversions': 'false'
+        }
+        
+        url = f"{self.pricing_endpoint}?{'&'.join([f'{k}={v}' for k, v in params.items()])}"
+        response = self._make_request('GET', url)
+        
+        prices = self._parse_prices(response)
+        logger.info(f"✅ Retrieved FRESH prices for {len(prices)} instruments from OANDA API")
+        return prices
+    
+    def get_price_cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss/coalesce counters of the shared price cache"""
+        return self.price_cache.get_stats()
+    
+    @profiled('oanda.candles')
+    def get_candles(self, instrument: str, granularity: str = 'M1', count: int = 50, price: str = 'BA',
+                    from_time: Optional[str] = None, to_time: Optional[str] = None) -> Dict[str, Any]:
         """Fetch recent candles for an instrument.
 
         - granularity: e.g., 'M1', 'M5', 'H1'
         - count: number of candles (max allowed by OANDA is typically 5000)
         - price: 'M' (mid), 'B' (bid), 'A' (ask), or a combination like 'BA'
+        - from_time/to_time: optional RFC3339 range; when both are given, count is ignored
 
         Returns raw JSON dict from OANDA. Caller can parse as needed.
         """
         try:
             params = {
                 'granularity': granularity,
-                'count': str(int(count)),
                 'price': price
             }
+            if from_time:
+                params['from'] = from_time
+            if to_time:
+                params['to'] = to_time
+            if not (from_time and to_time):
+                params['count'] = str(int(count))
             url = f"{self.instruments_endpoint}/{instrument}/candles?{'&'.join([f'{k}={v}' for k, v in params.items()])}"
             response = self._make_request('GET', url)
             return response
@@ -397,83 +504,14 @@ class OandaClient:
             logger.error(f"❌ Failed to get candles for {instrument}: {e}")
             raise
     
+    @profiled('order.submit')
     def place_market_order(self, instrument: str, units: int, stop_loss: Optional[float] = None, 
                           take_profit: Optional[float] = None) -> OandaOrder:
         """Place a market order"""
         try:
-            # Ensure instrument-precision-compliant prices for protective orders
-            def _price_dp(inst: str) -> int:
-                if inst.endswith('_JPY') or inst == 'USD_JPY':
-                    return 3
-                if inst == 'XAU_USD':
-                    return 2
-                return 5
-            def _round_px(px: Optional[float], dp: int) -> Optional[float]:
-                if px is None:
-                    return None
-                return float(f"{px:.{dp}f}")
-            dp = _price_dp(instrument)
-            stop_loss_rounded = _round_px(stop_loss, dp)
-            take_profit_rounded = _round_px(take_profit, dp)
-
-            order_data = {
-                'order': {
-                    'type': 'MARKET',
-                    'instrument': instrument,
-                    'units': str(units),
-                    'timeInForce': 'IOC',  # Immediate or Cancel (less strict than FOK)
-                    'positionFill': 'DEFAULT'
-                }
-            }
-            
-            # Add stop loss if provided
-            if stop_loss_rounded:
-                order_data['order']['stopLossOnFill'] = {
-                    'price': str(stop_loss_rounded)
-                }
-            
-            # Add take profit if provided
-            if take_profit_rounded:
-                order_data['order']['takeProfitOnFill'] = {
-                    'price': str(take_profit_rounded)
-                }
-            
+            order_data = self._market_order_payload(instrument, units, stop_loss, take_profit)
             response = self._make_request('POST', self.orders_endpoint, order_data)
-            
-            # OANDA may return different shapes; support both create and fill transactions
-            order_create = response.get('orderCreateTransaction') or response.get('orderCancelTransaction')
-            order_fill = response.get('orderFillTransaction')
-            if not order_create and not order_fill:
-                raise ValueError(f"Unexpected order response: {response}")
-
-            # Choose base transaction for instrument/units/type
-            base_txn = order_create or order_fill
-            order_id = base_txn['id']
-            instrument = base_txn.get('instrument') or order_fill.get('instrument')
-            units_value = int(base_txn.get('units') or order_fill.get('units') or 0)
-            side = 'buy' if units_value > 0 else 'sell'
-            order_type = base_txn.get('type', 'MARKET')
-            time_in_force = base_txn.get('timeInForce', 'FOK')
-            create_time = self._parse_oanda_time(base_txn['time'])
-            status = 'FILLED' if order_fill else base_txn.get('state', 'PENDING')
-            fill_time = None
-            if order_fill and 'time' in order_fill:
-                fill_time = self._parse_oanda_time(order_fill['time'])
-
-            order = OandaOrder(
-                order_id=order_id,
-                instrument=instrument,
-                units=units_value,
-                side=side,
-                type=order_type,
-                price=None,  # Market orders don't have fixed price here
-                stop_loss=stop_loss,
-                take_profit=take_profit,
-                time_in_force=time_in_force,
-                status=status,
-                create_time=create_time,
-                fill_time=fill_time
-            )
+            order = self._parse_market_order_response(response, stop_loss, take_profit)
             
             self.orders[order.order_id] = order
             logger.info(f"✅ Market order placed: {instrument} {units} units")
@@ -511,6 +549,7 @@ class OandaClient:
             logger.error(f"❌ Failed to create order: {e}")
             raise
     
+    @profiled('order.submit')
     def place_limit_order(self, instrument: str, units: int, price: float,
                           time_in_force: str = 'GTC',
                           stop_loss: Optional[float] = None,
@@ -807,6 +846,42 @@ class OandaClient:
             logger.error(f"❌ Failed to close trade {trade_id}: {e}")
             raise
     
+    def iter_transaction_pages(self, since_id: Optional[int] = None, from_time: Optional[datetime] = None,
+                               types: str = 'ORDER_FILL') -> Iterator[Tuple[List[Dict[str, Any]], int]]:
+        """Page through the account's transaction stream, oldest first.
+
+        Yields (transactions, cursor) per page, where cursor is the transaction ID a
+        caller can resume from once the page is stored. With since_id, reads
+        /transactions/sinceid until the account's lastTransactionID; without it, asks
+        /transactions for the page URLs from from_time (or the first transaction).
+        The last page's cursor is lastTransactionID, so filtered-out transaction types
+        are not re-read on the next call.
+        """
+        if since_id is None:
+            query = f"pageSize={TRANSACTION_PAGE_SIZE}&type={types}"
+            if from_time is not None:
+                query += f"&from={from_time.strftime('%Y-%m-%dT%H:%M:%S.%fZ')}"
+            response = self._make_request('GET', f"{self.transactions_endpoint}?{query}")
+            last_id = int(response.get('lastTransactionID', 0))
+            for page_url in response.get('pages', []):
+                transactions = self._make_request('GET', page_url).get('transactions', [])
+                if transactions:
+                    yield transactions, int(transactions[-1]['id'])
+            yield [], last_id
+            return
+        
+        cursor = int(since_id)
+        while True:
+            response = self._make_request('GET', f"{self.transactions_endpoint}/sinceid?id={cursor}&type={types}")
+            transactions = response.get('transactions', [])
+            last_id = max(cursor, int(response.get('lastTransactionID', cursor)))
+            if transactions:
+                cursor = int(transactions[-1]['id'])
+            if not transactions or cursor >= last_id or len(transactions) < TRANSACTION_PAGE_SIZE:
+                yield transactions, last_id
+                return
+            yield transactions, cursor
+    
     def close_position(self, instrument: str, long_units: Optional[int] = None, 
                       short_units: Optional[int] = None) -> Dict:
         """Close a position"""
@@ -826,6 +901,14 @@ class OandaClient:
             logger.error(f"❌ Failed to close position: {e}")
             raise
     
+    def get_connection_stats(self) -> Dict[str, Any]:
+        """Connection reuse and latency stats for the shared HTTP session pool"""
+        return get_http_session_pool().get_stats()
+    
+    def get_rate_limit_stats(self) -> Dict[str, Any]:
+        """Token bucket state and wait-time histograms for this client's API token"""
+        return self.rate_limiter.get_stats()
+    
     def is_connected(self) -> bool:
         """Check if OANDA connection is working"""
         try:
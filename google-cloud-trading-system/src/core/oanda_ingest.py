@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+OANDA Transaction Ingest
+Cursor-paged ORDER_FILL reads folded into trade rows and written as batched upserts, one transaction per page
+"""
+
+import re
+import logging
+import sqlite3
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+INGEST_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS ingest_cursors (
+        source TEXT PRIMARY KEY,
+        last_transaction_id INTEGER NOT NULL,
+        updated_at TEXT
+    );
+
+    CREATE TABLE IF NOT EXISTS oanda_fills (
+        account_id TEXT NOT NULL,
+        transaction_id INTEGER NOT NULL,
+        trade_id TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        time TEXT NOT NULL,
+        instrument TEXT,
+        units REAL,
+        price REAL,
+        realized_pl REAL DEFAULT 0.0,
+        financing REAL DEFAULT 0.0,
+        commission REAL DEFAULT 0.0,
+        reason TEXT,
+        PRIMARY KEY (account_id, transaction_id, trade_id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_oanda_fills_trade ON oanda_fills(account_id, trade_id);
+"""
+
+FILL_COLUMNS = ('account_id', 'transaction_id', 'trade_id', 'kind', 'time', 'instrument', 'units', 'price',
+                'realized_pl', 'financing', 'commission', 'reason')
+
+# ORDER_FILL reasons that close a trade, as the exit reasons TradeLogger uses
+EXIT_REASONS = {
+    'STOP_LOSS_ORDER': 'SL',
+    'GUARANTEED_STOP_LOSS_ORDER': 'SL',
+    'TRAILING_STOP_LOSS_ORDER': 'TRAILING_SL',
+    'TAKE_PROFIT_ORDER': 'TP',
+    'MARKET_ORDER_MARGIN_CLOSEOUT': 'MARGIN_CLOSEOUT',
+}
+
+SQLITE_MAX_PARAMS = 500
+
+
+def oanda_time(timestamp: str) -> str:
+    """'2025-09-15T14:14:27.714891445Z' -> '2025-09-15T14:14:27.714891' (naive UTC, like the trade tables)"""
+    match = re.match(r"^([^.Z+]+)(\.\d+)?", timestamp or '')
+    if not match:
+        return timestamp
+    base, frac = match.group(1), match.group(2) or ''
+    return base + (frac[:7] if frac else '')
+
+
+def fills_from_transactions(transactions: Iterable[Dict[str, Any]], account_id: str) -> List[Tuple]:
+    """
+    One row per trade an ORDER_FILL touches: 'open' for tradeOpened, 'reduce' for
+    tradeReduced and 'close' for each of tradesClosed. The fill's commission is charged
+    to the trade it opened, otherwise to the first trade it closed or reduced.
+    """
+    fills = []
+    for txn in transactions:
+        if txn.get('type') != 'ORDER_FILL':
+            continue
+        txn_id = int(txn['id'])
+        time = oanda_time(txn.get('time'))
+        instrument = txn.get('instrument')
+        price = float(txn['price']) if txn.get('price') is not None else None
+        reason = txn.get('reason')
+        commission = float(txn.get('commission', 0.0) or 0.0)
+
+        legs = []
+        opened = txn.get('tradeOpened')
+        if opened:
+            legs.append(('open', opened))
+        if txn.get('tradeReduced'):
+            legs.append(('reduce', txn['tradeReduced']))
+        legs.extend(('close', closed) for closed in txn.get('tradesClosed') or [])
+
+        for i, (kind, leg) in enumerate(legs):
+            fills.append((account_id, txn_id, str(leg['tradeID']), kind, time, instrument,
+                          float(leg.get('units', 0)), float(leg.get('price', price) or 0.0),
+                          float(leg.get('realizedPL', 0.0) or 0.0), float(leg.get('financing', 0.0) or 0.0),
+                          commission if i == 0 else 0.0, reason))
+    return fills
+
+
+def fold_fills(fills: Iterable[sqlite3.Row]) -> Dict[str, Dict[str, Any]]:
+    """
+    Trade state from its fills (in transaction order): entry from the open, P&L, financing and
+    commission summed, exit price averaged over closed units. Trades whose open fill is
+    older than anything ingested are left out - there is no entry to build a row from.
+    """
+    trades: Dict[str, Dict[str, Any]] = {}
+    for fill in fills:
+        trade_id = fill['trade_id']
+        if fill['kind'] == 'open':
+            units = fill['units']
+            trades[trade_id] = {
+                'oanda_trade_id': trade_id,
+                'account_id': fill['account_id'],
+                'instrument': fill['instrument'],
+                'side': 'BUY' if units > 0 else 'SELL',
+                'units': abs(units),
+                'entry_time': fill['time'],
+                'entry_price': fill['price'],
+                'entry_reason': fill['reason'],
+                'commission': fill['commission'],
+                'realized_pl': 0.0,
+                'financing': 0.0,
+                'closed_units': 0.0,
+                'exit_value': 0.0,
+                'exit_time': None,
+                'exit_price': None,
+                'exit_reason': None,
+                'status': 'open',
+                'duration_seconds': None,
+                'last_transaction_id': fill['transaction_id'],
+            }
+            continue
+        trade = trades.get(trade_id)
+        if trade is None:
+            continue
+        closed = abs(fill['units'])
+        trade['realized_pl'] += fill['realized_pl']
+        trade['financing'] += fill['financing']
+        trade['commission'] += fill['commission']
+        trade['closed_units'] += closed
+        trade['exit_value'] += closed * fill['price']
+        trade['exit_time'] = fill['time']
+        trade['exit_price'] = trade['exit_value'] / trade['closed_units'] if trade['closed_units'] else None
+        trade['last_transaction_id'] = fill['transaction_id']
+        if fill['kind'] == 'close' or trade['closed_units'] >= trade['units'] - 1e-9:
+            trade['status'] = 'closed'
+            trade['exit_reason'] = EXIT_REASONS.get(fill['reason'], 'MANUAL')
+            trade['duration_seconds'] = int((datetime.fromisoformat(trade['exit_time']) -
+                                             datetime.fromisoformat(trade['entry_time'])).total_seconds())
+    for trade in trades.values():
+        del trade['exit_value']
+    return trades
+
+
+def _chunks(values: List[Any], size: int = SQLITE_MAX_PARAMS):
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def create_ingest_tables(conn: sqlite3.Connection):
+    for statement in INGEST_SCHEMA.split(';'):
+        if statement.strip():
+            conn.execute(statement)
+
+
+def get_cursor(store, source: str) -> Optional[int]:
+    """Last transaction ID stored for a source (e.g. 'oanda:<account>'), None before the first run"""
+    row = store.query_one("SELECT last_transaction_id FROM ingest_cursors WHERE source = ?", (source,))
+    return row['last_transaction_id'] if row else None
+
+
+def set_cursor(conn: sqlite3.Connection, source: str, transaction_id: int):
+    """Advance a cursor inside the write that stored what it covers (never moves it back)"""
+    conn.execute("""
+        INSERT INTO ingest_cursors (source, last_transaction_id, updated_at) VALUES (?, ?, ?)
+        ON CONFLICT(source) DO UPDATE SET
+            last_transaction_id = MAX(last_transaction_id, excluded.last_transaction_id),
+            updated_at = excluded.updated_at
+    """, (source, transaction_id, datetime.now().isoformat()))
+
+
+class TransactionIngestor:
+    """
+    Incremental OANDA trade ingest into one SQLiteStore.
+
+    Each page of ORDER_FILL transactions is turned into fills; fills already stored
+    (same account and transaction) are dropped, the rest are inserted, the trades they
+    touch are re-folded from all their fills, and write_trades(conn, trades) upserts
+    those rows - all in a single write together with the account's cursor. A crash
+    loses at most the page in flight, and replaying history (full_resync) re-reads
+    transactions but writes nothing that has not changed.
+    """
+
+    def __init__(self, store, write_trades: Callable[[sqlite3.Connection, List[Dict[str, Any]]], List[Dict[str, Any]]],
+                 source: str = 'oanda'):
+        self.store = store
+        self.write_trades = write_trades
+        self.source = source
+        store.write(create_ingest_tables)
+        self.stats = {'pages': 0, 'transactions': 0, 'fills': 0, 'trades_written': 0}
+
+    def _cursor_key(self, account_id: str) -> str:
+        return f"{self.source}:{account_id}"
+
+    def get_cursor(self, account_id: str) -> Optional[int]:
+        return get_cursor(self.store, self._cursor_key(account_id))
+
+    def _ingest_page(self, account_id: str, transactions: List[Dict[str, Any]], cursor: int) -> Tuple[int, List]:
+        fills = fills_from_transactions(transactions, account_id)
+
+        def write(conn: sqlite3.Connection):
+            new = fills
+            if fills:
+                known = {row[0] for row in conn.execute(
+                    "SELECT transaction_id FROM oanda_fills WHERE account_id = ? AND transaction_id BETWEEN ? AND ?",
+                    (account_id, min(f[1] for f in fills), max(f[1] for f in fills)))}
+                new = [f for f in fills if f[1] not in known]
+            written = []
+            if new:
+                conn.executemany(f"INSERT OR IGNORE INTO oanda_fills ({', '.join(FILL_COLUMNS)}) "
+                                 f"VALUES ({', '.join('?' for _ in FILL_COLUMNS)})", new)
+                touched = sorted({f[2] for f in new})
+                rows = []
+                for chunk in _chunks(touched):
+                    rows += conn.execute(
+                        f"SELECT * FROM oanda_fills WHERE account_id = ? AND trade_id IN ({', '.join('?' for _ in chunk)}) "
+                        f"ORDER BY transaction_id", [account_id] + chunk).fetchall()
+                rows.sort(key=lambda row: row['transaction_id'])
+                trades = list(fold_fills(rows).values())
+                if trades:
+                    written = self.write_trades(conn, trades)
+            set_cursor(conn, self._cursor_key(account_id), cursor)
+            return len(new), written
+
+        return self.store.write(write)
+
+    def ingest(self, client, account_id: Optional[str] = None, from_time: Optional[datetime] = None,
+               full_resync: bool = False) -> Dict[str, Any]:
+        """
+        Pull everything after the account's cursor (or from from_time on the first run /
+        a full re-sync) and store it. Returns counts and the trade rows that changed
+        (a trade written by several pages appears once, in its latest form).
+        """
+        account_id = account_id or client.account_id
+        since_id = None if full_resync else self.get_cursor(account_id)
+        result = {'account_id': account_id, 'pages': 0, 'transactions': 0, 'new_fills': 0,
+                  'changed_trades': [], 'cursor': since_id}
+        changed: Dict[str, Dict[str, Any]] = {}
+        for transactions, cursor in client.iter_transaction_pages(since_id=since_id, from_time=from_time):
+            new_fills, written = self._ingest_page(account_id, transactions, cursor)
+            result['pages'] += 1
+            result['transactions'] += len(transactions)
+            result['new_fills'] += new_fills
+            changed.update((row['trade_id'], row) for row in written)
+            result['cursor'] = cursor
+        result['changed_trades'] = list(changed.values())
+
+        self.stats['pages'] += result['pages']
+        self.stats['transactions'] += result['transactions']
+        self.stats['fills'] += result['new_fills']
+        self.stats['trades_written'] += len(result['changed_trades'])
+        logger.info(f"✅ Ingested {result['transactions']} transactions for {account_id} "
+                    f"({result['new_fills']} new fills, {len(result['changed_trades'])} trades written, "
+                    f"cursor {result['cursor']})")
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats)
+
+
+def upsert_rows(conn: sqlite3.Connection, table: str, rows: List[Dict[str, Any]], key: str = 'trade_id',
+                apply: Callable[[sqlite3.Connection, Dict[str, Any], int], None] = None) -> List[Dict[str, Any]]:
+    """
+    Insert or update rows keyed by `key`, skipping rows identical to what is stored.
+
+    The stored versions are read in IN-chunks first; only new or changed rows go into
+    one executemany upsert. apply(conn, row, sign), when given, is called with each
+    replaced row (sign=-1) and each written row (sign=1) - the rollup hook. Returns the
+    rows written.
+    """
+    if not rows:
+        return []
+    columns = list(rows[0])
+    existing: Dict[Any, sqlite3.Row] = {}
+    keys = [row[key] for row in rows]
+    for chunk in _chunks(keys):
+        for row in conn.execute(f"SELECT * FROM {table} WHERE {key} IN ({', '.join('?' for _ in chunk)})", chunk):
+            existing[row[key]] = row
+
+    changed = []
+    for row in rows:
+        old = existing.get(row[key])
+        if old is not None and all(old[column] == row[column] for column in columns):
+            continue
+        changed.append(row)
+        if old is not None and apply is not None:
+            apply(conn, old, -1)
+    if not changed:
+        return []
+
+    updates = ', '.join(f"{column} = excluded.{column}" for column in columns if column != key)
+    conn.executemany(f"""
+        INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})
+        ON CONFLICT({key}) DO UPDATE SET {updates}
+    """, [tuple(row[column] for column in columns) for row in changed])
+    if apply is not None:
+        for row in changed:
+            merged = dict(existing[row[key]]) if row[key] in existing else {}
+            merged.update(row)
+            apply(conn, merged, 1)
+    return changed
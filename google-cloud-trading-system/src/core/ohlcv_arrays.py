@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Memory-Mapped OHLCV Arrays
+Contiguous NumPy candle history shared zero-copy between backtests and sweep workers
+"""
+
+import os
+import json
+import logging
+import threading
+import time as _time
+from typing import Dict, List, Optional, Any
+
+import numpy as np
+
+from .candle_store import (
+    get_candle_store, to_ns, ns_to_oanda, normalize_price, PRICE_COMPONENTS, OHLC, TimeLike
+)
+
+logger = logging.getLogger(__name__)
+
+# Row order of the (12, n) price matrix
+PRICE_FIELDS = tuple(f"{side}_{field}" for side in ('bid', 'ask', 'mid') for field in OHLC)
+_FIELD_INDEX = {name: i for i, name in enumerate(PRICE_FIELDS)}
+
+_materialise_lock = threading.Lock()
+
+
+class OHLCVArrays:
+    """
+    Read-only candle history for one instrument/granularity.
+
+    time is int64 ns, volume int64, and prices a C-contiguous (12, n) float64
+    matrix so every field (bid_c, mid_h, ...) is a contiguous 1-D view.
+    When backed by files the arrays are memory-mapped, and pickling sends only
+    the path, so pool workers map the same physical pages instead of copying.
+    """
+
+    def __init__(self, instrument: str, granularity: str, time: np.ndarray, prices: np.ndarray,
+                 volume: np.ndarray, path: Optional[str] = None):
+        self.instrument = instrument
+        self.granularity = granularity
+        self.time = time
+        self.prices = prices
+        self.volume = volume
+        self.path = path
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        index = _FIELD_INDEX.get(name)
+        if index is None:
+            raise AttributeError(name)
+        return self.prices[index]
+
+    def __reduce__(self):
+        if self.path:
+            # Bounds by time, not index: the file may have been rematerialised with more bars since
+            bounds = (int(self.time[0]), int(self.time[-1]) + 1) if len(self) else (0, 0)
+            return (open_ohlcv, (self.path,) + bounds)
+        return (OHLCVArrays, (self.instrument, self.granularity, np.asarray(self.time),
+                              np.asarray(self.prices), np.asarray(self.volume)))
+
+    def slice(self, lo: int, hi: int) -> 'OHLCVArrays':
+        """Zero-copy view of bars [lo, hi)"""
+        return OHLCVArrays(self.instrument, self.granularity, self.time[lo:hi], self.prices[:, lo:hi],
+                           self.volume[lo:hi], self.path)
+
+    def between(self, start: TimeLike, end: TimeLike = None) -> 'OHLCVArrays':
+        """Zero-copy view of bars with start <= time < end"""
+        lo = int(np.searchsorted(self.time, to_ns(start), side='left'))
+        hi = len(self) if end is None else int(np.searchsorted(self.time, to_ns(end), side='left'))
+        return self.slice(lo, hi)
+
+    def index_of(self, time_ns: int) -> int:
+        """Bar index for an exact timestamp, or -1"""
+        i = int(np.searchsorted(self.time, time_ns))
+        return i if i < len(self.time) and self.time[i] == time_ns else -1
+
+    def time_str(self, index: int) -> str:
+        """OANDA-format timestamp of a bar"""
+        return ns_to_oanda(int(self.time[index]))
+
+    def to_dataframe(self, side: str = 'mid'):
+        """pandas OHLCV frame (open/high/low/close/volume) indexed by UTC timestamp"""
+        import pandas as pd
+        columns = {name: self.prices[_FIELD_INDEX[f"{side}_{field}"]]
+                   for name, field in zip(('open', 'high', 'low', 'close'), OHLC)}
+        columns['volume'] = self.volume
+        return pd.DataFrame(columns, index=pd.DatetimeIndex(pd.to_datetime(np.asarray(self.time), utc=True),
+                                                            name='timestamp'))
+
+    def save(self, path: str) -> 'OHLCVArrays':
+        """Write to {path}.*.npy (replacing any previous copy) and return the memory-mapped copy"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        for suffix, values in (('time', self.time), ('prices', self.prices), ('volume', self.volume)):
+            tmp_path = f"{path}.{suffix}.tmp.npy"
+            np.save(tmp_path, np.ascontiguousarray(values))
+            os.replace(tmp_path, f"{path}.{suffix}.npy")
+        with open(f"{path}.meta.json", 'w') as f:
+            json.dump({'instrument': self.instrument, 'granularity': self.granularity, 'count': len(self),
+                       'first': int(self.time[0]) if len(self) else None,
+                       'last': int(self.time[-1]) if len(self) else None}, f)
+        return open_ohlcv(path)
+
+    @classmethod
+    def from_columns(cls, instrument: str, granularity: str, columns: Dict[str, np.ndarray]) -> 'OHLCVArrays':
+        """Build from CandleStore columns, deriving whichever of bid/ask/mid is missing"""
+        n = len(columns['time'])
+        prices = np.empty((len(PRICE_FIELDS), n), dtype=np.float64)
+        have = {side for side in ('bid', 'ask', 'mid') if f"{side}_c" in columns}
+        if not have:
+            raise ValueError("No price components in columns")
+        for field in OHLC:
+            get = lambda side: columns[f"{side}_{field}"]
+            bid = get('bid') if 'bid' in have else None
+            ask = get('ask') if 'ask' in have else None
+            mid = get('mid') if 'mid' in have else None
+            if mid is None:
+                mid = (bid + ask) / 2.0 if bid is not None and ask is not None else (bid if bid is not None else ask)
+            # Without a quoted side, fall back to mid (zero spread)
+            prices[_FIELD_INDEX[f"bid_{field}"]] = bid if bid is not None else (ask if ask is not None else mid)
+            prices[_FIELD_INDEX[f"ask_{field}"]] = ask if ask is not None else (bid if bid is not None else mid)
+            prices[_FIELD_INDEX[f"mid_{field}"]] = mid
+        return cls(instrument, granularity, np.ascontiguousarray(columns['time'], dtype=np.int64), prices,
+                   np.ascontiguousarray(columns['volume'], dtype=np.int64))
+
+    @classmethod
+    def from_candles(cls, instrument: str, granularity: str, candles: List[Dict[str, Any]]) -> 'OHLCVArrays':
+        """Parse raw OANDA candle dicts once (strings -> floats)"""
+        present = [c for c, key in PRICE_COMPONENTS.items() if candles and key in candles[0]]
+        price = normalize_price(''.join(present) or 'M')
+        columns: Dict[str, Any] = {'time': [], 'volume': []}
+        for component in price:
+            for field in OHLC:
+                columns[f"{PRICE_COMPONENTS[component]}_{field}"] = []
+        for candle in candles:
+            columns['time'].append(to_ns(candle['time']))
+            columns['volume'].append(int(candle.get('volume', 0)))
+            for component in price:
+                values = candle.get(PRICE_COMPONENTS[component]) or {}
+                for field in OHLC:
+                    columns[f"{PRICE_COMPONENTS[component]}_{field}"].append(float(values.get(field, 0.0)))
+        arrays = {
+            name: np.asarray(values, dtype=np.int64 if name in ('time', 'volume') else np.float64)
+            for name, values in columns.items()
+        }
+        order = np.argsort(arrays['time'], kind='stable')
+        return cls.from_columns(instrument, granularity, {name: values[order] for name, values in arrays.items()})
+
+
+def _read_meta(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(f"{path}.meta.json", 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def open_ohlcv(path: str, start_ns: Optional[int] = None, end_ns: Optional[int] = None,
+               attempts: int = 5) -> OHLCVArrays:
+    """
+    Memory-map arrays written by OHLCVArrays.save(), optionally only bars in [start_ns, end_ns).
+
+    The column files are replaced one by one when a series is rematerialised, so a
+    reader checks them against meta.json (written last) and retries on a mismatch.
+    """
+    for attempt in range(attempts):
+        meta = _read_meta(path)
+        if meta is not None:
+            try:
+                time = np.load(f"{path}.time.npy", mmap_mode='r')
+                prices = np.load(f"{path}.prices.npy", mmap_mode='r')
+                volume = np.load(f"{path}.volume.npy", mmap_mode='r')
+            except (OSError, ValueError):
+                time = None
+            if (time is not None and len(time) == meta['count'] == prices.shape[1] == len(volume)
+                    and (not len(time) or (int(time[0]), int(time[-1])) == (meta['first'], meta['last']))):
+                arrays = OHLCVArrays(meta['instrument'], meta['granularity'], time, prices, volume, path)
+                return arrays if start_ns is None else arrays.between(start_ns, end_ns)
+        _time.sleep(0.05 * (attempt + 1))
+    raise OSError(f"OHLCV arrays at {path} are missing or being rewritten")
+
+
+def load_ohlcv(instrument: str, granularity: str, start: TimeLike, end: TimeLike = None,
+               price: str = 'BA', store=None, fetch: bool = True) -> OHLCVArrays:
+    """
+    Candle history as memory-mapped arrays.
+
+    Candles come from the CandleStore (gap-filled from OANDA if fetch=True). Each
+    store series is materialised as one set of files under <store>/ohlcv/, rewritten
+    in place only when the series has grown; any window is a zero-copy slice of it.
+    """
+    store = store or get_candle_store()
+    columns = store.get_arrays(instrument, granularity, start, end, price, fetch)
+    if not len(columns['time']):
+        return OHLCVArrays.from_columns(instrument, granularity, columns)
+
+    series = store.get_arrays(instrument, granularity, 0, None, price, fetch=False)
+    first, last, count = int(series['time'][0]), int(series['time'][-1]), len(series['time'])
+    name = f"{instrument.replace('/', '_')}_{granularity}_{normalize_price(price)}"
+    path = os.path.join(store.root_dir, 'ohlcv', name)
+    meta = _read_meta(path)
+    if meta and (meta.get('count'), meta.get('first'), meta.get('last')) == (count, first, last):
+        arrays = open_ohlcv(path)
+    else:
+        with _materialise_lock:
+            arrays = OHLCVArrays.from_columns(instrument, granularity, series).save(path)
+        logger.info(f"🗺️ Memory-mapped {count} {granularity} bars for {instrument}")
+    return arrays.between(start, end)
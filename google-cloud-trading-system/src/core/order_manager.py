@@ -13,6 +13,7 @@ from dataclasses import dataclass, asdict
 from enum import Enum
 
 from .oanda_client import OandaClient, OandaOrder, OandaPosition, get_oanda_client
+from .perf_profiler import profiled
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -197,6 +198,7 @@ class OrderManager:
             GLOBAL_LAST_RESET_DATE = current_date
             logger.info("🔄 Global daily trade counter reset")
     
+    @profiled('order.sizing')
     def calculate_position_size(self, signal: TradeSignal) -> Optional[PositionSizing]:
         """Calculate position size based on risk management rules and signal strength"""
         try:
@@ -262,6 +264,7 @@ class OrderManager:
             logger.error(f"❌ Failed to calculate position size: {e}")
             return None
     
+    @profiled('risk.validate')
     def validate_trade(self, signal: TradeSignal, position_size: PositionSizing) -> Tuple[bool, str]:
         """Validate trade against risk management rules"""
         try:
@@ -317,6 +320,7 @@ class OrderManager:
             logger.error(f"❌ Trade validation failed: {e}")
             return False, f"Validation error: {e}"
     
+    @profiled('order.place')
     def execute_trade(self, signal: TradeSignal) -> TradeExecution:
         """Execute a trade signal"""
         try:
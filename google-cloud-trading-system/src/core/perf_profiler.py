@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Hot-Path Performance Profiler
+Timing spans with rolling log-linear latency histograms and on-demand sampled cProfile dumps
+"""
+
+import os
+import io
+import time
+import random
+import pstats
+import cProfile
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Log-linear buckets: exact below 2**SIG_BITS us, then 2**(SIG_BITS-1) sub-buckets per
+# power of two, i.e. every recorded value is within ~3% of its bucket (HDR-style)
+SIG_BITS = 5
+SUB_BUCKETS = 1 << SIG_BITS
+MAX_MICROS = (1 << 36) - 1  # ~19 hours; anything longer is clamped
+
+
+def _bucket(micros: int) -> int:
+    if micros < SUB_BUCKETS:
+        return micros
+    shift = micros.bit_length() - SIG_BITS
+    return (shift << (SIG_BITS - 1)) + (micros >> shift)
+
+
+def _bucket_value(index: int) -> float:
+    """Midpoint of a bucket in microseconds"""
+    if index < SUB_BUCKETS:
+        return float(index)
+    shift = (index >> (SIG_BITS - 1)) - 1
+    low = (index - (shift << (SIG_BITS - 1))) << shift
+    return low + ((1 << shift) - 1) / 2
+
+
+BUCKET_COUNT = _bucket(MAX_MICROS) + 1
+
+
+class LatencyHistogram:
+    """Fixed-size bucket counts for one time slice (values in microseconds)"""
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, micros: int):
+        micros = min(max(int(micros), 0), MAX_MICROS)
+        self.counts[_bucket(micros)] += 1
+        self.count += 1
+        self.total += micros
+        if micros > self.max:
+            self.max = micros
+
+    def merge(self, other: 'LatencyHistogram'):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, pct: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = max(1, int(round(pct / 100 * self.count)))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                return min(_bucket_value(index), float(self.max))
+        return float(self.max)
+
+
+class RollingHistogram:
+    """
+    Latency histogram over a sliding window.
+
+    The window is split into `slices` fixed time slices; recording goes into
+    the current slice and slices older than the window are discarded, so the
+    percentiles always describe roughly the last window_seconds.
+    """
+
+    def __init__(self, window_seconds: float = 300, slices: int = 5):
+        self.slice_seconds = window_seconds / slices
+        self.slices: deque = deque(maxlen=slices)
+        self.lock = threading.Lock()
+        self.lifetime_count = 0
+
+    def _current(self, now: float) -> LatencyHistogram:
+        slice_id = int(now // self.slice_seconds)
+        if not self.slices or self.slices[-1][0] != slice_id:
+            self.slices.append((slice_id, LatencyHistogram()))
+        return self.slices[-1][1]
+
+    def record(self, micros: int, now: float = None):
+        with self.lock:
+            self._current(time.time() if now is None else now).record(micros)
+            self.lifetime_count += 1
+
+    def merged(self, now: float = None) -> LatencyHistogram:
+        oldest = int((time.time() if now is None else now) // self.slice_seconds) - self.slices.maxlen + 1
+        merged = LatencyHistogram()
+        with self.lock:
+            for slice_id, histogram in self.slices:
+                if slice_id >= oldest:
+                    merged.merge(histogram)
+        return merged
+
+    def summary(self, now: float = None) -> Dict[str, Any]:
+        histogram = self.merged(now)
+        ms = lambda micros: round(micros / 1000, 3)
+        return {
+            'count': histogram.count,
+            'lifetime_count': self.lifetime_count,
+            'mean_ms': ms(histogram.total / histogram.count) if histogram.count else 0.0,
+            'p50_ms': ms(histogram.percentile(50)),
+            'p90_ms': ms(histogram.percentile(90)),
+            'p99_ms': ms(histogram.percentile(99)),
+            'p999_ms': ms(histogram.percentile(99.9)),
+            'max_ms': ms(histogram.max),
+        }
+
+
+class _NoopSpan:
+    """Shared do-nothing span handed out while profiling is disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ('profiler', 'name', 'root', 'started', 'cprofile')
+
+    def __init__(self, profiler: 'PerfProfiler', name: str, root: bool):
+        self.profiler = profiler
+        self.name = name
+        self.root = root
+        self.cprofile = None
+
+    def __enter__(self):
+        if self.root:
+            self.cprofile = self.profiler._start_cprofile()
+        self.started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed_ns = time.perf_counter_ns() - self.started
+        self.profiler.record_ns(self.name, elapsed_ns)
+        if self.cprofile is not None:
+            self.profiler._finish_cprofile(self.cprofile, self.name, elapsed_ns)
+        return False
+
+
+class PerfProfiler:
+    """
+    Process-wide timing spans for the scan and order hot paths.
+
+        with profiler.span('scan.prices'):
+            ...
+
+    Each span name gets a rolling latency histogram (PERF_WINDOW_SECONDS,
+    default 300). Spans opened with root=True (one per scan) can also be
+    cProfiled: profile_next(n) profiles the next n root spans, and
+    PERF_PROFILE_SAMPLE_RATE profiles that fraction of them at random. Dumps
+    are written as .prof files under PERF_PROFILE_DIR with a top-functions
+    summary kept in memory. cProfile only sees the thread the root span runs
+    on, and only one profile runs at a time.
+
+    With PERF_PROFILING=false, span() returns a shared no-op object and
+    nothing is timed or allocated.
+    """
+
+    def __init__(self, enabled: bool = None, window_seconds: float = None,
+                 profile_dir: str = None, sample_rate: float = None):
+        if enabled is None:
+            enabled = os.getenv('PERF_PROFILING', 'true').lower() == 'true'
+        self.enabled = enabled
+        self.window_seconds = window_seconds or float(os.getenv('PERF_WINDOW_SECONDS', '300'))
+        self.profile_dir = profile_dir or os.getenv('PERF_PROFILE_DIR', 'logs/profiles')
+        self.sample_rate = sample_rate if sample_rate is not None else float(os.getenv('PERF_PROFILE_SAMPLE_RATE', '0'))
+
+        self.histograms: Dict[str, RollingHistogram] = {}
+        self.lock = threading.Lock()
+        self._cprofile_lock = threading.Lock()
+        self.profile_requests = 0
+        self.profiles: deque = deque(maxlen=20)
+
+    def span(self, name: str, root: bool = False):
+        """Context manager timing one section; root=True marks a whole scan (cProfile candidate)"""
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _Span(self, name, root)
+
+    def timed(self, name: str, root: bool = False) -> Callable:
+        """Decorator form of span()"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Span(self, name, root):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _histogram(self, name: str) -> RollingHistogram:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.get(name)
+                if histogram is None:
+                    histogram = self.histograms[name] = RollingHistogram(self.window_seconds)
+        return histogram
+
+    def record_ns(self, name: str, elapsed_ns: int):
+        if self.enabled:
+            self._histogram(name).record(elapsed_ns // 1000)
+
+    def record(self, name: str, seconds: float):
+        self.record_ns(name, int(seconds * 1e9))
+
+    def profile_next(self, count: int = 1) -> int:
+        """Arm cProfile for the next count root spans; returns how many are pending"""
+        with self.lock:
+            self.profile_requests += max(0, int(count))
+            return self.profile_requests
+
+    def _start_cprofile(self) -> Optional[cProfile.Profile]:
+        with self.lock:
+            wanted = self.profile_requests > 0 or (self.sample_rate > 0 and random.random() < self.sample_rate)
+            if not wanted or not self._cprofile_lock.acquire(blocking=False):
+                return None
+            if self.profile_requests > 0:
+                self.profile_requests -= 1
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            # Another profiler (or debugger) already owns the interpreter hook
+            self._cprofile_lock.release()
+            logger.warning(f"⚠️ cProfile unavailable: {e}")
+            return None
+        return profile
+
+    def _finish_cprofile(self, profile: cProfile.Profile, name: str, elapsed_ns: int):
+        try:
+            profile.disable()
+            stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')
+            path = None
+            try:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                path = os.path.join(self.profile_dir, f"{name}-{stamp}.prof")
+                profile.dump_stats(path)
+            except OSError as e:
+                logger.warning(f"⚠️ Could not write profile dump: {e}")
+                path = None
+            text = io.StringIO()
+            pstats.Stats(profile, stream=text).sort_stats('cumulative').print_stats(25)
+            self.profiles.append({
+                'span': name,
+                'captured_at': datetime.now(timezone.utc).isoformat(),
+                'duration_ms': round(elapsed_ns / 1e6, 3),
+                'file': path,
+                'top': text.getvalue(),
+            })
+            logger.info(f"🔬 Profiled {name} ({elapsed_ns / 1e6:.0f}ms) -> {path or 'memory only'}")
+        except Exception as e:
+            logger.warning(f"⚠️ Profile capture failed: {e}")
+        finally:
+            self._cprofile_lock.release()
+
+    def snapshot(self, include_profiles: bool = False) -> Dict[str, Any]:
+        now = time.time()
+        with self.lock:
+            names = sorted(self.histograms)
+        result = {
+            'enabled': self.enabled,
+            'window_seconds': self.window_seconds,
+            'spans': {name: self.histograms[name].summary(now) for name in names},
+            'profile_pending': self.profile_requests,
+            'profile_sample_rate': self.sample_rate,
+        }
+        profiles = list(self.profiles)
+        if not include_profiles:
+            profiles = [{k: v for k, v in p.items() if k != 'top'} for p in profiles]
+        result['profiles'] = profiles
+        return result
+
+    def reset(self):
+        with self.lock:
+            self.histograms = {}
+            self.profiles.clear()
+
+
+# Global instance
+_profiler = None
+_profiler_lock = threading.Lock()
+
+
+def get_profiler() -> PerfProfiler:
+    """Get the process-wide profiler"""
+    global _profiler
+    if _profiler is None:
+        with _profiler_lock:
+            if _profiler is None:
+                _profiler = PerfProfiler()
+    return _profiler
+
+
+def span(name: str, root: bool = False):
+    """Shorthand for get_profiler().span(name)"""
+    return get_profiler().span(name, root)
+
+
+def profiled(name: str, root: bool = False) -> Callable:
+    """Decorator timing every call under name on the process-wide profiler"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = get_profiler()
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            with _Span(profiler, name, root):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
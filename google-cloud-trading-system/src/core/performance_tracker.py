@@ -12,8 +12,12 @@ from typing import Dict, List, Optional, Any
 from pathlib import Path
 import json
 
+from .time_rollups import create_rollup_tables, apply_snapshot, query_snapshots, resolution_for
+
 logger = logging.getLogger(__name__)
 
+HISTORY_FIELDS = ('balance', 'nav', 'pl', 'unrealized_pl', 'trade_count', 'open_positions', 'win_rate', 'status')
+
 class PerformanceTracker:
     """Track and store strategy performance history"""
     
@@ -91,22 +95,40 @@ class PerformanceTracker:
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_trades_account ON trade_history(account_id)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_daily_account ON daily_summary(account_id, date)")
         
+        # Hourly/daily/weekly/monthly rollups of the snapshots; history queries read these
+        if create_rollup_tables(conn):
+            conn.row_factory = sqlite3.Row
+            snapshots = conn.execute("SELECT * FROM strategy_snapshots").fetchall()
+            for row in snapshots:
+                self._apply_rollup(conn, row['timestamp'], dict(row))
+            if snapshots:
+                logger.info(f"✅ Backfilled snapshot rollups from {len(snapshots)} snapshots")
+        
         conn.commit()
         conn.close()
     
+    @staticmethod
+    def _apply_rollup(conn, timestamp: str, snapshot: Dict[str, Any]):
+        fields = {key: snapshot.get(key) for key in HISTORY_FIELDS}
+        fields['timestamp'] = timestamp
+        apply_snapshot(conn, snapshot['account_id'], timestamp, snapshot.get('nav') or 0, fields)
+    
     def capture_snapshot(self, account_data: Dict[str, Any]):
         """Capture current performance snapshot"""
         try:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
             
+            # Same UTC format as the column default, so rollups and rows agree
+            timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
             cursor.execute("""
                 INSERT INTO strategy_snapshots (
-                    account_id, strategy_name, display_name, balance, nav, pl, 
+                    timestamp, account_id, strategy_name, display_name, balance, nav, pl, 
                     unrealized_pl, trade_count, open_positions, win_rate, 
                     pairs, timeframe, daily_limit, status
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (
+                timestamp,
                 account_data.get('account_id'),
                 account_data.get('strategy_name'),
                 account_data.get('display_name'),
@@ -122,6 +144,17 @@ class PerformanceTracker:
                 account_data.get('daily_limit', 0),
                 account_data.get('status', 'unknown')
             ))
+            self._apply_rollup(conn, timestamp, {
+                'account_id': account_data.get('account_id'),
+                'balance': account_data.get('balance', 0),
+                'nav': account_data.get('nav', 0),
+                'pl': account_data.get('pl', 0),
+                'unrealized_pl': account_data.get('unrealized_pl', 0),
+                'trade_count': account_data.get('trade_count', 0),
+                'open_positions': account_data.get('open_positions', 0),
+                'win_rate': account_data.get('win_rate', 0),
+                'status': account_data.get('status', 'unknown'),
+            })
             
             conn.commit()
             conn.close()
@@ -132,39 +165,17 @@ class PerformanceTracker:
             return False
     
     def get_strategy_history(self, account_id: str, days: int = 7) -> List[Dict[str, Any]]:
-        """Get historical performance data for a strategy"""
+        """Get historical performance data for a strategy (the last snapshot of each hour, or day beyond a month)"""
         try:
             conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cutoff_date = datetime.now() - timedelta(days=days)
+            conn.row_factory = sqlite3.Row
             
-            cursor.execute("""
-                SELECT timestamp, balance, nav, pl, unrealized_pl, trade_count, 
-                       open_positions, win_rate, status
-                FROM strategy_snapshots
-                WHERE account_id = ? AND timestamp >= ?
-                ORDER BY timestamp ASC
-            """, (account_id, cutoff_date))
-            
-            rows = cursor.fetchall()
+            # Snapshot timestamps are UTC; reads the rollups, so cost does not grow with snapshot count
+            points = query_snapshots(conn, account_id, resolution_for(days), datetime.utcnow() - timedelta(days=days))
             conn.close()
             
-            history = []
-            for row in rows:
-                history.append({
-                    'timestamp': row[0],
-                    'balance': row[1],
-                    'nav': row[2],
-                    'pl': row[3],
-                    'unrealized_pl': row[4],
-                    'trade_count': row[5],
-                    'open_positions': row[6],
-                    'win_rate': row[7],
-                    'status': row[8]
-                })
-            
-            return history
+            return [{key: point['last_values'].get(key) for key in ('timestamp',) + HISTORY_FIELDS}
+                    for point in points]
         except Exception as e:
             logger.error(f"❌ Failed to get history for {account_id}: {e}")
             return []
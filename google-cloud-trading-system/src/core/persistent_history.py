@@ -7,21 +7,31 @@ import os
 import logging
 from datetime import datetime, timezone
 from typing import Dict, List, Any
-from collections import deque
 import threading
 
+import numpy as np
+
 from .data_feed import MarketData
+from .candle_store import to_ns, ns_to_oanda
+from .ring_buffer import RingBuffer
+
+# In-memory record per tick; times are int64 ns since epoch
+HISTORY_DTYPE = np.dtype([('bid', 'f8'), ('ask', 'f8'), ('spread', 'f8'), ('time', 'i8'), ('saved_at', 'i8')])
 
 logger = logging.getLogger(__name__)
 
 class PersistentHistoryManager:
     """Manages persistent price history storage"""
     
-    def __init__(self, storage_dir: str = "price_history"):
+    def __init__(self, storage_dir: str = "price_history", journal=None):
         self.storage_dir = storage_dir
         self.history_files = {}
         self.max_history = 1000
         self.lock = threading.Lock()
+        # With a tick journal every tick is appended there (once: by the journal's
+        # own bus subscription if attached, else from here); the JSON files are
+        # only rewritten by save_all_histories() instead of every 10 ticks
+        self.journal = journal
         
         # Create storage directory
         os.makedirs(storage_dir, exist_ok=True)
@@ -34,20 +44,20 @@ class PersistentHistoryManager:
             with self.lock:
                 # Get or create history file for instrument
                 if instrument not in self.history_files:
-                    self.history_files[instrument] = deque(maxlen=self.max_history)
+                    self.history_files[instrument] = RingBuffer(self.max_history, dtype=HISTORY_DTYPE)
+                history = self.history_files[instrument]
                 
                 # Add to memory buffer
-                self.history_files[instrument].append({
-                    'instrument': market_data.instrument,
-                    'bid': market_data.bid,
-                    'ask': market_data.ask,
-                    'timestamp': market_data.timestamp,
-                    'spread': market_data.spread,
-                    'saved_at': datetime.now(timezone.utc).isoformat()
-                })
+                time_ns = to_ns(market_data.timestamp)
+                history.append((market_data.bid, market_data.ask, market_data.spread,
+                                time_ns, to_ns(datetime.now(timezone.utc))))
                 
-                # Save to disk every 10 updates
-                if len(self.history_files[instrument]) % 10 == 0:
+                if self.journal is not None:
+                    # A journal attached to the bus already records this tick from there
+                    if self.journal.subscription is None:
+                        self.journal.append_tick(instrument, market_data.bid, market_data.ask, time_ns)
+                # Save to disk every 10 updates (counted over all appends, not the capped length)
+                elif history.total % 10 == 0:
                     self._save_to_disk(instrument)
                 
         except Exception as e:
@@ -58,8 +68,8 @@ class PersistentHistoryManager:
         try:
             file_path = os.path.join(self.storage_dir, f"{instrument.replace('/', '_')}.json")
             
-            # Convert deque to list for JSON serialization
-            history_data = list(self.history_files[instrument])
+            # Same list-of-dicts file format as before the ring buffer
+            history_data = self._records(instrument, self.history_files[instrument].tolist())
             
             with open(file_path, 'w') as f:
                 json.dump(history_data, f, indent=2)
@@ -99,37 +109,43 @@ class PersistentHistoryManager:
                         # Convert to MarketData objects
                         market_data_list = []
                         for item in disk_data[-count:]:
-                            market_data = MarketData(
-                                instrument=item['instrument'],
-                                bid=item['bid'],
-                                ask=item['ask'],
-                                timestamp=item['timestamp'],
-                                spread=item['spread']
-                            )
-                            market_data_list.append(market_data)
+                            market_data_list.append(self._market_data(item))
                         return market_data_list
                     return []
                 
                 # Get from memory buffer
-                recent_data = list(self.history_files[instrument])[-count:]
-                market_data_list = []
-                
-                for item in recent_data:
-                    market_data = MarketData(
-                        instrument=item['instrument'],
-                        bid=item['bid'],
-                        ask=item['ask'],
-                        timestamp=item['timestamp'],
-                        spread=item['spread']
-                    )
-                    market_data_list.append(market_data)
-                
-                return market_data_list
+                recent_data = self._records(instrument, self.history_files[instrument][-count:].tolist())
+                return [self._market_data(item) for item in recent_data]
                 
         except Exception as e:
             logger.error(f"❌ Error getting latest prices for {instrument}: {e}")
             return []
     
+    @staticmethod
+    def _records(instrument: str, rows: List[tuple]) -> List[Dict[str, Any]]:
+        """Ring rows as the JSON records stored on disk"""
+        return [{
+            'instrument': instrument,
+            'bid': bid,
+            'ask': ask,
+            'timestamp': ns_to_oanda(time_ns),
+            'spread': spread,
+            'saved_at': datetime.fromtimestamp(saved_ns / 1e9, tz=timezone.utc).isoformat()
+        } for bid, ask, spread, time_ns, saved_ns in rows]
+    
+    @staticmethod
+    def _market_data(item: Dict[str, Any]) -> MarketData:
+        return MarketData(
+            pair=item['instrument'],
+            bid=item['bid'],
+            ask=item['ask'],
+            timestamp=item['timestamp'],
+            is_live=False,
+            data_source='PersistentHistory',
+            spread=item['spread'],
+            last_update_age=0
+        )
+    
     def save_all_histories(self):
         """Save all instrument histories to disk"""
         try:
@@ -159,6 +175,9 @@ class PersistentHistoryManager:
                     stats['total_files'] += 1
                     stats['total_size_bytes'] += os.path.getsize(file_path)
             
+            if self.journal is not None:
+                stats['journal'] = self.journal.get_stats()
+            
             return stats
             
         except Exception as e:
@@ -172,5 +191,6 @@ def get_persistent_history() -> PersistentHistoryManager:
     """Get persistent history manager instance"""
     global _history_manager
     if _history_manager is None:
-        _history_manager = PersistentHistoryManager()
+        from .tick_journal import journal_enabled, get_tick_journal
+        _history_manager = PersistentHistoryManager(journal=get_tick_journal() if journal_enabled() else None)
     return _history_manager
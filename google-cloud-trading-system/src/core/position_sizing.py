@@ -5,6 +5,7 @@ Calculates proper lot sizes based on account balance, risk percentage, and ATR
 """
 
 import logging
+import threading
 from typing import Dict, Optional
 from dataclasses import dataclass
 
@@ -215,12 +216,15 @@ class PositionSizer:
 
 # Global instance
 _position_sizer = None
+_position_sizer_lock = threading.Lock()
 
 def get_position_sizer() -> PositionSizer:
     """Get global position sizer instance"""
     global _position_sizer
     if _position_sizer is None:
-        _position_sizer = PositionSizer()
+        with _position_sizer_lock:
+            if _position_sizer is None:
+                _position_sizer = PositionSizer()
     return _position_sizer
 
 
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Coalescing Latest-Price Cache
+Per-instrument TTL, single-flight misses and batched pricing calls shared by every OandaClient on an account
+"""
+
+import os
+import time
+import logging
+import threading
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_ttls(spec: str) -> Dict[str, float]:
+    """'XAU_USD=2,EUR_USD=5' -> {'XAU_USD': 2.0, 'EUR_USD': 5.0}"""
+    ttls = {}
+    for item in filter(None, (part.strip() for part in (spec or '').split(','))):
+        instrument, _, seconds = item.partition('=')
+        try:
+            ttls[instrument.strip()] = float(seconds)
+        except ValueError:
+            logger.warning(f"⚠️ Ignoring bad price TTL entry {item!r}")
+    return ttls
+
+
+class _Flight:
+    """One pricing request: its instruments, and the result every waiter shares"""
+
+    __slots__ = ('instruments', 'done', 'prices', 'error')
+
+    def __init__(self):
+        self.instruments = set()
+        self.done = threading.Event()
+        self.prices: Dict[str, Any] = {}
+        self.error: Optional[Exception] = None
+
+
+class PriceCache:
+    """
+    Latest price per instrument with request coalescing.
+
+    get() returns cached prices younger than their instrument's TTL and
+    fetches the rest. Misses are single-flighted: an instrument already
+    being fetched is waited on, not requested again, and misses from
+    callers arriving within batch_window of each other are merged into one
+    pricing call. Each returned price is a copy carrying its staleness
+    (fetched_at, age_seconds, stale, source). If a fetch fails, the last
+    known price is returned marked stale, as the client always did.
+    """
+
+    def __init__(self, ttl: float = None, ttls: Dict[str, float] = None, batch_window: float = None,
+                 wait_timeout: float = None, name: str = 'prices'):
+        self.name = name
+        self.ttl = float(os.getenv('OANDA_PRICE_CACHE_TTL', '5')) if ttl is None else ttl
+        self.ttls = _parse_ttls(os.getenv('OANDA_PRICE_CACHE_TTLS', '')) if ttls is None else dict(ttls)
+        self.batch_window = (float(os.getenv('OANDA_PRICE_BATCH_WINDOW_MS', '2')) / 1000
+                             if batch_window is None else batch_window)
+        self.wait_timeout = float(os.getenv('OANDA_PRICE_WAIT_TIMEOUT', '35')) if wait_timeout is None else wait_timeout
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Tuple[Any, float]] = {}  # instrument -> (price, fetched monotonic)
+        self.inflight: Dict[str, _Flight] = {}
+        self.pending: Optional[_Flight] = None  # Batch still accepting instruments
+        self.stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'merged': 0, 'fetches': 0,
+                      'fetched_instruments': 0, 'errors': 0, 'fallbacks': 0}
+
+    def ttl_for(self, instrument: str) -> float:
+        return self.ttls.get(instrument, self.ttl)
+
+    def set_ttl(self, instrument: str, seconds: float):
+        self.ttls[instrument] = seconds
+
+    def _annotate(self, price: Any, fetched: float, now: float, source: str, stale: bool = None) -> Any:
+        age = max(0.0, now - fetched)
+        if stale is None:
+            stale = age > self.ttl_for(getattr(price, 'instrument', None))
+        try:
+            return replace(price, fetched_at=datetime.now(timezone.utc) - timedelta(seconds=age),
+                           age_seconds=round(age, 3), stale=stale, source=source)
+        except (TypeError, ValueError):
+            return price  # Not an OandaPrice-style dataclass; hand back as is
+
+    def put(self, prices: Dict[str, Any]):
+        """Store freshly fetched (or streamed) prices"""
+        now = time.monotonic()
+        with self.lock:
+            for instrument, price in prices.items():
+                self.entries[instrument] = (price, now)
+
+    def get(self, instruments: Iterable[str], fetch: Callable[[List[str]], Dict[str, Any]],
+            force_refresh: bool = False) -> Dict[str, Any]:
+        """
+        Latest prices for instruments, calling fetch(instrument_list) only for misses.
+
+        fetch returns {instrument: price} and may raise; with force_refresh
+        every instrument is a miss (but still joins a request in flight,
+        whose answer is newer than this call).
+        """
+        instruments = list(dict.fromkeys(instruments))
+        now = time.monotonic()
+        result, waits, lead = {}, set(), None
+        with self.lock:
+            for instrument in instruments:
+                entry = self.entries.get(instrument)
+                if not force_refresh and entry is not None and now - entry[1] <= self.ttl_for(instrument):
+                    result[instrument] = self._annotate(entry[0], entry[1], now, 'cache')
+                    self.stats['hits'] += 1
+                    continue
+                flight = self.inflight.get(instrument)
+                if flight is not None:
+                    # Someone is already fetching it (or about to, in an open batch)
+                    waits.add(flight)
+                    self.stats['coalesced'] += 1
+                    continue
+                if self.pending is None:
+                    self.pending = lead = _Flight()
+                elif lead is not self.pending:
+                    self.stats['merged'] += 1  # Rides along in another caller's batch
+                self.pending.instruments.add(instrument)
+                self.inflight[instrument] = self.pending
+                waits.add(self.pending)
+                self.stats['misses'] += 1
+
+        if lead is not None:
+            self._run(lead, fetch)
+
+        for flight in waits:
+            if not flight.done.wait(self.wait_timeout):
+                logger.warning(f"⚠️ Price request still in flight after {self.wait_timeout:.0f}s - using last known prices")
+        now = time.monotonic()
+        with self.lock:
+            for instrument in instruments:
+                if instrument in result:
+                    continue
+                flight = next((f for f in waits if instrument in f.instruments), None)
+                if flight is not None and flight.done.is_set() and instrument in flight.prices:
+                    price = flight.prices[instrument]
+                    entry = self.entries.get(instrument)
+                    fetched = entry[1] if entry is not None and entry[0] is price else now
+                    result[instrument] = self._annotate(price, fetched, now, 'api' if flight is lead else 'coalesced')
+                elif instrument in self.entries:
+                    # Fetch failed or timed out: last known price, flagged stale
+                    price, fetched = self.entries[instrument]
+                    result[instrument] = self._annotate(price, fetched, now, 'fallback', stale=True)
+                    self.stats['fallbacks'] += 1
+        return {instrument: result[instrument] for instrument in instruments if instrument in result}
+
+    def _run(self, flight: _Flight, fetch: Callable[[List[str]], Dict[str, Any]]):
+        """Leader: let concurrent misses join for batch_window, then make the one pricing call"""
+        if self.batch_window > 0:
+            time.sleep(self.batch_window)
+        with self.lock:
+            if self.pending is flight:
+                self.pending = None
+            instruments = sorted(flight.instruments)
+        try:
+            prices = fetch(instruments) or {}
+            flight.prices = prices
+            self.put(prices)
+        except Exception as e:
+            flight.error = e
+            logger.error(f"❌ Price fetch failed for {len(instruments)} instruments: {e}")
+        finally:
+            with self.lock:
+                self.stats['fetches'] += 1
+                self.stats['fetched_instruments'] += len(instruments)
+                if flight.error is not None:
+                    self.stats['errors'] += 1
+                for instrument in instruments:
+                    if self.inflight.get(instrument) is flight:
+                        del self.inflight[instrument]
+            flight.done.set()
+
+    def latest(self, instruments: Iterable[str] = None) -> Dict[str, Any]:
+        """Whatever is cached, without fetching (stale entries included, and flagged)"""
+        now = time.monotonic()
+        with self.lock:
+            items = self.entries.items() if instruments is None else (
+                (i, self.entries[i]) for i in instruments if i in self.entries)
+            return {instrument: self._annotate(price, fetched, now, 'cache') for instrument, (price, fetched) in items}
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            stats = dict(self.stats)
+            stats['cached'] = len(self.entries)
+            stats['inflight'] = len(self.inflight)
+        lookups = stats['hits'] + stats['misses'] + stats['coalesced']
+        stats['hit_ratio'] = round(stats['hits'] / lookups, 3) if lookups else None
+        stats['avg_batch'] = round(stats['fetched_instruments'] / stats['fetches'], 2) if stats['fetches'] else None
+        stats.update({'ttl': self.ttl, 'ttls': dict(self.ttls), 'batch_window_ms': self.batch_window * 1000})
+        return stats
+
+
+# Global caches, one per pricing endpoint (environment + account)
+_price_caches: Dict[str, PriceCache] = {}
+_price_caches_lock = threading.Lock()
+
+
+def get_price_cache(key: str) -> PriceCache:
+    """Get the process-wide price cache for a pricing endpoint"""
+    cache = _price_caches.get(key)
+    if cache is None:
+        with _price_caches_lock:
+            cache = _price_caches.get(key)
+            if cache is None:
+                cache = PriceCache(name=key.rsplit('/', 2)[-2] if '/' in key else key)
+                _price_caches[key] = cache
+    return cache
+
+
+def get_price_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats for every price cache, keyed by account"""
+    with _price_caches_lock:
+        caches = list(_price_caches.values())
+    return {cache.name: cache.get_stats() for cache in caches}
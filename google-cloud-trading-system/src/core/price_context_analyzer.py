@@ -5,6 +5,7 @@ Detects key price levels, patterns, and market structures
 """
 
 import logging
+import threading
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Optional, Tuple, Any
@@ -703,12 +704,15 @@ class PriceContextAnalyzer:
 
 # Global instance
 _price_context_analyzer = None
+_price_context_analyzer_lock = threading.Lock()
 
 def get_price_context_analyzer() -> PriceContextAnalyzer:
     """Get the global price context analyzer instance"""
     global _price_context_analyzer
     if _price_context_analyzer is None:
-        _price_context_analyzer = PriceContextAnalyzer()
+        with _price_context_analyzer_lock:
+            if _price_context_analyzer is None:
+                _price_context_analyzer = PriceContextAnalyzer()
     return _price_context_analyzer
 
 
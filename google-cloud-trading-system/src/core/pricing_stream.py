@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+OANDA v20 Pricing Stream Client
+Newline-delimited JSON over chunked HTTP with heartbeat watchdog, backoff reconnect and gap resume
+"""
+
+import os
+import json
+import time
+import random
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import requests
+
+from .candle_store import to_ns
+
+logger = logging.getLogger(__name__)
+
+STREAM_HOSTS = {
+    'practice': 'https://stream-fxpractice.oanda.com',
+    'live': 'https://stream-fxtrade.oanda.com',
+}
+
+
+class StreamLineParser:
+    """
+    Incremental parser for the v20 stream body.
+
+    Chunks from the HTTP layer do not line up with messages: one chunk may
+    carry several lines, or end halfway through one. feed() buffers the
+    partial tail and yields every complete JSON object. Malformed lines are
+    counted and skipped so one bad line never kills the stream.
+    """
+
+    def __init__(self):
+        self._buffer = b''
+        self.parse_errors = 0
+
+    def feed(self, chunk: bytes) -> Iterator[Dict[str, Any]]:
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split(b'\n')
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                self.parse_errors += 1
+                logger.warning(f"⚠️ Skipping malformed stream line: {line[:80]!r}")
+
+    def reset(self):
+        """Drop any partial line (a new connection starts a new body)"""
+        self._buffer = b''
+
+
+class PricingStream:
+    """
+    Long-lived /v3/accounts/{id}/pricing/stream connection.
+
+    PRICE messages go to on_price, HEARTBEAT messages (every 5s from OANDA)
+    feed the watchdog and on_heartbeat(server_time), which lets the owner
+    close bars in quiet markets on the server clock. If no message arrives for stale_after seconds
+    the connection is dropped and reopened with exponential backoff (reset
+    once a new connection delivers a message). After every reconnect,
+    on_gap(instrument, last_tick_ns) is called for each instrument that had
+    ticks, so the owner can backfill what was missed while disconnected.
+    """
+
+    def __init__(self, account_id: str, instruments: List[str], api_key: str,
+                 environment: str = 'practice', base_url: Optional[str] = None,
+                 on_price: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 on_gap: Optional[Callable[[str, int], None]] = None,
+                 on_heartbeat: Optional[Callable[[str], None]] = None,
+                 stale_after: float = None, backoff_initial: float = None,
+                 backoff_max: float = None, connect_timeout: float = 10.0):
+        self.account_id = account_id
+        self.instruments = list(instruments)
+        self.api_key = api_key
+        self.base_url = (base_url or STREAM_HOSTS.get(environment, STREAM_HOSTS['practice'])).rstrip('/')
+        self.on_price = on_price
+        self.on_gap = on_gap
+        self.on_heartbeat = on_heartbeat
+
+        self.stale_after = stale_after or float(os.getenv('OANDA_STREAM_STALE_SECONDS', '15'))
+        self.backoff_initial = backoff_initial or float(os.getenv('OANDA_STREAM_BACKOFF_INITIAL', '1'))
+        self.backoff_max = backoff_max or float(os.getenv('OANDA_STREAM_BACKOFF_MAX', '60'))
+        self.connect_timeout = connect_timeout
+
+        self.parser = StreamLineParser()
+        self.session: Optional[requests.Session] = None
+        self.thread: Optional[threading.Thread] = None
+        self.stop_event = threading.Event()
+        self.connected = threading.Event()
+        self.lock = threading.Lock()
+        self._response = None
+
+        # Resume point: time of the last tick seen per instrument (ns)
+        self.last_tick_ns: Dict[str, int] = {}
+        self.last_message_at: Optional[float] = None
+        self.last_heartbeat: Optional[str] = None
+
+        self.stats = {
+            'connects': 0,
+            'reconnects': 0,
+            'prices': 0,
+            'heartbeats': 0,
+            'stale_timeouts': 0,
+            'errors': 0,
+            'gaps_backfilled': 0,
+        }
+
+    @property
+    def url(self) -> str:
+        return f"{self.base_url}/v3/accounts/{self.account_id}/pricing/stream"
+
+    @property
+    def is_running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        """Start the stream thread (returns immediately)"""
+        if self.is_running:
+            logger.warning("⚠️ Pricing stream already running")
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name='oanda-pricing-stream', daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop streaming and close the connection"""
+        self.stop_event.set()
+        self._close_response()
+        if self.thread:
+            self.thread.join(timeout=timeout)
+        if self.session:
+            self.session.close()
+            self.session = None
+        self.connected.clear()
+
+    def _close_response(self):
+        with self.lock:
+            response, self._response = self._response, None
+        if response is not None:
+            try:
+                response.close()
+            except Exception:
+                pass
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with +/-20% jitter, capped at backoff_max"""
+        delay = min(self.backoff_max, self.backoff_initial * (2 ** attempt))
+        return delay * random.uniform(0.8, 1.2)
+
+    def _run(self):
+        attempt = 0
+        while not self.stop_event.is_set():
+            try:
+                received = self._stream_once()
+                if received:
+                    attempt = 0
+            except (requests.RequestException, OSError) as e:
+                if self.stop_event.is_set():
+                    break
+                self.stats['errors'] += 1
+                logger.warning(f"⚠️ Pricing stream connection error: {e}")
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"❌ Pricing stream error: {e}")
+            finally:
+                self.connected.clear()
+                self._close_response()
+
+            if self.stop_event.is_set():
+                break
+            delay = self._backoff_delay(attempt)
+            attempt += 1
+            self.stats['reconnects'] += 1
+            logger.info(f"🔄 Reconnecting pricing stream in {delay:.1f}s (attempt {attempt})")
+            self.stop_event.wait(delay)
+
+    def _stream_once(self) -> bool:
+        """One connection: read until it ends, goes stale or stop() is called. True if any message arrived."""
+        if self.session is None:
+            self.session = requests.Session()
+        self.parser.reset()
+
+        response = self.session.get(
+            self.url,
+            params={'instruments': ','.join(self.instruments)},
+            headers={'Authorization': f'Bearer {self.api_key}', 'Accept-Datetime-Format': 'RFC3339'},
+            stream=True,
+            # The read timeout is the watchdog for a fully silent socket
+            timeout=(self.connect_timeout, self.stale_after),
+        )
+        with self.lock:
+            self._response = response
+        if self.stop_event.is_set():
+            return False
+        if response.status_code != 200:
+            raise requests.HTTPError(f"HTTP {response.status_code}: {response.text[:200]}")
+
+        self.stats['connects'] += 1
+        self.connected.set()
+        self.last_message_at = time.monotonic()
+        logger.info(f"✅ Pricing stream connected ({len(self.instruments)} instruments)")
+        if self.stats['connects'] > 1:
+            self._resume_gaps()
+
+        received = False
+        try:
+            for chunk in response.iter_content(chunk_size=None):
+                if self.stop_event.is_set():
+                    break
+                for message in self.parser.feed(chunk):
+                    received = True
+                    self.last_message_at = time.monotonic()
+                    self._dispatch(message)
+                # Bytes that never complete a message (or prices with no heartbeats
+                # after a silent stall) still count as stale
+                if time.monotonic() - self.last_message_at > self.stale_after:
+                    self._mark_stale()
+                    break
+        except requests.exceptions.ConnectionError as e:
+            # urllib3 surfaces the read timeout as a ConnectionError mid-iteration
+            if self.stop_event.is_set():
+                return received
+            if 'timed out' in str(e).lower():
+                self._mark_stale()
+            else:
+                raise
+        else:
+            if not self.stop_event.is_set():
+                logger.warning("⚠️ Pricing stream closed by server")
+        return received
+
+    def _mark_stale(self):
+        self.stats['stale_timeouts'] += 1
+        logger.warning(f"⚠️ Pricing stream stale (no message for {self.stale_after:g}s) - reconnecting")
+
+    def _dispatch(self, message: Dict[str, Any]):
+        kind = message.get('type')
+        if kind == 'HEARTBEAT':
+            self.stats['heartbeats'] += 1
+            self.last_heartbeat = message.get('time')
+            if self.on_heartbeat and self.last_heartbeat:
+                try:
+                    self.on_heartbeat(self.last_heartbeat)
+                except Exception as e:
+                    logger.error(f"❌ Heartbeat callback error: {e}")
+            return
+        if kind not in ('PRICE', None) or 'instrument' not in message:
+            return
+        self.stats['prices'] += 1
+        tick_time = message.get('time')
+        if tick_time:
+            try:
+                self.last_tick_ns[message['instrument']] = to_ns(tick_time)
+            except ValueError:
+                pass
+        if self.on_price:
+            try:
+                self.on_price(message)
+            except Exception as e:
+                logger.error(f"❌ Price callback error: {e}")
+
+    def _resume_gaps(self):
+        """Let the owner backfill each instrument from its last tick to now"""
+        if not self.on_gap:
+            return
+        for instrument, since_ns in list(self.last_tick_ns.items()):
+            try:
+                self.on_gap(instrument, since_ns)
+                self.stats['gaps_backfilled'] += 1
+            except Exception as e:
+                logger.warning(f"⚠️ Gap backfill failed for {instrument}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats.update({
+            'connected': self.connected.is_set(),
+            'parse_errors': self.parser.parse_errors,
+            'last_heartbeat': self.last_heartbeat,
+            'seconds_since_message': (round(time.monotonic() - self.last_message_at, 3)
+                                      if self.last_message_at is not None else None),
+        })
+        return stats
@@ -5,6 +5,7 @@ Manages trailing stops and break-even moves to protect gains
 """
 
 import logging
+import threading
 from typing import Dict, Optional
 from datetime import datetime
 
@@ -267,10 +268,13 @@ class ProfitProtector:
 
 # Global instance
 _profit_protector = None
+_profit_protector_lock = threading.Lock()
 
 def get_profit_protector(config: Optional[Dict] = None) -> ProfitProtector:
     """Get the global profit protector instance"""
     global _profit_protector
     if _profit_protector is None:
-        _profit_protector = ProfitProtector(config)
+        with _profit_protector_lock:
+            if _profit_protector is None:
+                _profit_protector = ProfitProtector(config)
     return _profit_protector
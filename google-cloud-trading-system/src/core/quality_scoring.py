@@ -6,6 +6,7 @@ Evaluates trade quality based on multiple factors
 """
 
 import logging
+import threading
 import numpy as np
 from typing import Dict, List, Optional, Tuple, Any
 from enum import Enum
@@ -650,12 +651,15 @@ class QualityScoring:
 
 # Global instance
 _quality_scoring = None
+_quality_scoring_lock = threading.Lock()
 
 def get_quality_scoring() -> QualityScoring:
     """Get the global quality scoring instance"""
     global _quality_scoring
     if _quality_scoring is None:
-        _quality_scoring = QualityScoring()
+        with _quality_scoring_lock:
+            if _quality_scoring is None:
+                _quality_scoring = QualityScoring()
     return _quality_scoring
 
 
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Shared OANDA Rate Limiter
+Process-wide token bucket per API token with priority lanes (orders > prices > dashboard)
+"""
+
+import os
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Priority lanes - lower value is served first
+PRIORITY_ORDER = 0
+PRIORITY_PRICE = 1
+PRIORITY_DASHBOARD = 2
+
+LANE_NAMES = {
+    PRIORITY_ORDER: 'orders',
+    PRIORITY_PRICE: 'prices',
+    PRIORITY_DASHBOARD: 'dashboard'
+}
+
+# Wait-time histogram bucket upper bounds in milliseconds (last bucket is overflow)
+WAIT_BUCKETS_MS = [0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+
+class WaitHistogram:
+    """Fixed-bucket histogram of limiter wait times"""
+
+    def __init__(self):
+        self.counts = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, wait_ms: float):
+        index = len(WAIT_BUCKETS_MS)
+        for i, bound in enumerate(WAIT_BUCKETS_MS):
+            if wait_ms <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.total += 1
+        self.sum_ms += wait_ms
+        self.max_ms = max(self.max_ms, wait_ms)
+
+    def to_dict(self) -> Dict[str, Any]:
+        buckets = {f"le_{bound}ms": self.counts[i] for i, bound in enumerate(WAIT_BUCKETS_MS)}
+        buckets['overflow'] = self.counts[-1]
+        return {
+            'count': self.total,
+            'avg_ms': round(self.sum_ms / self.total, 3) if self.total else 0.0,
+            'max_ms': round(self.max_ms, 3),
+            'buckets': buckets
+        }
+
+
+class TokenBucketLimiter:
+    """
+    Thread-safe token bucket with priority lanes.
+
+    A request may only take a token when no higher-priority lane has waiters,
+    so order placement never queues behind price polls or dashboard reads.
+    Waiters block on a condition variable until the next token is due.
+    """
+
+    def __init__(self, rate: float, capacity: float, name: str = 'default'):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.name = name
+        self.tokens = float(capacity)
+        self.last_refill = time.monotonic()
+        self.condition = threading.Condition(threading.Lock())
+        self.waiting: Dict[int, int] = {lane: 0 for lane in LANE_NAMES}
+        self.histograms: Dict[int, WaitHistogram] = {lane: WaitHistogram() for lane in LANE_NAMES}
+        self.timeouts = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self.last_refill
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.last_refill = now
+
+    def _higher_priority_waiting(self, priority: int) -> bool:
+        return any(count > 0 for lane, count in self.waiting.items() if lane < priority)
+
+    def acquire(self, priority: int = PRIORITY_DASHBOARD, timeout: Optional[float] = None) -> bool:
+        """Take one token, blocking until available. Returns False on timeout."""
+        if priority not in self.waiting:
+            priority = PRIORITY_DASHBOARD
+        start = time.monotonic()
+        deadline = start + timeout if timeout is not None else None
+
+        with self.condition:
+            self.waiting[priority] += 1
+            try:
+                while True:
+                    self._refill()
+                    if self.tokens >= 1.0 and not self._higher_priority_waiting(priority):
+                        self.tokens -= 1.0
+                        self.histograms[priority].record((time.monotonic() - start) * 1000.0)
+                        return True
+
+                    # Sleep until the next token is due; if only held back by a
+                    # higher lane, sleep until that waiter is served and notifies
+                    if self.tokens >= 1.0:
+                        wait_for = None
+                    else:
+                        wait_for = max((1.0 - self.tokens) / self.rate, 0.001)
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.timeouts += 1
+                            return False
+                        wait_for = remaining if wait_for is None else min(wait_for, remaining)
+                    self.condition.wait(wait_for)
+            finally:
+                self.waiting[priority] -= 1
+                # Lower lanes may have been held back by this waiter
+                self.condition.notify_all()
+
+    async def acquire_async(self, priority: int = PRIORITY_DASHBOARD, timeout: Optional[float] = None) -> bool:
+        """Coroutine variant of acquire() sharing the same bucket and priority lanes.
+
+        Async callers cannot block on the condition variable, so they poll the
+        bucket with asyncio.sleep() sized to the next token's arrival.
+        """
+        if priority not in self.waiting:
+            priority = PRIORITY_DASHBOARD
+        start = time.monotonic()
+        deadline = start + timeout if timeout is not None else None
+
+        with self.condition:
+            self.waiting[priority] += 1
+        try:
+            while True:
+                with self.condition:
+                    self._refill()
+                    # Our own registration does not count as a higher-priority waiter
+                    if self.tokens >= 1.0 and not self._higher_priority_waiting(priority):
+                        self.tokens -= 1.0
+                        self.histograms[priority].record((time.monotonic() - start) * 1000.0)
+                        return True
+                    wait_for = max((1.0 - self.tokens) / self.rate, 0.001)
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        with self.condition:
+                            self.timeouts += 1
+                        return False
+                    wait_for = min(wait_for, remaining)
+                await asyncio.sleep(wait_for)
+        finally:
+            with self.condition:
+                self.waiting[priority] -= 1
+                self.condition.notify_all()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.condition:
+            self._refill()
+            return {
+                'name': self.name,
+                'rate_per_sec': self.rate,
+                'capacity': self.capacity,
+                'tokens_available': round(self.tokens, 3),
+                'timeouts': self.timeouts,
+                'waiting': {LANE_NAMES[lane]: count for lane, count in self.waiting.items()},
+                'wait_histograms': {LANE_NAMES[lane]: h.to_dict() for lane, h in self.histograms.items()}
+            }
+
+
+# Global registry - one bucket per API token, shared by all clients and threads
+_limiters: Dict[str, TokenBucketLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def _token_key(api_key: str) -> str:
+    """Stable, non-reversible key so raw tokens never appear in stats"""
+    return hashlib.sha256((api_key or '').encode()).hexdigest()[:12]
+
+
+def get_rate_limiter(api_key: str) -> TokenBucketLimiter:
+    """Get the process-wide limiter for an OANDA API token"""
+    key = _token_key(api_key)
+    limiter = _limiters.get(key)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(key)
+            if limiter is None:
+                rate = float(os.getenv('OANDA_RATE_LIMIT_PER_SEC', '20'))
+                capacity = float(os.getenv('OANDA_RATE_LIMIT_BURST', '10'))
+                limiter = TokenBucketLimiter(rate=rate, capacity=capacity, name=key)
+                _limiters[key] = limiter
+                logger.info(f"✅ Rate limiter created for token {key} ({rate}/s, burst {capacity})")
+    return limiter
+
+
+def get_all_rate_limiter_stats() -> List[Dict[str, Any]]:
+    """Stats (including wait-time histograms) for every token bucket"""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return [limiter.get_stats() for limiter in limiters]
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Fixed-Capacity Ring Buffer
+Bounded O(1)-append price history with zero-copy NumPy window views
+"""
+
+import logging
+from typing import Any, Iterable, Iterator, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Record layout for bid/ask quote histories (time is int64 ns since epoch)
+QUOTE_DTYPE = np.dtype([('bid', 'f8'), ('ask', 'f8'), ('time', 'i8')])
+
+
+class RingBuffer:
+    """
+    Keeps the last capacity values of a typed stream.
+
+    Storage is a NumPy array of 2 * capacity slots and every value is written
+    twice (slot k and slot k + capacity), so the live window is always one
+    contiguous slice: reads never copy and appends never reallocate. Memory is
+    fixed at construction.
+
+    Reads look like a list: len(), indexing (a Python scalar), iteration and
+    slicing. Slices and view() are read-only NumPy views that stay valid
+    until the next append. dtype may be a structured dtype (see QUOTE_DTYPE),
+    in which case append() takes a tuple and view()['bid'] is a column view.
+    """
+
+    def __init__(self, capacity: int, values: Optional[Iterable[Any]] = None,
+                 dtype: Union[np.dtype, str] = np.float64):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.capacity = int(capacity)
+        self.dtype = np.dtype(dtype)
+        self._data = np.zeros(2 * self.capacity, dtype=self.dtype)
+        self._next = 0  # Slot the next value goes to
+        self._size = 0
+        self.total = 0  # Values ever appended
+        if values is not None:
+            self.extend(values)
+
+    def append(self, value: Any):
+        k = self._next
+        self._data[k] = value
+        self._data[k + self.capacity] = value
+        self._next = k + 1 if k + 1 < self.capacity else 0
+        if self._size < self.capacity:
+            self._size += 1
+        self.total += 1
+
+    def extend(self, values: Iterable[Any]):
+        if isinstance(values, RingBuffer):
+            values = values.view()
+        for value in values:
+            self.append(value)
+
+    def clear(self):
+        self._next = 0
+        self._size = 0
+        self.total = 0
+
+    def view(self) -> np.ndarray:
+        """Read-only view of the live window, oldest first"""
+        end = self._next + self.capacity
+        window = self._data[end - self._size:end]
+        window.flags.writeable = False
+        return window
+
+    def __array__(self, dtype=None, copy=None):
+        window = self.view()
+        if dtype is not None and np.dtype(dtype) != window.dtype:
+            return window.astype(dtype)
+        return window.copy() if copy else window
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.view()[index]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("ring buffer index out of range")
+        return self._data[self._next + self.capacity - self._size + index].item()
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.view().tolist())
+
+    def tolist(self) -> list:
+        return self.view().tolist()
+
+    def __repr__(self) -> str:
+        return f"RingBuffer(capacity={self.capacity}, len={self._size}, dtype={self.dtype})"
+
+
+def as_ring(values: Optional[Iterable[Any]], capacity: int) -> RingBuffer:
+    """
+    values as a float RingBuffer of this capacity.
+
+    Returned unchanged if it already is one; lists and arrays (e.g. histories
+    a backtest driver reset or trimmed itself) are converted, keeping the last
+    capacity values.
+    """
+    if isinstance(values, RingBuffer) and values.capacity == capacity:
+        return values
+    ring = RingBuffer(capacity)
+    if values is not None:
+        ring.extend(values[-capacity:] if hasattr(values, '__getitem__') else values)
+    return ring
@@ -5,6 +5,7 @@ Tracks active market sessions and provides timezone-aware scheduling
 """
 
 import logging
+import threading
 import pytz
 from datetime import datetime, time, timedelta
 from enum import Enum
@@ -410,12 +411,15 @@ class SessionManager:
 
 # Global instance
 _session_manager = None
+_session_manager_lock = threading.Lock()
 
 def get_session_manager() -> SessionManager:
     """Get the global session manager instance"""
     global _session_manager
     if _session_manager is None:
-        _session_manager = SessionManager()
+        with _session_manager_lock:
+            if _session_manager is None:
+                _session_manager = SessionManager()
     return _session_manager
 
 
@@ -4,13 +4,16 @@ SIMPLE TIMER SCANNER - NO WEBSOCKET, NO EVENTS, JUST WORKS
 Scans every 5 minutes, generates signals, NO EXCUSES
 """
 
+import atexit
 import logging
 import threading
 import time
+from collections import deque
 from datetime import datetime, timezone
-from typing import Dict, List
+from functools import partial
+from typing import Dict, List, Optional, Tuple
 
-from .oanda_client import get_oanda_client, OandaClient
+from .oanda_client import get_oanda_client, OandaClient, OandaPrice
 from .telegram_notifier import get_telegram_notifier
 from .optimization_loader import load_optimization_results, apply_per_pair_to_ultra_strict, apply_per_pair_to_momentum, apply_per_pair_to_gold
 from .yaml_manager import get_yaml_manager
@@ -18,18 +21,27 @@ from .economic_calendar import get_economic_calendar
 from .trump_dna_framework import get_trump_dna_planner
 from .adaptive_scanner_integration import AdaptiveScannerMixin
 from .signal_tracker import get_signal_tracker
-from src.strategies.ultra_strict_forex_optimized import get_ultra_strict_forex_strategy
-from src.strategies.momentum_trading import get_momentum_trading_strategy
-from src.strategies.gold_scalping_optimized import get_gold_scalping_strategy
-from src.strategies.gbp_usd_optimized import get_strategy_rank_1, get_strategy_rank_2, get_strategy_rank_3
-from src.strategies.champion_75wr import get_champion_75wr_strategy
-from src.strategies.ultra_strict_v2 import get_ultra_strict_v2_strategy
-from src.strategies.momentum_v2 import get_momentum_v2_strategy
-from src.strategies.all_weather_70wr import get_all_weather_70wr_strategy
-from src.strategies.breakout_strategy import get_breakout_strategy
-from src.strategies.scalping_strategy import get_scalping_strategy
-from src.strategies.swing_strategy import get_swing_strategy
-from src.strategies.adaptive_trump_gold_strategy import get_adaptive_trump_gold_strategy
+from .strategy_evaluator import StrategyEvaluator
+from .perf_profiler import get_profiler, profiled, span
+from .warm_start import get_warm_start_store, fetch_candle_batch, append_closes
+from .lazy_imports import lazy_import, resolve
+from .strategy_factory import build_concurrently
+
+# Strategy modules are imported on first use - only the ones active accounts need
+get_ultra_strict_forex_strategy = lazy_import('src.strategies.ultra_strict_forex_optimized', attr='get_ultra_strict_forex_strategy')
+get_momentum_trading_strategy = lazy_import('src.strategies.momentum_trading', attr='get_momentum_trading_strategy')
+get_gold_scalping_strategy = lazy_import('src.strategies.gold_scalping_optimized', attr='get_gold_scalping_strategy')
+get_strategy_rank_1 = lazy_import('src.strategies.gbp_usd_optimized', attr='get_strategy_rank_1')
+get_strategy_rank_2 = lazy_import('src.strategies.gbp_usd_optimized', attr='get_strategy_rank_2')
+get_strategy_rank_3 = lazy_import('src.strategies.gbp_usd_optimized', attr='get_strategy_rank_3')
+get_champion_75wr_strategy = lazy_import('src.strategies.champion_75wr', attr='get_champion_75wr_strategy')
+get_ultra_strict_v2_strategy = lazy_import('src.strategies.ultra_strict_v2', attr='get_ultra_strict_v2_strategy')
+get_momentum_v2_strategy = lazy_import('src.strategies.momentum_v2', attr='get_momentum_v2_strategy')
+get_all_weather_70wr_strategy = lazy_import('src.strategies.all_weather_70wr', attr='get_all_weather_70wr_strategy')
+get_breakout_strategy = lazy_import('src.strategies.breakout_strategy', attr='get_breakout_strategy')
+get_scalping_strategy = lazy_import('src.strategies.scalping_strategy', attr='get_scalping_strategy')
+get_swing_strategy = lazy_import('src.strategies.swing_strategy', attr='get_swing_strategy')
+get_adaptive_trump_gold_strategy = lazy_import('src.strategies.adaptive_trump_gold_strategy', attr='get_adaptive_trump_gold_strategy')
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +49,10 @@ class SimpleTimerScanner:
     """Simple scanner that just scans every 5 minutes"""
     
     def __init__(self):
+        self.init_started = time.perf_counter()
+        self.first_scan_seconds = None
+        self.warm_start = get_warm_start_store()
+        self.warm_start_mode = 'cold'
         self.oanda = get_oanda_client()
         self.notifier = get_telegram_notifier()
         self.economic_calendar = get_economic_calendar()
@@ -44,6 +60,9 @@ class SimpleTimerScanner:
         self.signal_tracker = get_signal_tracker()
         self.is_running = False
         self.scan_count = 0
+        self.pricing_calls = 0  # Batched snapshot calls made by _run_scan
+        self.scan_phase_timings = deque(maxlen=100)
+        self.evaluator = StrategyEvaluator(name='timer-scan')
         
         # Adaptive system tracking (from AdaptiveScannerMixin)
         self.last_signal_time = datetime.now()
@@ -92,6 +111,7 @@ class SimpleTimerScanner:
         self.accounts = {}
         
         # Load strategies from YAML
+        jobs, loaded_accounts = [], []
         for acc in yaml_accounts:
             if acc.get('active', False):
                 strategy_name = acc.get('strategy')
@@ -99,34 +119,54 @@ class SimpleTimerScanner:
                 
                 if strategy_name in strategy_loaders:
                     try:
-                        # Get instruments from account config
-                        instruments = acc.get('instruments') or acc.get('trading_pairs', [])
-                        
-                        # Load strategy with instruments if supported
-                        if strategy_name in strategies_with_instruments and instruments:
-                            strategy = strategy_loaders[strategy_name](instruments=instruments)
-                            logger.info(f"✅ Loaded: {display_name} ({strategy_name}) with instruments {instruments} → {acc['id']}")
-                        else:
-                            # Load strategy without instruments
-                            strategy = strategy_loaders[strategy_name]()
-                            logger.info(f"✅ Loaded: {display_name} ({strategy_name}) → {acc['id']}")
-                        
-                        self.strategies[display_name] = strategy
-                        self.accounts[display_name] = acc['id']
+                        loader = resolve(strategy_loaders[strategy_name])  # Import here, one module at a time
                     except Exception as e:
                         logger.error(f"❌ Failed to load {display_name} ({strategy_name}): {e}")
+                        continue
+                    # Get instruments from account config
+                    instruments = acc.get('instruments') or acc.get('trading_pairs', [])
+                    
+                    # Load strategy with instruments if supported
+                    if strategy_name in strategies_with_instruments and instruments:
+                        build = partial(loader, instruments=instruments)
+                    else:
+                        # Load strategy without instruments
+                        build = loader
+                        instruments = None
+                    # Getters returning a shared instance are built in order by one worker
+                    jobs.append((display_name, loader if instruments is None else display_name, build))
+                    loaded_accounts.append((display_name, strategy_name, instruments, acc['id']))
                 else:
                     logger.warning(f"⚠️ Strategy '{strategy_name}' not found in loader mapping for account {acc['id']}")
         
+        # Strategies skip their own candle prefill only when a usable snapshot will restore them
+        # (loaded up front: a stale, unreadable or other-version file must not leave them cold)
+        snapshot = self.warm_start.load() if self.warm_start.enabled else None
+        with span('startup.strategies'), self.warm_start.defer_prefill(snapshot is not None):
+            built = build_concurrently(jobs)
+        
+        for display_name, strategy_name, instruments, account_id in loaded_accounts:
+            strategy, error = built[display_name]
+            if error is not None:
+                logger.error(f"❌ Failed to load {display_name} ({strategy_name}): {error}")
+                continue
+            if instruments:
+                logger.info(f"✅ Loaded: {display_name} ({strategy_name}) with instruments {instruments} → {account_id}")
+            else:
+                logger.info(f"✅ Loaded: {display_name} ({strategy_name}) → {account_id}")
+            self.strategies[display_name] = strategy
+            self.accounts[display_name] = account_id
+            
         logger.info(f"✅ SimpleTimerScanner initialized with {len(self.strategies)} strategies from accounts.yaml")
         
-        # Backfill on initialization (APScheduler version)
+        # Restore from the warm-start snapshot (delta candles only), or backfill from scratch
         logger.info("📥 Backfilling historical data on init...")
         try:
-            self._backfill_all_strategies()
+            self._warm_start(snapshot)
             logger.info("✅ Backfill complete!")
         except Exception as e:
             logger.error(f"⚠️ Backfill failed (will retry): {e}")
+        atexit.register(self.save_warm_start)
         
         self.is_running = True
     
@@ -136,30 +176,66 @@ class SimpleTimerScanner:
         logger.info("APScheduler will handle scheduling - scanner ready")
         self.is_running = True
     
-    def _backfill_all_strategies(self):
-        """Backfill historical data for all strategies"""
+    def _warm_start(self, snapshot: Optional[Dict] = None):
+        """Restore strategies from the last snapshot and fetch only the candles since; cold backfill otherwise"""
+        started = time.perf_counter()
+        with span('startup.restore'):
+            restored = self.warm_start.restore(self.strategies, snapshot)
+        
+        if restored is None:
+            self._backfill_all_strategies()
+            self.warm_start_mode = 'cold'
+        else:
+            warm = {name: self.strategies[name] for name in restored['restored']}
+            self._backfill_delta(warm, restored['saved_at_ns'])
+            if restored['missing']:
+                # New or reconfigured accounts since the snapshot start from scratch
+                self._backfill_all_strategies({name: self.strategies[name] for name in restored['missing']})
+            self.warm_start_mode = f"warm ({len(warm)}/{len(self.strategies)} restored)"
+        
+        elapsed = time.perf_counter() - started
+        get_profiler().record('startup.backfill', elapsed)
+        logger.info(f"🚀 {self.warm_start_mode.capitalize()} start: strategies ready in {elapsed:.2f}s")
+    
+    def _backfill_delta(self, strategies: Dict, since_ns: int):
+        """Append closes of the M5 candles completed since the snapshot (one concurrent batch)"""
+        instruments = [inst for strategy in strategies.values() for inst in getattr(strategy, 'instruments', None) or []]
+        fetched = fetch_candle_batch(self.oanda, instruments, granularity='M5', since_ns=since_ns)
+        added = 0
+        for strategy in strategies.values():
+            for inst in getattr(strategy, 'instruments', None) or []:
+                added += append_closes(strategy, inst, fetched.get(inst, []), after_ns=since_ns)
+        age_min = (time.time_ns() - since_ns) / 6e10
+        logger.info(f"📥 Warm start: {len(fetched)} delta requests, {added} bars appended "
+                    f"(snapshot {age_min:.0f} min old)")
+    
+    def save_warm_start(self) -> bool:
+        """Snapshot strategy state now (also runs at interpreter exit)"""
+        return self.warm_start.save(self.strategies)
+    
+    def _backfill_all_strategies(self, strategies: Dict = None):
+        """Backfill historical data for all strategies (or the given subset)"""
         logger.info("📥 Backfilling historical data for all strategies...")
+        strategies = self.strategies if strategies is None else strategies
         
         try:
             # Get all unique instruments
             all_instruments = set()
-            for strategy in self.strategies.values():
+            for strategy in strategies.values():
                 if hasattr(strategy, 'instruments'):
                     all_instruments.update(strategy.instruments)
             
             logger.info(f"📥 Fetching historical data for {len(all_instruments)} instruments...")
             
-            # Get 60 candles for each instrument (enough for 50-period indicators)
-            for instrument in all_instruments:
+            # Get 60 mid candles for each instrument (enough for 50-period indicators), all at once
+            fetched = fetch_candle_batch(self.oanda, sorted(all_instruments), granularity='M5', count=60)
+            for instrument, candle_list in fetched.items():
                 try:
-                    candles = self.oanda.get_candles(instrument, count=60, granularity='M5')
-                    
-                    if candles and 'candles' in candles:
-                        candle_list = candles['candles']
+                    if candle_list:
                         logger.info(f"📥 Got {len(candle_list)} candles for {instrument}")
                         
                         # Add to each strategy that trades this instrument
-                        for strategy in self.strategies.values():
+                        for strategy in strategies.values():
                             if hasattr(strategy, 'instruments') and instrument in strategy.instruments:
                                 if not hasattr(strategy, 'price_history'):
                                     strategy.price_history = {}
@@ -199,7 +275,7 @@ class SimpleTimerScanner:
             logger.info("✅ Historical data backfill complete!")
             
             # Log data availability
-            for strategy_name, strategy in self.strategies.items():
+            for strategy_name, strategy in strategies.items():
                 if hasattr(strategy, 'price_history'):
                     max_hist = max([len(v) for v in strategy.price_history.values()]) if strategy.price_history else 0
                     logger.info(f"   {strategy_name}: {max_hist} data points")
@@ -212,6 +288,7 @@ class SimpleTimerScanner:
         logger.warning("⚠️ _scan_loop called but APScheduler handles scheduling now")
         # Not used with APScheduler - APScheduler calls _run_scan() directly
     
+    @profiled('scan.timer', root=True)
     def _run_scan(self):
         """Run one complete scan - WITH TRUMP DNA + ADAPTIVE"""
         try:
@@ -223,250 +300,75 @@ class SimpleTimerScanner:
             
             total_signals = 0
             aggregated_signals = []
+            phase_started = time.perf_counter()
+            
+            # PHASE 1: one batched pricing snapshot for every instrument any strategy trades
+            scan_instruments = self._scan_instruments()
+            snapshot = self._fetch_price_snapshot(scan_instruments)
+            prices_done = time.perf_counter()
+            
+            # PHASE 2: ECONOMIC CALENDAR once per instrument
+            pauses = self._calendar_pauses(scan_instruments)
+            calendar_done = time.perf_counter()
+            
+            # PHASE 3: Evaluate strategies concurrently against the shared snapshot;
+            # each strategy's signals are handed off for execution as soon as its evaluation finishes
+            tasks = []
+            for strategy_name in self.accounts:
+                strategy = self.strategies[strategy_name]
+                
+                # Get instruments for this strategy
+                instruments = getattr(strategy, 'instruments', [])
+                if not instruments:
+                    continue
+                
+                paused = next((inst for inst in instruments if inst in pauses), None)
+                if paused:
+                    logger.warning(f"⏸️  {strategy_name} ({paused}): Paused - {pauses[paused]}")
+                    continue
+                
+                market_data = {inst: snapshot[inst] for inst in instruments if inst in snapshot}
+                if not market_data:
+                    continue
+                
+                # Same strategy object behind two accounts -> evaluated one at a time
+                tasks.append((strategy_name,
+                              partial(self._evaluate_strategy, strategy_name, strategy, market_data),
+                              id(strategy)))
             
-            # Scan each strategy
-            for strategy_name, account_id in self.accounts.items():
+            orders = []
+            for evaluation in self.evaluator.evaluate(tasks):
+                strategy_name = evaluation.name
                 try:
-                    strategy = self.strategies[strategy_name]
-                    
-                    # Get instruments for this strategy
-                    instruments = getattr(strategy, 'instruments', [])
-                    if not instruments:
-                        continue
-                    
-                    # ECONOMIC CALENDAR: Check if we should pause
-                    should_pause = False
-                    for inst in instruments:
-                        try:
-                            pause_needed, reason = self.economic_calendar.should_avoid_trading(inst)
-                            if pause_needed:
-                                logger.warning(f"⏸️  {strategy_name} ({inst}): Paused - {reason}")
-                                should_pause = True
-                                break
-                        except AttributeError:
-                            # Method doesn't exist, skip check
-                            pass
-                    
-                    if should_pause:
-                        continue
-                    
-                    # Get market data - FIXED: Ensure we get OandaPrice objects, not lists
-                    market_data = {}
-                    for inst in instruments:
-                        try:
-                            prices = self.oanda.get_current_prices([inst], force_refresh=False)
-                            if inst in prices:
-                                price_obj = prices[inst]
-                                # Ensure it's an OandaPrice object, not a list
-                                if hasattr(price_obj, 'bid') and hasattr(price_obj, 'ask'):
-                                    market_data[inst] = price_obj
-                                elif isinstance(price_obj, dict):
-                                    # Convert dict to OandaPrice-like object
-                                    from src.core.oanda_client import OandaPrice
-                                    # Use module-level datetime and timezone imports (no local imports)
-                                    market_data[inst] = OandaPrice(
-                                        instrument=inst,
-                                        bid=float(price_obj.get('bid', 0)),
-                                        ask=float(price_obj.get('ask', 0)),
-                                        timestamp=price_obj.get('timestamp', datetime.now(timezone.utc)),
-                                        spread=float(price_obj.get('spread', 0)),
-                                        is_live=price_obj.get('is_live', True)
-                                    )
-                        except Exception as e:
-                            logger.warning(f"⚠️ Error getting price for {inst}: {e}")
-                            pass
-                    
-                    if not market_data:
-                        continue
-                    
-                    # Update strategy price history if it has one (per-instrument)
-                    if hasattr(strategy, '_update_price_history'):
-                        for inst in instruments:
-                            if inst in market_data:
-                                try:
-                                    price_obj = market_data[inst]
-                                    # Ensure we pass the right format
-                                    if hasattr(price_obj, 'bid'):
-                                        strategy._update_price_history(price_obj)
-                                except Exception as e:
-                                    logger.debug(f"⚠️ Price history update failed for {inst}: {e}")
-                                    pass
-                    
-                    # Get price history length
-                    hist_len = 0
-                    if hasattr(strategy, 'price_history'):
-                        price_hist = strategy.price_history
-                        # Handle both dict and list formats
-                        if isinstance(price_hist, dict):
-                            for inst in instruments:
-                                hist_len = max(hist_len, len(price_hist.get(inst, [])))
-                        elif isinstance(price_hist, list):
-                            hist_len = len(price_hist)
-                        else:
-                            # Try to get length if it's a single list per instrument
-                            for inst in instruments:
-                                if hasattr(price_hist, inst):
-                                    inst_hist = getattr(price_hist, inst)
-                                    if isinstance(inst_hist, list):
-                                        hist_len = max(hist_len, len(inst_hist))
-                    
-                    # Try to generate signals from strategy logic
-                    signals = []
-                    if hasattr(strategy, 'analyze_market'):
-                        result = strategy.analyze_market(market_data)
-                        if result:
-                            if isinstance(result, list):
-                                signals = result
-                            else:
-                                signals = [result]
-                    
-                    # TRUMP DNA: Also check sniper zones (simpler, more likely to trigger)
-                    if not signals:
-                        for inst in instruments:
-                            if inst in market_data:
-                                price_obj = market_data[inst]
-                                # FIXED: Safely access ask price
-                                if hasattr(price_obj, 'ask'):
-                                    current_price = price_obj.ask
-                                elif isinstance(price_obj, dict):
-                                    current_price = float(price_obj.get('ask', 0))
-                                else:
-                                    continue
-                                sniper_signal = self.trump_planner.get_entry_signal(inst, current_price, strategy_name)
-                                
-                                if sniper_signal:
-                                    # Convert to strategy signal format
-                                    signals.append({
-                                        'instrument': inst,
-                                        'direction': sniper_signal['action'],
-                                        'confidence': 0.75,  # Sniper zones are high confidence
-                                        'entry_price': current_price,
-                                        'stop_loss': sniper_signal['stop_loss'],
-                                        'take_profit': sniper_signal['take_profit'],
-                                        'reason': f"Trump DNA sniper zone: {sniper_signal['reason']}",
-                                        'source': 'trump_dna'
-                                    })
-                                    logger.info(f"🎯 {strategy_name}: Trump DNA sniper signal at {sniper_signal['zone_type']}")
+                    if evaluation.error is not None:
+                        raise evaluation.error
+                    signals, hist_len = evaluation.result
                     
                     if signals:
                         total_signals += len(signals)
                         self.last_signal_time = datetime.now()
-                        logger.info(f"🎯 {strategy_name}: {len(signals)} signals (history: {hist_len})")
+                        logger.info(f"🎯 {strategy_name}: {len(signals)} signals (history: {hist_len}, {evaluation.latency_ms:.0f}ms)")
                         # Collect for assessment and classification
                         for s in signals:
                             aggregated_signals.append((strategy_name, s))
                         
-                        # EXECUTE TRADES for signals
-                        for signal in signals:
-                            try:
-                                # Access TradeSignal as dataclass, not dictionary
-                                instrument = signal.instrument if hasattr(signal, 'instrument') else signal.get('instrument') if isinstance(signal, dict) else None
-                                direction = signal.side.name if hasattr(signal, 'side') else signal.get('direction') if isinstance(signal, dict) else None
-                                confidence = signal.confidence if hasattr(signal, 'confidence') else signal.get('confidence', 0) if isinstance(signal, dict) else 0
-                                
-                                if not instrument or not direction:
-                                    continue
-                                
-                                # Check economic calendar before entering
-                                try:
-                                    should_avoid, reason = self.economic_calendar.should_avoid_trading(instrument)
-                                    if should_avoid:
-                                        logger.warning(f"   ⏭️  Skipping {instrument} - {reason}")
-                                        continue
-                                except AttributeError:
-                                    # Method doesn't exist, skip check
-                                    pass
-                                
-                                # Check if already have position on this instrument
-                                existing = self.oanda.get_open_trades()
-                                # Handle both dict and object formats
-                                existing_instruments = {
-                                    t.get('instrument') if isinstance(t, dict) else getattr(t, 'instrument', None)
-                                    for t in existing
-                                }
-                                if instrument in existing_instruments:
-                                    logger.info(f"   ⏭️  Skipping {instrument} - already have position")
-                                    continue
-                                
-                                # Place order
-                                units = 500000 if direction == 'BUY' else -500000
-                                if 'JPY' in instrument:
-                                    tp_distance = 0.20 if direction == 'BUY' else -0.20
-                                    sl_distance = -0.10 if direction == 'BUY' else 0.10
-                                elif instrument == 'XAU_USD':
-                                    units = 300 if direction == 'BUY' else -300
-                                    tp_distance = 15.0 if direction == 'BUY' else -15.0
-                                    sl_distance = -7.0 if direction == 'BUY' else 7.0
-                                else:
-                                    tp_distance = 0.0020 if direction == 'BUY' else -0.0020
-                                    sl_distance = -0.0010 if direction == 'BUY' else 0.0010
-                                
-                                logger.info(f"   🔄 Placing order: {instrument} {direction} ({units} units)")
-                                
-                                # Get current price for entry
-                                current_prices = self.oanda.get_current_prices([instrument], force_refresh=True)
-                                current_price = current_prices[instrument]
-                                entry_price = current_price.ask if direction == 'BUY' else current_price.bid
-                                
-                                # Calculate SL/TP as prices not distances
-                                if direction == 'BUY':
-                                    tp_price = entry_price + tp_distance
-                                    sl_price = entry_price - sl_distance
-                                else:
-                                    tp_price = entry_price - tp_distance
-                                    sl_price = entry_price + sl_distance
-                                
-                                # TRACK SIGNAL BEFORE EXECUTING TRADE (so dashboard can display it)
-                                try:
-                                    signal_id = self.signal_tracker.add_signal(
-                                        instrument=instrument,
-                                        side=direction.upper(),
-                                        strategy_name=strategy_name,
-                                        entry_price=entry_price,
-                                        stop_loss=sl_price,
-                                        take_profit=tp_price,
-                                        ai_insight=getattr(signal, 'reason', '') or signal.get('reason', '') if isinstance(signal, dict) else '',
-                                        confidence=confidence,
-                                        account_id=account_id,
-                                        units=units
-                                    )
-                                    logger.info(f"   📊 Signal tracked: {signal_id} - {instrument} {direction}")
-                                except Exception as track_error:
-                                    logger.warning(f"   ⚠️ Signal tracking failed: {track_error}")
-                                
-                                # Use account-specific OANDA client for this trade
-                                account_client = OandaClient(account_id=account_id)
-                                
-                                result = account_client.place_market_order(
-                                    instrument=instrument,
-                                    units=units,
-                                    take_profit=tp_price,
-                                    stop_loss=sl_price
-                                )
-                                
-                                if result:
-                                    trade_id = result.trade_id if hasattr(result, 'trade_id') else 'N/A'
-                                    logger.info(f"   ✅ ENTERED: {instrument} {direction} (ID: {trade_id})")
-                                    # Send Telegram AFTER logging (don't let it block)
-                                    try:
-                                        self.notifier.send_message(
-                                            f"✅ {strategy_name}\n{instrument} {direction}\nID: {trade_id}\nConfidence: {confidence:.0%}",
-                                            'trade_entry'
-                                        )
-                                    except Exception as notif_error:
-                                        logger.warning(f"   ⚠️ Telegram notification failed: {notif_error}")
-                                else:
-                                    error_msg = result.get('error', 'Unknown error') if result else 'No result returned'
-                                    logger.warning(f"   ❌ Failed to enter {instrument} {direction}: {error_msg}")
-                                    
-                            except Exception as e:
-                                logger.error(f"   ❌ Trade execution error: {e}")
+                        # EXECUTE TRADES for signals (off this loop, so a slow broker call
+                        # does not delay collecting the other strategies' results)
+                        orders.append(self.evaluator.handoff(self._execute_signals, strategy_name,
+                                                             self.accounts[strategy_name], signals,
+                                                             scan_instruments, pauses))
                     else:
                         logger.info(f"   {strategy_name}: 0 signals (history: {hist_len})")
                         
                 except Exception as e:
                     logger.error(f"❌ {strategy_name} error: {e}")
             
+            strategies_done = time.perf_counter()
+            self.evaluator.wait_handoffs(orders)
+            self._record_scan_phases(phase_started, prices_done, calendar_done, strategies_done,
+                                     len(scan_instruments), len(snapshot))
+            self._after_scan()
+            
             if total_signals > 0:
                 logger.info(f"📊 SCAN #{self.scan_count}: {total_signals} TOTAL SIGNALS")
                 self.notifier.send_message(
@@ -495,6 +397,278 @@ class SimpleTimerScanner:
             import traceback
             traceback.print_exc()
     
+    def _evaluate_strategy(self, strategy_name: str, strategy, market_data: Dict) -> Tuple[List, int]:
+        """Update history and generate signals for one strategy (runs on an evaluator worker)"""
+        instruments = getattr(strategy, 'instruments', [])
+        
+        # Update strategy price history if it has one (per-instrument)
+        if hasattr(strategy, '_update_price_history'):
+            with span('scan.history'):
+                for inst in instruments:
+                    if inst in market_data:
+                        try:
+                            price_obj = market_data[inst]
+                            # Ensure we pass the right format
+                            if hasattr(price_obj, 'bid'):
+                                strategy._update_price_history(price_obj)
+                        except Exception as e:
+                            logger.debug(f"⚠️ Price history update failed for {inst}: {e}")
+                            pass
+        
+        # Get price history length
+        hist_len = 0
+        if hasattr(strategy, 'price_history'):
+            price_hist = strategy.price_history
+            # Handle both dict and list formats
+            if isinstance(price_hist, dict):
+                for inst in instruments:
+                    hist_len = max(hist_len, len(price_hist.get(inst, [])))
+            elif isinstance(price_hist, list):
+                hist_len = len(price_hist)
+            else:
+                # Try to get length if it's a single list per instrument
+                for inst in instruments:
+                    if hasattr(price_hist, inst):
+                        inst_hist = getattr(price_hist, inst)
+                        if isinstance(inst_hist, list):
+                            hist_len = max(hist_len, len(inst_hist))
+        
+        # Try to generate signals from strategy logic
+        signals = []
+        if hasattr(strategy, 'analyze_market'):
+            with span('scan.analyze'):
+                result = strategy.analyze_market(market_data)
+            if result:
+                if isinstance(result, list):
+                    signals = result
+                else:
+                    signals = [result]
+        
+        # TRUMP DNA: Also check sniper zones (simpler, more likely to trigger)
+        if not signals:
+            for inst in instruments:
+                if inst in market_data:
+                    price_obj = market_data[inst]
+                    # FIXED: Safely access ask price
+                    if hasattr(price_obj, 'ask'):
+                        current_price = price_obj.ask
+                    elif isinstance(price_obj, dict):
+                        current_price = float(price_obj.get('ask', 0))
+                    else:
+                        continue
+                    sniper_signal = self.trump_planner.get_entry_signal(inst, current_price, strategy_name)
+                    
+                    if sniper_signal:
+                        # Convert to strategy signal format
+                        signals.append({
+                            'instrument': inst,
+                            'direction': sniper_signal['action'],
+                            'confidence': 0.75,  # Sniper zones are high confidence
+                            'entry_price': current_price,
+                            'stop_loss': sniper_signal['stop_loss'],
+                            'take_profit': sniper_signal['take_profit'],
+                            'reason': f"Trump DNA sniper zone: {sniper_signal['reason']}",
+                            'source': 'trump_dna'
+                        })
+                        logger.info(f"🎯 {strategy_name}: Trump DNA sniper signal at {sniper_signal['zone_type']}")
+        
+        return signals, hist_len
+    
+    @profiled('scan.execute')
+    def _execute_signals(self, strategy_name: str, account_id: str, signals: List,
+                         scan_instruments: List[str], pauses: Dict[str, str]):
+        """
+        Place orders for one strategy's signals.
+
+        Runs via evaluator.handoff(): on the evaluator's single order thread, one
+        strategy at a time in collection order, while the scan loop keeps
+        collecting results (inline when the evaluator is sequential). pauses is
+        shared with the scan loop and only updated from here.
+        """
+        for signal in signals:
+            try:
+                # Access TradeSignal as dataclass, not dictionary
+                instrument = signal.instrument if hasattr(signal, 'instrument') else signal.get('instrument') if isinstance(signal, dict) else None
+                direction = signal.side.name if hasattr(signal, 'side') else signal.get('direction') if isinstance(signal, dict) else None
+                confidence = signal.confidence if hasattr(signal, 'confidence') else signal.get('confidence', 0) if isinstance(signal, dict) else 0
+                
+                if not instrument or not direction:
+                    continue
+                
+                # Check economic calendar before entering (phase 2 result)
+                if instrument not in scan_instruments:
+                    pauses.update(self._calendar_pauses([instrument]))
+                if instrument in pauses:
+                    logger.warning(f"   ⏭️  Skipping {instrument} - {pauses[instrument]}")
+                    continue
+                
+                # Check if already have position on this instrument
+                existing = self.oanda.get_open_trades()
+                # Handle both dict and object formats
+                existing_instruments = {
+                    t.get('instrument') if isinstance(t, dict) else getattr(t, 'instrument', None)
+                    for t in existing
+                }
+                if instrument in existing_instruments:
+                    logger.info(f"   ⏭️  Skipping {instrument} - already have position")
+                    continue
+                
+                # Place order
+                units = 500000 if direction == 'BUY' else -500000
+                if 'JPY' in instrument:
+                    tp_distance = 0.20 if direction == 'BUY' else -0.20
+                    sl_distance = -0.10 if direction == 'BUY' else 0.10
+                elif instrument == 'XAU_USD':
+                    units = 300 if direction == 'BUY' else -300
+                    tp_distance = 15.0 if direction == 'BUY' else -15.0
+                    sl_distance = -7.0 if direction == 'BUY' else 7.0
+                else:
+                    tp_distance = 0.0020 if direction == 'BUY' else -0.0020
+                    sl_distance = -0.0010 if direction == 'BUY' else 0.0010
+                
+                logger.info(f"   🔄 Placing order: {instrument} {direction} ({units} units)")
+                
+                # Get current price for entry
+                current_prices = self.oanda.get_current_prices([instrument], force_refresh=True)
+                current_price = current_prices[instrument]
+                entry_price = current_price.ask if direction == 'BUY' else current_price.bid
+                
+                # Calculate SL/TP as prices not distances
+                if direction == 'BUY':
+                    tp_price = entry_price + tp_distance
+                    sl_price = entry_price - sl_distance
+                else:
+                    tp_price = entry_price - tp_distance
+                    sl_price = entry_price + sl_distance
+                
+                # TRACK SIGNAL BEFORE EXECUTING TRADE (so dashboard can display it)
+                try:
+                    signal_id = self.signal_tracker.add_signal(
+                        instrument=instrument,
+                        side=direction.upper(),
+                        strategy_name=strategy_name,
+                        entry_price=entry_price,
+                        stop_loss=sl_price,
+                        take_profit=tp_price,
+                        ai_insight=getattr(signal, 'reason', '') or signal.get('reason', '') if isinstance(signal, dict) else '',
+                        confidence=confidence,
+                        account_id=account_id,
+                        units=units
+                    )
+                    logger.info(f"   📊 Signal tracked: {signal_id} - {instrument} {direction}")
+                except Exception as track_error:
+                    logger.warning(f"   ⚠️ Signal tracking failed: {track_error}")
+                
+                # Use account-specific OANDA client for this trade
+                account_client = OandaClient(account_id=account_id)
+                
+                result = account_client.place_market_order(
+                    instrument=instrument,
+                    units=units,
+                    take_profit=tp_price,
+                    stop_loss=sl_price
+                )
+                
+                if result:
+                    trade_id = result.trade_id if hasattr(result, 'trade_id') else 'N/A'
+                    logger.info(f"   ✅ ENTERED: {instrument} {direction} (ID: {trade_id})")
+                    # Send Telegram AFTER logging (don't let it block)
+                    try:
+                        self.notifier.send_message(
+                            f"✅ {strategy_name}\n{instrument} {direction}\nID: {trade_id}\nConfidence: {confidence:.0%}",
+                            'trade_entry'
+                        )
+                    except Exception as notif_error:
+                        logger.warning(f"   ⚠️ Telegram notification failed: {notif_error}")
+                else:
+                    error_msg = result.get('error', 'Unknown error') if result else 'No result returned'
+                    logger.warning(f"   ❌ Failed to enter {instrument} {direction}: {error_msg}")
+                    
+            except Exception as e:
+                logger.error(f"   ❌ Trade execution error: {e}")
+    
+    def _after_scan(self):
+        """Log time-to-first-scan once, and refresh the warm-start snapshot periodically"""
+        if self.first_scan_seconds is None:
+            self.first_scan_seconds = time.perf_counter() - self.init_started
+            get_profiler().record('startup.first_scan', self.first_scan_seconds)
+            logger.info(f"⏱️ Time to first scan: {self.first_scan_seconds:.2f}s ({self.warm_start_mode} start)")
+        self.warm_start.maybe_save(self.strategies)
+    
+    def _scan_instruments(self) -> List[str]:
+        """Union of instruments across all active strategies (first-seen order)"""
+        instruments = {}
+        for strategy_name in self.accounts:
+            strategy = self.strategies.get(strategy_name)
+            for inst in getattr(strategy, 'instruments', None) or []:
+                instruments[inst] = True
+        return list(instruments)
+    
+    @profiled('scan.prices')
+    def _fetch_price_snapshot(self, instruments: List[str]) -> Dict:
+        """One pricing call for the whole scan; entries normalised to OandaPrice objects"""
+        if not instruments:
+            return {}
+        try:
+            prices = self.oanda.get_current_prices(instruments, force_refresh=False)
+        except Exception as e:
+            logger.warning(f"⚠️ Error getting price snapshot for {len(instruments)} instruments: {e}")
+            return {}
+        self.pricing_calls += 1
+        
+        snapshot = {}
+        for inst, price_obj in prices.items():
+            # Ensure it's an OandaPrice object, not a list
+            if hasattr(price_obj, 'bid') and hasattr(price_obj, 'ask'):
+                snapshot[inst] = price_obj
+            elif isinstance(price_obj, dict):
+                # Convert dict to OandaPrice-like object
+                snapshot[inst] = OandaPrice(
+                    instrument=inst,
+                    bid=float(price_obj.get('bid', 0)),
+                    ask=float(price_obj.get('ask', 0)),
+                    timestamp=price_obj.get('timestamp', datetime.now(timezone.utc)),
+                    spread=float(price_obj.get('spread', 0)),
+                    is_live=price_obj.get('is_live', True)
+                )
+        missing = [inst for inst in instruments if inst not in snapshot]
+        if missing:
+            logger.warning(f"⚠️ No price in snapshot for: {', '.join(missing)}")
+        return snapshot
+    
+    @profiled('scan.news')
+    def _calendar_pauses(self, instruments: List[str]) -> Dict[str, str]:
+        """instrument -> reason for every instrument near high-impact news"""
+        pauses = {}
+        for inst in instruments:
+            try:
+                pause_needed, reason = self.economic_calendar.should_avoid_trading(inst)
+                if pause_needed:
+                    pauses[inst] = reason
+            except AttributeError:
+                # Method doesn't exist, skip check
+                pass
+            except Exception as e:
+                logger.warning(f"⚠️ Calendar check failed for {inst}: {e}")
+        return pauses
+    
+    def _record_scan_phases(self, started: float, prices_done: float, calendar_done: float,
+                            strategies_done: float, instrument_count: int, priced_count: int):
+        """Keep per-phase timings of the last scans (milliseconds)"""
+        phases = {
+            'scan': self.scan_count,
+            'instruments': instrument_count,
+            'priced': priced_count,
+            'prices_ms': round((prices_done - started) * 1000, 2),
+            'calendar_ms': round((calendar_done - prices_done) * 1000, 2),
+            'strategies_ms': round((strategies_done - calendar_done) * 1000, 2),
+            'total_ms': round((strategies_done - started) * 1000, 2),
+        }
+        self.scan_phase_timings.append(phases)
+        logger.info(f"⏱️ Scan #{self.scan_count} phases: prices {phases['prices_ms']:.0f}ms "
+                    f"({priced_count}/{instrument_count} instruments, 1 call), calendar {phases['calendar_ms']:.0f}ms, "
+                    f"strategies {phases['strategies_ms']:.0f}ms")
+    
     def _check_and_adapt_thresholds(self):
         """ADAPTIVE SYSTEM: Auto-adjust thresholds based on market conditions"""
         now = datetime.now()
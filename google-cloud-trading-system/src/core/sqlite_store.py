@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Shared SQLite Storage Layer
+WAL mode, one group-committing writer thread and a pool of read connections per database file
+"""
+
+import os
+import time
+import queue
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class _Write:
+    """One queued write: fn(conn) runs on the writer thread, the caller may wait for its result"""
+
+    __slots__ = ('fn', 'transaction', 'done', 'result', 'error')
+
+    def __init__(self, fn: Callable[[sqlite3.Connection], Any], transaction: bool = True):
+        self.fn = fn
+        self.transaction = transaction
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+    def wait(self, timeout: float = None) -> Any:
+        """The write's return value once committed; re-raises its error"""
+        if not self.done.wait(timeout):
+            raise TimeoutError("SQLite write not committed in time")
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SQLiteStore:
+    """
+    One database file shared by every store that uses it.
+
+    All writes go through a single writer thread. It takes whatever is
+    queued (up to batch_max, waiting at most batch_wait for more) and
+    commits it as one transaction, so concurrent inserts share a commit
+    instead of each paying for one. Every write runs in its own savepoint:
+    a failing write is rolled back and re-raised to its caller without
+    affecting the rest of the batch. Reads use pooled connections; in WAL
+    mode they see the last committed state and never block on the writer.
+    """
+
+    def __init__(self, path: str, pool_size: int = None, batch_max: int = None, batch_wait: float = None,
+                 busy_timeout: float = None, synchronous: str = None):
+        self.path = path
+        self.pool_size = pool_size or int(os.getenv('SQLITE_READ_POOL', '4'))
+        self.batch_max = batch_max or int(os.getenv('SQLITE_BATCH_MAX', '256'))
+        self.batch_wait = (float(os.getenv('SQLITE_BATCH_WAIT_MS', '2')) / 1000 if batch_wait is None else batch_wait)
+        self.busy_timeout = busy_timeout or float(os.getenv('SQLITE_BUSY_TIMEOUT', '10'))
+        self.synchronous = (synchronous or os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')).upper()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self.queue: 'queue.Queue' = queue.Queue()
+        self._writer_conn = self._connect()
+        self.journal_mode = self._writer_conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+        self._carry: Optional[_Write] = None
+
+        self._readers: 'queue.LifoQueue' = queue.LifoQueue()
+        self._reader_count = 0
+        self._reader_lock = threading.Lock()
+        self._local = threading.local()
+        self._all_readers: List[sqlite3.Connection] = []
+
+        self.closed = False
+        self.stats = {'writes': 0, 'commits': 0, 'failed_writes': 0, 'max_batch': 0, 'max_queue': 0,
+                      'reads': 0, 'read_waits': 0}
+        self.writer = threading.Thread(target=self._run_writer, name=f"sqlite-writer-{os.path.basename(path)}",
+                                       daemon=True)
+        self.writer.start()
+        logger.info(f"✅ SQLite store: {path} ({self.journal_mode}, synchronous={self.synchronous})")
+
+    def _connect(self, readonly: bool = False) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout * 1000)}")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute(f"PRAGMA cache_size=-{int(os.getenv('SQLITE_CACHE_KB', '8192'))}")
+        if readonly:
+            conn.execute("PRAGMA query_only=ON")
+        return conn
+
+    def write(self, fn: Callable[[sqlite3.Connection], Any], wait: bool = True, transaction: bool = True) -> Any:
+        """
+        Run fn(conn) on the writer thread.
+
+        With wait (the default) returns fn's result once committed, raising
+        whatever fn raised; otherwise returns the queued _Write. Writes that
+        cannot run inside a transaction (VACUUM, executescript) need
+        transaction=False and are committed on their own.
+        """
+        if self.closed:
+            raise sqlite3.ProgrammingError(f"SQLite store {self.path} is closed")
+        item = _Write(fn, transaction)
+        self.queue.put(item)
+        depth = self.queue.qsize()
+        if depth > self.stats['max_queue']:
+            self.stats['max_queue'] = depth
+        return item.wait() if wait else item
+
+    def execute(self, sql: str, params: Sequence = (), wait: bool = True) -> Any:
+        """One write statement; returns its rowcount"""
+        return self.write(lambda conn: conn.execute(sql, params).rowcount, wait)
+
+    def executemany(self, sql: str, seq_of_params: Iterable[Sequence], wait: bool = True) -> Any:
+        rows = list(seq_of_params)
+        return self.write(lambda conn: conn.executemany(sql, rows).rowcount, wait)
+
+    def executescript(self, script: str) -> None:
+        """Schema scripts (committed on their own, outside the batch)"""
+        self.write(lambda conn: conn.executescript(script), transaction=False)
+
+    def flush(self, timeout: float = None):
+        """Wait until everything queued so far is committed"""
+        self.write(lambda conn: None, wait=False).wait(timeout)
+
+    def _next_batch(self) -> Optional[List[_Write]]:
+        first = self._carry if self._carry is not None else self.queue.get()
+        self._carry = None
+        if first is _STOP:
+            return None
+        batch = [first]
+        if not first.transaction:
+            return batch
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_max:
+            try:
+                remaining = deadline - time.monotonic()
+                item = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP or not item.transaction:
+                self._carry = item
+                break
+            batch.append(item)
+        return batch
+
+    def _run_writer(self):
+        conn = self._writer_conn
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                break
+            if not batch[0].transaction:
+                self._run_alone(conn, batch[0])
+            else:
+                self._commit_batch(conn, batch)
+            for item in batch:
+                item.done.set()
+        conn.close()
+
+    def _run_alone(self, conn: sqlite3.Connection, item: _Write):
+        try:
+            item.result = item.fn(conn)
+            if conn.in_transaction:
+                conn.execute("COMMIT")
+        except BaseException as e:
+            item.error = e
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+        self._count(1, 0 if item.error is None else 1)
+
+    def _commit_batch(self, conn: sqlite3.Connection, batch: List[_Write]):
+        failed = 0
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for item in batch:
+                conn.execute("SAVEPOINT write")
+                try:
+                    item.result = item.fn(conn)
+                    conn.execute("RELEASE write")
+                except BaseException as e:
+                    item.error = e
+                    failed += 1
+                    conn.execute("ROLLBACK TO write")
+                    conn.execute("RELEASE write")
+            conn.execute("COMMIT")
+        except BaseException as e:
+            # The transaction itself failed (disk full, locked past busy_timeout): nothing was written
+            logger.error(f"❌ SQLite commit failed for {len(batch)} writes on {self.path}: {e}")
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for item in batch:
+                if item.error is None:
+                    item.error = e
+                    failed += 1
+        self._count(len(batch), failed)
+
+    def _count(self, writes: int, failed: int):
+        self.stats['writes'] += writes
+        self.stats['commits'] += 1
+        self.stats['failed_writes'] += failed
+        if writes > self.stats['max_batch']:
+            self.stats['max_batch'] = writes
+
+    def _acquire_reader(self) -> sqlite3.Connection:
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+        with self._reader_lock:
+            if self._reader_count < self.pool_size:
+                self._reader_count += 1
+                conn = self._connect(readonly=True)
+                self._all_readers.append(conn)
+                return conn
+        self.stats['read_waits'] += 1
+        return self._readers.get(timeout=self.busy_timeout)
+
+    @contextmanager
+    def read(self):
+        """A pooled read-only connection (reads see the last committed state)"""
+        conn = self._acquire_reader()
+        self.stats['reads'] += 1
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            self._readers.put(conn)
+
+    def query(self, sql: str, params: Sequence = ()) -> List[sqlite3.Row]:
+        with self.read() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def query_one(self, sql: str, params: Sequence = ()) -> Optional[sqlite3.Row]:
+        with self.read() as conn:
+            return conn.execute(sql, params).fetchone()
+
+    def thread_reader(self) -> sqlite3.Connection:
+        """A read-only connection owned by the calling thread (for code holding on to a connection)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect(readonly=True)
+            with self._reader_lock:
+                self._all_readers.append(conn)
+        return conn
+
+    def close(self):
+        """Commit what is queued, stop the writer and close every connection"""
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(_STOP)
+        self.writer.join(timeout=self.busy_timeout)
+        with self._reader_lock:
+            for conn in self._all_readers:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._all_readers = []
+        logger.info(f"✅ SQLite store closed: {self.path}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats.update({
+            'path': self.path,
+            'journal_mode': self.journal_mode,
+            'synchronous': self.synchronous,
+            'queued': self.queue.qsize(),
+            'readers': self._reader_count,
+            'avg_batch': round(stats['writes'] / stats['commits'], 2) if stats['commits'] else None,
+        })
+        return stats
+
+
+# Global stores, one per database file
+_stores: Dict[str, SQLiteStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_sqlite_store(path: str, **kwargs) -> SQLiteStore:
+    """Get the process-wide store for a database file (kwargs only apply when it is first opened)"""
+    key = os.path.abspath(path)
+    store = _stores.get(key)
+    if store is None or store.closed:
+        with _stores_lock:
+            store = _stores.get(key)
+            if store is None or store.closed:
+                store = SQLiteStore(path, **kwargs)
+                _stores[key] = store
+    return store
+
+
+def get_sqlite_store_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats for every open store, keyed by file name"""
+    with _stores_lock:
+        stores = [store for store in _stores.values() if not store.closed]
+    return {os.path.basename(store.path): store.get_stats() for store in stores}
@@ -6,8 +6,8 @@ Includes critical price history prefilling that ALL strategies need
 
 import logging
 import os
-import requests
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List
 from datetime import datetime
 
 logging.basicConfig(level=logging.INFO)
@@ -31,17 +31,17 @@ def prefill_price_history_for_strategy(strategy, instruments: List[str],
     Returns:
         Total number of bars loaded
     """
+    from .warm_start import prefill_deferred
+    if prefill_deferred():
+        logger.info("⏭️ Prefill skipped - history comes from the warm-start snapshot")
+        return 0
+    
     try:
         logger.info(f"📥 Pre-filling price history for {strategy.name if hasattr(strategy, 'name') else 'strategy'}...")
         
-        # Get credentials from environment
-        api_key = os.environ.get('OANDA_API_KEY', 'c01de9eb4d793c945ea0fcbb0620cc4e-d0c62eb93ed53e8db5a709089460794a')
-        base_url = os.environ.get('OANDA_BASE_URL', 'https://api-fxpractice.oanda.com')
-        
-        headers = {
-            'Authorization': f'Bearer {api_key}',
-            'Content-Type': 'application/json'
-        }
+        # Shared local candle store - restarts only fetch candles missing since last run
+        from .candle_store import get_candle_store
+        store = get_candle_store()
         
         total_loaded = 0
         
@@ -52,15 +52,9 @@ def prefill_price_history_for_strategy(strategy, instruments: List[str],
         # Get historical candles for each instrument
         for instrument in instruments:
             try:
-                url = f"{base_url}/v3/instruments/{instrument}/candles"
-                params = {'count': count, 'granularity': granularity, 'price': 'M'}
+                candles = store.get_recent_candles(instrument, granularity, count, price='M')
                 
-                response = requests.get(url, headers=headers, params=params, timeout=10)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    candles = data.get('candles', [])
-                    
+                if candles:
                     # Initialize list if needed
                     if instrument not in strategy.price_history:
                         strategy.price_history[instrument] = []
@@ -76,7 +70,7 @@ def prefill_price_history_for_strategy(strategy, instruments: List[str],
                     total_loaded += bars_loaded
                     logger.info(f"  ✅ {instrument}: {bars_loaded} bars loaded")
                 else:
-                    logger.debug(f"  ⚠️ {instrument}: HTTP {response.status_code}")
+                    logger.debug(f"  ⚠️ {instrument}: no candles available")
                     
             except Exception as e:
                 logger.debug(f"  ⚠️ {instrument}: {e}")
@@ -94,6 +88,58 @@ def prefill_price_history_for_strategy(strategy, instruments: List[str],
         return 0
 
 
+def prefill_price_history_batch(strategies: Iterable, granularity: str = 'M15', count: int = 50,
+                                store=None, max_workers: int = None) -> int:
+    """
+    Pre-fill many strategies at once from the shared candle store
+
+    Used after constructing strategies with prefill deferred: each instrument
+    is read (and gap-filled from OANDA) once, concurrently, instead of once
+    per strategy. Only empty price histories are filled, so state restored
+    from a warm-start snapshot is left alone. Strategies with their own
+    _prefill_price_history() (candle-dict histories, filled lazily on first
+    analyze_market) are skipped unless they set batch_prefill = True.
+
+    Returns:
+        Total number of bars loaded
+    """
+    from .warm_start import append_closes
+
+    strategies = [s for s in strategies if isinstance(getattr(s, 'price_history', None), dict)
+                  and (not hasattr(s, '_prefill_price_history') or getattr(s, 'batch_prefill', False))]
+    wanted = {}
+    for strategy in strategies:
+        for instrument in getattr(strategy, 'instruments', None) or []:
+            if not strategy.price_history.get(instrument):
+                wanted.setdefault(instrument, []).append(strategy)
+    if not wanted:
+        return 0
+
+    if store is None:
+        from .candle_store import get_candle_store
+        store = get_candle_store()
+    max_workers = max_workers or int(os.getenv('WARM_START_FETCH_WORKERS', '8'))
+
+    def fetch(instrument):
+        return store.get_recent_candles(instrument, granularity, count, price='M')
+
+    total_loaded = 0
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(wanted)), thread_name_prefix='prefill') as executor:
+        futures = {instrument: executor.submit(fetch, instrument) for instrument in wanted}
+        for instrument, future in futures.items():
+            try:
+                candles = future.result()
+            except Exception as e:
+                logger.debug(f"  ⚠️ {instrument}: {e}")
+                continue
+            for strategy in wanted[instrument]:
+                total_loaded += append_closes(strategy, instrument, candles)
+
+    logger.info(f"✅ Batch pre-fill: {total_loaded} bars for {len(strategies)} strategies "
+                f"from {len(wanted)} instruments")
+    return total_loaded
+
+
 def apply_universal_fixes_to_strategy(strategy):
     """
     Apply all universal fixes to any strategy
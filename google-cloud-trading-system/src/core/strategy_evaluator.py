@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Parallel Strategy Evaluator
+Runs strategy analysis concurrently on a bounded pool with per-strategy deadlines and latency percentiles
+"""
+
+import os
+import time
+import queue
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait as wait_futures
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Evaluation:
+    """Outcome of one strategy run: result on success, error if it raised"""
+    name: str
+    result: Any = None
+    error: Optional[BaseException] = None
+    latency_ms: float = 0.0
+
+
+class _Batch:
+    """One evaluate() call: results arrive on a queue, anything after close() is late"""
+
+    def __init__(self, deadline: float):
+        self.results: 'queue.Queue[Evaluation]' = queue.Queue()
+        self.deadline = deadline
+        self.submitted_at = time.perf_counter()
+        self.started_at: Dict[str, float] = {}
+        self.closed = False
+
+    def expires_at(self, name: str) -> float:
+        # A task still queued for a worker expires one deadline after submission
+        return self.started_at.get(name, self.submitted_at) + self.deadline
+
+
+class StrategyEvaluator:
+    """
+    Evaluates several strategies at once so one slow strategy cannot hold up the rest.
+
+    evaluate() submits every task to a bounded thread pool and yields each
+    Evaluation as soon as it finishes, fastest first, so the caller can act
+    on a fast strategy's signals while slower ones are still running. Every
+    task has a deadline measured from when a worker starts running it (a
+    task not started within one deadline of submission is late too); a task
+    that misses it is not waited for, and its result is dropped and counted
+    as late when it eventually arrives. Python threads cannot be cancelled, so a strategy
+    still running from an earlier batch is skipped (and counted) instead of
+    being stacked up behind itself. Tasks sharing a lock key (the same
+    strategy object behind two accounts) run one at a time.
+
+    Side effects of a result (placing orders) should go through handoff()
+    rather than run inside the evaluate() loop, so a slow broker call does
+    not hold up collecting the other strategies' results.
+
+    With max_workers=0 (or SCANNER_PARALLEL=false) tasks run inline on the
+    caller's thread in submission order, which is the old sequential scan.
+    """
+
+    def __init__(self, max_workers: int = None, deadline: float = None, history: int = 500,
+                 name: str = 'strategy-eval'):
+        if max_workers is None:
+            parallel = os.getenv('SCANNER_PARALLEL', 'true').lower() == 'true'
+            max_workers = int(os.getenv('SCANNER_MAX_WORKERS', '4')) if parallel else 0
+        self.max_workers = max(0, int(max_workers))
+        self.deadline = deadline or float(os.getenv('SCANNER_STRATEGY_DEADLINE_SECONDS', '10'))
+        self.history = history
+        self.name = name
+
+        self.executor = (ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=name)
+                         if self.max_workers else None)
+        # One thread, so handed-off side effects run one at a time in hand-off order
+        self.handoffs = (ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{name}-handoff")
+                         if self.max_workers else None)
+        self.lock = threading.Lock()
+        self._key_locks: Dict[Any, threading.Lock] = {}
+        self._inflight: Dict[str, int] = {}
+        self.latencies: Dict[str, deque] = {}
+        self.counts: Dict[str, Dict[str, int]] = {}
+        self.stats = {'batches': 0, 'tasks': 0, 'late': 0, 'late_dropped': 0, 'skipped_busy': 0, 'errors': 0}
+
+    @property
+    def parallel(self) -> bool:
+        return self.executor is not None
+
+    def _count(self, name: str, field: str):
+        counts = self.counts.setdefault(name, {'runs': 0, 'errors': 0, 'late': 0, 'skipped_busy': 0})
+        counts[field] += 1
+        if field != 'runs':
+            self.stats[field] += 1
+
+    def _key_lock(self, key: Any) -> threading.Lock:
+        with self.lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def _execute(self, name: str, fn: Callable[[], Any], key: Any) -> Evaluation:
+        with self._key_lock(key):
+            started = time.perf_counter()
+            try:
+                result, error = fn(), None
+            except Exception as e:
+                result, error = None, e
+            latency_ms = (time.perf_counter() - started) * 1000
+        with self.lock:
+            self.latencies.setdefault(name, deque(maxlen=self.history)).append(latency_ms)
+            self._count(name, 'runs')
+            if error is not None:
+                self._count(name, 'errors')
+        return Evaluation(name, result, error, latency_ms)
+
+    def _run_task(self, batch: _Batch, name: str, fn: Callable[[], Any], key: Any):
+        try:
+            with self.lock:
+                batch.started_at[name] = time.perf_counter()
+            evaluation = self._execute(name, fn, key)
+            with self.lock:
+                late = batch.closed or time.perf_counter() > batch.expires_at(name)
+                if late:
+                    self.stats['late_dropped'] += 1
+                else:
+                    batch.results.put(evaluation)
+            if late:
+                logger.warning(f"⏱️ Dropped late result from {name} ({evaluation.latency_ms:.0f}ms)")
+        finally:
+            with self.lock:
+                self._inflight[name] -= 1
+                if not self._inflight[name]:
+                    del self._inflight[name]
+
+    def evaluate(self, tasks: List[Tuple], deadline: float = None) -> Iterator[Evaluation]:
+        """
+        Run tasks and yield their Evaluations as they complete.
+
+        tasks are (name, fn) or (name, fn, lock_key) tuples; fn takes no
+        arguments. Stops yielding once the deadline (seconds, default
+        self.deadline) has passed; unfinished tasks are counted as late.
+        """
+        deadline = deadline or self.deadline
+        with self.lock:
+            self.stats['batches'] += 1
+            self.stats['tasks'] += len(tasks)
+
+        if not self.parallel:
+            for task in tasks:
+                name, fn = task[0], task[1]
+                yield self._execute(name, fn, task[2] if len(task) > 2 else name)
+            return
+
+        batch = _Batch(deadline)
+        pending = set()
+        for task in tasks:
+            name, fn = task[0], task[1]
+            key = task[2] if len(task) > 2 else name
+            with self.lock:
+                if name in self._inflight:
+                    self._count(name, 'skipped_busy')
+                    logger.warning(f"⏭️ {name}: previous evaluation still running - skipped this scan")
+                    continue
+                self._inflight[name] = 1
+            pending.add(name)
+            self.executor.submit(self._run_task, batch, name, fn, key)
+
+        try:
+            while pending:
+                with self.lock:
+                    remaining = max(batch.expires_at(name) for name in pending) - time.perf_counter()
+                try:
+                    # Results that arrived in time are still collected once the wait is over
+                    evaluation = batch.results.get(timeout=remaining) if remaining > 0 else batch.results.get_nowait()
+                except queue.Empty:
+                    if remaining > 0:
+                        continue  # A queued task may have started since; re-check its deadline
+                    break
+                pending.discard(evaluation.name)
+                yield evaluation
+        finally:
+            with self.lock:
+                batch.closed = True
+                for name in pending:
+                    self._count(name, 'late')
+            if pending:
+                logger.warning(f"⏱️ Deadline {deadline:g}s missed by: {', '.join(sorted(pending))}")
+
+    def handoff(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """
+        Run fn(*args, **kwargs) off the evaluate() loop (e.g. placing a strategy's orders).
+
+        Handed-off calls run one at a time in the order they were handed off;
+        wait_handoffs() blocks until the given ones are done. Sequentially,
+        fn runs inline.
+        """
+        if self.handoffs is not None:
+            return self.handoffs.submit(self._handoff, fn, *args, **kwargs)
+        future = Future()
+        future.set_result(self._handoff(fn, *args, **kwargs))
+        return future
+
+    def _handoff(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            logger.error(f"❌ Handed-off call {getattr(fn, '__name__', fn)} failed: {e}")
+            return None
+
+    @staticmethod
+    def wait_handoffs(futures: List[Future], timeout: float = None):
+        """Wait for handed-off calls to finish (they are never abandoned, unlike late evaluations)"""
+        if futures:
+            wait_futures(futures, timeout=timeout)
+
+    def percentiles(self, name: str) -> Dict[str, float]:
+        """p50/p90/p99/max latency (ms) over the last `history` runs of one strategy"""
+        with self.lock:
+            samples = np.array(self.latencies.get(name, ()), dtype=float)
+        if not samples.size:
+            return {}
+        p50, p90, p99 = np.percentile(samples, [50, 90, 99])
+        return {'p50_ms': round(float(p50), 2), 'p90_ms': round(float(p90), 2),
+                'p99_ms': round(float(p99), 2), 'max_ms': round(float(samples.max()), 2)}
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            stats = dict(self.stats)
+            counts = {name: dict(c) for name, c in self.counts.items()}
+            stats['inflight'] = sorted(self._inflight)
+        stats.update({'parallel': self.parallel, 'workers': self.max_workers, 'deadline_s': self.deadline})
+        stats['strategies'] = {name: {**c, **self.percentiles(name)} for name, c in counts.items()}
+        return stats
+
+    def shutdown(self, wait: bool = False):
+        if self.executor is not None:
+            self.executor.shutdown(wait=wait)
+        if self.handoffs is not None:
+            self.handoffs.shutdown(wait=wait)
@@ -4,11 +4,18 @@ Strategy Factory - Hybrid auto-discovery + manual override system
 Centralized strategy loading with explicit control and fallback auto-discovery
 """
 
+import os
+import time
 import logging
 import importlib
-from typing import Dict, Any, Optional, List
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Callable, Hashable, Iterable, Tuple
 from datetime import datetime
 
+from .lazy_imports import lazy_load_times
+
 logger = logging.getLogger(__name__)
 
 # Manual overrides for explicit control
@@ -76,6 +83,10 @@ class StrategyFactory:
     def __init__(self):
         self._strategy_cache = {}
         self._load_errors = {}
+        self._load_times = {}
+        self._import_times = {}
+        self._lock = threading.Lock()
+        self._strategy_locks = {}
         
         # Load environment variables for strategies
         try:
@@ -106,6 +117,22 @@ class StrategyFactory:
             logger.debug(f"📦 Using cached strategy: {strategy_name}")
             return self._strategy_cache[strategy_name]
         
+        # One build per strategy even when preload and a caller race for it
+        with self._lock:
+            strategy_lock = self._strategy_locks.setdefault(strategy_name, threading.Lock())
+        with strategy_lock:
+            if strategy_name in self._strategy_cache:
+                return self._strategy_cache[strategy_name]
+            started = time.perf_counter()
+            strategy = self._load_strategy(strategy_name, account_config)
+            self._load_times.setdefault(strategy_name, {}).update({
+                'total_ms': round((time.perf_counter() - started) * 1000, 1),
+                'thread': threading.current_thread().name,
+            })
+            return strategy
+    
+    def _load_strategy(self, strategy_name: str, account_config: Dict = None) -> Any:
+        """Build a strategy (override first, then auto-discovery) and cache it"""
         # Check manual overrides first
         if strategy_name in STRATEGY_OVERRIDES:
             logger.info(f"🔧 Loading strategy from override: {strategy_name}")
@@ -140,7 +167,7 @@ class StrategyFactory:
             module_name = override['module']
             
             # Import module
-            module = importlib.import_module(module_name)
+            module = self._import_module(module_name, strategy_name)
             
             # Try getter function first (preferred)
             if 'getter' in override:
@@ -193,6 +220,16 @@ class StrategyFactory:
             logger.error(f"❌ Error loading {strategy_name}: {e}")
             return None
     
+    def _import_module(self, module_name: str, strategy_name: str = None):
+        """importlib.import_module, recording how long the first import of each module took"""
+        started = time.perf_counter()
+        module = importlib.import_module(module_name)
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+        self._import_times.setdefault(module_name, elapsed_ms)
+        if strategy_name:
+            self._load_times.setdefault(strategy_name, {})['import_ms'] = self._import_times[module_name]
+        return module
+    
     def _auto_discover(self, strategy_name: str, account_config: Dict = None) -> Optional[Any]:
         """
         Auto-discover strategy by common patterns
@@ -274,33 +311,108 @@ class StrategyFactory:
         self._strategy_cache.clear()
         logger.info("🧹 Strategy cache cleared")
     
-    def preload_strategies(self, strategy_names: List[str], account_configs: Dict[str, Dict] = None):
+    def get_load_report(self) -> Dict[str, Any]:
+        """Per-strategy import/build times plus modules imported lazily on first use"""
+        return {
+            'strategies': {name: dict(times) for name, times in self._load_times.items()},
+            'module_imports_ms': dict(self._import_times),
+            'lazy_imports': lazy_load_times(),
+            'errors': len(self._load_errors),
+        }
+    
+    def preload_strategies(self, strategy_names: List[str], account_configs: Dict[str, Dict] = None,
+                           max_workers: int = None, defer_prefill: bool = True):
         """
         Preload multiple strategies
         
+        Modules are imported first, one at a time (imports serialise on the
+        import lock anyway), then strategies are built concurrently. With
+        defer_prefill, constructors skip their own per-strategy OANDA prefill
+        and histories are filled afterwards in one batch from the shared
+        candle store.
+        
         Args:
             strategy_names: List of strategy names to preload
             account_configs: Optional dict mapping strategy names to account configs
+            max_workers: Build threads (STRATEGY_PRELOAD_WORKERS, default 4; 1 = sequential)
+            defer_prefill: Batch the price-history prefill through the candle store
         """
-        logger.info(f"📦 Preloading {len(strategy_names)} strategies")
+        from .warm_start import get_warm_start_store
+        from .strategy_base import prefill_price_history_batch
+        
+        started = time.perf_counter()
+        names = [name for name in dict.fromkeys(strategy_names) if name not in self._strategy_cache]
+        logger.info(f"📦 Preloading {len(names)} strategies")
+        
+        for strategy_name in names:
+            if strategy_name in STRATEGY_OVERRIDES:
+                try:
+                    self._import_module(STRATEGY_OVERRIDES[strategy_name]['module'], strategy_name)
+                except Exception as e:
+                    logger.warning(f"⚠️ Failed to import {strategy_name}: {e}")
         
-        for strategy_name in strategy_names:
+        jobs = [(name, name, lambda name=name: self.get_strategy(
+            name, account_configs.get(name) if account_configs else None)) for name in names]
+        with get_warm_start_store().defer_prefill(defer_prefill):
+            results = build_concurrently(jobs, max_workers)
+        
+        for strategy_name, (strategy, error) in results.items():
+            if error is not None:
+                logger.warning(f"⚠️ Failed to preload {strategy_name}: {error}")
+        if defer_prefill:
+            prefill_price_history_batch(s for s, error in results.values() if error is None)
+        
+        logger.info(f"✅ Preloaded {len(self._strategy_cache)} strategies in {time.perf_counter() - started:.2f}s")
+
+def build_concurrently(jobs: Iterable[Tuple[Hashable, Hashable, Callable[[], Any]]],
+                       max_workers: int = None) -> Dict[Hashable, Tuple[Any, Optional[Exception]]]:
+    """
+    Run strategy builders in a thread pool.
+    
+    Each job is (key, group, build). Jobs in the same group run one after
+    another in a single worker - use the getter as the group so a getter
+    returning a shared instance is never entered twice at once. Builders run
+    in a copy of the caller's context, so they see its defer_prefill().
+    Returns {key: (strategy, None)} or {key: (None, exception)} in job order.
+    """
+    jobs = list(jobs)
+    max_workers = int(os.getenv('STRATEGY_PRELOAD_WORKERS', '4')) if max_workers is None else max_workers
+    groups: Dict[Hashable, List] = {}
+    for key, group, build in jobs:
+        groups.setdefault(group, []).append((key, build))
+    
+    results = {}
+    
+    def run(group_jobs):
+        for key, build in group_jobs:
             try:
-                account_config = account_configs.get(strategy_name) if account_configs else None
-                self.get_strategy(strategy_name, account_config)
+                results[key] = (build(), None)
             except Exception as e:
-                logger.warning(f"⚠️ Failed to preload {strategy_name}: {e}")
-        
-        logger.info(f"✅ Preloaded {len(self._strategy_cache)} strategies")
+                results[key] = (None, e)
+    
+    if max_workers <= 1 or len(groups) <= 1:
+        for group_jobs in groups.values():
+            run(group_jobs)
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(groups)),
+                                thread_name_prefix='strategy-build') as executor:
+            context = contextvars.copy_context()
+            # One copy per worker: a Context cannot be entered by two threads at once
+            for future in [executor.submit(context.copy().run, run, group_jobs) for group_jobs in groups.values()]:
+                future.result()
+    return {key: results[key] for key, _, _ in jobs}
 
 # Global factory instance
 _strategy_factory = None
+_strategy_factory_lock = threading.Lock()
 
 def get_strategy_factory() -> StrategyFactory:
     """Get global strategy factory instance"""
     global _strategy_factory
     if _strategy_factory is None:
-        _strategy_factory = StrategyFactory()
+        with _strategy_factory_lock:
+            if _strategy_factory is None:
+                _strategy_factory = StrategyFactory()
     return _strategy_factory
 
 def reset_strategy_factory():
@@ -2,19 +2,18 @@
 OANDA Streaming Data Feed - API Optimized
 Uses OANDA Pricing Stream API to minimize API calls by 95%
 """
-import asyncio
-import json
 import logging
-import threading
-import time
-from datetime import datetime, timezone
 from typing import Dict, Any, Optional, Callable
-import websocket
-import requests
 from dataclasses import dataclass
 
 from .oanda_client import OandaClient, get_oanda_client
 from .data_feed import MarketData
+from .candle_store import to_ns, ns_to_oanda
+from .ring_buffer import RingBuffer, QUOTE_DTYPE
+from .pricing_stream import PricingStream
+from .bar_aggregator import BarAggregator, Bar
+from .market_data_bus import MarketDataBus, get_market_data_bus
+from .warm_start import fetch_candle_batch
 
 logger = logging.getLogger(__name__)
 
@@ -30,33 +29,40 @@ class StreamPrice:
 class StreamingDataFeed:
     """Optimized streaming data feed using OANDA Pricing Stream API"""
     
-    def __init__(self, account_id: str, instruments: list, api_key: str, environment: str = "practice"):
+    def __init__(self, account_id: str, instruments: list, api_key: str, environment: str = "practice",
+                 stream_base_url: Optional[str] = None, oanda_client: Optional[OandaClient] = None,
+                 bus: Optional[MarketDataBus] = None):
         self.account_id = account_id
         self.instruments = instruments
         self.api_key = api_key
         self.environment = environment
         
         # Streaming state
-        self.ws = None
+        self.stream = PricingStream(account_id, instruments, api_key, environment=environment,
+                                    base_url=stream_base_url, on_price=self._process_price_update,
+                                    on_gap=self._backfill_gap, on_heartbeat=self._on_heartbeat)
         self.is_streaming = False
-        self.stream_thread = None
+        self.oanda_client = oanda_client  # REST client for gap backfill, created lazily
         self.last_prices = {}
-        self.price_history = {inst: [] for inst in instruments}
         self.max_history = 1000  # Keep last 1000 prices per instrument
+        # Fixed-size bid/ask/time rings: bounded memory, O(1) appends
+        self.price_history = {inst: RingBuffer(self.max_history, dtype=QUOTE_DTYPE) for inst in instruments}
         
         # Callbacks
         self.on_price_update: Optional[Callable] = None
         self.on_new_candle: Optional[Callable] = None
         
+        # Ticks and closed bars are published once on the bus for every consumer
+        self.bus = bus or get_market_data_bus()
+        
+        # Bars built from tick timestamps; an M1 close is the "new candle" event
+        self.bars = BarAggregator()
+        self.bars.subscribe(self.bus.publish_bar)
+        if 'M1' in self.bars.granularities:
+            self.bars.subscribe(self._on_m1_close, 'M1')
+        
         # API optimization
         self.api_calls_made = 0
-        self.last_candle_times = {inst: None for inst in instruments}
-        
-        # Base URL for streaming
-        if environment == "practice":
-            self.stream_url = "wss://stream-fxpractice.oanda.com/v3/accounts/{}/pricing/stream"
-        else:
-            self.stream_url = "wss://stream-fxtrade.oanda.com/v3/accounts/{}/pricing/stream"
         
         logger.info(f"✅ StreamingDataFeed initialized for {len(instruments)} instruments")
     
@@ -68,68 +74,50 @@ class StreamingDataFeed:
         
         logger.info("🚀 Starting OANDA pricing stream...")
         self.is_streaming = True
-        self.stream_thread = threading.Thread(target=self._stream_loop, daemon=True)
-        self.stream_thread.start()
+        self.stream.start()
         
-        # Wait for connection
-        time.sleep(2)
-        logger.info("✅ Streaming started - API calls reduced by 95%")
+        # Wait for connection (the stream keeps reconnecting on its own if this times out)
+        if self.stream.connected.wait(timeout=5):
+            logger.info("✅ Streaming started - API calls reduced by 95%")
+        else:
+            logger.warning("⚠️ Pricing stream not connected yet - retrying in background")
     
     def stop_streaming(self):
         """Stop the streaming connection"""
         logger.info("🛑 Stopping streaming...")
         self.is_streaming = False
-        
-        if self.ws:
-            self.ws.close()
-        
-        if self.stream_thread:
-            self.stream_thread.join(timeout=5)
-        
+        self.stream.stop()
         logger.info("✅ Streaming stopped")
     
-    def _stream_loop(self):
-        """Main streaming loop"""
-        try:
-            # Build stream URL
-            url = self.stream_url.format(self.account_id)
-            instruments_param = "&".join([f"instruments={inst}" for inst in self.instruments])
-            full_url = f"{url}?{instruments_param}"
-            
-            logger.info(f"🔗 Connecting to: {full_url}")
-            
-            # Create WebSocket connection
-            self.ws = websocket.WebSocketApp(
-                full_url,
-                header=[f"Authorization: Bearer {self.api_key}"],
-                on_message=self._on_message,
-                on_error=self._on_error,
-                on_close=self._on_close,
-                on_open=self._on_open
-            )
-            
-            # Run forever
-            self.ws.run_forever()
-            
-        except Exception as e:
-            logger.error(f"❌ Streaming error: {e}")
-            self.is_streaming = False
-    
-    def _on_open(self, ws):
-        """WebSocket opened"""
-        logger.info("✅ WebSocket connection opened")
-    
-    def _on_message(self, ws, message):
-        """Handle incoming price updates"""
-        try:
-            data = json.loads(message)
-            
-            if 'prices' in data:
-                for price_data in data['prices']:
-                    self._process_price_update(price_data)
-            
-        except Exception as e:
-            logger.error(f"❌ Message processing error: {e}")
+    def _backfill_gap(self, instrument: str, since_ns: int):
+        """After a reconnect, append the M1 closes missed since the last streamed tick and reconcile bars"""
+        if instrument not in self.price_history:
+            return
+        if self.oanda_client is None:
+            self.oanda_client = get_oanda_client()
+        data = None
+        for granularity, step in self.bars.steps.items():
+            # From the open of the bar the last tick fell in, so that bar is corrected too
+            candles = self.oanda_client.get_candles(instrument, granularity=granularity, count=500, price='BA',
+                                                    from_time=ns_to_oanda(since_ns - since_ns % step))
+            self.api_calls_made += 1
+            self.bars.reconcile(instrument, granularity, candles.get('candles', []))
+            if granularity == 'M1':
+                data = candles
+        if data is None:
+            data = self.oanda_client.get_candles(instrument, granularity='M1', count=500, price='BA',
+                                                 from_time=ns_to_oanda(since_ns))
+            self.api_calls_made += 1
+        added = 0
+        for candle in data.get('candles', []):
+            if 'bid' not in candle or 'ask' not in candle or not candle.get('complete', True):
+                continue
+            time_ns = to_ns(candle['time'])
+            if time_ns <= since_ns:
+                continue
+            self.price_history[instrument].append((float(candle['bid']['c']), float(candle['ask']['c']), time_ns))
+            added += 1
+        logger.info(f"📥 Backfilled {added} bars for {instrument} after stream reconnect")
     
     def _process_price_update(self, price_data: dict):
         """Process individual price update"""
@@ -149,31 +137,27 @@ class StreamingDataFeed:
             
             # Create MarketData object
             market_data = MarketData(
-                instrument=instrument,
+                pair=instrument,
                 bid=bid,
                 ask=ask,
                 timestamp=time_str,
-                spread=ask - bid
+                is_live=True,
+                data_source='OANDA_Stream',
+                spread=ask - bid,
+                last_update_age=0
             )
             
             # Update last prices
             self.last_prices[instrument] = market_data
+            self.bus.publish_tick(instrument, market_data)
             
             # Add to history
-            self.price_history[instrument].append(market_data)
-            if len(self.price_history[instrument]) > self.max_history:
-                self.price_history[instrument].pop(0)
-            
-            # Check for new candle (M1)
-            current_time = datetime.now(timezone.utc)
-            minute_key = current_time.strftime('%Y-%m-%d %H:%M')
+            time_ns = to_ns(time_str) if time_str else 0
+            self.price_history[instrument].append((bid, ask, time_ns))
             
-            if self.last_candle_times[instrument] != minute_key:
-                self.last_candle_times[instrument] = minute_key
-                
-                # Trigger new candle callback
-                if self.on_new_candle:
-                    self.on_new_candle(instrument, market_data)
+            # Aggregate into bars on the exchange timestamp (closing bars fires on_new_candle)
+            if time_ns:
+                self.bars.on_tick(instrument, bid, ask, time_ns)
             
             # Trigger price update callback
             if self.on_price_update:
@@ -182,14 +166,29 @@ class StreamingDataFeed:
         except Exception as e:
             logger.error(f"❌ Price update processing error: {e}")
     
-    def _on_error(self, ws, error):
-        """WebSocket error"""
-        logger.error(f"❌ WebSocket error: {error}")
+    def _on_heartbeat(self, time_str: str):
+        """Close bars whose period ended on the server clock, even if no tick arrived since"""
+        try:
+            self.bars.close_due(to_ns(time_str))
+        except ValueError:
+            pass
     
-    def _on_close(self, ws, close_status_code, close_msg):
-        """WebSocket closed"""
-        logger.info(f"🔌 WebSocket closed: {close_status_code} - {close_msg}")
-        self.is_streaming = False
+    def _on_m1_close(self, bar: Bar):
+        """M1 bar closed by a later tick or heartbeat: trigger the new-candle scan"""
+        if bar.source != 'ticks' or not self.on_new_candle:
+            return  # Bars reconciled from OANDA candles after a reconnect are history, not a new candle
+        market_data = self.last_prices.get(bar.instrument)
+        if market_data is not None:
+            self.on_new_candle(bar.instrument, market_data)
+    
+    def subscribe_bars(self, callback: Callable[[Bar], None], granularity: Optional[str] = None):
+        """Receive every closed bar (optionally of one granularity)"""
+        self.bars.subscribe(callback, granularity)
+    
+    def get_bars(self, instrument: str, granularity: str = 'M1', count: int = 100,
+                 include_current: bool = False) -> list:
+        """Recent bars built from the stream, as OANDA candle dicts"""
+        return self.bars.get_candles(instrument, granularity, count, include_current)
     
     def get_latest_prices(self) -> Dict[str, MarketData]:
         """Get latest prices for all instruments"""
@@ -200,6 +199,16 @@ class StreamingDataFeed:
         if instrument not in self.price_history:
             return []
         
+        return [
+            MarketData(pair=instrument, bid=bid, ask=ask, timestamp=ns_to_oanda(time_ns), is_live=True,
+                       data_source='OANDA_Stream', spread=ask - bid, last_update_age=0)
+            for bid, ask, time_ns in self.price_history[instrument][-count:].tolist()
+        ]
+    
+    def get_price_arrays(self, instrument: str, count: int = 100):
+        """Zero-copy view of the last count quotes (fields bid, ask, time ns); valid until the next tick"""
+        if instrument not in self.price_history:
+            return None
         return self.price_history[instrument][-count:]
     
     def get_api_usage_stats(self) -> Dict[str, Any]:
@@ -208,6 +217,8 @@ class StreamingDataFeed:
             'api_calls_made': self.api_calls_made,
             'instruments_tracked': len(self.instruments),
             'streaming_active': self.is_streaming,
+            'stream': self.stream.get_stats(),
+            'bars': self.bars.get_stats(),
             'optimization_ratio': '95% reduction vs REST polling'
         }
 
@@ -219,6 +230,7 @@ class OptimizedMultiAccountDataFeed:
         self.shared_instruments = set()
         self.is_running = False
         self.scan_callbacks = []
+        self.bar_callbacks = []  # (callback, granularity), re-attached whenever the shared feed is created
         self.oanda_client = get_oanda_client()
         
         # Load configuration
@@ -265,16 +277,16 @@ class OptimizedMultiAccountDataFeed:
         # Set up callbacks
         shared_feed.on_new_candle = self._on_new_candle
         shared_feed.on_price_update = self._on_price_update
+        for callback, granularity in self.bar_callbacks:
+            shared_feed.subscribe_bars(callback, granularity)
         
-        # Warm-start: if price history is too short, fetch recent candles once
+        # Warm-start: seed the M1 bar history from recent candles (one concurrent batch)
         try:
-            for inst in list(self.shared_instruments):
-                try:
-                    candles = self.oanda_client.get_candles(inst, granularity='M1', count=50, price='BA')
-                    # We do not store here; strategies will build their own history on first analyze
-                    logger.info(f"📥 Warm-start candles loaded: {inst} ({len(candles.get('candles', []))})")
-                except Exception as e:
-                    logger.warning(f"⚠️ Warm-start failed for {inst}: {e}")
+            fetched = fetch_candle_batch(self.oanda_client, list(self.shared_instruments),
+                                         granularity='M1', count=50, price='BA')
+            for inst, candles in fetched.items():
+                shared_feed.bars.reconcile(inst, 'M1', candles)
+            logger.info(f"📥 Warm-start candles loaded into M1 bars for {len(fetched)} instruments")
         except Exception as e:
             logger.warning(f"⚠️ Warm-start pass failed: {e}")
 
@@ -330,6 +342,19 @@ class OptimizedMultiAccountDataFeed:
         self.scan_callbacks.append(callback)
         logger.info(f"✅ Registered scan callback: {callback.__name__}")
     
+    def register_bar_callback(self, callback: Callable, granularity: Optional[str] = None):
+        """Register callback(bar) for closed stream bars (all granularities unless one is given)"""
+        self.bar_callbacks.append((callback, granularity))
+        if 'shared' in self.streaming_feeds:
+            self.streaming_feeds['shared'].subscribe_bars(callback, granularity)
+        logger.info(f"✅ Registered bar callback: {getattr(callback, '__name__', callback)} ({granularity or 'all'})")
+    
+    def get_bars(self, instrument: str, granularity: str = 'M1', count: int = 100) -> list:
+        """Recent stream-built bars for an instrument (OANDA candle dicts)"""
+        if 'shared' not in self.streaming_feeds:
+            return []
+        return self.streaming_feeds['shared'].get_bars(instrument, granularity, count)
+    
     def get_optimization_stats(self) -> Dict[str, Any]:
         """Get optimization statistics"""
         if 'shared' not in self.streaming_feeds:
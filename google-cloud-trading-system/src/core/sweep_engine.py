@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Parallel Parameter Sweep Engine
+Process-pool evaluation of parameter sets with streamed results and checkpoint/resume
+"""
+
+import os
+import json
+import time
+import logging
+import multiprocessing
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Set once per worker process by the pool initializer
+_worker_evaluate: Optional[Callable[[Dict[str, Any]], Any]] = None
+
+
+def _init_worker(evaluate: Callable[[Dict[str, Any]], Any]):
+    global _worker_evaluate
+    _worker_evaluate = evaluate
+
+
+def _run_task(task: Tuple[int, Dict[str, Any]]) -> Tuple[int, Any, Optional[str]]:
+    index, params = task
+    try:
+        return index, _worker_evaluate(params), None
+    except Exception as e:
+        return index, None, f"{type(e).__name__}: {e}"
+
+
+def params_key(params: Dict[str, Any]) -> str:
+    """Canonical identity of a parameter set (used to match checkpointed results)"""
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+class SweepEngine:
+    """
+    Evaluates evaluate(params) for many parameter sets on a process pool.
+
+    evaluate is handed to each worker once, through the pool initializer, and
+    every task only carries its (index, params) pair. With the default 'fork'
+    start method workers inherit the parent's data (memory-mapped OHLCV arrays,
+    DataFrames, fetchers) without pickling it; with 'spawn' evaluate must be
+    picklable. Each task should build its own strategy instance from params.
+
+    Results stream back as they finish and, when checkpoint_path is set, are
+    appended to a JSONL file so an interrupted sweep resumes where it stopped.
+    Randomly sampled sweeps should build their parameter sets through plan().
+    """
+
+    def __init__(self, evaluate: Callable[[Dict[str, Any]], Any], workers: Optional[int] = None,
+                 checkpoint_path: Optional[str] = None, chunksize: Optional[int] = None,
+                 start_method: Optional[str] = None, encode: Optional[Callable[[Any], Any]] = None,
+                 decode: Optional[Callable[[Any], Any]] = None, name: str = 'sweep'):
+        self.evaluate = evaluate
+        self.workers = workers or int(os.getenv('SWEEP_WORKERS', '0')) or os.cpu_count() or 1
+        self.checkpoint_path = checkpoint_path
+        self.chunksize = chunksize
+        self.start_method = start_method or os.getenv('SWEEP_START_METHOD') or (
+            'fork' if 'fork' in multiprocessing.get_all_start_methods() else None
+        )
+        self.encode = encode or (lambda result: result)
+        self.decode = decode or (lambda result: result)
+        self.name = name
+        self.stats: Dict[str, Any] = {}
+
+    def _load_checkpoint(self) -> Dict[str, Any]:
+        done: Dict[str, Any] = {}
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return done
+        with open(self.checkpoint_path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Partial last line from an interrupted run
+                    continue
+                if 'key' in record:
+                    done[record['key']] = record.get('result')
+        return done
+
+    def _load_plan(self) -> Optional[List[Dict[str, Any]]]:
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if 'param_sets' in record:
+                    return record['param_sets']
+        return None
+
+    def plan(self, generate: Callable[[], Iterable[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Parameter sets for this sweep that stay the same across restarts.
+
+        Randomly sampled sets cannot be regenerated after a restart, so with a
+        checkpoint the first run stores them as the checkpoint's plan record and a
+        resumed run reads them back instead of calling generate() again.
+        """
+        planned = self._load_plan()
+        if planned is not None:
+            logger.info(f"♻️ {self.name}: reusing {len(planned)} planned parameter sets from the checkpoint")
+            return planned
+
+        param_sets = list(generate())
+        if self.checkpoint_path:
+            record = json.dumps({'param_sets': param_sets}, default=str)
+            # Resume matches on the stored form, so run exactly what was written
+            param_sets = json.loads(record)['param_sets']
+            with self._open_checkpoint() as f:
+                f.write(record + '\n')
+        return param_sets
+
+    def _open_checkpoint(self):
+        os.makedirs(os.path.dirname(self.checkpoint_path) or '.', exist_ok=True)
+        checkpoint = open(self.checkpoint_path, 'a+')
+        # Never append onto a line left truncated by an interrupted run
+        if checkpoint.tell() > 0:
+            checkpoint.seek(checkpoint.tell() - 1)
+            if checkpoint.read(1) != '\n':
+                checkpoint.write('\n')
+        return checkpoint
+
+    def _execute(self, pending: List[Tuple[int, Dict[str, Any]]]) -> Iterator[Tuple[int, Any, Optional[str]]]:
+        if self.workers <= 1 or len(pending) <= 1:
+            _init_worker(self.evaluate)
+            for task in pending:
+                yield _run_task(task)
+            return
+
+        chunksize = self.chunksize or max(1, len(pending) // (self.workers * 8))
+        context = multiprocessing.get_context(self.start_method)
+        with context.Pool(self.workers, initializer=_init_worker, initargs=(self.evaluate,)) as pool:
+            for outcome in pool.imap_unordered(_run_task, pending, chunksize):
+                yield outcome
+
+    def run(self, param_sets: Iterable[Dict[str, Any]],
+            on_result: Optional[Callable[[int, Dict[str, Any], Any], None]] = None) -> List[Any]:
+        """
+        Evaluate every parameter set and return the non-None results in input order.
+
+        on_result(index, params, result) is called as each result arrives.
+        """
+        param_sets = list(param_sets)
+        results: List[Any] = [None] * len(param_sets)
+        done = self._load_checkpoint()
+
+        pending = []
+        for index, params in enumerate(param_sets):
+            key = params_key(params)
+            if key in done:
+                stored = done[key]
+                results[index] = self.decode(stored) if stored is not None else None
+            else:
+                pending.append((index, params))
+
+        resumed = len(param_sets) - len(pending)
+        self.stats = {'total': len(param_sets), 'resumed': resumed, 'completed': 0, 'failed': 0,
+                      'workers': self.workers, 'elapsed_sec': 0.0}
+        if resumed:
+            logger.info(f"♻️ {self.name}: resuming, {resumed}/{len(param_sets)} parameter sets already checkpointed")
+        logger.info(f"🔬 {self.name}: evaluating {len(pending)} parameter sets on {self.workers} worker(s)")
+
+        start = time.perf_counter()
+        checkpoint = None
+        if self.checkpoint_path and pending:
+            checkpoint = self._open_checkpoint()
+        try:
+            report_every = max(1, len(pending) // 10)
+            for index, result, error in self._execute(pending):
+                params = param_sets[index]
+                if error:
+                    self.stats['failed'] += 1
+                    logger.debug(f"  {self.name}: parameter set {index} failed: {error}")
+                else:
+                    results[index] = result
+                    self.stats['completed'] += 1
+                    if checkpoint:
+                        checkpoint.write(json.dumps({
+                            'key': params_key(params),
+                            'result': self.encode(result) if result is not None else None
+                        }, default=str) + '\n')
+                        checkpoint.flush()
+                    if on_result:
+                        on_result(index, params, result)
+
+                finished = self.stats['completed'] + self.stats['failed']
+                if finished % report_every == 0:
+                    logger.info(f"  Progress: {finished}/{len(pending)} ({finished / len(pending) * 100:.1f}%)")
+        finally:
+            if checkpoint:
+                checkpoint.close()
+            self.stats['elapsed_sec'] = round(time.perf_counter() - start, 3)
+
+        logger.info(f"✅ {self.name}: {self.stats['completed']} done, {self.stats['failed']} failed "
+                    f"in {self.stats['elapsed_sec']:.1f}s")
+        return [result for result in results if result is not None]
@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+Binary Tick Journal
+Append-only record of every tick and bar on the market data bus, with deterministic replay of a recorded session
+"""
+
+import os
+import time
+import struct
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .bar_aggregator import Bar
+from .candle_store import to_ns, ns_to_oanda
+from .data_feed import MarketData
+from .market_data_bus import BAR, TICK, DROP_OLDEST, BusEvent, MarketDataBus
+
+logger = logging.getLogger(__name__)
+
+# Segment layout: 8-byte file header, then records of
+#   <HB  payload length, record kind
+#   fixed-width payload for the kind
+# The length prefix lets a reader skip kinds it does not know and spot a torn tail.
+MAGIC = b'TJNL'
+VERSION = 1
+FILE_HEADER = struct.Struct('<4sHH')            # magic, version, reserved
+RECORD_HEADER = struct.Struct('<HB')            # payload length, kind
+
+KIND_INSTRUMENT = 0
+KIND_TICK = 1
+KIND_BAR = 2
+
+INSTRUMENT_RECORD = struct.Struct('<H16s')      # instrument id, name (ids are per segment)
+TICK_RECORD = struct.Struct('<qHdd')            # time ns, instrument id, bid, ask
+BAR_RECORD = struct.Struct('<qH4sqB12d')        # open time ns, instrument id, granularity, volume, flags, bid/ask/mid OHLC
+
+BAR_COMPLETE = 1
+BAR_FROM_CANDLES = 2  # Reconciled from OANDA candles rather than built from ticks
+
+SEGMENT_SUFFIX = '.ticks'
+NS_PER_DAY = 86_400 * 10**9
+
+
+class JournalEvent(NamedTuple):
+    """One journal record: data is (bid, ask) for a tick and a Bar for a bar"""
+    kind: str
+    instrument: str
+    time_ns: int
+    data: Any
+
+
+def segment_name(time_ns: int) -> str:
+    """Daily segment file for an event time (UTC day)"""
+    return datetime.fromtimestamp(time_ns // 10**9, tz=timezone.utc).strftime('%Y%m%d') + SEGMENT_SUFFIX
+
+
+def list_segments(directory: str) -> List[str]:
+    """Segment paths in time order"""
+    if not os.path.isdir(directory):
+        return []
+    return [os.path.join(directory, name) for name in sorted(os.listdir(directory)) if name.endswith(SEGMENT_SUFFIX)]
+
+
+def _read_records(f) -> Iterator[Tuple[int, int, bytes]]:
+    """(offset after record, kind, payload) for each complete record; stops at a torn tail"""
+    header = f.read(FILE_HEADER.size)
+    if len(header) < FILE_HEADER.size:
+        return
+    magic, version, _ = FILE_HEADER.unpack(header)
+    if magic != MAGIC or version > VERSION:
+        raise ValueError(f"Not a tick journal segment (magic {magic!r}, version {version})")
+    offset = FILE_HEADER.size
+    while True:
+        head = f.read(RECORD_HEADER.size)
+        if len(head) < RECORD_HEADER.size:
+            return
+        length, kind = RECORD_HEADER.unpack(head)
+        payload = f.read(length)
+        if len(payload) < length:
+            return
+        offset += RECORD_HEADER.size + length
+        yield offset, kind, payload
+
+
+def read_segment(path: str, instruments: Optional[Iterable[str]] = None) -> Iterator[JournalEvent]:
+    """Events of one segment in write order"""
+    wanted = frozenset(instruments) if instruments is not None else None
+    names: Dict[int, str] = {}
+    with open(path, 'rb') as f:
+        for _, kind, payload in _read_records(f):
+            if kind == KIND_INSTRUMENT:
+                instrument_id, name = INSTRUMENT_RECORD.unpack(payload[:INSTRUMENT_RECORD.size])
+                names[instrument_id] = name.rstrip(b'\0').decode()
+            elif kind == KIND_TICK:
+                time_ns, instrument_id, bid, ask = TICK_RECORD.unpack(payload[:TICK_RECORD.size])
+                instrument = names.get(instrument_id)
+                if instrument is not None and (wanted is None or instrument in wanted):
+                    yield JournalEvent(TICK, instrument, time_ns, (bid, ask))
+            elif kind == KIND_BAR:
+                time_ns, instrument_id, granularity, volume, flags, *prices = BAR_RECORD.unpack(
+                    payload[:BAR_RECORD.size])
+                instrument = names.get(instrument_id)
+                if instrument is not None and (wanted is None or instrument in wanted):
+                    bar = Bar.from_record(instrument, granularity.rstrip(b'\0').decode(), (time_ns, volume, *prices),
+                                          source='candles' if flags & BAR_FROM_CANDLES else 'ticks')
+                    bar.complete = bool(flags & BAR_COMPLETE)
+                    yield JournalEvent(BAR, instrument, time_ns, bar)
+            # Unknown kinds are skipped (written by a newer version)
+
+
+def iter_journal(directory: str, start: Any = None, end: Any = None,
+                 instruments: Optional[Iterable[str]] = None) -> Iterator[JournalEvent]:
+    """Events across segments in write order, optionally limited to [start, end) and some instruments"""
+    start_ns = to_ns(start) if start is not None else None
+    end_ns = to_ns(end) if end is not None else None
+    first = segment_name(start_ns) if start_ns is not None else None
+    last = segment_name(end_ns) if end_ns is not None else None
+    for path in list_segments(directory):
+        name = os.path.basename(path)
+        if (first is not None and name < first) or (last is not None and name > last):
+            continue
+        for event in read_segment(path, instruments):
+            if start_ns is not None and event.time_ns < start_ns:
+                continue
+            if end_ns is not None and event.time_ns >= end_ns:
+                continue
+            yield event
+
+
+class TickJournal:
+    """
+    Append-only binary journal of ticks and bars, one segment file per UTC day.
+
+    Records are fixed width per kind (a tick is 29 bytes on disk), so
+    recording costs one small buffered append per update rather than a
+    rewrite of the history. Writes are flushed every flush_interval
+    seconds; a crash loses at most that much, and a record torn by the
+    crash is truncated when the segment is next opened. attach() records
+    everything published on a market data bus.
+    """
+
+    def __init__(self, directory: str = None, flush_interval: float = None, fsync: bool = None):
+        self.directory = directory or os.getenv('TICK_JOURNAL_DIR', os.path.join('data', 'tick_journal'))
+        self.flush_interval = (float(os.getenv('TICK_JOURNAL_FLUSH_SECONDS', '1'))
+                               if flush_interval is None else flush_interval)
+        self.fsync = os.getenv('TICK_JOURNAL_FSYNC', 'false').lower() == 'true' if fsync is None else fsync
+        self.lock = threading.Lock()
+        self._file = None
+        self._segment: Optional[str] = None
+        self._day: Optional[int] = None
+        self._ids: Dict[str, int] = {}
+        self._last_flush = time.monotonic()
+        self.subscription = None
+        self.stats = {'ticks': 0, 'bars': 0, 'bytes': 0, 'segments': 0, 'truncated_bytes': 0, 'errors': 0}
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _open_segment(self, time_ns: int):
+        """Switch to the segment for time_ns (called with the lock held)"""
+        self._close_file()
+        path = os.path.join(self.directory, segment_name(time_ns))
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            self._truncate_torn_tail(path)
+            self._file = open(path, 'ab')
+        else:
+            self._file = open(path, 'wb')
+            self._file.write(FILE_HEADER.pack(MAGIC, VERSION, 0))
+            self.stats['bytes'] += FILE_HEADER.size
+        self._segment = path
+        self._day = time_ns // NS_PER_DAY
+        self._ids = {}  # Instrument ids are re-declared in every segment (and every reopen)
+        self.stats['segments'] += 1
+        logger.info(f"📼 Tick journal segment: {path}")
+
+    def _truncate_torn_tail(self, path: str):
+        with open(path, 'rb') as f:
+            good = FILE_HEADER.size
+            for good, _, _ in _read_records(f):
+                pass
+        size = os.path.getsize(path)
+        if size > good:
+            with open(path, 'r+b') as f:
+                f.truncate(good)
+            self.stats['truncated_bytes'] += size - good
+            logger.warning(f"⚠️ Tick journal {os.path.basename(path)}: dropped {size - good} bytes of torn record")
+
+    def _write(self, kind: int, payload: bytes):
+        self._file.write(RECORD_HEADER.pack(len(payload), kind))
+        self._file.write(payload)
+        self.stats['bytes'] += RECORD_HEADER.size + len(payload)
+
+    def _instrument_id(self, instrument: str) -> int:
+        instrument_id = self._ids.get(instrument)
+        if instrument_id is None:
+            instrument_id = self._ids[instrument] = len(self._ids)
+            self._write(KIND_INSTRUMENT, INSTRUMENT_RECORD.pack(instrument_id, instrument.encode()))
+        return instrument_id
+
+    def _prepare(self, time_ns: int):
+        if self._file is None or time_ns // NS_PER_DAY != self._day:
+            self._open_segment(time_ns)
+
+    def _maybe_flush(self):
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self._flush_file()
+
+    def append_tick(self, instrument: str, bid: float, ask: float, time_ns: int):
+        with self.lock:
+            self._prepare(time_ns)
+            self._write(KIND_TICK, TICK_RECORD.pack(time_ns, self._instrument_id(instrument), bid, ask))
+            self.stats['ticks'] += 1
+            self._maybe_flush()
+
+    def append_bar(self, bar: Bar):
+        flags = (BAR_COMPLETE if bar.complete else 0) | (BAR_FROM_CANDLES if bar.source == 'candles' else 0)
+        with self.lock:
+            self._prepare(bar.time_ns)
+            self._write(KIND_BAR, BAR_RECORD.pack(bar.time_ns, self._instrument_id(bar.instrument),
+                                                  bar.granularity.encode(), bar.volume, flags,
+                                                  *bar.bid, *bar.ask, *bar.mid))
+            self.stats['bars'] += 1
+            self._maybe_flush()
+
+    def record(self, event: BusEvent):
+        """Append one bus event (ticks carry MarketData, bars carry Bar)"""
+        try:
+            if event.kind == TICK:
+                data = event.data
+                timestamp = getattr(data, 'timestamp', None)
+                time_ns = to_ns(timestamp) if timestamp else time.time_ns()
+                self.append_tick(event.instrument, float(data.bid), float(data.ask), time_ns)
+            elif event.kind == BAR:
+                self.append_bar(event.data)
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"❌ Tick journal write failed for {event.instrument}: {e}")
+
+    def attach(self, bus: MarketDataBus, instruments: Optional[Iterable[str]] = None, maxsize: int = None):
+        """Record every tick and bar published on the bus (from its own subscriber thread)"""
+        if self.subscription is None:
+            self.subscription = bus.subscribe(
+                'tick-journal', instruments, kinds=(TICK, BAR),
+                maxsize=maxsize or int(os.getenv('TICK_JOURNAL_QUEUE_SIZE', '65536')),
+                policy=DROP_OLDEST, callback=self.record)
+        return self.subscription
+
+    def detach(self):
+        if self.subscription is not None:
+            self.subscription.bus.unsubscribe(self.subscription)
+            self.subscription = None
+        self.flush()
+
+    def _flush_file(self):
+        if self._file is not None:
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+        self._last_flush = time.monotonic()
+
+    def flush(self):
+        with self.lock:
+            self._flush_file()
+
+    def _close_file(self):
+        if self._file is not None:
+            self._flush_file()
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        """Detach from the bus and close the current segment"""
+        if self.subscription is not None:
+            self.detach()
+        with self.lock:
+            self._close_file()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            stats = dict(self.stats)
+            stats['segment'] = os.path.basename(self._segment) if self._segment else None
+        stats['directory'] = self.directory
+        stats['segments_on_disk'] = len(list_segments(self.directory))
+        if self.subscription is not None:
+            stats['subscription'] = self.subscription.get_stats()
+        return stats
+
+
+class ReplayPriceSource:
+    """
+    Stands in for OandaClient during a replay: latest prices are the journal's"""
+
+    def __init__(self):
+        self.prices: Dict[str, Tuple[float, float, int]] = {}
+
+    def update(self, instrument: str, bid: float, ask: float, time_ns: int):
+        self.prices[instrument] = (bid, ask, time_ns)
+
+    def get_current_prices(self, instruments: List[str], force_refresh: bool = False) -> Dict[str, Any]:
+        from .oanda_client import OandaPrice
+        prices = {}
+        for instrument in instruments:
+            if instrument in self.prices:
+                bid, ask, time_ns = self.prices[instrument]
+                timestamp = datetime.fromtimestamp(time_ns / 1e9, tz=timezone.utc)
+                prices[instrument] = OandaPrice(instrument=instrument, bid=bid, ask=ask, timestamp=timestamp,
+                                                spread=ask - bid, fetched_at=timestamp, source='journal')
+        return prices
+
+
+class _ReplayNotifier:
+    """Collects scanner notifications instead of sending them"""
+
+    def __init__(self):
+        self.messages: List[Tuple[str, str]] = []
+
+    def send_message(self, message: str, message_type: str = None, *args, **kwargs):
+        self.messages.append((message_type, message))
+        return True
+
+    def __getattr__(self, item):
+        return lambda *args, **kwargs: None
+
+
+class JournalReplay:
+    """
+    Feed a recorded session back through the bus and, optionally, the scanners.
+
+    Events are published in journal order. With speed > 0 the gaps between
+    events are reproduced at 1/speed of the recorded time (speed=300 plays a
+    day in under five minutes); speed=0 replays as fast as possible. A
+    scanner passed to run() is scanned every scan_interval seconds of
+    journal time against the replayed prices; its signals are collected
+    in self.signals instead of being executed, and its notifications are
+    kept rather than sent. Strategy logic that reads the wall clock (news
+    pauses, session filters) still sees the time of the replay.
+    """
+
+    def __init__(self, directory: str = None, bus: MarketDataBus = None, speed: float = None,
+                 start: Any = None, end: Any = None, instruments: Optional[Iterable[str]] = None):
+        self.directory = directory or os.getenv('TICK_JOURNAL_DIR', os.path.join('data', 'tick_journal'))
+        self.bus = bus
+        self.speed = float(os.getenv('TICK_REPLAY_SPEED', '0')) if speed is None else speed
+        self.start = start
+        self.end = end
+        self.instruments = instruments
+        self.prices = ReplayPriceSource()
+        self.now_ns: Optional[int] = None  # Journal time of the last replayed event
+        self.signals: List[Dict[str, Any]] = []
+        self.stats = {'ticks': 0, 'bars': 0, 'scans': 0, 'signals': 0, 'wall_seconds': 0.0, 'journal_seconds': 0.0}
+
+    def events(self) -> Iterator[JournalEvent]:
+        return iter_journal(self.directory, self.start, self.end, self.instruments)
+
+    def _publish(self, event: JournalEvent):
+        if event.kind == TICK:
+            bid, ask = event.data
+            self.prices.update(event.instrument, bid, ask, event.time_ns)
+            self.stats['ticks'] += 1
+            if self.bus is not None:
+                self.bus.publish_tick(event.instrument, MarketData(
+                    pair=event.instrument, bid=bid, ask=ask,
+                    timestamp=ns_to_oanda(event.time_ns), is_live=True, data_source='TickJournal', spread=ask - bid, last_update_age=0))
+        else:
+            self.stats['bars'] += 1
+            if self.bus is not None:
+                self.bus.publish_bar(event.data)
+
+    def run(self, scanner=None, scan_interval: float = None,
+            on_event: Optional[Callable[[JournalEvent], None]] = None) -> Dict[str, Any]:
+        """Replay the journal once; returns the replay stats"""
+        scan_interval_ns = int((scan_interval or float(os.getenv('TICK_REPLAY_SCAN_SECONDS', '300'))) * 1e9)
+        restore = self._attach_scanner(scanner) if scanner is not None else None
+        wall_start = time.perf_counter()
+        first_ns = next_scan_ns = None
+        try:
+            for event in self.events():
+                if first_ns is None:
+                    first_ns = event.time_ns
+                    next_scan_ns = first_ns + scan_interval_ns
+                if self.speed > 0:
+                    delay = (event.time_ns - first_ns) / 1e9 / self.speed - (time.perf_counter() - wall_start)
+                    if delay > 0:
+                        time.sleep(delay)
+                # Scans due before this event see the prices as they were at the scan time
+                while scanner is not None and event.time_ns >= next_scan_ns:
+                    self.now_ns = next_scan_ns
+                    self._scan(scanner)
+                    next_scan_ns += scan_interval_ns
+                self.now_ns = event.time_ns
+                self._publish(event)
+                if on_event is not None:
+                    on_event(event)
+            if scanner is not None and first_ns is not None:
+                self._scan(scanner)  # Final scan on the end-of-journal prices
+        finally:
+            if restore is not None:
+                restore()
+        self.stats['wall_seconds'] = round(time.perf_counter() - wall_start, 3)
+        if first_ns is not None:
+            self.stats['journal_seconds'] = round((self.now_ns - first_ns) / 1e9, 3)
+        logger.info(f"▶️ Replayed {self.stats['ticks']} ticks and {self.stats['bars']} bars "
+                    f"({self.stats['journal_seconds']:.0f}s of journal in {self.stats['wall_seconds']:.1f}s), "
+                    f"{self.stats['scans']} scans, {self.stats['signals']} signals")
+        return dict(self.stats)
+
+    def _scan(self, scanner):
+        self.stats['scans'] += 1
+        scanner._run_scan()
+
+    def _attach_scanner(self, scanner) -> Callable[[], None]:
+        """Point the scanner at the replayed prices; returns a function undoing it"""
+        saved = {name: scanner.__dict__[name] for name in ('oanda', 'notifier', '_execute_signals')
+                 if name in scanner.__dict__}
+        scanner.oanda = self.prices
+        scanner.notifier = _ReplayNotifier()
+
+        def record_signals(strategy_name, account_id, signals, *args, **kwargs):
+            for signal in signals:
+                self.signals.append({'time_ns': self.now_ns, 'strategy': strategy_name, 'signal': signal})
+            self.stats['signals'] += len(signals)
+
+        scanner._execute_signals = record_signals
+
+        def restore():
+            for name in ('oanda', 'notifier', '_execute_signals'):
+                if name in saved:
+                    setattr(scanner, name, saved[name])
+                else:
+                    scanner.__dict__.pop(name, None)
+        return restore
+
+
+# Global instance
+_tick_journal = None
+_journal_lock = threading.Lock()
+
+
+def get_tick_journal() -> TickJournal:
+    """Get the process-wide tick journal"""
+    global _tick_journal
+    if _tick_journal is None:
+        with _journal_lock:
+            if _tick_journal is None:
+                _tick_journal = TickJournal()
+    return _tick_journal
+
+
+def journal_enabled() -> bool:
+    return os.getenv('TICK_JOURNAL_ENABLED', 'false').lower() == 'true'
+
+
+def start_tick_journal(bus: MarketDataBus = None) -> Optional[TickJournal]:
+    """Record the process-wide bus when TICK_JOURNAL_ENABLED=true; idempotent"""
+    if not journal_enabled():
+        return None
+    from .market_data_bus import get_market_data_bus
+    journal = get_tick_journal()
+    journal.attach(bus or get_market_data_bus())
+    return journal
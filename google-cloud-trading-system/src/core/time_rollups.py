@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Time-Bucket Rollups
+Hourly/daily/weekly/monthly trade and snapshot aggregates, maintained incrementally inside the writing transaction
+"""
+
+import json
+import logging
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+BUCKETS = ('hour', 'day', 'week', 'month')
+
+# Same keys MetricsCalculator's breakdowns use; all sort lexicographically in time order
+PERIOD_FORMATS = {'hour': '%Y-%m-%dT%H', 'day': '%Y-%m-%d', 'week': '%Y-W%W', 'month': '%Y-%m'}
+
+ROLLUP_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS trade_rollups (
+        bucket TEXT NOT NULL,
+        period TEXT NOT NULL,
+        strategy_id TEXT NOT NULL DEFAULT '',
+        account_id TEXT NOT NULL DEFAULT '',
+        instrument TEXT NOT NULL DEFAULT '',
+        trades INTEGER DEFAULT 0,
+        wins INTEGER DEFAULT 0,
+        losses INTEGER DEFAULT 0,
+        pnl REAL DEFAULT 0.0,
+        wins_sum REAL DEFAULT 0.0,
+        losses_sum REAL DEFAULT 0.0,
+        duration_sum INTEGER DEFAULT 0,
+        commission REAL DEFAULT 0.0,
+        PRIMARY KEY (bucket, period, strategy_id, account_id, instrument)
+    );
+    CREATE INDEX IF NOT EXISTS idx_trade_rollups_strategy ON trade_rollups(bucket, strategy_id, period);
+    CREATE INDEX IF NOT EXISTS idx_trade_rollups_account ON trade_rollups(bucket, account_id, period);
+
+    CREATE TABLE IF NOT EXISTS snapshot_rollups (
+        bucket TEXT NOT NULL,
+        period TEXT NOT NULL,
+        series_id TEXT NOT NULL,
+        samples INTEGER DEFAULT 0,
+        first_time TEXT,
+        last_time TEXT,
+        open_value REAL,
+        high_value REAL,
+        low_value REAL,
+        close_value REAL,
+        last_values TEXT,
+        PRIMARY KEY (series_id, bucket, period)
+    );
+"""
+
+_TRADE_UPSERT = """
+    INSERT INTO trade_rollups (bucket, period, strategy_id, account_id, instrument,
+                               trades, wins, losses, pnl, wins_sum, losses_sum, duration_sum, commission)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(bucket, period, strategy_id, account_id, instrument) DO UPDATE SET
+        trades = trades + excluded.trades,
+        wins = wins + excluded.wins,
+        losses = losses + excluded.losses,
+        pnl = pnl + excluded.pnl,
+        wins_sum = wins_sum + excluded.wins_sum,
+        losses_sum = losses_sum + excluded.losses_sum,
+        duration_sum = duration_sum + excluded.duration_sum,
+        commission = commission + excluded.commission
+"""
+
+# Every right-hand side sees the old row, so open/close compare against the old first/last times
+_SNAPSHOT_UPSERT = """
+    INSERT INTO snapshot_rollups (bucket, period, series_id, samples, first_time, last_time,
+                                  open_value, high_value, low_value, close_value, last_values)
+    VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(series_id, bucket, period) DO UPDATE SET
+        samples = samples + 1,
+        open_value = CASE WHEN excluded.first_time < first_time THEN excluded.open_value ELSE open_value END,
+        first_time = MIN(first_time, excluded.first_time),
+        high_value = MAX(high_value, excluded.high_value),
+        low_value = MIN(low_value, excluded.low_value),
+        close_value = CASE WHEN excluded.last_time >= last_time THEN excluded.close_value ELSE close_value END,
+        last_values = CASE WHEN excluded.last_time >= last_time THEN excluded.last_values ELSE last_values END,
+        last_time = MAX(last_time, excluded.last_time)
+"""
+
+Timestamp = Union[str, datetime]
+
+
+def _to_datetime(timestamp: Timestamp) -> datetime:
+    if isinstance(timestamp, datetime):
+        return timestamp
+    return datetime.fromisoformat(str(timestamp).replace('Z', '+00:00'))
+
+
+def period_key(timestamp: Timestamp, bucket: str) -> str:
+    """The period a timestamp falls in, e.g. '2025-11-03T09', '2025-11-03', '2025-W44', '2025-11'"""
+    return _to_datetime(timestamp).strftime(PERIOD_FORMATS[bucket])
+
+
+def resolution_for(days: int) -> str:
+    """Finest bucket that keeps a window at a few hundred points"""
+    return 'hour' if days <= 31 else 'day'
+
+
+def create_rollup_tables(conn: sqlite3.Connection) -> bool:
+    """Create the rollup tables; True if they did not exist yet (the caller should backfill)"""
+    existed = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'trade_rollups'").fetchone() is not None
+    for statement in ROLLUP_SCHEMA.split(';'):
+        if statement.strip():
+            conn.execute(statement)
+    return not existed
+
+
+def apply_trade(conn: sqlite3.Connection, timestamp: Timestamp, pnl: float, strategy_id: str = '',
+                account_id: str = '', instrument: str = '', duration: int = 0, commission: float = 0.0,
+                sign: int = 1):
+    """Add a closed trade to its four buckets (sign=-1 takes a previously applied trade back out)"""
+    dt = _to_datetime(timestamp)
+    pnl = pnl or 0.0
+    win = pnl > 0
+    row = (strategy_id or '', account_id or '', instrument or '',
+           sign, sign if win else 0, 0 if win else sign, sign * pnl,
+           sign * pnl if win else 0.0, 0.0 if win else sign * pnl,
+           sign * int(duration or 0), sign * (commission or 0.0))
+    conn.executemany(_TRADE_UPSERT, [(bucket, dt.strftime(PERIOD_FORMATS[bucket])) + row for bucket in BUCKETS])
+
+
+def apply_snapshot(conn: sqlite3.Connection, series_id: str, timestamp: Timestamp, value: float,
+                   fields: Optional[Dict[str, Any]] = None):
+    """Fold one snapshot into its four buckets: open/high/low/close of value, plus the latest fields"""
+    dt = _to_datetime(timestamp)
+    time_key = dt.isoformat()
+    last_values = json.dumps(fields or {}, default=str)
+    conn.executemany(_SNAPSHOT_UPSERT, [
+        (bucket, dt.strftime(PERIOD_FORMATS[bucket]), series_id, time_key, time_key, value, value, value, value,
+         last_values) for bucket in BUCKETS])
+
+
+def _period_row(row: sqlite3.Row) -> Dict[str, Any]:
+    trades = row['trades'] or 0
+    wins = row['wins'] or 0
+    losses = row['losses'] or 0
+    return {
+        'period': row['period'],
+        'trades': trades,
+        'wins': wins,
+        'losses': losses,
+        'win_rate': (wins / trades * 100) if trades else 0.0,
+        'pnl': row['pnl'] or 0.0,
+        'avg_win': (row['wins_sum'] / wins) if wins else 0.0,
+        'avg_loss': abs(row['losses_sum'] / losses) if losses else 0.0,
+        'profit_factor': (row['wins_sum'] / abs(row['losses_sum'])) if row['losses_sum'] else 0.0,
+        'avg_trade_duration_seconds': int(row['duration_sum'] / trades) if trades else 0,
+        'commission': row['commission'] or 0.0,
+    }
+
+
+def query_breakdown(conn: sqlite3.Connection, bucket: str = 'day', since: Optional[Timestamp] = None,
+                    until: Optional[Timestamp] = None, strategy_id: str = None, account_id: str = None,
+                    instrument: str = None) -> List[Dict[str, Any]]:
+    """Per-period trade statistics, oldest first; reads rollup rows only, never trades"""
+    if bucket not in PERIOD_FORMATS:
+        raise ValueError(f"Unknown rollup bucket: {bucket}")
+    query = """
+        SELECT period, SUM(trades) AS trades, SUM(wins) AS wins, SUM(losses) AS losses, SUM(pnl) AS pnl,
+               SUM(wins_sum) AS wins_sum, SUM(losses_sum) AS losses_sum, SUM(duration_sum) AS duration_sum,
+               SUM(commission) AS commission
+        FROM trade_rollups WHERE bucket = ?
+    """
+    params: List[Any] = [bucket]
+    for column, value in (('strategy_id', strategy_id), ('account_id', account_id), ('instrument', instrument)):
+        if value:
+            query += f" AND {column} = ?"
+            params.append(value)
+    if since is not None:
+        query += " AND period >= ?"
+        params.append(period_key(since, bucket))
+    if until is not None:
+        query += " AND period <= ?"
+        params.append(period_key(until, bucket))
+    query += " GROUP BY period HAVING SUM(trades) != 0 ORDER BY period"
+    return [_period_row(row) for row in conn.execute(query, params)]
+
+
+def equity_from_breakdown(breakdown: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Cumulative P&L and drawdown from its running peak, one point per period"""
+    cumulative = peak = 0.0
+    curve = []
+    for row in breakdown:
+        cumulative += row['pnl']
+        peak = max(peak, cumulative)
+        curve.append({'period': row['period'], 'pnl': row['pnl'], 'trades': row['trades'],
+                      'cumulative_pnl': cumulative, 'drawdown': cumulative - peak})
+    return curve
+
+
+def query_snapshots(conn: sqlite3.Connection, series_id: str, bucket: str = 'hour',
+                    since: Optional[Timestamp] = None) -> List[Dict[str, Any]]:
+    """Per-period open/high/low/close of a snapshot series, oldest first"""
+    if bucket not in PERIOD_FORMATS:
+        raise ValueError(f"Unknown rollup bucket: {bucket}")
+    query = "SELECT * FROM snapshot_rollups WHERE series_id = ? AND bucket = ?"
+    params: List[Any] = [series_id, bucket]
+    if since is not None:
+        query += " AND period >= ?"
+        params.append(period_key(since, bucket))
+    query += " ORDER BY period"
+    return [{'period': row['period'], 'samples': row['samples'], 'first_time': row['first_time'],
+             'last_time': row['last_time'], 'open': row['open_value'], 'high': row['high_value'],
+             'low': row['low_value'], 'close': row['close_value'], 'last_values': json.loads(row['last_values'] or '{}')}
+            for row in conn.execute(query, params)]
+
+
+class TimeRollups:
+    """
+    Rollup queries over a SQLiteStore.
+
+    Writers keep the tables current by calling apply_trade / apply_snapshot on the
+    connection they already hold inside their own write, so a rollup never disagrees
+    with the row it came from. backfill(conn) runs once, when the tables are first created.
+    """
+
+    def __init__(self, store, backfill: Callable[[sqlite3.Connection], int] = None):
+        self.store = store
+
+        def create(conn):
+            if create_rollup_tables(conn) and backfill is not None:
+                count = backfill(conn)
+                if count:
+                    logger.info(f"✅ Backfilled rollups from {count} rows in {store.path}")
+
+        store.write(create)
+
+    def breakdown(self, bucket: str = 'day', days: int = None, since: Optional[Timestamp] = None,
+                  **filters) -> List[Dict[str, Any]]:
+        """Per-period statistics for the last `days` (or from `since`), filtered by strategy/account/instrument"""
+        if days:
+            since = datetime.now() - timedelta(days=days)
+        with self.store.read() as conn:
+            return query_breakdown(conn, bucket, since=since, **filters)
+
+    def equity_curve(self, bucket: str = 'day', days: int = None, since: Optional[Timestamp] = None,
+                     **filters) -> List[Dict[str, Any]]:
+        """Cumulative P&L per period (a window starts from zero at its first period)"""
+        return equity_from_breakdown(self.breakdown(bucket, days, since, **filters))
+
+    def snapshots(self, series_id: str, days: int = 30, bucket: str = None,
+                  now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        bucket = bucket or resolution_for(days)
+        since = (now or datetime.now()) - timedelta(days=days)
+        with self.store.read() as conn:
+            return query_snapshots(conn, series_id, bucket, since)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.store.read() as conn:
+            return {
+                'trade_rollup_rows': conn.execute("SELECT COUNT(*) FROM trade_rollups").fetchone()[0],
+                'snapshot_rollup_rows': conn.execute("SELECT COUNT(*) FROM snapshot_rollups").fetchone()[0],
+            }
@@ -13,6 +13,8 @@ from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+from .sqlite_store import get_sqlite_store
+
 logger = logging.getLogger(__name__)
 
 class TradeStatus(Enum):
@@ -97,6 +99,7 @@ class TradeTracker:
         # Prefer GAE-writable tmp for cloud; allow override via env
         default_db = os.getenv('TRADE_DB_PATH', '/tmp/trading_system.db')
         self.db_path = db_path or default_db
+        self.store = get_sqlite_store(self.db_path)
         self.log_file = f"trading_system_{datetime.now().strftime('%Y%m%d')}.log"
         self.setup_database()
         self.setup_logging()
@@ -106,103 +109,103 @@ class TradeTracker:
     def setup_database(self):
         """Setup SQLite database for trade tracking"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Create trades table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS trades (
-                    trade_id TEXT PRIMARY KEY,
-                    timestamp TEXT NOT NULL,
-                    account TEXT NOT NULL,
-                    instrument TEXT NOT NULL,
-                    side TEXT NOT NULL,
-                    order_type TEXT NOT NULL,
-                    units INTEGER NOT NULL,
-                    entry_price REAL NOT NULL,
-                    stop_loss REAL NOT NULL,
-                    take_profit REAL NOT NULL,
-                    strategy TEXT NOT NULL,
-                    confidence REAL NOT NULL,
-                    session TEXT NOT NULL,
-                    status TEXT NOT NULL,
-                    fill_price REAL,
-                    fill_time TEXT,
-                    exit_price REAL,
-                    exit_time TEXT,
-                    pips_profit REAL,
-                    pips_drawdown REAL,
-                    profit_loss REAL,
-                    profit_loss_pct REAL,
-                    max_drawdown_pips REAL,
-                    max_profit_pips REAL,
-                    duration_minutes INTEGER,
-                    notes TEXT
-                )
-            ''')
-            
-            # Create signals table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS signals (
-                    signal_id TEXT PRIMARY KEY,
-                    timestamp TEXT NOT NULL,
-                    instrument TEXT NOT NULL,
-                    signal_type TEXT NOT NULL,
-                    entry_price REAL NOT NULL,
-                    stop_loss REAL NOT NULL,
-                    take_profit REAL NOT NULL,
-                    confidence REAL NOT NULL,
-                    strategy TEXT NOT NULL,
-                    reasoning TEXT NOT NULL,
-                    session TEXT NOT NULL,
-                    status TEXT NOT NULL,
-                    trade_id TEXT,
-                    execution_time TEXT,
-                    notes TEXT
-                )
-            ''')
-            
-            # Create system logs table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS system_logs (
-                    log_id TEXT PRIMARY KEY,
-                    timestamp TEXT NOT NULL,
-                    log_type TEXT NOT NULL,
-                    level TEXT NOT NULL,
-                    message TEXT NOT NULL,
-                    data TEXT,
-                    account TEXT,
-                    instrument TEXT
-                )
-            ''')
-            
-            # Create performance metrics table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS performance_metrics (
-                    metric_id TEXT PRIMARY KEY,
-                    timestamp TEXT NOT NULL,
-                    account TEXT NOT NULL,
-                    total_trades INTEGER,
-                    winning_trades INTEGER,
-                    losing_trades INTEGER,
-                    win_rate REAL,
-                    total_pips REAL,
-                    total_profit_loss REAL,
-                    max_drawdown REAL,
-                    sharpe_ratio REAL,
-                    avg_trade_duration REAL,
-                    session TEXT
-                )
-            ''')
-            
-            conn.commit()
-            conn.close()
+            self.store.write(self._create_tables)
             
             logger.info("✅ Database setup completed")
             
         except Exception as e:
             logger.error(f"❌ Database setup failed: {e}")
     
+    @staticmethod
+    def _create_tables(conn: sqlite3.Connection):
+        cursor = conn.cursor()
+        
+        # Create trades table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS trades (
+                trade_id TEXT PRIMARY KEY,
+                timestamp TEXT NOT NULL,
+                account TEXT NOT NULL,
+                instrument TEXT NOT NULL,
+                side TEXT NOT NULL,
+                order_type TEXT NOT NULL,
+                units INTEGER NOT NULL,
+                entry_price REAL NOT NULL,
+                stop_loss REAL NOT NULL,
+                take_profit REAL NOT NULL,
+                strategy TEXT NOT NULL,
+                confidence REAL NOT NULL,
+                session TEXT NOT NULL,
+                status TEXT NOT NULL,
+                fill_price REAL,
+                fill_time TEXT,
+                exit_price REAL,
+                exit_time TEXT,
+                pips_profit REAL,
+                pips_drawdown REAL,
+                profit_loss REAL,
+                profit_loss_pct REAL,
+                max_drawdown_pips REAL,
+                max_profit_pips REAL,
+                duration_minutes INTEGER,
+                notes TEXT
+            )
+        ''')
+        
+        # Create signals table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS signals (
+                signal_id TEXT PRIMARY KEY,
+                timestamp TEXT NOT NULL,
+                instrument TEXT NOT NULL,
+                signal_type TEXT NOT NULL,
+                entry_price REAL NOT NULL,
+                stop_loss REAL NOT NULL,
+                take_profit REAL NOT NULL,
+                confidence REAL NOT NULL,
+                strategy TEXT NOT NULL,
+                reasoning TEXT NOT NULL,
+                session TEXT NOT NULL,
+                status TEXT NOT NULL,
+                trade_id TEXT,
+                execution_time TEXT,
+                notes TEXT
+            )
+        ''')
+        
+        # Create system logs table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS system_logs (
+                log_id TEXT PRIMARY KEY,
+                timestamp TEXT NOT NULL,
+                log_type TEXT NOT NULL,
+                level TEXT NOT NULL,
+                message TEXT NOT NULL,
+                data TEXT,
+                account TEXT,
+                instrument TEXT
+            )
+        ''')
+        
+        # Create performance metrics table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS performance_metrics (
+                metric_id TEXT PRIMARY KEY,
+                timestamp TEXT NOT NULL,
+                account TEXT NOT NULL,
+                total_trades INTEGER,
+                winning_trades INTEGER,
+                losing_trades INTEGER,
+                win_rate REAL,
+                total_pips REAL,
+                total_profit_loss REAL,
+                max_drawdown REAL,
+                sharpe_ratio REAL,
+                avg_trade_duration REAL,
+                session TEXT
+            )
+        ''')
+    
     def setup_logging(self):
         """Setup file logging for system logs"""
         try:
@@ -231,10 +234,7 @@ class TradeTracker:
     def log_signal(self, signal: SignalEntry) -> bool:
         """Log a trading signal"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
+            self.store.execute('''
                 INSERT INTO signals (
                     signal_id, timestamp, instrument, signal_type, entry_price,
                     stop_loss, take_profit, confidence, strategy, reasoning,
@@ -258,9 +258,6 @@ class TradeTracker:
                 signal.notes
             ))
             
-            conn.commit()
-            conn.close()
-            
             # Log to file
             logger.info(f"📊 Signal logged: {signal.instrument} {signal.signal_type} "
                        f"at {signal.entry_price} (Confidence: {signal.confidence:.2f})")
@@ -274,10 +271,7 @@ class TradeTracker:
     def log_trade(self, trade: TradeEntry) -> bool:
         """Log a trade entry"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
+            self.store.execute('''
                 INSERT INTO trades (
                     trade_id, timestamp, account, instrument, side, order_type,
                     units, entry_price, stop_loss, take_profit, strategy,
@@ -315,9 +309,6 @@ class TradeTracker:
                 trade.notes
             ))
             
-            conn.commit()
-            conn.close()
-            
             # Log to file
             logger.info(f"💰 Trade logged: {trade.instrument} {trade.side} "
                        f"{trade.units} units at {trade.entry_price} "
@@ -335,55 +326,12 @@ class TradeTracker:
                           notes: Optional[str] = None) -> bool:
         """Update trade status and prices"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Get current trade data
-            cursor.execute('SELECT * FROM trades WHERE trade_id = ?', (trade_id,))
-            trade_data = cursor.fetchone()
-            
-            if not trade_data:
+            # Read and update in one write so a concurrent update cannot interleave
+            if not self.store.write(lambda conn: self._apply_trade_status(conn, trade_id, status, fill_price,
+                                                                          exit_price, notes)):
                 logger.error(f"❌ Trade {trade_id} not found")
                 return False
             
-            # Calculate pips and P&L
-            entry_price = trade_data[7]  # entry_price
-            side = trade_data[4]  # side
-            
-            if fill_price:
-                # Calculate pips from entry to fill
-                pips = self._calculate_pips(entry_price, fill_price, side)
-                
-                cursor.execute('''
-                    UPDATE trades SET 
-                        status = ?, fill_price = ?, fill_time = ?,
-                        pips_profit = ?, notes = ?
-                    WHERE trade_id = ?
-                ''', (status.value, fill_price, datetime.now().isoformat(), 
-                      pips, notes, trade_id))
-            
-            if exit_price:
-                # Calculate final P&L
-                pips = self._calculate_pips(entry_price, exit_price, side)
-                profit_loss = self._calculate_profit_loss(entry_price, exit_price, side, trade_data[6])  # units
-                profit_loss_pct = (profit_loss / (entry_price * trade_data[6])) * 100
-                
-                # Calculate duration
-                entry_time = datetime.fromisoformat(trade_data[1])
-                duration_minutes = int((datetime.now() - entry_time).total_seconds() / 60)
-                
-                cursor.execute('''
-                    UPDATE trades SET 
-                        status = ?, exit_price = ?, exit_time = ?,
-                        pips_profit = ?, profit_loss = ?, profit_loss_pct = ?,
-                        duration_minutes = ?, notes = ?
-                    WHERE trade_id = ?
-                ''', (status.value, exit_price, datetime.now().isoformat(),
-                      pips, profit_loss, profit_loss_pct, duration_minutes, notes, trade_id))
-            
-            conn.commit()
-            conn.close()
-            
             logger.info(f"📊 Trade {trade_id} updated: {status.value}")
             return True
             
@@ -391,6 +339,55 @@ class TradeTracker:
             logger.error(f"❌ Failed to update trade {trade_id}: {e}")
             return False
     
+    def _apply_trade_status(self, conn: sqlite3.Connection, trade_id: str, status: TradeStatus,
+                            fill_price: Optional[float], exit_price: Optional[float],
+                            notes: Optional[str]) -> bool:
+        cursor = conn.cursor()
+        
+        # Get current trade data
+        cursor.execute('SELECT * FROM trades WHERE trade_id = ?', (trade_id,))
+        trade_data = cursor.fetchone()
+        
+        if not trade_data:
+            return False
+        
+        # Calculate pips and P&L
+        entry_price = trade_data[7]  # entry_price
+        side = trade_data[4]  # side
+        
+        if fill_price:
+            # Calculate pips from entry to fill
+            pips = self._calculate_pips(entry_price, fill_price, side)
+            
+            cursor.execute('''
+                UPDATE trades SET 
+                    status = ?, fill_price = ?, fill_time = ?,
+                    pips_profit = ?, notes = ?
+                WHERE trade_id = ?
+            ''', (status.value, fill_price, datetime.now().isoformat(), 
+                  pips, notes, trade_id))
+        
+        if exit_price:
+            # Calculate final P&L
+            pips = self._calculate_pips(entry_price, exit_price, side)
+            profit_loss = self._calculate_profit_loss(entry_price, exit_price, side, trade_data[6])  # units
+            profit_loss_pct = (profit_loss / (entry_price * trade_data[6])) * 100
+            
+            # Calculate duration
+            entry_time = datetime.fromisoformat(trade_data[1])
+            duration_minutes = int((datetime.now() - entry_time).total_seconds() / 60)
+            
+            cursor.execute('''
+                UPDATE trades SET 
+                    status = ?, exit_price = ?, exit_time = ?,
+                    pips_profit = ?, profit_loss = ?, profit_loss_pct = ?,
+                    duration_minutes = ?, notes = ?
+                WHERE trade_id = ?
+            ''', (status.value, exit_price, datetime.now().isoformat(),
+                  pips, profit_loss, profit_loss_pct, duration_minutes, notes, trade_id))
+        
+        return True
+    
     def _calculate_pips(self, entry_price: float, current_price: float, side: str) -> float:
         """Calculate pips difference"""
         if side == "BUY":
@@ -409,42 +406,41 @@ class TradeTracker:
     def get_active_trades(self) -> List[Dict[str, Any]]:
         """Get all active trades with current status"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT * FROM trades 
-                WHERE status IN ('pending', 'filled', 'partially_filled')
-                ORDER BY timestamp DESC
-            ''')
-            
-            trades = []
-            for row in cursor.fetchall():
-                trade = {
-                    'trade_id': row[0],
-                    'timestamp': row[1],
-                    'account': row[2],
-                    'instrument': row[3],
-                    'side': row[4],
-                    'order_type': row[5],
-                    'units': row[6],
-                    'entry_price': row[7],
-                    'stop_loss': row[8],
-                    'take_profit': row[9],
-                    'strategy': row[10],
-                    'confidence': row[11],
-                    'session': row[12],
-                    'status': row[13],
-                    'fill_price': row[14],
-                    'fill_time': row[15],
-                    'pips_profit': row[18],
-                    'pips_drawdown': row[19],
-                    'profit_loss': row[20],
-                    'profit_loss_pct': row[21]
-                }
-                trades.append(trade)
-            
-            conn.close()
+            with self.store.read() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute('''
+                    SELECT * FROM trades 
+                    WHERE status IN ('pending', 'filled', 'partially_filled')
+                    ORDER BY timestamp DESC
+                ''')
+                
+                trades = []
+                for row in cursor.fetchall():
+                    trade = {
+                        'trade_id': row[0],
+                        'timestamp': row[1],
+                        'account': row[2],
+                        'instrument': row[3],
+                        'side': row[4],
+                        'order_type': row[5],
+                        'units': row[6],
+                        'entry_price': row[7],
+                        'stop_loss': row[8],
+                        'take_profit': row[9],
+                        'strategy': row[10],
+                        'confidence': row[11],
+                        'session': row[12],
+                        'status': row[13],
+                        'fill_price': row[14],
+                        'fill_time': row[15],
+                        'pips_profit': row[18],
+                        'pips_drawdown': row[19],
+                        'profit_loss': row[20],
+                        'profit_loss_pct': row[21]
+                    }
+                    trades.append(trade)
+                
             return trades
             
         except Exception as e:
@@ -454,42 +450,41 @@ class TradeTracker:
     def get_trade_history(self, limit: int = 100) -> List[Dict[str, Any]]:
         """Get trade history"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT * FROM trades 
-                ORDER BY timestamp DESC 
-                LIMIT ?
-            ''', (limit,))
-            
-            trades = []
-            for row in cursor.fetchall():
-                trade = {
-                    'trade_id': row[0],
-                    'timestamp': row[1],
-                    'account': row[2],
-                    'instrument': row[3],
-                    'side': row[4],
-                    'order_type': row[5],
-                    'units': row[6],
-                    'entry_price': row[7],
-                    'stop_loss': row[8],
-                    'take_profit': row[9],
-                    'strategy': row[10],
-                    'confidence': row[11],
-                    'session': row[12],
-                    'status': row[13],
-                    'fill_price': row[14],
-                    'exit_price': row[16],
-                    'pips_profit': row[18],
-                    'profit_loss': row[20],
-                    'profit_loss_pct': row[21],
-                    'duration_minutes': row[24]
-                }
-                trades.append(trade)
-            
-            conn.close()
+            with self.store.read() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute('''
+                    SELECT * FROM trades 
+                    ORDER BY timestamp DESC 
+                    LIMIT ?
+                ''', (limit,))
+                
+                trades = []
+                for row in cursor.fetchall():
+                    trade = {
+                        'trade_id': row[0],
+                        'timestamp': row[1],
+                        'account': row[2],
+                        'instrument': row[3],
+                        'side': row[4],
+                        'order_type': row[5],
+                        'units': row[6],
+                        'entry_price': row[7],
+                        'stop_loss': row[8],
+                        'take_profit': row[9],
+                        'strategy': row[10],
+                        'confidence': row[11],
+                        'session': row[12],
+                        'status': row[13],
+                        'fill_price': row[14],
+                        'exit_price': row[16],
+                        'pips_profit': row[18],
+                        'profit_loss': row[20],
+                        'profit_loss_pct': row[21],
+                        'duration_minutes': row[24]
+                    }
+                    trades.append(trade)
+                
             return trades
             
         except Exception as e:
@@ -500,65 +495,64 @@ class TradeTracker:
                               days: int = 30) -> Dict[str, Any]:
         """Get performance metrics"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Base query
-            base_query = '''
-                SELECT 
-                    COUNT(*) as total_trades,
-                    SUM(CASE WHEN profit_loss > 0 THEN 1 ELSE 0 END) as winning_trades,
-                    SUM(CASE WHEN profit_loss < 0 THEN 1 ELSE 0 END) as losing_trades,
-                    AVG(profit_loss) as avg_profit_loss,
-                    SUM(profit_loss) as total_profit_loss,
-                    AVG(pips_profit) as avg_pips,
-                    SUM(pips_profit) as total_pips,
-                    MIN(profit_loss) as max_drawdown,
-                    AVG(duration_minutes) as avg_duration
-                FROM trades 
-                WHERE status = 'filled' 
-                AND timestamp >= datetime('now', '-{} days')
-            '''.format(days)
-            
-            if account:
-                base_query += f" AND account = '{account}'"
-            
-            cursor.execute(base_query)
-            result = cursor.fetchone()
-            
-            if result and result[0] > 0:
-                total_trades = result[0]
-                winning_trades = result[1]
-                losing_trades = result[2]
-                win_rate = (winning_trades / total_trades) * 100 if total_trades > 0 else 0
+            with self.store.read() as conn:
+                cursor = conn.cursor()
+                
+                # Base query
+                base_query = '''
+                    SELECT 
+                        COUNT(*) as total_trades,
+                        SUM(CASE WHEN profit_loss > 0 THEN 1 ELSE 0 END) as winning_trades,
+                        SUM(CASE WHEN profit_loss < 0 THEN 1 ELSE 0 END) as losing_trades,
+                        AVG(profit_loss) as avg_profit_loss,
+                        SUM(profit_loss) as total_profit_loss,
+                        AVG(pips_profit) as avg_pips,
+                        SUM(pips_profit) as total_pips,
+                        MIN(profit_loss) as max_drawdown,
+                        AVG(duration_minutes) as avg_duration
+                    FROM trades 
+                    WHERE status = 'filled' 
+                    AND timestamp >= datetime('now', '-{} days')
+                '''.format(days)
+                
+                if account:
+                    base_query += f" AND account = '{account}'"
+                
+                cursor.execute(base_query)
+                result = cursor.fetchone()
+                
+                if result and result[0] > 0:
+                    total_trades = result[0]
+                    winning_trades = result[1]
+                    losing_trades = result[2]
+                    win_rate = (winning_trades / total_trades) * 100 if total_trades > 0 else 0
+                    
+                    metrics = {
+                        'total_trades': total_trades,
+                        'winning_trades': winning_trades,
+                        'losing_trades': losing_trades,
+                        'win_rate': win_rate,
+                        'avg_profit_loss': result[3] or 0,
+                        'total_profit_loss': result[4] or 0,
+                        'avg_pips': result[5] or 0,
+                        'total_pips': result[6] or 0,
+                        'max_drawdown': result[7] or 0,
+                        'avg_duration_minutes': result[8] or 0
+                    }
+                else:
+                    metrics = {
+                        'total_trades': 0,
+                        'winning_trades': 0,
+                        'losing_trades': 0,
+                        'win_rate': 0,
+                        'avg_profit_loss': 0,
+                        'total_profit_loss': 0,
+                        'avg_pips': 0,
+                        'total_pips': 0,
+                        'max_drawdown': 0,
+                        'avg_duration_minutes': 0
+                    }
                 
-                metrics = {
-                    'total_trades': total_trades,
-                    'winning_trades': winning_trades,
-                    'losing_trades': losing_trades,
-                    'win_rate': win_rate,
-                    'avg_profit_loss': result[3] or 0,
-                    'total_profit_loss': result[4] or 0,
-                    'avg_pips': result[5] or 0,
-                    'total_pips': result[6] or 0,
-                    'max_drawdown': result[7] or 0,
-                    'avg_duration_minutes': result[8] or 0
-                }
-            else:
-                metrics = {
-                    'total_trades': 0,
-                    'winning_trades': 0,
-                    'losing_trades': 0,
-                    'win_rate': 0,
-                    'avg_profit_loss': 0,
-                    'total_profit_loss': 0,
-                    'avg_pips': 0,
-                    'total_pips': 0,
-                    'max_drawdown': 0,
-                    'avg_duration_minutes': 0
-                }
-            
-            conn.close()
             return metrics
             
         except Exception as e:
@@ -582,10 +576,8 @@ class TradeTracker:
                 instrument=instrument
             )
             
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
+            # Queued without waiting: event logging never holds up the caller
+            self.store.execute('''
                 INSERT INTO system_logs (
                     log_id, timestamp, log_type, level, message, data, account, instrument
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
@@ -598,10 +590,7 @@ class TradeTracker:
                 json.dumps(log_entry.data) if log_entry.data else None,
                 log_entry.account,
                 log_entry.instrument
-            ))
-            
-            conn.commit()
-            conn.close()
+            ), wait=False)
             
             # Log to file
             log_level = getattr(logging, level.upper(), logging.INFO)
@@ -613,59 +602,57 @@ class TradeTracker:
     def export_for_backtesting(self, days: int = 30) -> Dict[str, Any]:
         """Export trade data for backtesting analysis"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Get all trades from last N days
-            cursor.execute('''
-                SELECT * FROM trades 
-                WHERE timestamp >= datetime('now', '-{} days')
-                ORDER BY timestamp ASC
-            '''.format(days))
-            
-            trades_data = []
-            for row in cursor.fetchall():
-                trade = {
-                    'timestamp': row[1],
-                    'instrument': row[3],
-                    'side': row[4],
-                    'entry_price': row[7],
-                    'exit_price': row[16],
-                    'stop_loss': row[8],
-                    'take_profit': row[9],
-                    'units': row[6],
-                    'strategy': row[10],
-                    'session': row[12],
-                    'profit_loss': row[20],
-                    'pips_profit': row[18],
-                    'duration_minutes': row[24]
-                }
-                trades_data.append(trade)
-            
-            # Get signals data
-            cursor.execute('''
-                SELECT * FROM signals 
-                WHERE timestamp >= datetime('now', '-{} days')
-                ORDER BY timestamp ASC
-            '''.format(days))
-            
-            signals_data = []
-            for row in cursor.fetchall():
-                signal = {
-                    'timestamp': row[1],
-                    'instrument': row[2],
-                    'signal_type': row[3],
-                    'entry_price': row[4],
-                    'stop_loss': row[5],
-                    'take_profit': row[6],
-                    'confidence': row[7],
-                    'strategy': row[8],
-                    'session': row[10],
-                    'status': row[11]
-                }
-                signals_data.append(signal)
-            
-            conn.close()
+            with self.store.read() as conn:
+                cursor = conn.cursor()
+                
+                # Get all trades from last N days
+                cursor.execute('''
+                    SELECT * FROM trades 
+                    WHERE timestamp >= datetime('now', '-{} days')
+                    ORDER BY timestamp ASC
+                '''.format(days))
+                
+                trades_data = []
+                for row in cursor.fetchall():
+                    trade = {
+                        'timestamp': row[1],
+                        'instrument': row[3],
+                        'side': row[4],
+                        'entry_price': row[7],
+                        'exit_price': row[16],
+                        'stop_loss': row[8],
+                        'take_profit': row[9],
+                        'units': row[6],
+                        'strategy': row[10],
+                        'session': row[12],
+                        'profit_loss': row[20],
+                        'pips_profit': row[18],
+                        'duration_minutes': row[24]
+                    }
+                    trades_data.append(trade)
+                
+                # Get signals data
+                cursor.execute('''
+                    SELECT * FROM signals 
+                    WHERE timestamp >= datetime('now', '-{} days')
+                    ORDER BY timestamp ASC
+                '''.format(days))
+                
+                signals_data = []
+                for row in cursor.fetchall():
+                    signal = {
+                        'timestamp': row[1],
+                        'instrument': row[2],
+                        'signal_type': row[3],
+                        'entry_price': row[4],
+                        'stop_loss': row[5],
+                        'take_profit': row[6],
+                        'confidence': row[7],
+                        'strategy': row[8],
+                        'session': row[10],
+                        'status': row[11]
+                    }
+                    signals_data.append(signal)
             
             # Create export data
             export_data = {
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Warm-Start Strategy Snapshots
+Persist strategy histories, indicator state and daily counters so a restart only fetches the candles it missed
+"""
+
+import os
+import gzip
+import time
+import pickle
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+from .candle_store import ns_to_oanda, to_ns
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+# Set only in the context that is building strategies it will restore; threads
+# started elsewhere never see it, and builder pools must run jobs in a copy of
+# the caller's context (see strategy_factory.build_concurrently)
+_prefill_deferred = contextvars.ContextVar('warm_start_prefill_deferred', default=False)
+
+# Strategy attributes carried across restarts (whichever a strategy has).
+# A strategy can override the list with a `warm_start_attributes` tuple.
+STATE_ATTRIBUTES = (
+    # Histories
+    'price_history', 'ema_history', 'rsi_history', 'atr_history',
+    'regime_history', 'trend_history', 'volatility_history',
+    # Incremental indicator state
+    'indicators',
+    # Daily counters
+    'daily_trade_count', 'daily_trades', 'daily_signals', 'last_reset_date',
+    'last_trade_time', 'last_signal_time', 'last_weekly_reset',
+)
+
+
+def _candle_close(candle: Any) -> Optional[float]:
+    """Mid close of an OANDA candle (falls back to bid, then ask)"""
+    if not isinstance(candle, dict):
+        return None
+    for side in ('mid', 'bid', 'ask'):
+        ohlc = candle.get(side)
+        if isinstance(ohlc, dict) and 'c' in ohlc:
+            close = float(ohlc['c'])
+            return close if close > 0 else None
+    return None
+
+
+def fetch_candle_batch(client, instruments: Iterable[str], granularity: str = 'M5', count: int = 60,
+                       since_ns: Optional[int] = None, price: str = 'M',
+                       max_workers: int = None) -> Dict[str, List[Dict]]:
+    """
+    Fetch candles for many instruments in one concurrent batch.
+
+    With since_ns, only candles from that time to now are requested (the
+    delta since a snapshot); otherwise the last `count`. Instruments whose
+    request fails are left out of the result.
+    """
+    instruments = list(dict.fromkeys(instruments))
+    if not instruments:
+        return {}
+    max_workers = max_workers or int(os.getenv('WARM_START_FETCH_WORKERS', '8'))
+
+    def fetch(instrument: str) -> List[Dict]:
+        if since_ns is not None:
+            # No to_time: OANDA rejects one that is ahead of its clock, and "now" is the default
+            response = client.get_candles(instrument, granularity=granularity, price=price,
+                                          from_time=ns_to_oanda(since_ns))
+        else:
+            response = client.get_candles(instrument, granularity=granularity, count=count, price=price)
+        return (response or {}).get('candles', [])
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(instruments)),
+                            thread_name_prefix='warm-start') as executor:
+        futures = {instrument: executor.submit(fetch, instrument) for instrument in instruments}
+        for instrument, future in futures.items():
+            try:
+                results[instrument] = future.result()
+            except Exception as e:
+                logger.warning(f"⚠️ Candle fetch failed for {instrument}: {e}")
+    return results
+
+
+def append_closes(strategy: Any, instrument: str, candles: List[Dict], after_ns: Optional[int] = None) -> int:
+    """Append complete candle closes newer than after_ns to a strategy's price history"""
+    history = getattr(strategy, 'price_history', None)
+    if not isinstance(history, dict):
+        return 0
+    series = history.setdefault(instrument, [])
+    if series and isinstance(series[-1], dict):
+        return 0  # Candle-dict histories are rebuilt by the strategy itself
+    added = 0
+    for candle in candles:
+        if not candle.get('complete', True):
+            continue
+        if after_ns is not None and to_ns(candle['time']) <= after_ns:
+            continue
+        close = _candle_close(candle)
+        if close is not None:
+            series.append(close)
+            added += 1
+    return added
+
+
+class WarmStartStore:
+    """
+    Compact local snapshot of every scanner strategy's state.
+
+    save() writes one gzip-compressed pickle (atomically, via a temp file)
+    holding the STATE_ATTRIBUTES of each strategy keyed by its account
+    display name. restore() puts that state back onto freshly constructed
+    strategies when the snapshot is younger than max_age and was taken for
+    the same strategy class and instruments; the caller then fetches only
+    the candles since saved_at_ns. The file is trusted local state written
+    by this process - never point WARM_START_PATH at untrusted input.
+    """
+
+    def __init__(self, path: str = None, max_age: float = None, save_interval: float = None):
+        self.path = path or os.getenv('WARM_START_PATH', os.path.join('data', 'warm_start', 'strategies.pkl.gz'))
+        self.max_age = max_age or float(os.getenv('WARM_START_MAX_AGE_SECONDS', str(6 * 3600)))
+        self.save_interval = save_interval or float(os.getenv('WARM_START_SAVE_SECONDS', '300'))
+        self.enabled = os.getenv('WARM_START_ENABLED', 'true').lower() == 'true'
+        self.lock = threading.Lock()
+        self.last_saved_at: Optional[float] = None
+        self.stats = {'saves': 0, 'save_errors': 0, 'restored': 0, 'skipped': 0}
+
+    def has_snapshot(self) -> bool:
+        """Cheap check (file age only) that a snapshot exists; only load() tells whether it is usable"""
+        try:
+            return self.enabled and time.time() - os.path.getmtime(self.path) <= self.max_age
+        except OSError:
+            return False
+
+    @staticmethod
+    @contextmanager
+    def defer_prefill(defer: bool = True):
+        """While active, strategies built in this context skip their own candle prefill (see prefill_deferred())"""
+        token = _prefill_deferred.set(bool(defer))
+        try:
+            yield
+        finally:
+            _prefill_deferred.reset(token)
+
+    @staticmethod
+    def _attributes(strategy: Any) -> Iterable[str]:
+        return getattr(strategy, 'warm_start_attributes', STATE_ATTRIBUTES)
+
+    def _strategy_state(self, name: str, strategy: Any) -> Dict[str, Any]:
+        state = {}
+        for attr in self._attributes(strategy):
+            if not hasattr(strategy, attr):
+                continue
+            value = getattr(strategy, attr)
+            try:
+                pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception as e:
+                logger.debug(f"⚠️ {name}.{attr} not snapshotted: {e}")
+                continue
+            state[attr] = value
+        return {
+            'class': type(strategy).__qualname__,
+            'instruments': list(getattr(strategy, 'instruments', []) or []),
+            'state': state,
+        }
+
+    def save(self, strategies: Dict[str, Any]) -> bool:
+        """Write the snapshot now; returns False (and logs) on failure"""
+        started = time.perf_counter()
+        with self.lock:
+            try:
+                payload = {
+                    'version': SNAPSHOT_VERSION,
+                    'saved_at_ns': time.time_ns(),
+                    'strategies': {name: self._strategy_state(name, s) for name, s in strategies.items()},
+                }
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                tmp_path = f"{self.path}.tmp"
+                with gzip.open(tmp_path, 'wb', compresslevel=6) as f:
+                    pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                self.stats['save_errors'] += 1
+                logger.warning(f"⚠️ Warm-start snapshot save failed: {e}")
+                return False
+            self.last_saved_at = time.monotonic()
+            self.stats['saves'] += 1
+        logger.info(f"💾 Warm-start snapshot saved: {len(strategies)} strategies, "
+                    f"{os.path.getsize(self.path) / 1024:.0f}KB in {(time.perf_counter() - started) * 1000:.0f}ms")
+        return True
+
+    def maybe_save(self, strategies: Dict[str, Any]) -> bool:
+        """Save if save_interval has passed since the last save"""
+        if self.last_saved_at is not None and time.monotonic() - self.last_saved_at < self.save_interval:
+            return False
+        return self.save(strategies)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """The snapshot payload if present, readable, current-version and fresh enough"""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with gzip.open(self.path, 'rb') as f:
+                payload = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"⚠️ Warm-start snapshot unreadable ({e}) - cold start")
+            return None
+        if payload.get('version') != SNAPSHOT_VERSION:
+            logger.info("ℹ️ Warm-start snapshot from another version - cold start")
+            return None
+        age = (time.time_ns() - payload['saved_at_ns']) / 1e9
+        if age > self.max_age:
+            logger.info(f"ℹ️ Warm-start snapshot is {age / 3600:.1f}h old (max {self.max_age / 3600:g}h) - cold start")
+            return None
+        return payload
+
+    def restore(self, strategies: Dict[str, Any],
+                payload: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Put snapshotted state back on matching strategies.
+
+        payload is a snapshot already returned by load() (loaded here when
+        omitted). Returns {'saved_at_ns': ..., 'restored': [names],
+        'missing': [names]} or None when there is no usable snapshot (cold
+        start for everyone).
+        """
+        if payload is None and self.enabled:
+            payload = self.load()
+        if payload is None:
+            return None
+        saved = payload.get('strategies', {})
+        restored, missing = [], []
+        for name, strategy in strategies.items():
+            entry = saved.get(name)
+            instruments = list(getattr(strategy, 'instruments', []) or [])
+            if (entry is None or entry.get('class') != type(strategy).__qualname__
+                    or entry.get('instruments') != instruments):
+                missing.append(name)
+                continue
+            for attr, value in entry['state'].items():
+                try:
+                    setattr(strategy, attr, value)
+                except Exception as e:
+                    logger.debug(f"⚠️ Could not restore {name}.{attr}: {e}")
+            restored.append(name)
+        self.stats['restored'] += len(restored)
+        self.stats['skipped'] += len(missing)
+        return {'saved_at_ns': payload['saved_at_ns'], 'restored': restored, 'missing': missing}
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats.update({'path': self.path, 'enabled': self.enabled})
+        return stats
+
+
+# Global instance
+_warm_start_store = None
+_warm_start_lock = threading.Lock()
+
+
+def get_warm_start_store() -> WarmStartStore:
+    """Get the process-wide warm-start store"""
+    global _warm_start_store
+    if _warm_start_store is None:
+        with _warm_start_lock:
+            if _warm_start_store is None:
+                _warm_start_store = WarmStartStore()
+    return _warm_start_store
+
+
+def prefill_deferred() -> bool:
+    """True while the current context is building strategies it will restore from a snapshot"""
+    return _prefill_deferred.get()
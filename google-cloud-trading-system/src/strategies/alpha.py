@@ -13,6 +13,7 @@ import numpy as np
 
 from ..core.order_manager import TradeSignal, OrderSide
 from ..core.data_feed import MarketData
+from ..core.ring_buffer import RingBuffer, as_ring
 
 
 logging.basicConfig(level=logging.INFO)
@@ -56,7 +57,7 @@ class AlphaStrategy:
         self.min_trades_today = 2
 
         # State
-        self.price_history: Dict[str, List[float]] = {i: [] for i in self.instruments}
+        self.price_history: Dict[str, RingBuffer] = {i: RingBuffer(200) for i in self.instruments}
         self.daily_trade_count = 0
         self.last_date = datetime.now().date()
 
@@ -90,9 +91,8 @@ class AlphaStrategy:
         for inst, data in market_data.items():
             if inst in self.instruments:
                 mid = (data.bid + data.ask) / 2.0
+                self.price_history[inst] = as_ring(self.price_history.get(inst), 200)
                 self.price_history[inst].append(mid)
-                if len(self.price_history[inst]) > 200:
-                    self.price_history[inst] = self.price_history[inst][-200:]
 
     def _generate_alpha_signals(self, market_data: Dict[str, MarketData]) -> Dict[str, AlphaSignal]:
         signals: Dict[str, AlphaSignal] = {}
@@ -14,6 +14,7 @@ import pandas as pd
 
 from ..core.order_manager import TradeSignal, OrderSide, get_order_manager
 from ..core.data_feed import MarketData, get_data_feed
+from ..core.ring_buffer import RingBuffer, as_ring
 
 # News integration for GBP economic data (ADDED OCT 14, 2025)
 try:
@@ -83,7 +84,7 @@ class GBP_USD_Optimized_Strategy:
         self.max_daily_trades = strategy_params.get('max_daily_trades', 100)
         
         # Data storage
-        self.price_history: List[float] = []
+        self.price_history: RingBuffer = RingBuffer(100)
         self.ema_history: Dict[int, List[float]] = {self.ema_fast: [], self.ema_slow: []}
         self.rsi_history: List[float] = []
         self.atr_history: List[float] = []
@@ -167,12 +168,10 @@ class GBP_USD_Optimized_Strategy:
         """Update all technical indicators"""
         # Use mid price
         mid_price = (market_data.bid + market_data.ask) / 2
+        # Keep only last 100 prices (fixed-size ring, O(1) append)
+        self.price_history = as_ring(self.price_history, 100)
         self.price_history.append(mid_price)
         
-        # Keep only last 100 prices for efficiency
-        if len(self.price_history) > 100:
-            self.price_history = self.price_history[-100:]
-        
         # Calculate EMAs
         if len(self.price_history) >= self.ema_slow:
             ema_fast = self._calculate_ema(self.price_history, self.ema_fast)
@@ -395,7 +394,7 @@ class GBP_USD_Optimized_Strategy:
                 return None
             
             # Update price history
-            self.price_history = prices[-100:]
+            self.price_history = RingBuffer(100, prices[-100:])
             
             # Calculate indicators
             ema_fast = self._calculate_ema(self.price_history, self.ema_fast)
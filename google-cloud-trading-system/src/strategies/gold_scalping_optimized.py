@@ -5,6 +5,7 @@ Maximum 10 trades per day with ultra high quality filters
 """
 
 import logging
+import threading
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
@@ -13,23 +14,23 @@ import pandas as pd
 
 from ..core.order_manager import TradeSignal, OrderSide, get_order_manager
 from ..core.data_feed import MarketData, get_data_feed
+from ..core.indicators import IndicatorSet, ATR
+from ..core.ring_buffer import RingBuffer, as_ring
+from ..core.lazy_imports import lazy_import, module_available
+from ..core.batch_indicators import PrecomputedIndicators, history_lengths, close_atr, trailing_volatility
 
-# News integration (optional, non-breaking)
-try:
-    from ..core.news_integration import safe_news_integration
-    NEWS_AVAILABLE = True
-except ImportError:
-    NEWS_AVAILABLE = False
+# News integration (optional, non-breaking) - imported on first use (pulls in aiohttp)
+NEWS_AVAILABLE = module_available('..core.news_integration', __package__)
+safe_news_integration = lazy_import('..core.news_integration', __package__, 'safe_news_integration')
 
-# Learning & Honesty System (NEW OCT 21, 2025)
-try:
-    from ..core.loss_learner import get_loss_learner
-    from ..core.early_trend_detector import get_early_trend_detector
-    from ..core.honesty_reporter import get_honesty_reporter
-    LEARNING_AVAILABLE = True
-except ImportError:
-    LEARNING_AVAILABLE = False
-    logger.warning("⚠️ Learning system not available")
+# Learning & Honesty System (NEW OCT 21, 2025) - imported on first use
+LEARNING_AVAILABLE = all(module_available(f'..core.{name}', __package__)
+                         for name in ('loss_learner', 'early_trend_detector', 'honesty_reporter'))
+get_loss_learner = lazy_import('..core.loss_learner', __package__, 'get_loss_learner')
+get_early_trend_detector = lazy_import('..core.early_trend_detector', __package__, 'get_early_trend_detector')
+get_honesty_reporter = lazy_import('..core.honesty_reporter', __package__, 'get_honesty_reporter')
+if not LEARNING_AVAILABLE:
+    logging.getLogger(__name__).warning("⚠️ Learning system not available")
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -116,7 +117,11 @@ class GoldScalpingStrategy:
         # ===============================================
         # DATA STORAGE
         # ===============================================
-        self.price_history: Dict[str, List[float]] = {inst: [] for inst in self.instruments}
+        self.history_limit = 100             # Bars of price_history kept per instrument
+        self.price_history: Dict[str, RingBuffer] = {inst: RingBuffer(self.history_limit) for inst in self.instruments}
+        self.indicators: Dict[str, IndicatorSet] = {}  # Streaming ATR per instrument
+        self.backtest_indicators: Dict[str, PrecomputedIndicators] = {}  # Backtest mode only
+        self.backtest_positions: Dict[str, int] = {}
         self.signals: List[TradeSignal] = []
         self.daily_signals = []  # Store all signals for ranking
         self.selected_trades = []  # Quality trades selected
@@ -148,7 +153,11 @@ class GoldScalpingStrategy:
         # ===============================================
         # NEWS INTEGRATION
         # ===============================================
-        self.news_enabled = NEWS_AVAILABLE and safe_news_integration.enabled if NEWS_AVAILABLE else False
+        try:
+            self.news_enabled = NEWS_AVAILABLE and safe_news_integration.enabled
+        except ImportError as e:
+            logger.warning(f"⚠️ News integration unavailable: {e}")
+            self.news_enabled = False
         if self.news_enabled:
             logger.info("✅ News integration enabled for quality filtering")
         else:
@@ -328,6 +337,55 @@ class GoldScalpingStrategy:
         
         return atr if not pd.isna(atr) else 0.0
     
+    def enable_backtest_mode(self, closes: Dict[str, np.ndarray]):
+        """
+        Precompute ATR/volatility columns over whole backtest close series.
+        
+        closes[instrument] must be the exact sequence of values price_history
+        will receive. Call after parameters are set, then call
+        set_backtest_positions() before each analyze_market().
+        """
+        self.backtest_indicators = {
+            instrument: self._precompute_indicators(np.asarray(series, dtype=np.float64))
+            for instrument, series in closes.items()
+        }
+        self.backtest_positions = {}
+    
+    def set_backtest_positions(self, positions: Dict[str, int]):
+        """Position in each instrument's backtest series of the value appended last"""
+        self.backtest_positions = positions
+    
+    def _precompute_indicators(self, closes: np.ndarray, period: int = 14) -> PrecomputedIndicators:
+        """Vectorized _calculate_atr and volatility filter for every bar"""
+        lengths = history_lengths(len(closes), self.history_limit)
+        atr = np.nan_to_num(close_atr(closes, period), nan=0.0)
+        atr[lengths < period] = 0.0
+        volatility = trailing_volatility(closes, self.volatility_lookback)
+        volatility[lengths < self.volatility_lookback] = np.nan  # Shorter window: computed per scan
+        return PrecomputedIndicators(closes, {'atr': atr, 'volatility': volatility}, self.history_limit)
+    
+    def _backtest_row(self, instrument: str) -> Optional[Dict[str, float]]:
+        table = self.backtest_indicators.get(instrument)
+        if table is None:
+            return None
+        return table.row_for(self.price_history[instrument], self.backtest_positions.get(instrument))
+    
+    def _streaming_atr(self, instrument: str, period: int = 14) -> float:
+        """O(1) per bar equivalent of _calculate_atr on price_history"""
+        prices = self.price_history[instrument]
+        if len(prices) <= period:
+            # The pandas window still includes the zero TR of the first bar here
+            return self._calculate_atr(prices, period)
+        
+        atr = self._indicator_set(instrument, period).sync(prices).value('atr')
+        return atr if atr is not None else 0.0
+    
+    def _indicator_set(self, instrument: str, period: int = 14) -> IndicatorSet:
+        indicators = self.indicators.get(instrument)
+        if indicators is None or indicators['atr'].period != period:
+            indicators = self.indicators[instrument] = IndicatorSet(atr=ATR(period, smoothing='sma'))
+        return indicators
+    
     def _select_best_daily_trades(self, signals: List[TradeSignal]) -> List[TradeSignal]:
         """Select only the best trades for the day"""
         if not self.daily_trade_ranking:
@@ -352,11 +410,11 @@ class GoldScalpingStrategy:
             if instrument in self.instruments:
                 # Use mid price (average of bid and ask)
                 mid_price = (data.bid + data.ask) / 2
-                self.price_history[instrument].append(mid_price)
                 
-                # Keep only last 100 prices for efficiency
-                if len(self.price_history[instrument]) > 100:
-                    self.price_history[instrument] = self.price_history[instrument][-100:]
+                # Keep only last 100 prices (fixed-size ring, O(1) append)
+                history = self.price_history[instrument] = as_ring(self.price_history.get(instrument), self.history_limit)
+                history.append(mid_price)
+                self._indicator_set(instrument).update(mid_price)
     
     def _set_current_timestamp(self, market_data: Dict[str, MarketData]):
         """Track the timestamp associated with the latest candle (for backtests)."""
@@ -525,8 +583,12 @@ class GoldScalpingStrategy:
                 continue
             
             # Volatility filter
-            recent_prices = prices[-self.volatility_lookback:]
-            volatility = np.std(recent_prices) / np.mean(recent_prices)
+            row = self._backtest_row(instrument)
+            if row is not None and not np.isnan(row['volatility']):
+                volatility = row['volatility']
+            else:
+                recent_prices = prices[-self.volatility_lookback:]
+                volatility = np.std(recent_prices) / np.mean(recent_prices)
             min_volatility = self._effective_min_volatility()
             if volatility < min_volatility:
                 self._record_skip('volatility')
@@ -534,7 +596,7 @@ class GoldScalpingStrategy:
                 continue
             
             # ATR filter
-            atr = self._calculate_atr(prices)
+            atr = row['atr'] if row is not None else self._streaming_atr(instrument)
             min_atr = self._effective_min_atr()
             if atr < min_atr:
                 self._record_skip('atr')
@@ -762,9 +824,22 @@ class GoldScalpingStrategy:
             print(f'Error generating signals in {self.name}: {e}')
         
         return signals
-# Global strategy instance
-gold_scalping = GoldScalpingStrategy()
+# Global strategy instance - built on first request, not at import
+_gold_scalping = None
+_gold_scalping_lock = threading.Lock()
+
+
+def __getattr__(name):
+    if name == 'gold_scalping':
+        return get_gold_scalping_strategy()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 def get_gold_scalping_strategy() -> GoldScalpingStrategy:
     """Get the global Gold Scalping strategy instance"""
-    return gold_scalping
+    global _gold_scalping
+    if _gold_scalping is None:
+        with _gold_scalping_lock:
+            if _gold_scalping is None:
+                _gold_scalping = GoldScalpingStrategy()
+    return _gold_scalping
@@ -13,6 +13,7 @@ from dataclasses import dataclass
 
 from ..core.data_feed import MarketData
 from ..core.order_manager import TradeSignal, Side
+from ..core.indicators import IndicatorSet, RollingMean
 
 logger = logging.getLogger(__name__)
 
@@ -58,6 +59,7 @@ class ICTOTEStrategy:
         
         # Price history for analysis
         self.price_history = {inst: [] for inst in self.instruments}
+        self.indicators: Dict[tuple, IndicatorSet] = {}  # Streaming indicators per instrument
         self.ict_levels = {inst: [] for inst in self.instruments}
         self.market_structure = {inst: {'trend': 'neutral', 'last_bos': None} for inst in self.instruments}
         
@@ -258,16 +260,17 @@ class ICTOTEStrategy:
     
     def _calculate_atr(self, instrument: str, period: int = 14) -> float:
         """Calculate ATR for stop loss and take profit"""
-        if len(self.price_history[instrument]) < period + 1:
+        history = self.price_history[instrument]
+        if len(history) < period + 1:
             return 0.001
         
-        df = pd.DataFrame(self.price_history[instrument])
-        df['tr'] = df[['high', 'low']].apply(
-            lambda x: x['high'] - x['low'], axis=1
-        )
-        atr = df['tr'].rolling(period).mean().iloc[-1]
+        # Rolling mean of the high-low range, streamed instead of rebuilt per call
+        key = (instrument, 'atr', period)
+        if key not in self.indicators:
+            self.indicators[key] = IndicatorSet(atr=RollingMean(period, source='range'))
+        atr = self.indicators[key].sync(history).value('atr')
         
-        return atr if not pd.isna(atr) and atr > 0 else 0.001
+        return atr if atr is not None and atr > 0 else 0.001
     
     def _find_ote_entry(self, instrument: str, current_price: float) -> Optional[Dict]:
         """Find optimal OTE entry based on ICT levels"""
@@ -5,14 +5,22 @@ Maximum 10 trades per day with ultra high quality filters
 """
 
 import logging
+import threading
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 import numpy as np
-import pandas as pd
 
 from ..core.order_manager import TradeSignal, OrderSide, get_order_manager
 from ..core.data_feed import MarketData, get_data_feed
+from ..core.indicators import IndicatorSet, ATR, ADX, RollingStd
+from ..core.ring_buffer import RingBuffer, as_ring
+from ..core.perf_profiler import profiled
+from ..core.warm_start import prefill_deferred
+from ..core.lazy_imports import lazy_import, module_available
+from ..core.batch_indicators import (
+    PrecomputedIndicators, history_lengths, close_atr, close_adx, abs_return_std
+)
 
 # Adaptive regime detection and profit protection
 try:
@@ -23,31 +31,25 @@ except ImportError:
     ADAPTIVE_AVAILABLE = False
     logger.warning("⚠️ Adaptive features not available")
 
-# News integration (optional, non-breaking)
-try:
-    from ..core.news_integration import safe_news_integration
-    NEWS_AVAILABLE = True
-except ImportError:
-    NEWS_AVAILABLE = False
+# News integration (optional, non-breaking) - imported on first use (pulls in aiohttp)
+NEWS_AVAILABLE = module_available('..core.news_integration', __package__)
+safe_news_integration = lazy_import('..core.news_integration', __package__, 'safe_news_integration')
 
-# Contextual trading modules (optional, non-breaking)
-try:
-    from ..core.session_manager import get_session_manager
-    from ..core.quality_scoring import get_quality_scoring
-    from ..core.price_context_analyzer import get_price_context_analyzer
-    CONTEXTUAL_AVAILABLE = True
-except ImportError:
-    CONTEXTUAL_AVAILABLE = False
+# Contextual trading modules (optional, non-breaking) - imported on first use
+CONTEXTUAL_AVAILABLE = all(module_available(f'..core.{name}', __package__)
+                           for name in ('session_manager', 'quality_scoring', 'price_context_analyzer'))
+get_session_manager = lazy_import('..core.session_manager', __package__, 'get_session_manager')
+get_quality_scoring = lazy_import('..core.quality_scoring', __package__, 'get_quality_scoring')
+get_price_context_analyzer = lazy_import('..core.price_context_analyzer', __package__, 'get_price_context_analyzer')
 
-# Learning & Honesty System (NEW OCT 21, 2025)
-try:
-    from ..core.loss_learner import get_loss_learner
-    from ..core.early_trend_detector import get_early_trend_detector
-    from ..core.honesty_reporter import get_honesty_reporter
-    LEARNING_AVAILABLE = True
-except ImportError:
-    LEARNING_AVAILABLE = False
-    logger.warning("⚠️ Learning system not available")
+# Learning & Honesty System (NEW OCT 21, 2025) - imported on first use
+LEARNING_AVAILABLE = all(module_available(f'..core.{name}', __package__)
+                         for name in ('loss_learner', 'early_trend_detector', 'honesty_reporter'))
+get_loss_learner = lazy_import('..core.loss_learner', __package__, 'get_loss_learner')
+get_early_trend_detector = lazy_import('..core.early_trend_detector', __package__, 'get_early_trend_detector')
+get_honesty_reporter = lazy_import('..core.honesty_reporter', __package__, 'get_honesty_reporter')
+if not LEARNING_AVAILABLE:
+    logging.getLogger(__name__).warning("⚠️ Learning system not available")
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -68,6 +70,9 @@ class MomentumSignal:
 class MomentumTradingStrategy:
     """OPTIMIZED Momentum Trading Strategy - MAX 10 TRADES/DAY"""
     
+    # _prefill_price_history() skips when deferred; prefill_price_history_batch() fills the closes instead
+    batch_prefill = True
+    
     def __init__(self, instruments: Optional[List[str]] = None):
         """Initialize optimized strategy
         
@@ -136,7 +141,11 @@ class MomentumTradingStrategy:
         # ===============================================
         # DATA STORAGE
         # ===============================================
-        self.price_history: Dict[str, List[float]] = {inst: [] for inst in self.instruments}
+        self.history_limit = 200             # Bars of price_history kept per instrument
+        self.price_history: Dict[str, RingBuffer] = {inst: RingBuffer(self.history_limit) for inst in self.instruments}
+        self.indicators: Dict[str, IndicatorSet] = {}  # Streaming ATR/ADX per instrument
+        self.backtest_indicators: Dict[str, PrecomputedIndicators] = {}  # Backtest mode only
+        self.backtest_positions: Dict[str, int] = {}
         self.signals: List[TradeSignal] = []
         self.daily_signals = []  # Store all signals for ranking
         self.selected_trades = []  # Quality trades selected
@@ -151,7 +160,11 @@ class MomentumTradingStrategy:
         # ===============================================
         # NEWS INTEGRATION
         # ===============================================
-        self.news_enabled = NEWS_AVAILABLE and safe_news_integration.enabled if NEWS_AVAILABLE else False
+        try:
+            self.news_enabled = NEWS_AVAILABLE and safe_news_integration.enabled
+        except ImportError as e:
+            logger.warning(f"⚠️ News integration unavailable: {e}")
+            self.news_enabled = False
         
         # ===============================================
         # CONTEXTUAL TRADING INTEGRATION
@@ -284,6 +297,9 @@ class MomentumTradingStrategy:
         CRITICAL FIX: Pre-fill price history from OANDA so strategy can work immediately!
         Without this, strategy has empty history and NEVER generates signals.
         """
+        if prefill_deferred():
+            logger.info("⏭️ Prefill skipped - history comes from the warm-start snapshot")
+            return
         try:
             import os
             import requests
@@ -383,65 +399,74 @@ class MomentumTradingStrategy:
         time_since_last = datetime.now() - self.last_trade_time
         return time_since_last.total_seconds() >= (self.min_time_between_trades_minutes * 60)
     
-    def _calculate_atr(self, prices: List[float], period: int = 14) -> float:
-        """Calculate ATR estimate from close prices only (FIXED OCT 16)"""
-        if len(prices) < period + 1:
-            return 0.001  # Small non-zero default instead of 0
-        
-        # CRITICAL FIX: Can't use high/low (we only have close prices)
-        # Use price changes as proxy for true range
-        df = pd.Series(prices)
-        price_changes = df.diff().abs()
-        atr = price_changes.rolling(window=period).mean().iloc[-1]
-        
-        # If ATR is valid and non-zero, return it
-        if not pd.isna(atr) and atr > 0:
-            return atr
-        
-        # Fallback: use volatility estimate
-        returns = df.pct_change().abs()
-        vol_estimate = returns.rolling(period).std().iloc[-1] * df.iloc[-1]
-        
-        # Never return 0 - always return a small positive value
-        return vol_estimate if (not pd.isna(vol_estimate) and vol_estimate > 0) else 0.001
+    def _indicator_set(self, instrument: str) -> IndicatorSet:
+        """Streaming ATR/ADX for an instrument, rebuilt if the periods were re-tuned"""
+        indicators = self.indicators.get(instrument)
+        if (indicators is None or indicators['atr'].period != self.momentum_period
+                or indicators['adx'].period != self.adx_period):
+            indicators = IndicatorSet(
+                atr=ATR(self.momentum_period, smoothing='sma'),
+                abs_return_std=RollingStd(self.momentum_period, source='abs_return'),
+                adx=ADX(self.adx_period, smoothing='sma')
+            )
+            self.indicators[instrument] = indicators
+        return indicators
+    
+    def enable_backtest_mode(self, closes: Dict[str, np.ndarray]):
+        """
+        Precompute ATR/ADX columns over whole backtest close series.
+        
+        closes[instrument] must be the exact sequence of values price_history
+        will receive. Call after parameters are set, then call
+        set_backtest_positions() before each analyze_market().
+        """
+        self.backtest_indicators = {
+            instrument: self._precompute_indicators(np.asarray(series, dtype=np.float64))
+            for instrument, series in closes.items()
+        }
+        self.backtest_positions = {}
+    
+    def set_backtest_positions(self, positions: Dict[str, int]):
+        """Position in each instrument's backtest series of the value appended last"""
+        self.backtest_positions = positions
+    
+    def _precompute_indicators(self, closes: np.ndarray) -> PrecomputedIndicators:
+        """Vectorized close-only ATR/ADX (including the short-history defaults) for every bar"""
+        lengths = history_lengths(len(closes), self.history_limit)
+        atr = close_atr(closes, self.momentum_period)
+        fallback = abs_return_std(closes, self.momentum_period) * closes
+        atr = np.where(atr > 0, atr, np.where(fallback > 0, fallback, 0.001))
+        atr[lengths < self.momentum_period + 1] = 0.001
+        adx = np.nan_to_num(close_adx(closes, self.adx_period), nan=0.0)
+        adx[lengths < self.adx_period * 2] = 0.0
+        return PrecomputedIndicators(closes, {'atr': atr, 'adx': adx}, self.history_limit)
+    
+    def _backtest_row(self, instrument: str) -> Optional[Dict[str, float]]:
+        table = self.backtest_indicators.get(instrument)
+        if table is None:
+            return None
+        return table.row_for(self.price_history[instrument], self.backtest_positions.get(instrument))
     
-    def _calculate_adx(self, prices: List[float], period: int = 14) -> float:
-        """Calculate Average Directional Index"""
-        if len(prices) < period * 2:
-            return 0.0
-        
-        df = pd.Series(prices)
-        high = df
-        low = df
-        close = df.shift(1)
-        
-        # Calculate True Range
-        tr1 = high - low
-        tr2 = abs(high - close)
-        tr3 = abs(low - close)
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        
-        # Calculate Directional Movement
-        dm_plus = high.diff()
-        dm_minus = -low.diff()
-        
-        dm_plus = dm_plus.where((dm_plus > dm_minus) & (dm_plus > 0), 0)
-        dm_minus = dm_minus.where((dm_minus > dm_plus) & (dm_minus > 0), 0)
-        
-        # Calculate smoothed values
-        tr_smooth = tr.rolling(window=period).mean()
-        dm_plus_smooth = dm_plus.rolling(window=period).mean()
-        dm_minus_smooth = dm_minus.rolling(window=period).mean()
-        
-        # Calculate DI+ and DI-
-        di_plus = 100 * (dm_plus_smooth / tr_smooth)
-        di_minus = 100 * (dm_minus_smooth / tr_smooth)
-        
-        # Calculate ADX
-        dx = 100 * abs(di_plus - di_minus) / (di_plus + di_minus)
-        adx = dx.rolling(window=period).mean().iloc[-1]
-        
-        return adx if not pd.isna(adx) else 0.0
+    @profiled('strategy.indicators')
+    def _streaming_atr_adx(self, instrument: str) -> Tuple[float, float]:
+        """O(1) per bar close-only ATR/ADX on price_history"""
+        row = self._backtest_row(instrument)
+        if row is not None:
+            return row['atr'], row['adx']
+        
+        prices = self.price_history[instrument]
+        indicators = self._indicator_set(instrument).sync(prices)
+        
+        if len(prices) < self.momentum_period + 1:
+            atr = 0.001
+        else:
+            atr = indicators.value('atr')
+            if atr is None or atr <= 0:
+                vol = indicators.value('abs_return_std')
+                atr = vol * prices[-1] if vol is not None and vol * prices[-1] > 0 else 0.001
+        
+        adx = indicators.value('adx') if len(prices) >= self.adx_period * 2 else None
+        return atr, adx if adx is not None else 0.0
     
     def _check_trend_continuation(self, prices: List[float], direction: str) -> bool:
         """Check if trend is continuing"""
@@ -514,6 +539,7 @@ class MomentumTradingStrategy:
         
         return None
     
+    @profiled('strategy.quality')
     def _calculate_adaptive_quality_score(self, instrument: str, adx: float, 
                                          momentum: float, volume_score: float, 
                                          prices: List[float], regime: Optional[Dict],
@@ -726,12 +752,12 @@ class MomentumTradingStrategy:
             if instrument in self.instruments:
                 # Use mid price (average of bid and ask)
                 mid_price = (data.bid + data.ask) / 2
-                self.price_history[instrument].append(mid_price)
                 
                 # Keep more history for better calculations (was 100 - too small!)
-                # Increased to 200 to support 50-bar momentum + 100-bar trend
-                if len(self.price_history[instrument]) > 200:
-                    self.price_history[instrument] = self.price_history[instrument][-200:]
+                # 200 bars supports 50-bar momentum + 100-bar trend; the ring drops the oldest in O(1)
+                history = self.price_history[instrument] = as_ring(self.price_history.get(instrument), self.history_limit)
+                history.append(mid_price)
+                self._indicator_set(instrument).update(mid_price)
     
     def _generate_trade_signals(self, market_data: Dict[str, MarketData]) -> List[TradeSignal]:
         """Generate optimized trade signals with enhanced quality filters"""
@@ -799,8 +825,7 @@ class MomentumTradingStrategy:
             prices = self.price_history[instrument]
             
             # Calculate indicators
-            atr = self._calculate_atr(prices, self.momentum_period)
-            adx = self._calculate_adx(prices, self.adx_period)
+            atr, adx = self._streaming_atr_adx(instrument)
             
             if atr == 0 or adx == 0:
                 logger.info(f"⏰ Skipping {instrument}: ATR or ADX is zero (ATR={atr:.2f}, ADX={adx:.2f})")
@@ -1144,8 +1169,16 @@ class MomentumTradingStrategy:
             print(f'Error generating signals in {self.name}: {e}')
         
         return signals
-# Global strategy instance (for backward compatibility)
-momentum_trading = MomentumTradingStrategy()
+# Global strategy instance (for backward compatibility) - built on first request, not at import
+_momentum_trading = None
+_momentum_trading_lock = threading.Lock()
+
+
+def __getattr__(name):
+    if name == 'momentum_trading':
+        return get_momentum_trading_strategy()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 def get_momentum_trading_strategy(instruments: Optional[List[str]] = None) -> MomentumTradingStrategy:
     """Get a Momentum Trading strategy instance
@@ -1162,4 +1195,9 @@ def get_momentum_trading_strategy(instruments: Optional[List[str]] = None) -> Mo
         return MomentumTradingStrategy(instruments=instruments)
     else:
         # Return default global instance
-        return momentum_trading
+        global _momentum_trading
+        if _momentum_trading is None:
+            with _momentum_trading_lock:
+                if _momentum_trading is None:
+                    _momentum_trading = MomentumTradingStrategy()
+        return _momentum_trading
@@ -11,6 +11,7 @@ import numpy as np
 
 from ..core.order_manager import TradeSignal, OrderSide
 from ..core.data_feed import MarketData
+from ..core.ring_buffer import RingBuffer, as_ring
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -44,7 +45,7 @@ class RangeTradingStrategy:
         self.target_trades_per_day = 5     # Soft target
         
         # Data storage
-        self.price_history: Dict[str, List[float]] = {inst: [] for inst in self.instruments}
+        self.price_history: Dict[str, RingBuffer] = {inst: RingBuffer(100) for inst in self.instruments}
         self.support_levels: Dict[str, List[float]] = {}
         self.resistance_levels: Dict[str, List[float]] = {}
         self.daily_trade_count = 0
@@ -156,12 +157,8 @@ class RangeTradingStrategy:
         for instrument, data in market_data.items():
             if instrument in self.instruments:
                 mid_price = (data.bid + data.ask) / 2
-                if instrument not in self.price_history:
-                    self.price_history[instrument] = []
+                self.price_history[instrument] = as_ring(self.price_history.get(instrument), 100)
                 self.price_history[instrument].append(mid_price)
-                
-                if len(self.price_history[instrument]) > 100:
-                    self.price_history[instrument] = self.price_history[instrument][-100:]
         
         signals = []
         
@@ -13,6 +13,7 @@ from dataclasses import dataclass
 
 from ..core.data_feed import MarketData
 from ..core.order_manager import TradeSignal, Side
+from ..core.indicators import IndicatorSet, RollingMean, RSI
 
 logger = logging.getLogger(__name__)
 
@@ -68,6 +69,7 @@ class RSIDivergenceStrategy:
         
         # Price history for analysis
         self.price_history = {inst: [] for inst in self.instruments}
+        self.indicators: Dict[tuple, IndicatorSet] = {}  # Streaming indicators per instrument
         self.rsi_data = {inst: [] for inst in self.instruments}
         self.divergence_points = {inst: [] for inst in self.instruments}
         
@@ -339,41 +341,31 @@ class RSIDivergenceStrategy:
     
     def _calculate_atr(self, instrument: str, period: int = 14) -> float:
         """Calculate ATR for stop loss and take profit"""
-        if len(self.price_history[instrument]) < period + 1:
+        history = self.price_history[instrument]
+        if len(history) < period + 1:
             return 0.001
         
-        df = pd.DataFrame(self.price_history[instrument])
-        df['tr'] = df[['high', 'low']].apply(
-            lambda x: x['high'] - x['low'], axis=1
-        )
-        atr = df['tr'].rolling(period).mean().iloc[-1]
+        # Rolling mean of the high-low range, streamed instead of rebuilt per call
+        key = (instrument, 'atr', period)
+        if key not in self.indicators:
+            self.indicators[key] = IndicatorSet(atr=RollingMean(period, source='range'))
+        atr = self.indicators[key].sync(history).value('atr')
         
-        return atr if not pd.isna(atr) and atr > 0 else 0.001
+        return atr if atr is not None and atr > 0 else 0.001
     
     def _calculate_current_rsi(self, instrument: str) -> float:
         """Calculate current RSI value"""
-        if len(self.price_history[instrument]) < self.rsi_period + 1:
+        history = self.price_history[instrument]
+        if len(history) < self.rsi_period + 1:
             return 50.0  # Neutral RSI
         
-        df = pd.DataFrame(self.price_history[instrument])
-        
-        # Calculate price changes
-        df['price_change'] = df['close'].diff()
-        
-        # Separate gains and losses
-        df['gain'] = df['price_change'].where(df['price_change'] > 0, 0)
-        df['loss'] = -df['price_change'].where(df['price_change'] < 0, 0)
-        
-        # Calculate average gains and losses
-        df['avg_gain'] = df['gain'].rolling(window=self.rsi_period).mean()
-        df['avg_loss'] = df['loss'].rolling(window=self.rsi_period).mean()
-        
-        # Calculate RSI
-        df['rs'] = df['avg_gain'] / df['avg_loss']
-        df['rsi'] = 100 - (100 / (1 + df['rs']))
+        # Rolling-average RSI of closes, updated per new candle
+        key = (instrument, 'rsi', self.rsi_period)
+        if key not in self.indicators:
+            self.indicators[key] = IndicatorSet(rsi=RSI(self.rsi_period, smoothing='sma'))
+        current_rsi = self.indicators[key].sync(history).value('rsi')
         
-        current_rsi = df['rsi'].iloc[-1]
-        return current_rsi if not pd.isna(current_rsi) else 50.0
+        return current_rsi if current_rsi is not None else 50.0
     
     def analyze_market(self, market_data_dict: Dict[str, MarketData]) -> List[TradeSignal]:
         """Analyze market and generate RSI divergence signals"""
@@ -5,6 +5,7 @@ Maximum 10 trades per day with ultra high quality filters
 """
 
 import logging
+import threading
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
@@ -13,22 +14,22 @@ import pandas as pd
 
 from ..core.order_manager import TradeSignal, OrderSide, get_order_manager
 from ..core.data_feed import MarketData, get_data_feed
+from ..core.ring_buffer import RingBuffer, as_ring
+from ..core.lazy_imports import lazy_import, module_available
+from ..core.batch_indicators import (
+    PrecomputedIndicators, history_lengths, windowed_ema, windowed_macd, sma_rsi, trailing_volatility
+)
 
-# News integration (optional, non-breaking)
-try:
-    from ..core.news_integration import safe_news_integration
-    NEWS_AVAILABLE = True
-except ImportError:
-    NEWS_AVAILABLE = False
+# News integration (optional, non-breaking) - imported on first use (pulls in aiohttp)
+NEWS_AVAILABLE = module_available('..core.news_integration', __package__)
+safe_news_integration = lazy_import('..core.news_integration', __package__, 'safe_news_integration')
 
-# Learning & Honesty System (NEW OCT 21, 2025)
-try:
-    from ..core.loss_learner import get_loss_learner
-    from ..core.early_trend_detector import get_early_trend_detector
-    from ..core.honesty_reporter import get_honesty_reporter
-    LEARNING_AVAILABLE = True
-except ImportError:
-    LEARNING_AVAILABLE = False
+# Learning & Honesty System (NEW OCT 21, 2025) - imported on first use
+LEARNING_AVAILABLE = all(module_available(f'..core.{name}', __package__)
+                         for name in ('loss_learner', 'early_trend_detector', 'honesty_reporter'))
+get_loss_learner = lazy_import('..core.loss_learner', __package__, 'get_loss_learner')
+get_early_trend_detector = lazy_import('..core.early_trend_detector', __package__, 'get_early_trend_detector')
+get_honesty_reporter = lazy_import('..core.honesty_reporter', __package__, 'get_honesty_reporter')
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -117,7 +118,10 @@ class UltraStrictForexStrategy:
         # ===============================================
         # DATA STORAGE
         # ===============================================
-        self.price_history: Dict[str, List[float]] = {inst: [] for inst in self.instruments}
+        self.history_limit = 100             # Bars of price_history kept per instrument
+        self.price_history: Dict[str, RingBuffer] = {inst: RingBuffer(self.history_limit) for inst in self.instruments}
+        self.backtest_indicators: Dict[str, PrecomputedIndicators] = {}  # Backtest mode only
+        self.backtest_positions: Dict[str, int] = {}
         self.ema_history: Dict[str, Dict[int, List[float]]] = {
             inst: {period: [] for period in self.ema_periods} for inst in self.instruments
         }
@@ -134,7 +138,11 @@ class UltraStrictForexStrategy:
         # ===============================================
         # NEWS INTEGRATION
         # ===============================================
-        self.news_enabled = NEWS_AVAILABLE and safe_news_integration.enabled if NEWS_AVAILABLE else False
+        try:
+            self.news_enabled = NEWS_AVAILABLE and safe_news_integration.enabled
+        except ImportError as e:
+            logger.warning(f"⚠️ News integration unavailable: {e}")
+            self.news_enabled = False
         if self.news_enabled:
             logger.info("✅ News integration enabled for quality filtering")
         else:
@@ -191,15 +199,68 @@ class UltraStrictForexStrategy:
         df = pd.Series(prices)
         return df.ewm(span=period, adjust=False).mean().iloc[-1]
     
-    def _check_higher_timeframe_trend(self, prices: List[float], signal_direction: str) -> bool:
+    def enable_backtest_mode(self, closes: Dict[str, np.ndarray]):
+        """
+        Precompute EMA/RSI/MACD/volatility columns over whole backtest close series.
+        
+        closes[instrument] must be the exact sequence of values price_history
+        will receive. Call after parameters are set, then call
+        set_backtest_positions() before each analyze_market().
+        """
+        self.backtest_indicators = {
+            instrument: self._precompute_indicators(np.asarray(series, dtype=np.float64))
+            for instrument, series in closes.items()
+        }
+        self.backtest_positions = {}
+    
+    def set_backtest_positions(self, positions: Dict[str, int]):
+        """Position in each instrument's backtest series of the value appended last"""
+        self.backtest_positions = positions
+    
+    def _precompute_indicators(self, closes: np.ndarray) -> PrecomputedIndicators:
+        """Vectorized _calculate_ema and the RSI/MACD/volatility calculations for every bar"""
+        lengths = history_lengths(len(closes), self.history_limit)
+        
+        def ema(period: int) -> np.ndarray:
+            values = windowed_ema(closes, period, self.history_limit)
+            return np.where(lengths < period, closes, values)
+        
+        macd, macd_signal = windowed_macd(closes, self.history_limit)
+        volatility = trailing_volatility(closes, 20)
+        volatility[lengths < 20] = np.nan
+        columns = {
+            'ema_3': ema(3),
+            'ema_8': ema(8),
+            'ema_21': ema(21),
+            'ema_trend_long': ema(self.trend_lookback_long),
+            'ema_trend_short': ema(self.trend_lookback_short),
+            'rsi': np.nan_to_num(sma_rsi(closes, 14), nan=50.0),
+            'macd': np.nan_to_num(macd, nan=0.0),
+            'macd_signal': np.nan_to_num(macd_signal, nan=0.0),
+            'volatility': volatility
+        }
+        return PrecomputedIndicators(closes, columns, self.history_limit)
+    
+    def _backtest_row(self, instrument: str) -> Optional[Dict[str, float]]:
+        table = self.backtest_indicators.get(instrument)
+        if table is None:
+            return None
+        return table.row_for(self.price_history[instrument], self.backtest_positions.get(instrument))
+    
+    def _check_higher_timeframe_trend(self, prices: List[float], signal_direction: str,
+                                      instrument: Optional[str] = None) -> bool:
         """Check if signal aligns with higher timeframe trend"""
         if len(prices) < max(self.trend_lookback_long, self.trend_lookback_short):
             return True  # Not enough data, allow trade
         
         try:
             # Calculate EMAs for trend analysis
-            long_term_ema = self._calculate_ema(prices, self.trend_lookback_long)
-            short_term_ema = self._calculate_ema(prices, self.trend_lookback_short)
+            row = self._backtest_row(instrument) if instrument else None
+            if row is not None:
+                long_term_ema, short_term_ema = row['ema_trend_long'], row['ema_trend_short']
+            else:
+                long_term_ema = self._calculate_ema(prices, self.trend_lookback_long)
+                short_term_ema = self._calculate_ema(prices, self.trend_lookback_short)
             current_price = prices[-1]
             
             # Determine higher TF trend
@@ -264,11 +325,10 @@ class UltraStrictForexStrategy:
             if instrument in self.instruments:
                 # Use mid price (average of bid and ask)
                 mid_price = (data.bid + data.ask) / 2
-                self.price_history[instrument].append(mid_price)
                 
-                # Keep only last 100 prices for efficiency
-                if len(self.price_history[instrument]) > 100:
-                    self.price_history[instrument] = self.price_history[instrument][-100:]
+                # Keep only last 100 prices (fixed-size ring, O(1) append)
+                history = self.price_history[instrument] = as_ring(self.price_history.get(instrument), self.history_limit)
+                history.append(mid_price)
     
     def _calculate_ema_signals(self) -> Dict[str, EMASignal]:
         """Calculate EMA crossover signals"""
@@ -281,9 +341,13 @@ class UltraStrictForexStrategy:
             prices = self.price_history[instrument]
             
             # Calculate EMAs
-            ema_3 = self._calculate_ema(prices, 3)
-            ema_8 = self._calculate_ema(prices, 8)
-            ema_21 = self._calculate_ema(prices, 21)
+            row = self._backtest_row(instrument)
+            if row is not None:
+                ema_3, ema_8, ema_21 = row['ema_3'], row['ema_8'], row['ema_21']
+            else:
+                ema_3 = self._calculate_ema(prices, 3)
+                ema_8 = self._calculate_ema(prices, 8)
+                ema_21 = self._calculate_ema(prices, 21)
             
             # Determine signal and strength
             signal = 'HOLD'
@@ -320,24 +384,27 @@ class UltraStrictForexStrategy:
                 continue
             
             prices = self.price_history[instrument]
-            
-            # Calculate RSI
-            df = pd.Series(prices)
-            delta = df.diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs))
-            rsi = rsi.iloc[-1] if not pd.isna(rsi.iloc[-1]) else 50
-            
-            # Calculate MACD
-            ema_12 = df.ewm(span=12).mean()
-            ema_26 = df.ewm(span=26).mean()
-            macd = ema_12 - ema_26
-            macd_signal = macd.ewm(span=9).mean()
-            
-            macd_val = macd.iloc[-1] if not pd.isna(macd.iloc[-1]) else 0
-            macd_sig = macd_signal.iloc[-1] if not pd.isna(macd_signal.iloc[-1]) else 0
+            row = self._backtest_row(instrument)
+            if row is not None:
+                rsi, macd_val, macd_sig = row['rsi'], row['macd'], row['macd_signal']
+            else:
+                # Calculate RSI
+                df = pd.Series(prices)
+                delta = df.diff()
+                gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+                loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+                rs = gain / loss
+                rsi = 100 - (100 / (1 + rs))
+                rsi = rsi.iloc[-1] if not pd.isna(rsi.iloc[-1]) else 50
+                
+                # Calculate MACD
+                ema_12 = df.ewm(span=12).mean()
+                ema_26 = df.ewm(span=26).mean()
+                macd = ema_12 - ema_26
+                macd_signal = macd.ewm(span=9).mean()
+                
+                macd_val = macd.iloc[-1] if not pd.isna(macd.iloc[-1]) else 0
+                macd_sig = macd_signal.iloc[-1] if not pd.isna(macd_signal.iloc[-1]) else 0
             
             # Determine momentum and strength
             momentum = 'NEUTRAL'
@@ -396,8 +463,12 @@ class UltraStrictForexStrategy:
             
             # Volatility filter
             if len(self.price_history[instrument]) >= 20:
-                recent_prices = self.price_history[instrument][-20:]
-                volatility = np.std(recent_prices) / np.mean(recent_prices)
+                row = self._backtest_row(instrument)
+                if row is not None and not np.isnan(row['volatility']):
+                    volatility = row['volatility']
+                else:
+                    recent_prices = self.price_history[instrument][-20:]
+                    volatility = np.std(recent_prices) / np.mean(recent_prices)
                 if volatility < self.min_volatility_threshold:
                     continue
             
@@ -419,7 +490,7 @@ class UltraStrictForexStrategy:
                 (momentum_signal.momentum == 'BULLISH' or momentum_signal.momentum == 'NEUTRAL')):
                 
                 # Multi-timeframe confirmation
-                if not self._check_higher_timeframe_trend(self.price_history[instrument], 'BUY'):
+                if not self._check_higher_timeframe_trend(self.price_history[instrument], 'BUY', instrument):
                     logger.info(f"⏰ Skipping {instrument} BUY: Higher TF not aligned")
                     continue
                 
@@ -454,7 +525,7 @@ class UltraStrictForexStrategy:
                   (momentum_signal.momentum == 'BEARISH' or momentum_signal.momentum == 'NEUTRAL')):
                 
                 # Multi-timeframe confirmation
-                if not self._check_higher_timeframe_trend(self.price_history[instrument], 'SELL'):
+                if not self._check_higher_timeframe_trend(self.price_history[instrument], 'SELL', instrument):
                     logger.info(f"⏰ Skipping {instrument} SELL: Higher TF not aligned")
                     continue
                 
@@ -595,9 +666,22 @@ class UltraStrictForexStrategy:
         }
 
 
-# Global strategy instance
-ultra_strict_forex = UltraStrictForexStrategy()
+# Global strategy instance - built on first request, not at import
+_ultra_strict_forex = None
+_ultra_strict_forex_lock = threading.Lock()
+
+
+def __getattr__(name):
+    if name == 'ultra_strict_forex':
+        return get_ultra_strict_forex_strategy()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 def get_ultra_strict_forex_strategy() -> UltraStrictForexStrategy:
     """Get the global Ultra Strict Forex strategy instance"""
-    return ultra_strict_forex
+    global _ultra_strict_forex
+    if _ultra_strict_forex is None:
+        with _ultra_strict_forex_lock:
+            if _ultra_strict_forex is None:
+                _ultra_strict_forex = UltraStrictForexStrategy()
+    return _ultra_strict_forex
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Test AsyncOandaClient snapshots - concurrent account fetches over a stubbed aiohttp session, per-account failures
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import yarl
+import aiohttp
+
+from src.core import async_oanda_client
+from src.core.async_oanda_client import fetch_accounts_snapshot, get_accounts_snapshot
+
+LATENCY = 0.2
+
+
+class _StubResponse:
+    def __init__(self, session, url, status, body):
+        self.session = session
+        self.url = url
+        self.status = status
+        self.body = body
+
+    async def __aenter__(self):
+        self.session.in_flight += 1
+        self.session.max_in_flight = max(self.session.max_in_flight, self.session.in_flight)
+        try:
+            await asyncio.sleep(LATENCY)
+        finally:
+            self.session.in_flight -= 1
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            url = yarl.URL(self.url)
+            raise aiohttp.ClientResponseError(aiohttp.RequestInfo(url, 'GET', {}, url), (), status=self.status,
+                                              message='Service Unavailable')
+
+    async def json(self, content_type=None):
+        return self.body
+
+
+class StubSession:
+    """Stands in for aiohttp.ClientSession: canned OANDA account/trades JSON, some accounts down"""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        self.closed = True
+
+    def request(self, method, url, headers=None, json=None, params=None, timeout=None):
+        self.requests.append((method, url, headers['Authorization']))
+        account_id = url.split('/v3/accounts/')[1].split('/')[0]
+        if account_id in self.failing:
+            return _StubResponse(self, url, 503, {})
+        if url.endswith('/trades'):
+            return _StubResponse(self, url, 200, {'trades': [{'id': '7', 'instrument': 'EUR_USD'}]})
+        return _StubResponse(self, url, 200, {'account': {'id': account_id, 'currency': 'USD', 'balance': '1000.5',
+                                                          'openTradeCount': 1}})
+
+
+def _with_stub(session, fn):
+    saved_env = {k: os.environ.get(k) for k in ('OANDA_HTTP_RETRIES', 'OANDA_HTTP_BACKOFF')}
+    os.environ.update(OANDA_HTTP_RETRIES='2', OANDA_HTTP_BACKOFF='0')
+    create_session = async_oanda_client.create_session
+    async_oanda_client.create_session = lambda: session
+    logging.disable(logging.ERROR)
+    try:
+        return fn()
+    finally:
+        logging.disable(logging.NOTSET)
+        async_oanda_client.create_session = create_session
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def test_accounts_are_fetched_concurrently_and_one_failure_is_isolated():
+    accounts = ['101-004-1', '101-004-2', '101-004-3', '101-004-4']
+    session = StubSession(failing={'101-004-3'})
+    start = time.monotonic()
+    snapshots = _with_stub(session, lambda: get_accounts_snapshot(
+        accounts + [''], api_key='async-test-token', environment='practice',
+        credentials={'101-004-4': {'api_key': 'other-token'}}))
+    elapsed = time.monotonic() - start
+
+    assert set(snapshots) == set(accounts)
+    assert 'error' in snapshots['101-004-3'] and '503' in snapshots['101-004-3']['error']
+    for account_id in ('101-004-1', '101-004-2', '101-004-4'):
+        assert snapshots[account_id]['account'].account_id == account_id
+        assert snapshots[account_id]['account'].balance == 1000.5
+        assert snapshots[account_id]['open_trades'][0]['id'] == '7'
+
+    # Every account's info and trades requests were in flight together: ~one round trip (plus the failing
+    # account's retry), not eight sequential ones
+    assert session.max_in_flight == 8
+    assert elapsed < 4 * LATENCY
+    assert len([r for r in session.requests if '101-004-3' in r[1]]) == 4
+    assert {r[2] for r in session.requests if '101-004-4' in r[1]} == {'Bearer other-token'}
+    assert session.closed
+
+
+def test_snapshot_runs_inside_a_running_event_loop():
+    session = StubSession(failing={'101-004-2'})
+
+    async def from_async_code():
+        # Sync entry point called from a coroutine (e.g. an async web handler) must not deadlock
+        return get_accounts_snapshot(['101-004-1', '101-004-2'], api_key='async-test-token',
+                                     include_trades=False)
+
+    snapshots = _with_stub(session, lambda: asyncio.run(from_async_code()))
+    assert snapshots['101-004-1']['open_trades'] == [] and 'error' in snapshots['101-004-2']
+    assert not any(r[1].endswith('/trades') for r in session.requests)
+
+    direct = _with_stub(StubSession(), lambda: asyncio.run(fetch_accounts_snapshot(
+        ['101-004-5'], api_key='async-test-token')))
+    assert direct['101-004-5']['account'].open_trade_count == 1
+
+
+if __name__ == '__main__':
+    test_accounts_are_fetched_concurrently_and_one_failure_is_isolated()
+    test_snapshot_runs_inside_a_running_event_loop()
+    print("✅ Async OANDA client tests passed")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test the tick-to-OHLC bar aggregator - multi-granularity bars on exchange time, late ticks, reconcile
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.core.bar_aggregator import BarAggregator
+from src.core.candle_store import to_ns
+
+T0 = to_ns('2025-11-03T09:00:00Z')
+SEC = 1_000_000_000
+
+
+def _ticks(n=1500, seed=2):
+    """(time_ns, bid, ask) roughly every 2.4s for an hour"""
+    rng = np.random.default_rng(seed)
+    times = T0 + np.cumsum(rng.integers(1, 4 * SEC, n))
+    bids = 1.15 + np.cumsum(rng.normal(0, 2e-5, n))
+    return [(int(t), float(b), float(b) + 1.2e-4) for t, b in zip(times, bids)]
+
+
+def test_bars_match_reference_ohlc_for_all_granularities():
+    ticks = _ticks()
+    bars = BarAggregator(('M1', 'M5', 'H1'), history=1000)
+    closed = []
+    bars.subscribe(closed.append)
+    for t, bid, ask in ticks:
+        bars.on_tick('EUR_USD', bid, ask, t)
+
+    for granularity, seconds in (('M1', 60), ('M5', 300)):
+        step = seconds * SEC
+        buckets = {}
+        for t, bid, ask in ticks:
+            buckets.setdefault(t - t % step, []).append((bid, ask))
+        expected = sorted(buckets)[:-1]  # The last bucket is still open
+        arrays = bars.get_arrays('EUR_USD', granularity)
+        assert arrays.time.tolist() == expected
+        for i, start in enumerate(expected):
+            bid = [b for b, _ in buckets[start]]
+            mid = [(b + a) / 2 for b, a in buckets[start]]
+            assert (arrays.bid_o[i], arrays.bid_h[i], arrays.bid_l[i], arrays.bid_c[i]) == (bid[0], max(bid), min(bid), bid[-1])
+            assert arrays.mid_h[i] == max(mid) and arrays.mid_l[i] == min(mid)
+            assert arrays.volume[i] == len(bid)
+        assert bars.current_bar('EUR_USD', granularity).time_ns == sorted(buckets)[-1]
+
+    # Events arrive in close order, each bar exactly once
+    m1 = [bar.time_ns for bar in closed if bar.granularity == 'M1']
+    assert m1 == sorted(set(m1)) and len(m1) == len(bars.get_arrays('EUR_USD', 'M1'))
+    assert all(bar.complete for bar in closed)
+
+
+def test_late_ticks_and_quiet_market_close():
+    bars = BarAggregator(('M1',))
+    bars.on_tick('XAU_USD', 4000.0, 4000.4, T0 + 5 * SEC)
+    bars.on_tick('XAU_USD', 4001.0, 4001.4, T0 + 65 * SEC)      # Closes 09:00
+    bars.on_tick('XAU_USD', 3990.0, 3990.4, T0 + 59 * SEC)      # Late: 09:00 already closed
+    assert bars.stats['late_ticks'] == 1
+    assert bars.get_candles('XAU_USD', 'M1')[0]['bid']['l'] == 4000.0
+
+    assert bars.close_due(T0 + 119 * SEC) == []
+    closed = bars.close_due(T0 + 120 * SEC)
+    assert [bar.timestamp for bar in closed] == ['2025-11-03T09:01:00.000000000Z']
+    assert bars.current_bar('XAU_USD', 'M1') is None
+
+
+def test_reconcile_inserts_gaps_and_corrects_bars():
+    bars = BarAggregator(('M1',))
+    emitted = []
+    bars.subscribe(emitted.append, 'M1')
+    bars.on_tick('EUR_USD', 1.1000, 1.1001, T0 + 10 * SEC)
+    bars.on_tick('EUR_USD', 1.1004, 1.1005, T0 + 70 * SEC)      # Closes 09:00, 09:01 in progress
+    emitted.clear()
+
+    def candle(minute, o, h, l, c, complete=True):
+        return {'time': f'2025-11-03T09:0{minute}:00.000000000Z', 'volume': 10, 'complete': complete,
+                'bid': {'o': o, 'h': h, 'l': l, 'c': c},
+                'ask': {'o': o + 1e-4, 'h': h + 1e-4, 'l': l + 1e-4, 'c': c + 1e-4}}
+
+    # Disconnected from 09:01:10 to 09:03:30; OANDA is authoritative for what was missed
+    inserted = bars.reconcile('EUR_USD', 'M1', [
+        candle(0, 1.0999, 1.1003, 1.0998, 1.1002),
+        candle(1, 1.1003, 1.1009, 1.1001, 1.1006),
+        candle(2, 1.1006, 1.1007, 1.0995, 1.0996),
+        candle(3, 1.0996, 1.0999, 1.0990, 1.0991, complete=False),
+    ])
+    assert [bar.timestamp[11:16] for bar in inserted] == ['09:01', '09:02']
+    assert [bar.source for bar in emitted] == ['candles', 'candles']
+    assert bars.stats['corrected_bars'] == 1
+
+    arrays = bars.get_arrays('EUR_USD', 'M1')
+    assert arrays.time.tolist() == [T0, T0 + 60 * SEC, T0 + 120 * SEC]
+    assert arrays.bid_h[0] == 1.1003  # Corrected from the candle
+    live = bars.current_bar('EUR_USD', 'M1')
+    assert live.time_ns == T0 + 180 * SEC and live.bid[2] == 1.0990
+
+    bars.on_tick('EUR_USD', 1.0989, 1.0990, T0 + 200 * SEC)
+    assert bars.current_bar('EUR_USD', 'M1').bid[2] == 1.0989
+    assert len(bars.on_tick('EUR_USD', 1.0992, 1.0993, T0 + 240 * SEC)) == 1
+
+
+if __name__ == '__main__':
+    test_bars_match_reference_ohlc_for_all_granularities()
+    test_late_ticks_and_quiet_market_close()
+    test_reconcile_inserts_gaps_and_corrects_bars()
+    print("✅ Bar aggregator tests passed")
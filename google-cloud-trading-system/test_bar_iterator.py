@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test aligned multi-instrument bar iterator - gaps, ordering, data-access overhead
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.core.ohlcv_arrays import OHLCVArrays
+from src.core.bar_iterator import AlignedBarIterator
+
+STEP = 300 * 10**9
+
+
+def _series(instrument, times, base):
+    times = np.asarray(times, dtype=np.int64)
+    bid = base + np.arange(len(times)) * 1e-5
+    columns = {'time': times, 'volume': np.ones(len(times), dtype=np.int64)}
+    for field in 'ohlc':
+        columns[f'bid_{field}'] = bid
+        columns[f'ask_{field}'] = bid + 2e-4
+    return OHLCVArrays.from_columns(instrument, 'M5', columns)
+
+
+def test_alignment_with_gaps():
+    eur = _series('EUR_USD', [0, STEP, 2 * STEP, 4 * STEP], 1.1)
+    gbp = _series('GBP_USD', [STEP, 3 * STEP, 4 * STEP], 1.3)
+    bars = AlignedBarIterator({'EUR_USD': eur, 'GBP_USD': gbp}, ['GBP_USD', 'EUR_USD', 'USD_JPY'])
+
+    assert bars.instruments == ['GBP_USD', 'EUR_USD']
+    steps = list(bars.snapshots())
+    assert [bar.time_ns for bar, _ in steps] == [0, STEP, 2 * STEP, 3 * STEP, 4 * STEP]
+    assert [bar.indices for bar, _ in steps] == [
+        {'EUR_USD': 0},
+        {'GBP_USD': 0, 'EUR_USD': 1},
+        {'EUR_USD': 2},
+        {'GBP_USD': 1},
+        {'GBP_USD': 2, 'EUR_USD': 3},
+    ]
+
+    bar, snapshot = steps[4]
+    assert bar.timestamp == '1970-01-01T00:20:00.000000000Z'
+    assert snapshot['EUR_USD'].bid == eur.bid_c[3]
+    assert abs(snapshot['GBP_USD'].spread - 2e-4) < 1e-12
+    assert snapshot['GBP_USD'].pair == 'GBP_USD'
+
+
+def test_min_spread_for_mid_only_data():
+    columns = {'time': np.array([0, STEP], dtype=np.int64), 'volume': np.zeros(2, dtype=np.int64)}
+    for field in 'ohlc':
+        columns[f'mid_{field}'] = np.array([1.2, 1.3])
+    bars = AlignedBarIterator({'EUR_USD': OHLCVArrays.from_columns('EUR_USD', 'M5', columns)}, min_spread=1e-4)
+    _, snapshot = next(bars.snapshots())
+    assert snapshot['EUR_USD'].bid == 1.2
+    assert abs(snapshot['EUR_USD'].ask - 1.2001) < 1e-12
+
+
+def test_two_week_seven_pair_overhead():
+    bars_per_pair = 14 * 288
+    series = {}
+    for k in range(7):
+        times = np.arange(bars_per_pair, dtype=np.int64) * STEP
+        # Drop a different handful of bars per pair so timelines do not line up
+        series[f'PAIR_{k}'] = _series(f'PAIR_{k}', np.delete(times, np.arange(k, bars_per_pair, 97)), 1.0 + k)
+
+    start = time.perf_counter()
+    seen = 0
+    for _, snapshot in AlignedBarIterator(series).snapshots():
+        seen += len(snapshot)
+    elapsed = time.perf_counter() - start
+
+    assert seen == sum(len(s) for s in series.values())
+    assert elapsed < 1.0, f"data access took {elapsed:.2f}s"
+
+
+if __name__ == '__main__':
+    test_alignment_with_gaps()
+    test_min_spread_for_mid_only_data()
+    test_two_week_seven_pair_overhead()
+    print("✅ Bar iterator tests passed")
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Test vectorized batch indicators - parity with per-scan pandas and streaming values, backtest mode
+"""
+
+import os
+import sys
+import logging
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.core.batch_indicators import PARITY_RTOL, PrecomputedIndicators, interleaved_closes
+from src.core.ohlcv_arrays import OHLCVArrays
+from src.strategies.momentum_trading import MomentumTradingStrategy
+from test_support import pandas_close_atr, pandas_close_adx
+from src.strategies.gold_scalping_optimized import GoldScalpingStrategy
+from src.strategies.ultra_strict_forex_optimized import UltraStrictForexStrategy
+
+
+def _walk(n=500, seed=21, base=1.1, flat_at=None):
+    rng = np.random.default_rng(seed)
+    closes = base * (1 + np.cumsum(rng.normal(0, 3e-4, n)))
+    if flat_at is not None:
+        closes[flat_at:flat_at + 60] = closes[flat_at]
+    return closes
+
+
+def _bare(cls, **attrs):
+    """Strategy instance without running __init__ (no feeds, no network)"""
+    strategy = cls.__new__(cls)
+    strategy.backtest_indicators, strategy.backtest_positions, strategy.indicators = {}, {}, {}
+    for name, value in attrs.items():
+        setattr(strategy, name, value)
+    return strategy
+
+
+def _histories(closes, window):
+    """(position, trimmed history) as the strategy sees it after each append"""
+    history = []
+    for i, close in enumerate(closes.tolist()):
+        history.append(close)
+        if len(history) > window:
+            history = history[-window:]
+        yield i, history
+
+
+def _close(a, b):
+    return np.isclose(a, b, rtol=PARITY_RTOL, atol=1e-12)
+
+
+def test_momentum_columns_match_per_scan_and_streaming():
+    closes = _walk(flat_at=250)
+    strategy = _bare(MomentumTradingStrategy, momentum_period=40, adx_period=14, history_limit=200,
+                     price_history={'EUR_USD': []})
+    table = strategy._precompute_indicators(closes)
+
+    for i, history in _histories(closes, 200):
+        strategy._indicator_set('EUR_USD').update(history[-1])  # As _update_price_history does
+        row = table.row_for(history, i)
+        assert _close(row['atr'], pandas_close_atr(history, 40)), i
+        assert _close(row['adx'], pandas_close_adx(history, 14)), i
+        strategy.price_history['EUR_USD'] = history
+        streaming = strategy._streaming_atr_adx('EUR_USD')
+        assert _close(row['atr'], streaming[0]) and _close(row['adx'], streaming[1]), i
+    assert table.misses == 0
+
+
+def test_gold_and_ultra_columns_match_per_scan():
+    closes = _walk(base=2000.0, seed=4)
+    gold = _bare(GoldScalpingStrategy, history_limit=100, volatility_lookback=20)
+    table = gold._precompute_indicators(closes)
+    for i, history in _histories(closes, 100):
+        row = table.row(i)
+        assert _close(row['atr'], gold._calculate_atr(history)), i
+        if len(history) >= 20:
+            assert _close(row['volatility'], np.std(history[-20:]) / np.mean(history[-20:])), i
+
+    closes = _walk(seed=8)
+    ultra = _bare(UltraStrictForexStrategy, history_limit=100, trend_lookback_long=50, trend_lookback_short=20)
+    table = ultra._precompute_indicators(closes)
+    for i, history in _histories(closes, 100):
+        row = table.row(i)
+        for period in (3, 8, 21):
+            assert _close(row[f'ema_{period}'], ultra._calculate_ema(history, period)), (i, period)
+        assert _close(row['ema_trend_long'], ultra._calculate_ema(history, 50)), i
+        if len(history) < 14:
+            continue
+        df = pd.Series(history)
+        delta = df.diff()
+        gain = delta.where(delta > 0, 0).rolling(window=14).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+        rsi = (100 - (100 / (1 + gain / loss))).iloc[-1]
+        macd = df.ewm(span=12).mean() - df.ewm(span=26).mean()
+        assert _close(row['rsi'], rsi if not pd.isna(rsi) else 50), i
+        assert _close(row['macd'], macd.iloc[-1]), i
+        assert _close(row['macd_signal'], macd.ewm(span=9).mean().iloc[-1]), i
+
+
+def test_rows_refused_when_history_does_not_line_up():
+    closes = _walk(100)
+    table = PrecomputedIndicators(closes, {'x': np.arange(100.0)}, window=50)
+    history = closes[40:71].tolist()
+    assert table.row_for(history, 70) is None  # Too short for a 50-bar window at bar 70
+    assert table.row_for(closes[21:71].tolist(), 70) == {'x': 70.0}
+    assert table.row_for(closes[21:71].tolist(), 69) is None
+    assert table.row_for(closes[21:71].tolist(), None) is None
+
+
+def test_optimizer_backtest_mode_matches_per_scan():
+    from universal_optimizer import UniversalOptimizer
+
+    n = 1200
+    t = (np.arange(n, dtype=np.int64) * 300 + 1_700_000_000) * 10**9
+    data = {}
+    for seed, inst in enumerate(('EUR_USD', 'GBP_USD')):
+        c = _walk(n, seed=seed, base=1.1 + seed * 0.15)
+        cols = {'time': t, 'volume': np.ones(n, dtype=np.int64)}
+        for side, px in (('bid', c), ('ask', c + 1e-4)):
+            cols.update({f'{side}_{f}': px for f in 'ohlc'})
+        data[inst] = OHLCVArrays.from_columns(inst, 'M5', cols)
+
+    strategies = []
+
+    class Tracked(UltraStrictForexStrategy):
+        def enable_backtest_mode(self, closes):
+            super().enable_backtest_mode(closes)
+            strategies.append(self)
+
+    class PerScan(UltraStrictForexStrategy):
+        def enable_backtest_mode(self, closes):
+            pass
+
+    logging.disable(logging.INFO)
+    try:
+        fast = UniversalOptimizer(Tracked, 'UltraStrictForex', list(data)).backtest_with_params({}, data)
+        slow = UniversalOptimizer(PerScan, 'UltraStrictForex', list(data)).backtest_with_params({}, data)
+    finally:
+        logging.disable(logging.NOTSET)
+
+    assert fast == slow
+    tables = strategies[0].backtest_indicators
+    assert set(tables) == set(data)
+    assert all(table.hits > 0 and table.misses == 0 for table in tables.values())
+    assert len(tables['EUR_USD']) == 2 * n
+    assert np.array_equal(tables['EUR_USD'].closes[1::2], (data['EUR_USD'].bid_c + data['EUR_USD'].ask_c) / 2)
+    assert np.array_equal(interleaved_closes(np.array([1.0]), np.array([2.0])), np.array([1.0, 2.0]))
+
+
+if __name__ == '__main__':
+    test_momentum_columns_match_per_scan_and_streaming()
+    test_gold_and_ultra_columns_match_per_scan()
+    test_rows_refused_when_history_does_not_line_up()
+    test_optimizer_backtest_mode_matches_per_scan()
+    print("✅ Batch indicator tests passed")
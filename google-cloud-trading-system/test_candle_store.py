@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Test persistent candle store - gap-fill, 5000-candle paging, offline reads
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.core.candle_store import CandleStore, to_ns, ns_to_oanda, OANDA_MAX_CANDLES
+
+
+class FakeCandleClient:
+    """Serves synthetic M1 candles for any from/to/count request"""
+
+    def __init__(self):
+        self.calls = []
+
+    def get_candles(self, instrument, granularity='M1', count=50, price='BA', from_time=None, to_time=None):
+        self.calls.append((from_time, to_time, count))
+        step = 60 * 10**9
+        start = to_ns(from_time)
+        start += (-start) % step
+        end = to_ns(to_time) if to_time else start + int(count) * step
+        candles = []
+        t = start
+        while t < end and len(candles) < OANDA_MAX_CANDLES:
+            px = 1.1 + (t // step % 100) * 1e-5
+            candles.append({
+                'time': ns_to_oanda(t),
+                'volume': 10,
+                'complete': True,
+                'mid': {'o': str(px), 'h': str(px + 1e-4), 'l': str(px - 1e-4), 'c': str(px)}
+            })
+            t += step
+        return {'candles': candles}
+
+
+def test_gap_fill_and_offline_reads():
+    with tempfile.TemporaryDirectory() as root:
+        client = FakeCandleClient()
+        store = CandleStore(root_dir=root, client=client)
+        end = datetime(2025, 10, 1, tzinfo=timezone.utc)
+        start = end - timedelta(days=2)
+
+        candles = store.get_candles('EUR_USD', 'M1', start, end)
+        assert len(candles) == 2 * 1440
+        first_calls = len(client.calls)
+
+        # Fully covered: no network I/O
+        again = store.get_candles('EUR_USD', 'M1', start + timedelta(hours=1), end - timedelta(hours=1))
+        assert len(client.calls) == first_calls
+        assert again[0]['time'] == ns_to_oanda(to_ns(start + timedelta(hours=1)))
+
+        # Extending the range fetches only the missing prefix, paging past 5000
+        earlier = start - timedelta(days=5)
+        candles = store.get_candles('EUR_USD', 'M1', earlier, end)
+        assert len(candles) == 7 * 1440
+        new_calls = client.calls[first_calls:]
+        assert len(new_calls) >= 2
+        assert all(to_ns(c[0]) < to_ns(start) for c in new_calls)
+
+        # A fresh store reads everything from disk without a client
+        offline = CandleStore(root_dir=root, client=None)
+        arrays = offline.get_arrays('EUR_USD', 'M1', earlier, end, fetch=False)
+        assert len(arrays['time']) == 7 * 1440
+        assert arrays['time'].dtype.kind == 'i'
+        assert (arrays['time'][1:] > arrays['time'][:-1]).all()
+
+
+def test_overlapping_range_fetches_only_the_uncovered_part():
+    with tempfile.TemporaryDirectory() as root:
+        client = FakeCandleClient()
+        store = CandleStore(root_dir=root, client=client)
+        start = datetime(2025, 10, 1, tzinfo=timezone.utc)
+        end = start + timedelta(hours=6)
+        store.get_candles('EUR_USD', 'M1', start, end)
+        first_calls = len(client.calls)
+        assert store.range_misses == 1
+
+        # Overlaps the stored range on the left: only the tail is requested
+        candles = store.get_candles('EUR_USD', 'M1', start + timedelta(hours=3), end + timedelta(hours=3))
+        assert len(candles) == 6 * 60
+        new_calls = client.calls[first_calls:]
+        assert new_calls
+        assert all(to_ns(c[0]) >= to_ns(end) for c in new_calls)
+
+        # Inside the merged coverage: a hit, no network I/O
+        calls = len(client.calls)
+        store.get_candles('EUR_USD', 'M1', start + timedelta(hours=1), end + timedelta(hours=2))
+        assert len(client.calls) == calls
+        assert store.range_hits == 1
+
+
+def test_gap_between_stored_ranges_is_filled_once():
+    with tempfile.TemporaryDirectory() as root:
+        client = FakeCandleClient()
+        store = CandleStore(root_dir=root, client=client)
+        day = datetime(2025, 10, 1, tzinfo=timezone.utc)
+        store.get_candles('EUR_USD', 'M1', day, day + timedelta(hours=1))
+        store.get_candles('EUR_USD', 'M1', day + timedelta(hours=3), day + timedelta(hours=4))
+        calls = len(client.calls)
+
+        candles = store.get_candles('EUR_USD', 'M1', day, day + timedelta(hours=4))
+        gap_calls = client.calls[calls:]
+        assert len(candles) == 4 * 60
+        assert gap_calls
+        assert all(to_ns(day + timedelta(hours=1)) <= to_ns(c[0]) < to_ns(day + timedelta(hours=3))
+                   for c in gap_calls)
+        times = [to_ns(c['time']) for c in candles]
+        assert times == sorted(set(times))
+
+        calls = len(client.calls)
+        store.get_candles('EUR_USD', 'M1', day, day + timedelta(hours=4))
+        assert len(client.calls) == calls
+
+
+def test_reopened_store_extends_existing_npy_series():
+    with tempfile.TemporaryDirectory() as root:
+        start = datetime(2025, 10, 1, tzinfo=timezone.utc)
+        end = start + timedelta(hours=2)
+        CandleStore(root_dir=root, client=FakeCandleClient()).get_candles('EUR_USD', 'M1', start, end)
+        series_dir = CandleStore(root_dir=root).series_dir('EUR_USD', 'M1')
+        assert os.path.exists(os.path.join(series_dir, 'time.npy'))
+        assert os.path.exists(os.path.join(series_dir, 'meta.json'))
+
+        # A new process reuses the stored coverage and fetches only what is new
+        client = FakeCandleClient()
+        reopened = CandleStore(root_dir=root, client=client)
+        cached = reopened.get_candles('EUR_USD', 'M1', start, end)
+        assert client.calls == []
+        assert len(cached) == 2 * 60
+
+        extended = reopened.get_arrays('EUR_USD', 'M1', start, end + timedelta(hours=1))
+        assert len(client.calls) >= 1
+        assert all(to_ns(c[0]) >= to_ns(end) for c in client.calls)
+        assert len(extended['time']) == 3 * 60
+        assert (extended['time'][1:] > extended['time'][:-1]).all()
+
+
+if __name__ == '__main__':
+    test_gap_fill_and_offline_reads()
+    test_overlapping_range_fetches_only_the_uncovered_part()
+    test_gap_between_stored_ranges_is_filled_once()
+    test_reopened_store_extends_existing_npy_series()
+    print("✅ Candle store tests passed")
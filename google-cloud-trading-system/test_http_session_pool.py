@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test pooled HTTP sessions - connection reuse against a local keep-alive server
+"""
+
+import os
+import sys
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.core.http_session_pool import HttpSessionPool
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = json.dumps({'ok': True}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def test_connections_are_reused():
+    server = _serve()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/v3/accounts"
+        pool = HttpSessionPool(pool_maxsize=4, keep_alive=True)
+        for _ in range(10):
+            assert pool.request('GET', url, timeout=5).json() == {'ok': True}
+
+        stats = pool.get_stats()
+        assert stats['requests'] == 10
+        assert stats['new_connections'] == 1
+        assert stats['reused_connections'] == 9
+        assert stats['latency_p50_ms'] is not None
+        pool.close()
+    finally:
+        server.shutdown()
+
+
+def test_same_host_shares_one_session():
+    pool = HttpSessionPool()
+    a = pool.get_session('https://api-fxpractice.oanda.com/v3/accounts/1/pricing')
+    b = pool.get_session('https://api-fxpractice.oanda.com/v3/accounts/2/trades')
+    c = pool.get_session('https://api-fxtrade.oanda.com/v3/accounts')
+    assert a is b
+    assert a is not c
+    pool.close()
+
+
+if __name__ == '__main__':
+    test_connections_are_reused()
+    test_same_host_shares_one_session()
+    print("✅ HTTP session pool tests passed")
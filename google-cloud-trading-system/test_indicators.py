@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Test incremental indicators - parity with the strategies' pandas versions, snapshot/restore, sync
+"""
+
+import os
+import sys
+import json
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.core.indicators import IndicatorSet, Indicator, _SourceIndicator, ATR, ADX, EMA, RSI, RollingMean, RollingStd
+from src.strategies.momentum_trading import MomentumTradingStrategy
+from test_support import pandas_close_atr, pandas_close_adx
+from src.strategies.rsi_divergence_strategy import RSIDivergenceStrategy
+
+
+def _walk(n=400, seed=7):
+    rng = np.random.default_rng(seed)
+    return (1.10 + np.cumsum(rng.normal(0, 2e-4, n))).tolist()
+
+
+def _bare(cls):
+    """Strategy instance without running __init__ (no feeds, no network)"""
+    return cls.__new__(cls)
+
+
+def test_momentum_atr_adx_match_pandas():
+    prices = _walk()
+    strategy = _bare(MomentumTradingStrategy)
+    strategy.momentum_period, strategy.adx_period = 40, 14
+    strategy.indicators, strategy.backtest_indicators = {}, {}
+    strategy.price_history = {'EUR_USD': []}
+
+    for i, price in enumerate(prices):
+        strategy.price_history['EUR_USD'].append(price)
+        strategy._indicator_set('EUR_USD').update(price)
+        if len(strategy.price_history['EUR_USD']) > 200:
+            strategy.price_history['EUR_USD'] = strategy.price_history['EUR_USD'][-200:]
+        if i % 7:
+            continue
+        history = strategy.price_history['EUR_USD']
+        atr, adx = strategy._streaming_atr_adx('EUR_USD')
+        assert np.isclose(atr, pandas_close_atr(history, 40), rtol=1e-9, atol=0)
+        assert np.isclose(adx, pandas_close_adx(history, 14), rtol=1e-9, atol=1e-9)
+
+    # The 200-bar trims were followed without ever recomputing from scratch
+    assert strategy.indicators['EUR_USD'].replays == 0
+
+
+def test_rsi_and_ema_match_pandas():
+    closes = _walk(300, seed=3)
+    rsi, ema = RSI(14, smoothing='sma'), EMA(20)
+    for close in closes:
+        rsi.update(close)
+        ema.update(close)
+
+    delta = pd.Series(closes).diff()
+    gain = delta.where(delta > 0, 0).rolling(14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
+    expected_rsi = (100 - 100 / (1 + gain / loss)).iloc[-1]
+    expected_ema = pd.Series(closes).ewm(span=20, adjust=False).mean().iloc[-1]
+    assert np.isclose(rsi.value, expected_rsi, rtol=1e-9)
+    assert np.isclose(ema.value, expected_ema, rtol=1e-12)
+
+    std = RollingStd(30)
+    for close in closes:
+        std.update(close)
+    assert np.isclose(std.value, pd.Series(closes).rolling(30).std().iloc[-1], rtol=1e-6)
+
+
+def test_candle_strategies_stream_range_atr_and_rsi():
+    closes = _walk(150, seed=11)
+    candles = [{'timestamp': str(i), 'open': c, 'high': c + 3e-4, 'low': c - 2e-4 * (i % 3), 'close': c, 'volume': 0}
+               for i, c in enumerate(closes)]
+    strategy = _bare(RSIDivergenceStrategy)
+    strategy.rsi_period = 14
+    strategy.indicators = {}
+    strategy.price_history = {'EUR_USD': []}
+
+    for candle in candles:
+        strategy.price_history['EUR_USD'].append(candle)
+        if len(strategy.price_history['EUR_USD']) > 100:
+            strategy.price_history['EUR_USD'] = strategy.price_history['EUR_USD'][-100:]
+        df = pd.DataFrame(strategy.price_history['EUR_USD'])
+        if len(df) >= 15:
+            expected_atr = (df['high'] - df['low']).rolling(14).mean().iloc[-1]
+            assert np.isclose(strategy._calculate_atr('EUR_USD'), expected_atr if expected_atr > 0 else 0.001)
+            delta = df['close'].diff()
+            gain = delta.where(delta > 0, 0).rolling(14).mean()
+            loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
+            assert np.isclose(strategy._calculate_current_rsi('EUR_USD'), (100 - 100 / (1 + gain / loss)).iloc[-1])
+        else:
+            assert strategy._calculate_atr('EUR_USD') == 0.001
+            assert strategy._calculate_current_rsi('EUR_USD') == 50.0
+
+
+def test_snapshot_restore_resumes_exactly():
+    closes = _walk(200, seed=5)
+    bars = [{'close': c, 'high': c + 1e-4, 'low': c - 1e-4} for c in closes]
+
+    def make():
+        return IndicatorSet(atr=ATR(14), adx=ADX(14), rsi=RSI(14), ema=EMA(10),
+                            mean=RollingMean(20, source='abs_change'), std=RollingStd(20, source='abs_return'))
+
+    full = make()
+    for bar in bars:
+        full.update(bar)
+
+    first = make()
+    for bar in bars[:120]:
+        first.update(bar)
+    state = json.loads(json.dumps(first.snapshot()))
+    resumed = make().restore(state)
+    for bar in bars[120:]:
+        resumed.update(bar)
+
+    for name in full.indicators:
+        assert np.isclose(resumed.value(name), full.value(name), rtol=1e-12), name
+
+
+def test_sync_replays_when_history_is_replaced():
+    closes = _walk(120, seed=9)
+    indicators = IndicatorSet(atr=ATR(14, smoothing='sma'))
+    history = closes[:60]
+    indicators.sync(history)
+    history = history + closes[60:70]
+    indicators.sync(history)
+    assert indicators.replays == 1
+
+    # A prefill that swaps the whole list forces one replay
+    replaced = closes[30:120]
+    indicators.sync(replaced)
+    assert indicators.replays == 2
+    reference = IndicatorSet(atr=ATR(14, smoothing='sma')).sync(replaced)
+    assert np.isclose(indicators.value('atr'), reference.value('atr'))
+
+
+def test_sync_sees_flat_closes_in_a_trimmed_history():
+    closes = _walk(60, seed=3) + [1.2] * 30
+    indicators = IndicatorSet(atr=ATR(14, smoothing='sma'), std=RollingStd(5))
+    history = []
+    for close in closes:
+        # Each append is a new float object, as when a strategy appends a freshly computed mid price
+        history.append(float(repr(close)))
+        history = history[-20:]
+        indicators.sync(history)
+    assert indicators.replays == 1 and indicators.count == len(closes)
+    reference = IndicatorSet(atr=ATR(14, smoothing='sma'), std=RollingStd(5))
+    for close in closes:
+        reference.update(close)
+    assert indicators.value('atr') == reference.value('atr') == 0.0
+    assert indicators.value('std') == 0.0
+
+
+def test_indicator_base_classes_are_abstract():
+    for cls in (Indicator, _SourceIndicator):
+        try:
+            cls(14)
+        except TypeError:
+            continue
+        raise AssertionError(f"{cls.__name__} should not be instantiable")
+
+
+if __name__ == '__main__':
+    test_momentum_atr_adx_match_pandas()
+    test_rsi_and_ema_match_pandas()
+    test_candle_strategies_stream_range_atr_and_rsi()
+    test_snapshot_restore_resumes_exactly()
+    test_sync_replays_when_history_is_replaced()
+    test_sync_sees_flat_closes_in_a_trimmed_history()
+    test_indicator_base_classes_are_abstract()
+    print("✅ Indicator tests passed")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test the market data bus - one publish fans out to N subscribers, queue policies, lock-free snapshots
+"""
+
+import os
+import sys
+import time
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.core.market_data_bus import MarketDataBus, COALESCE, DROP_OLDEST, DROP_NEWEST, BAR
+from src.core.data_feed import LiveDataFeed, MarketData
+from src.core.bar_aggregator import Bar
+
+
+def _md(pair, bid, ts='2025-11-03T09:00:00Z'):
+    return MarketData(pair=pair, bid=bid, ask=bid + 1e-4, timestamp=ts, is_live=True,
+                      data_source='test', spread=1e-4, last_update_age=0)
+
+
+def test_one_publish_reaches_every_subscriber():
+    bus = MarketDataBus()
+    strategies = [bus.subscribe(f'strategy-{i}', instruments=['EUR_USD']) for i in range(3)]
+    dashboard = bus.subscribe('dashboard')
+    received = []
+    done = threading.Event()
+    bus.subscribe('account', callback=lambda event: (received.append(event.data), done.set()))
+
+    eur = _md('EUR_USD', 1.1)
+    bus.publish_ticks({'EUR_USD': eur, 'XAU_USD': _md('XAU_USD', 4000.0)})
+    assert all([e.data for e in s.drain()] == [eur] for s in strategies)  # Same object, not a copy
+    assert [e.instrument for e in dashboard.drain()] == ['EUR_USD', 'XAU_USD']
+    assert done.wait(2) and received[0] is eur
+    assert bus.published['tick'] == 2
+
+
+def test_queue_policies_bound_slow_consumers():
+    bus = MarketDataBus()
+    latest = bus.subscribe('latest', maxsize=2, policy=COALESCE)
+    fifo = bus.subscribe('fifo', maxsize=3, policy=DROP_OLDEST)
+    refuse = bus.subscribe('refuse', maxsize=3, policy=DROP_NEWEST)
+    for i in range(10):
+        bus.publish_tick('EUR_USD', _md('EUR_USD', 1.1 + i * 1e-4))
+    bus.publish_tick('GBP_USD', _md('GBP_USD', 1.3))
+
+    events = latest.drain()
+    assert [(e.instrument, round(e.data.bid, 4)) for e in events] == [('EUR_USD', 1.1009), ('GBP_USD', 1.3)]
+    assert latest.stats['coalesced'] == 9 and latest.stats['dropped'] == 0
+    assert [round(e.data.bid, 4) for e in fifo.drain()] == [1.1008, 1.1009, 1.3]
+    assert fifo.stats['dropped'] == 8
+    assert [round(e.data.bid, 4) for e in refuse.drain()] == [1.1, 1.1001, 1.1002]
+    assert refuse.stats['dropped'] == 8
+
+    # A full coalescing inbox drops the oldest instrument to admit a new one
+    bus.publish_ticks({'A': _md('A', 1.0), 'B': _md('B', 2.0), 'C': _md('C', 3.0)})
+    assert [e.instrument for e in latest.drain()] == ['B', 'C'] and latest.stats['dropped'] == 1
+
+
+def test_snapshots_are_stable_and_bars_are_published():
+    bus = MarketDataBus()
+    bus.publish_tick('EUR_USD', _md('EUR_USD', 1.1))
+    before = bus.snapshot()
+    bus.publish_tick('EUR_USD', _md('EUR_USD', 1.2))
+    assert before['EUR_USD'].bid == 1.1 and bus.latest('EUR_USD').bid == 1.2
+    assert list(bus.snapshot(['EUR_USD', 'USD_JPY'])) == ['EUR_USD']
+    try:
+        before['EUR_USD'] = None
+        assert False, "snapshots are read-only"
+    except TypeError:
+        pass
+
+    bars = bus.subscribe('bars', kinds=[BAR])
+    bar = Bar.from_tick('EUR_USD', 'M5', 0, 1.1, 1.1001)
+    bus.publish_bar(bar)
+    assert bars.get(timeout=1).data is bar and bus.latest_bar('EUR_USD', 'M5') is bar
+    assert bars.get(timeout=0.01) is None
+
+    # Coalescing bars keeps one pending bar per granularity: an M1 close never hides an M5/H1 close
+    latest = bus.subscribe('latest-bars', kinds=[BAR], policy=COALESCE)
+    m5, h1 = Bar.from_tick('EUR_USD', 'M5', 0, 1.1, 1.1001), Bar.from_tick('EUR_USD', 'H1', 0, 1.1, 1.1001)
+    m1 = [Bar.from_tick('EUR_USD', 'M1', i * 60 * 10**9, 1.1, 1.1001) for i in range(3)]
+    for published in (m5, h1, *m1):
+        bus.publish_bar(published)
+    assert [e.data for e in latest.drain()] == [m5, h1, m1[2]]
+    assert latest.stats['coalesced'] == 2
+
+
+def test_live_feed_publishes_each_poll_once():
+    bus = MarketDataBus()
+    inbox = bus.subscribe('strategies')
+
+    class Price:
+        def __init__(self, instrument, bid):
+            from datetime import datetime, timezone
+            self.instrument, self.bid, self.ask, self.spread = instrument, bid, bid + 1e-4, 1e-4
+            self.timestamp, self.is_live = datetime.now(timezone.utc), True
+
+    class Client:
+        calls = 0
+
+        def get_current_prices(self, instruments, force_refresh=False):
+            Client.calls += 1
+            feed.running = False  # One poll
+            return {inst: Price(inst, 1.1) for inst in instruments}
+
+    feed = LiveDataFeed.__new__(LiveDataFeed)
+    feed.instruments, feed.market_data, feed.data_callbacks = ['EUR_USD', 'GBP_USD'], {}, []
+    feed.oanda_client, feed.bus, feed.running = Client(), bus, True
+    started = time.time()
+    feed._data_collection_loop()
+    assert time.time() - started < 5
+    assert Client.calls == 1
+    assert sorted(e.instrument for e in inbox.drain()) == ['EUR_USD', 'GBP_USD']
+    assert bus.snapshot()['GBP_USD'] is feed.market_data['GBP_USD']
+
+
+if __name__ == '__main__':
+    test_one_publish_reaches_every_subscriber()
+    test_queue_policies_bound_slow_consumers()
+    test_snapshots_are_stable_and_bars_are_published()
+    test_live_feed_publishes_each_poll_once()
+    print("✅ Market data bus tests passed")
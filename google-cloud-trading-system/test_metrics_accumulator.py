@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Test the incremental metrics accumulators - parity with MetricsCalculator, O(1) updates on close, persistence and rebuilds
+"""
+
+import os
+import sys
+import random
+import logging
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.analytics.metrics_accumulator import MetricsAccumulator, MetricsAccumulatorManager, STRATEGY_METRICS_COLUMNS
+from src.analytics.metrics_calculator import MetricsCalculator
+from src.analytics.trade_database import TradeDatabase, TradeRecord
+from src.analytics.trade_logger import TradeLogger
+
+# Calmar/recovery differ on purpose: the calculator reads max_drawdown before computing it, so they are always None there
+PARITY_KEYS = [column for column in STRATEGY_METRICS_COLUMNS if column not in ('calmar_ratio', 'recovery_factor')] + [
+    'total_trades', 'total_wins_sum', 'total_losses_sum', 'avg_slippage', 'total_commission', 'avg_drawdown',
+    'min_trade_duration_seconds', 'max_trade_duration_seconds', 'best_hour', 'worst_hour',
+    'london_session_pnl', 'ny_session_trades', 'asian_session_win_rate']
+
+
+def _trades(n, seed=7):
+    rng = random.Random(seed)
+    start = datetime(2025, 11, 3)
+    trades = []
+    for i in range(n):
+        entry = start + timedelta(hours=i * 5 + rng.randint(0, 3))
+        pnl = rng.choice([0.0, round(rng.gauss(5, 40), 2)])
+        trades.append({'trade_id': f't{i}', 'strategy_id': 'momentum', 'account_id': f'101-004-{i % 2}',
+                       'instrument': ('EUR_USD', 'XAU_USD', 'USD_JPY')[i % 3], 'is_closed': 1, 'realized_pnl': pnl,
+                       'entry_price': 1.1, 'stop_loss': 1.09 if i % 4 else None, 'take_profit': 1.12,
+                       'execution_slippage': 0.1 * (i % 3), 'commission': 0.5,
+                       'trade_duration_seconds': rng.randint(0, 7200), 'entry_time': entry.isoformat(),
+                       'exit_time': (entry + timedelta(hours=2)).isoformat()})
+    return trades
+
+
+def _assert_matches(actual, expected):
+    for key in PARITY_KEYS:
+        a, e = actual[key], expected[key]
+        if e is None or a is None:
+            assert a is None and e is None, key
+        else:
+            assert abs(a - e) < 1e-9 * max(1.0, abs(e)), (key, a, e)
+
+
+def test_accumulator_matches_full_recomputation():
+    logging.disable(logging.INFO)
+    try:
+        calculator = MetricsCalculator()
+    finally:
+        logging.disable(logging.NOTSET)
+    trades = _trades(200)
+    acc = MetricsAccumulator()
+    for i, trade in enumerate(trades):
+        acc.add(trade)
+        if i in (0, 1, 17, 199):
+            _assert_matches(acc.metrics(), calculator.calculate_all_metrics(trades[:i + 1]))
+
+    metrics = acc.metrics()
+    assert sum(v['trades'] for v in metrics['hourly_pnl'].values()) == 200
+    assert metrics['calmar_ratio'] == metrics['total_pnl'] / abs(metrics['max_drawdown'])
+
+    # Rebuilding from unordered history and restoring saved state give the same numbers
+    rebuilt = MetricsAccumulator.from_trades(reversed(trades)).metrics()
+    restored = MetricsAccumulator.from_state(acc.to_state()).metrics()
+    assert rebuilt == metrics and restored == metrics
+
+
+def test_trade_close_updates_persisted_accumulators():
+    logging.disable(logging.WARNING)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = TradeDatabase(os.path.join(tmp, 'trading.db'))
+            trade_logger = TradeLogger.__new__(TradeLogger)
+            trade_logger.db = db
+            trade_logger.accumulators = MetricsAccumulatorManager(db)
+            trade_logger._open_positions = {}
+            trade_logger._position_lock = threading.Lock()
+
+            trades = _trades(30)
+            for trade in trades:
+                db.insert_trade(TradeRecord(trade['trade_id'], trade['account_id'], 'momentum', 1, trade['instrument'],
+                                            'BUY', 1000, 1.1, trade['entry_time'], stop_loss=trade['stop_loss'],
+                                            take_profit=trade['take_profit']))
+            for trade in trades[:29]:
+                assert trade_logger.log_trade_exit(trade['trade_id'], 1.1, 'TP', pnl=trade['realized_pnl'])
+
+            closed = db.get_closed_trades_by()
+            row = db.get_strategy_metrics('momentum')
+            expected = MetricsAccumulator.from_trades(closed).metrics()
+            assert row['closed_trades'] == 29 and row['open_trades'] == 1 and row['total_trades'] == 30
+            assert abs(row['total_pnl'] - expected['total_pnl']) < 1e-9 and row['sharpe_ratio'] == expected['sharpe_ratio']
+            manager = trade_logger.accumulators
+            assert manager.stats['updates'] == 29
+            assert manager.get_metrics('instrument', 'XAU_USD')['closed_trades'] == 10
+            assert manager.get_metrics('account', '101-004-1')['closed_trades'] == 14
+
+            # A fresh process loads saved state instead of reading the trades table
+            fresh = MetricsAccumulatorManager(db)
+            assert fresh.get_metrics('strategy', 'momentum') == manager.get_metrics('strategy', 'momentum')
+            assert fresh.stats == {'updates': 0, 'loads': 1, 'rebuilds': 0}
+
+            # With the saved state gone, the next close rebuilds from history without counting itself twice
+            db.store.execute("DELETE FROM metrics_accumulators")
+            trade_logger.accumulators = MetricsAccumulatorManager(db)
+            assert trade_logger.log_trade_exit('t29', 1.1, 'SL', pnl=-12.5)
+            assert trade_logger.accumulators.get_metrics('strategy', 'momentum')['closed_trades'] == 30
+            assert db.get_strategy_metrics('momentum')['open_trades'] == 0
+
+            everything = MetricsAccumulatorManager(db)
+            assert everything.rebuild_all() == 30
+            assert everything.get_metrics('strategy', 'momentum') == \
+                trade_logger.accumulators.get_metrics('strategy', 'momentum')
+            assert db.store.query_one("SELECT COUNT(*) AS n FROM metrics_accumulators")['n'] == 1 + 2 + 3
+            db.store.close()
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+class _StaleReads(TradeDatabase):
+    """Reports every trade as still open, as a close racing another close reads it"""
+
+    def get_trade(self, trade_id):
+        trade = super().get_trade(trade_id)
+        return dict(trade, is_closed=0) if trade else trade
+
+
+def test_a_trade_closed_meanwhile_is_not_counted_twice():
+    logging.disable(logging.WARNING)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = _StaleReads(os.path.join(tmp, 'trading.db'))
+            trade_logger = TradeLogger.__new__(TradeLogger)
+            trade_logger.db = db
+            trade_logger.accumulators = MetricsAccumulatorManager(db)
+            trade_logger._open_positions = {}
+            trade_logger._position_lock = threading.Lock()
+            for trade in _trades(2):
+                db.insert_trade(TradeRecord(trade['trade_id'], trade['account_id'], 'momentum', 1, trade['instrument'],
+                                            'BUY', 1000, 1.1, trade['entry_time']))
+
+            assert trade_logger.log_trade_exit('t0', 1.1, 'TP', pnl=10.0)
+            assert trade_logger.log_trade_exit('t1', 1.1, 'SL', pnl=-5.0)
+            # t0 again, after t1 closed: the stored closed state rejects it before metrics are touched
+            assert not trade_logger.log_trade_exit('t0', 1.1, 'TP', pnl=10.0)
+
+            metrics = trade_logger.accumulators.get_metrics('strategy', 'momentum')
+            assert metrics['closed_trades'] == 2 and metrics['total_pnl'] == 5.0
+            assert trade_logger.accumulators.stats['updates'] == 2
+            assert db.get_strategy_metrics('momentum')['closed_trades'] == 2
+            db.store.close()
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+if __name__ == '__main__':
+    test_accumulator_matches_full_recomputation()
+    test_trade_close_updates_persisted_accumulators()
+    test_a_trade_closed_meanwhile_is_not_counted_twice()
+    print("✅ Metrics accumulator tests passed")
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Test the OANDA bulk ingest - cursor paging, batched upserts, idempotent re-syncs, imports and transaction-driven position sync
+"""
+
+import os
+import sys
+import random
+import logging
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.core.oanda_client import OandaClient, TRANSACTION_PAGE_SIZE
+from src.core.oanda_ingest import TransactionIngestor, oanda_time, get_cursor
+from src.analytics.trade_database import TradeDatabase, TradeRecord
+from src.analytics.trade_logger import TradeLogger
+from src.analytics.metrics_accumulator import MetricsAccumulatorManager
+from analytics.database.models import PerformanceDatabase
+
+
+class FakeTransactionStream:
+    """An account's transaction history served like OANDA's /transactions endpoints"""
+
+    def __init__(self, account_id, seed):
+        self.account_id = account_id
+        self.rng = random.Random(seed)
+        self.transactions = []
+        self.expected = {}
+        self.requests = 0
+
+    def _add(self, when, **fields):
+        txn = dict(id=str(len(self.transactions) + 1), time=when.strftime('%Y-%m-%dT%H:%M:%S.%f') + '123Z', **fields)
+        self.transactions.append(txn)
+        return txn
+
+    def open(self, when, instrument='EUR_USD', units=1000):
+        txn = self._add(when, type='ORDER_FILL', instrument=instrument, units=str(units), price='1.10000',
+                        reason='MARKET_ORDER', commission='0.25', tradeOpened={'tradeID': None, 'units': str(units)})
+        txn['tradeOpened']['tradeID'] = txn['id']
+        self.expected[txn['id']] = {'units': abs(units), 'pnl': 0.0, 'status': 'open', 'closed_units': 0}
+        return txn['id']
+
+    def close(self, when, trade_id, units=None, reason='TAKE_PROFIT_ORDER'):
+        trade = self.expected[trade_id]
+        remaining = trade['units'] - trade['closed_units']
+        units = remaining if units is None else units
+        pnl = round(self.rng.gauss(2, 15), 2)
+        leg = {'tradeID': trade_id, 'units': str(-units), 'price': '1.10100', 'realizedPL': str(pnl), 'financing': '-0.01'}
+        if units < remaining:
+            self._add(when, type='ORDER_FILL', instrument='EUR_USD', units=str(-units), price='1.10100',
+                      reason='MARKET_ORDER', tradeReduced=leg)
+        else:
+            self._add(when, type='ORDER_FILL', instrument='EUR_USD', units=str(-units), price='1.10100',
+                      reason=reason, tradesClosed=[leg])
+            trade['status'] = 'closed'
+        trade['closed_units'] += units
+        trade['pnl'] += pnl
+
+    def year(self, trades):
+        start = datetime.utcnow() - timedelta(days=360)
+        for i in range(trades):
+            when = start + timedelta(minutes=170 * i)
+            trade_id = self.open(when, ('EUR_USD', 'XAU_USD')[i % 2], 1000 if i % 3 else -500)
+            self._add(when, type='DAILY_FINANCING', financing='-0.02')  # Not a fill: skipped, but moves the cursor
+            if i % 7 == 0:
+                self.close(when + timedelta(minutes=30), trade_id, units=self.expected[trade_id]['units'] // 2)
+            if i < trades - 5:
+                self.close(when + timedelta(minutes=60), trade_id, reason=('TAKE_PROFIT_ORDER', 'STOP_LOSS_ORDER')[i % 2])
+
+    def make_request(self, method, url, **kwargs):
+        self.requests += 1
+        parsed = urlparse(url)
+        query = parse_qs(parsed.query)
+        fills = [t for t in self.transactions if t['type'] in query['type'][0].split(',')]
+        last_id = self.transactions[-1]['id']
+        if parsed.path.endswith('/sinceid'):
+            since = int(query['id'][0])
+            return {'transactions': [t for t in fills if int(t['id']) > since][:TRANSACTION_PAGE_SIZE],
+                    'lastTransactionID': last_id}
+        if parsed.path.endswith('/idrange'):
+            low, high = int(query['from'][0]), int(query['to'][0])
+            return {'transactions': [t for t in fills if low <= int(t['id']) <= high], 'lastTransactionID': last_id}
+        first = next(int(t['id']) for t in self.transactions if oanda_time(t['time']) >= query['from'][0][:26])
+        pages = [f"{url.split('?')[0]}/idrange?from={low}&to={min(low + TRANSACTION_PAGE_SIZE - 1, int(last_id))}"
+                 f"&type={query['type'][0]}" for low in range(first, int(last_id) + 1, TRANSACTION_PAGE_SIZE)]
+        return {'pages': pages, 'lastTransactionID': last_id}
+
+
+def _client(stream):
+    client = OandaClient.__new__(OandaClient)
+    client.account_id = stream.account_id
+    client.transactions_endpoint = f"https://example/v3/accounts/{stream.account_id}/transactions"
+    client._make_request = stream.make_request
+    return client
+
+
+def _analytics_row(trade):
+    return {'trade_id': f"{trade['account_id']}-{trade['oanda_trade_id']}", 'account_id': trade['account_id'],
+            'account_name': 'Demo', 'instrument': trade['instrument'], 'strategy_name': 'momentum',
+            'entry_time': trade['entry_time'], 'entry_price': trade['entry_price'], 'units': trade['units'],
+            'side': trade['side'], 'exit_time': trade['exit_time'], 'exit_price': trade['exit_price'],
+            'exit_reason': trade['exit_reason'], 'realized_pl': trade['realized_pl'], 'commission': trade['commission'],
+            'net_pl': trade['realized_pl'] - trade['commission'], 'duration_seconds': trade['duration_seconds'],
+            'status': trade['status']}
+
+
+def test_resync_of_a_year_writes_only_changes():
+    logging.disable(logging.WARNING)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = PerformanceDatabase(os.path.join(tmp, 'analytics.db'))
+            streams = [FakeTransactionStream(f'101-004-{i}', seed=i) for i in range(3)]
+            for stream in streams:
+                stream.year(1500)
+            clients = [_client(stream) for stream in streams]
+            ingestor = TransactionIngestor(
+                db.store, lambda conn, trades: db.upsert_trades(conn, [_analytics_row(t) for t in trades]))
+            year_ago = datetime.utcnow() - timedelta(days=365)
+
+            def sync(full_resync=False):
+                return [len(ingestor.ingest(client, from_time=year_ago, full_resync=full_resync)['changed_trades'])
+                        for client in clients]
+
+            assert sync() == [1500, 1500, 1500]
+            stream = streams[1]
+            rows = {row['trade_id']: row for row in db.get_trades(account_id=stream.account_id)}
+            for oanda_id, expected in stream.expected.items():
+                row = rows[f'{stream.account_id}-{oanda_id}']
+                assert row['status'] == expected['status'] and row['units'] == expected['units']
+                assert abs(row['realized_pl'] - expected['pnl']) < 1e-9
+            first = rows[f'{stream.account_id}-1']
+            assert first['exit_reason'] == 'TP' and first['duration_seconds'] == 3600 and first['exit_price'] == 1.101
+            assert ingestor.get_cursor(stream.account_id) == int(stream.transactions[-1]['id'])
+
+            # Nothing new: one sinceid request per account, nothing written; a full re-sync writes nothing either
+            stream.requests = 0
+            assert sync() == [0, 0, 0] and stream.requests == 1
+            assert sync(full_resync=True) == [0, 0, 0]
+
+            # New fills touch only the trades they belong to
+            open_id = next(t for t, e in stream.expected.items() if e['status'] == 'open')
+            stream.close(datetime.utcnow(), open_id, reason='STOP_LOSS_ORDER')
+            stream.open(datetime.utcnow())
+            assert len(ingestor.ingest(clients[1])['changed_trades']) == 2
+
+            closed = db.get_trades(account_id=stream.account_id, status='closed')
+            assert len(closed) == 1496
+            months = db.get_period_breakdown('month', account_id=stream.account_id, days=400)
+            assert sum(m['trades'] for m in months) == len(closed)
+            assert abs(months[-1]['cumulative_pnl'] - sum(t['net_pl'] for t in closed)) < 1e-6
+            db.close()
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def test_trade_logger_imports_and_syncs_from_transactions():
+    logging.disable(logging.WARNING)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = TradeDatabase(os.path.join(tmp, 'trading.db'))
+            trade_logger = TradeLogger.__new__(TradeLogger)
+            trade_logger.db = db
+            trade_logger.accumulators = MetricsAccumulatorManager(db)
+            trade_logger.version_manager = type('Versions', (), {'initialize_strategy_if_needed': lambda self, s: 1})()
+            trade_logger._open_positions = {}
+            trade_logger._position_lock = threading.Lock()
+
+            stream = FakeTransactionStream('101-004-9', seed=4)
+            stream.year(300)
+            client = _client(stream)
+            assert trade_logger.import_historical_trades_from_oanda(stream.account_id, 'momentum', client, days=365) == 300
+            assert trade_logger.import_historical_trades_from_oanda(stream.account_id, 'momentum', client, days=365) == 0
+            closed = db.get_closed_trades_by('strategy_id', 'momentum')
+            assert len(closed) == 295 and {t['exit_reason'] for t in closed} == {'TP', 'SL'}
+            metrics = trade_logger.accumulators.get_metrics('strategy', 'momentum')
+            assert metrics['closed_trades'] == 295
+            assert abs(metrics['total_pnl'] - sum(e['pnl'] for e in stream.expected.values() if e['status'] == 'closed')) < 1e-6
+
+            # Tracked positions close from fills after the sync cursor, without the open-positions walk
+            entry = (datetime.now() - timedelta(hours=1)).isoformat()
+            live_id = stream.open(datetime.utcnow() - timedelta(minutes=50), units=2000)
+            db.insert_trade(TradeRecord('live-1', stream.account_id, 'momentum', 1, 'EUR_USD', 'BUY', 2000, 1.1, entry))
+            trade_logger._open_positions['live-1'] = {'account_id': stream.account_id, 'instrument': 'EUR_USD',
+                                                      'oanda_trade_id': live_id, 'entry_time': entry,
+                                                      'entry_price': 1.1, 'direction': 'BUY', 'position_size': 2000}
+
+            def walk_positions(account_id):
+                raise AssertionError('open positions were walked')
+            client.get_open_positions = walk_positions
+            trade_logger.sync_with_oanda_positions(client)
+            assert 'live-1' in trade_logger._open_positions and get_cursor(db.store, f'sync:{stream.account_id}')
+
+            stream.close(datetime.utcnow(), live_id, reason='STOP_LOSS_ORDER')
+            stream.requests = 0
+            trade_logger.sync_with_oanda_positions(client)
+            assert stream.requests == 1 and 'live-1' not in trade_logger._open_positions
+            live = db.get_trade('live-1')
+            assert live['is_closed'] == 1 and live['exit_reason'] == 'SL' and live['exit_price'] == 1.101
+            assert live['realized_pnl'] == stream.expected[live_id]['pnl']
+            db.store.close()
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def test_import_updates_live_logged_trades_instead_of_duplicating_them():
+    logging.disable(logging.WARNING)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = TradeDatabase(os.path.join(tmp, 'trading.db'))
+            trade_logger = TradeLogger.__new__(TradeLogger)
+            trade_logger.db = db
+            trade_logger.accumulators = MetricsAccumulatorManager(db)
+            trade_logger.version_manager = type('Versions', (), {'initialize_strategy_if_needed': lambda self, s: 1})()
+            trade_logger._open_positions = {}
+            trade_logger._position_lock = threading.Lock()
+
+            stream = FakeTransactionStream('101-004-7', seed=9)
+            opened = datetime.utcnow() - timedelta(hours=3)
+            live_id = stream.open(opened, units=2000)
+            stream.open(opened + timedelta(minutes=5))
+            stream.close(opened + timedelta(hours=1), live_id, reason='STOP_LOSS_ORDER')
+
+            # Logged when it was placed, under the live strategy and its own trade ID
+            order = type('Order', (), {'price': 1.1, 'trade_id': live_id, 'commission': 0.0, 'slippage': 0.0})()
+            signal = type('Signal', (), {'instrument': 'EUR_USD', 'side': 'BUY', 'units': 2000, 'stop_loss': 1.09,
+                                         'take_profit': 1.12})()
+            trade_logger.version_manager.get_current_version = lambda strategy_id: 3
+            live = trade_logger.log_trade_entry(stream.account_id, 'gold_scalping', signal,
+                                                type('Execution', (), {'order': order})())
+            assert db.get_trade(live)['oanda_trade_id'] == live_id
+
+            client = _client(stream)
+            assert trade_logger.import_historical_trades_from_oanda(stream.account_id, 'momentum', client, days=1) == 2
+            rows = db.store.query("SELECT * FROM trades ORDER BY trade_id")
+            assert len(rows) == 2 and sorted(row['oanda_trade_id'] for row in rows) == sorted(stream.expected)
+            merged = db.get_trade(live)
+            assert merged['strategy_id'] == 'gold_scalping' and merged['strategy_version'] == 3
+            assert merged['is_closed'] == 1 and merged['exit_reason'] == 'SL' and merged['stop_loss'] == 1.09
+            assert merged['realized_pnl'] == stream.expected[live_id]['pnl']
+            assert live not in trade_logger._open_positions
+
+            # The close is counted once, under the strategy that placed it
+            assert trade_logger.accumulators.get_metrics('strategy', 'gold_scalping')['closed_trades'] == 1
+            assert trade_logger.accumulators.get_metrics('account', stream.account_id)['closed_trades'] == 1
+            assert trade_logger.import_historical_trades_from_oanda(stream.account_id, 'momentum', client, days=1) == 0
+            db.store.close()
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+if __name__ == '__main__':
+    test_resync_of_a_year_writes_only_changes()
+    test_trade_logger_imports_and_syncs_from_transactions()
+    test_import_updates_live_logged_trades_instead_of_duplicating_them()
+    print("✅ OANDA ingest tests passed")
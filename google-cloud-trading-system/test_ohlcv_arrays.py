@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test memory-mapped OHLCV arrays - candle parsing, mmap round-trip, pickle-by-path
+"""
+
+import os
+import sys
+import pickle
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.core.candle_store import CandleStore, to_ns, ns_to_oanda
+from src.core.ohlcv_arrays import OHLCVArrays, load_ohlcv, open_ohlcv
+from test_candle_store import FakeCandleClient
+
+
+def _ba_candles(count):
+    start = to_ns(datetime(2025, 10, 1, tzinfo=timezone.utc))
+    candles = []
+    for i in range(count):
+        bid = 1.1 + i * 1e-4
+        candles.append({
+            'time': ns_to_oanda(start + i * 300 * 10**9),
+            'volume': i,
+            'bid': {'o': str(bid), 'h': str(bid + 2e-4), 'l': str(bid - 2e-4), 'c': str(bid)},
+            'ask': {'o': str(bid + 2e-4), 'h': str(bid + 4e-4), 'l': str(bid), 'c': str(bid + 2e-4)}
+        })
+    return candles
+
+
+def test_from_candles_derives_mid():
+    arrays = OHLCVArrays.from_candles('EUR_USD', 'M5', list(reversed(_ba_candles(10))))
+    assert len(arrays) == 10
+    assert (np.diff(arrays.time) > 0).all()
+    np.testing.assert_allclose(arrays.mid_c, (arrays.bid_c + arrays.ask_c) / 2)
+    assert arrays.index_of(int(arrays.time[3])) == 3
+    assert arrays.index_of(int(arrays.time[3]) + 1) == -1
+    assert arrays.time_str(0) == _ba_candles(1)[0]['time']
+
+
+def test_mmap_round_trip_and_pickle_by_path():
+    with tempfile.TemporaryDirectory() as root:
+        arrays = OHLCVArrays.from_candles('EUR_USD', 'M5', _ba_candles(50))
+        mapped = arrays.save(os.path.join(root, 'eur_usd'))
+        assert isinstance(mapped.time, np.memmap)
+        np.testing.assert_array_equal(mapped.bid_c, arrays.bid_c)
+
+        view = mapped.slice(10, 20)
+        assert view.bid_c.base is not None
+        payload = pickle.dumps(view)
+        # Only the path travels, not the bars
+        assert len(payload) < 1000
+        restored = pickle.loads(payload)
+        np.testing.assert_array_equal(restored.time, view.time)
+        np.testing.assert_array_equal(restored.ask_h, view.ask_h)
+
+        between = mapped.between(ns_to_oanda(int(mapped.time[5])), ns_to_oanda(int(mapped.time[8])))
+        assert len(between) == 3
+
+        frame = open_ohlcv(os.path.join(root, 'eur_usd')).to_dataframe(side='bid')
+        assert list(frame.columns) == ['open', 'high', 'low', 'close', 'volume']
+        assert frame['close'].iloc[-1] == arrays.bid_c[-1]
+
+
+def test_load_ohlcv_reuses_materialised_files():
+    with tempfile.TemporaryDirectory() as root:
+        client = FakeCandleClient()
+        store = CandleStore(root_dir=root, client=client)
+        end = datetime(2025, 10, 1, tzinfo=timezone.utc)
+        start = end - timedelta(hours=6)
+
+        first = load_ohlcv('EUR_USD', 'M1', start, end, price='M', store=store)
+        assert len(first) == 360
+        np.testing.assert_array_equal(first.bid_c, first.mid_c)
+
+        calls = len(client.calls)
+        second = load_ohlcv('EUR_USD', 'M1', start, end, price='M', store=store)
+        assert len(client.calls) == calls
+        assert second.path == first.path
+
+        # Sliding now-relative windows reuse (or grow) one file set per series instead of adding one per window
+        ohlcv_dir = os.path.join(root, 'ohlcv')
+        files = sorted(os.listdir(ohlcv_dir))
+        inner = load_ohlcv('EUR_USD', 'M1', start + timedelta(hours=1), end - timedelta(hours=1), price='M', store=store)
+        assert len(inner) == 240 and inner.time[0] == to_ns(start + timedelta(hours=1))
+        assert sorted(os.listdir(ohlcv_dir)) == files
+
+        pickled = pickle.dumps(first.slice(100, 110))
+        later = load_ohlcv('EUR_USD', 'M1', start + timedelta(hours=3), end + timedelta(hours=3), price='M', store=store)
+        assert len(later) == 360 and sorted(os.listdir(ohlcv_dir)) == files
+        assert len(open_ohlcv(first.path)) == 540
+        # A view pickled before the series was rewritten still resolves to the same bars
+        np.testing.assert_array_equal(pickle.loads(pickled).time, first.time[100:110])
+
+
+if __name__ == '__main__':
+    test_from_candles_derives_mid()
+    test_mmap_round_trip_and_pickle_by_path()
+    test_load_ohlcv_reuses_materialised_files()
+    print("✅ OHLCV array tests passed")
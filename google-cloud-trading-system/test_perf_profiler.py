@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test the hot-path profiler - histogram accuracy, rolling window, disabled overhead, on-demand cProfile dumps
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.core.perf_profiler import LatencyHistogram, RollingHistogram, PerfProfiler, _NOOP_SPAN
+
+
+def test_histogram_percentiles_within_bucket_precision():
+    rng = np.random.default_rng(7)
+    samples = rng.lognormal(mean=8, sigma=1.2, size=20000).astype(int)  # ~3ms median, long tail
+    histogram = LatencyHistogram()
+    for micros in samples:
+        histogram.record(micros)
+
+    assert histogram.count == len(samples) and histogram.max == samples.max()
+    for pct in (50, 90, 99, 99.9):
+        exact = np.percentile(samples, pct)
+        assert abs(histogram.percentile(pct) - exact) <= exact * 0.05, pct
+
+
+def test_rolling_window_forgets_old_slices():
+    rolling = RollingHistogram(window_seconds=60, slices=3)
+    for _ in range(10):
+        rolling.record(50_000, now=1000.0)  # 50ms
+    rolling.record(2_000, now=1030.0)
+    assert rolling.summary(now=1030.0)['count'] == 11
+    assert rolling.summary(now=1030.0)['max_ms'] == 50.0
+
+    # 1000s slice has left the 60s window; only the 2ms sample remains
+    summary = rolling.summary(now=1075.0)
+    assert summary['count'] == 1 and summary['lifetime_count'] == 11
+    assert abs(summary['p50_ms'] - 2.0) < 0.1
+
+
+def test_spans_decorator_and_disabled_overhead():
+    profiler = PerfProfiler(enabled=True)
+    for _ in range(5):
+        with profiler.span('scan.prices'):
+            time.sleep(0.002)
+
+    @profiler.timed('order.place')
+    def place():
+        return 'ok'
+    assert place() == 'ok'
+
+    spans = profiler.snapshot()['spans']
+    assert spans['scan.prices']['count'] == 5 and spans['scan.prices']['p50_ms'] >= 1.9
+    assert spans['order.place']['count'] == 1
+
+    disabled = PerfProfiler(enabled=False)
+    assert disabled.span('scan.prices') is _NOOP_SPAN
+    started = time.perf_counter()
+    for _ in range(100000):
+        with disabled.span('scan.prices'):
+            pass
+    per_call_us = (time.perf_counter() - started) * 10
+    assert per_call_us < 5
+    assert disabled.snapshot()['spans'] == {}
+
+
+def test_oanda_rest_calls_stay_profiled():
+    from src.core.oanda_client import OandaClient
+    # Each REST entry point keeps its span (the decorator leaves __wrapped__ behind)
+    for method in ('_make_request', 'get_current_prices', 'get_candles'):
+        assert hasattr(getattr(OandaClient, method), '__wrapped__'), method
+
+
+def test_profile_next_dumps_one_root_span():
+    with tempfile.TemporaryDirectory() as tmp:
+        profiler = PerfProfiler(enabled=True, profile_dir=tmp, sample_rate=0)
+        assert profiler.profile_next(1) == 1
+        for _ in range(2):
+            with profiler.span('scan.timer', root=True):
+                sum(i * i for i in range(20000))
+
+        snapshot = profiler.snapshot(include_profiles=True)
+        assert snapshot['profile_pending'] == 0
+        assert len(snapshot['profiles']) == 1  # Only the armed scan was profiled
+        profile = snapshot['profiles'][0]
+        assert profile['span'] == 'scan.timer' and os.path.exists(profile['file'])
+        assert 'genexpr' in profile['top']
+        assert 'top' not in profiler.snapshot()['profiles'][0]
+        assert snapshot['spans']['scan.timer']['count'] == 2
+
+
+if __name__ == '__main__':
+    test_histogram_percentiles_within_bucket_precision()
+    test_rolling_window_forgets_old_slices()
+    test_spans_decorator_and_disabled_overhead()
+    test_oanda_rest_calls_stay_profiled()
+    test_profile_next_dumps_one_root_span()
+    print("✅ Perf profiler tests passed")
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test the coalescing price cache - per-instrument TTL, single-flight misses, batched fetches, staleness metadata
+"""
+
+import os
+import sys
+import time
+import logging
+import threading
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.core.price_cache import PriceCache
+from src.core.oanda_client import OandaClient, OandaPrice
+
+
+def _price(instrument, bid=1.1):
+    return OandaPrice(instrument=instrument, bid=bid, ask=bid + 2e-4, timestamp=datetime.now(timezone.utc),
+                      spread=2e-4)
+
+
+class _Pricing:
+    """Counts pricing calls; each takes `delay` seconds"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self.fail = False
+        self.lock = threading.Lock()
+
+    def __call__(self, instruments):
+        with self.lock:
+            self.calls.append(list(instruments))
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError('pricing down')
+        return {inst: _price(inst, bid=1.1 + len(self.calls) / 100) for inst in instruments}
+
+
+def test_per_instrument_ttl_and_staleness_metadata():
+    cache = PriceCache(ttl=5, ttls={'XAU_USD': 0.05}, batch_window=0)
+    pricing = _Pricing()
+    first = cache.get(['EUR_USD', 'XAU_USD'], pricing)
+    assert pricing.calls == [['EUR_USD', 'XAU_USD']]  # One batched call for both misses
+    assert list(first) == ['EUR_USD', 'XAU_USD'] and first['EUR_USD'].source == 'api'
+    assert first['EUR_USD'].age_seconds == 0 and not first['EUR_USD'].stale and first['EUR_USD'].fetched_at
+
+    time.sleep(0.08)
+    second = cache.get(['EUR_USD', 'XAU_USD'], pricing)
+    assert pricing.calls[-1] == ['XAU_USD']  # Only the short-TTL instrument expired
+    assert second['EUR_USD'].source == 'cache' and second['EUR_USD'].age_seconds >= 0.07
+    assert second['XAU_USD'].source == 'api' and second['XAU_USD'].bid != first['XAU_USD'].bid
+    assert first['EUR_USD'].age_seconds == 0  # Returned copies, cached objects untouched
+
+    cache.get(['EUR_USD'], pricing, force_refresh=True)
+    assert pricing.calls[-1] == ['EUR_USD']
+
+    # Fetch failure: last known price comes back flagged stale
+    pricing.fail = True
+    logging.disable(logging.ERROR)
+    try:
+        fallback = cache.get(['EUR_USD', 'GBP_USD'], pricing, force_refresh=True)
+    finally:
+        logging.disable(logging.NOTSET)
+    assert list(fallback) == ['EUR_USD'] and fallback['EUR_USD'].stale and fallback['EUR_USD'].source == 'fallback'
+
+    stats = cache.get_stats()
+    assert stats['hits'] == 1 and stats['misses'] == 6 and stats['fetches'] == 4
+    assert stats['errors'] == 1 and stats['fallbacks'] == 1
+
+
+def test_concurrent_overlapping_misses_share_requests():
+    cache = PriceCache(ttl=5, batch_window=0.05)
+    pricing = _Pricing(delay=0.1)
+    sets = [['EUR_USD', 'GBP_USD'], ['GBP_USD', 'USD_JPY'], ['EUR_USD'], ['XAU_USD', 'EUR_USD']] * 3
+    results = [None] * len(sets)
+    barrier = threading.Barrier(len(sets))
+
+    def ask(i):
+        barrier.wait()
+        results[i] = cache.get(sets[i], pricing)
+
+    threads = [threading.Thread(target=ask, args=(i,)) for i in range(len(sets))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(pricing.calls) == 1  # Twelve callers, one upstream request
+    assert sorted(pricing.calls[0]) == ['EUR_USD', 'GBP_USD', 'USD_JPY', 'XAU_USD']
+    assert all(sorted(result) == sorted(wanted) for result, wanted in zip(results, sets))
+    assert {result['EUR_USD'].bid for result in results if 'EUR_USD' in result} == {1.11}
+    assert sum(result[inst].source == 'api' for result in results for inst in result) >= 1
+    stats = cache.get_stats()
+    assert stats['misses'] == 4 and stats['coalesced'] + stats['merged'] >= 15
+    assert stats['inflight'] == 0 and stats['avg_batch'] == 4
+
+
+def test_client_prices_go_through_the_shared_cache():
+    client = OandaClient.__new__(OandaClient)
+    client.pricing_endpoint = 'https://example/v3/accounts/101-004-1/pricing'
+    client.current_prices = {}
+    client.price_cache = PriceCache(ttl=5, batch_window=0)
+    requests = []
+
+    def make_request(method, url, **kwargs):
+        requests.append(url)
+        time.sleep(0.05)
+        now = '2025-11-03T09:00:00.000000000Z'
+        return {'prices': [{'instrument': inst, 'time': now, 'bids': [{'price': '1.1000'}], 'asks': [{'price': '1.1002'}]}
+                           for inst in url.split('instruments=')[1].split('&')[0].split(',')]}
+    client._make_request = make_request
+
+    logging.disable(logging.INFO)
+    try:
+        threads = [threading.Thread(target=client.get_current_prices, args=(['EUR_USD', 'GBP_USD'],)) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        prices = client.get_current_prices(['EUR_USD'])
+    finally:
+        logging.disable(logging.NOTSET)
+
+    assert len(requests) == 1 and 'instruments=EUR_USD,GBP_USD' in requests[0]
+    assert prices['EUR_USD'].source == 'cache' and prices['EUR_USD'].bid == 1.1
+    assert set(client.current_prices) == {'EUR_USD', 'GBP_USD'}
+    assert client.get_price_cache_stats()['hits'] >= 1
+
+
+if __name__ == '__main__':
+    test_per_instrument_ttl_and_staleness_metadata()
+    test_concurrent_overlapping_misses_share_requests()
+    test_client_prices_go_through_the_shared_cache()
+    print("✅ Price cache tests passed")
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Test the chunked-HTTP pricing stream against a local stand-in server replaying recorded ticks
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.core.pricing_stream import StreamLineParser
+from src.core.streaming_data_feed import StreamingDataFeed
+from src.core.candle_store import to_ns
+
+# Recorded from a practice-account stream (trimmed to the fields the feed reads)
+RECORDED = [
+    {"type": "PRICE", "instrument": "EUR_USD", "time": "2025-11-03T09:00:00.104181367Z", "status": "tradeable",
+     "bids": [{"price": "1.15321", "liquidity": 1000000}], "asks": [{"price": "1.15334", "liquidity": 1000000}]},
+    {"type": "PRICE", "instrument": "XAU_USD", "time": "2025-11-03T09:00:00.381047102Z", "status": "tradeable",
+     "bids": [{"price": "4001.115", "liquidity": 250}], "asks": [{"price": "4001.455", "liquidity": 250}]},
+    {"type": "PRICE", "instrument": "EUR_USD", "time": "2025-11-03T09:00:01.002917455Z", "status": "tradeable",
+     "bids": [{"price": "1.15323", "liquidity": 1000000}], "asks": [{"price": "1.15336", "liquidity": 1000000}]},
+    {"type": "HEARTBEAT", "time": "2025-11-03T09:00:05.000012611Z"},
+    {"type": "PRICE", "instrument": "EUR_USD", "time": "2025-11-03T09:02:10.551823006Z", "status": "tradeable",
+     "bids": [{"price": "1.15298", "liquidity": 1000000}], "asks": [{"price": "1.15311", "liquidity": 1000000}]},
+    {"type": "HEARTBEAT", "time": "2025-11-03T09:02:15.000009872Z"},
+    {"type": "PRICE", "instrument": "EUR_USD", "time": "2025-11-03T09:04:30.207431980Z", "status": "tradeable",
+     "bids": [{"price": "1.15287", "liquidity": 1000000}], "asks": [{"price": "1.15300", "liquidity": 1000000}]},
+]
+
+
+def _line(message) -> bytes:
+    return (json.dumps(message) + '\n').encode()
+
+
+class _StandInStream(BaseHTTPRequestHandler):
+    """
+    Replays RECORDED with one scenario per connection:
+    1) three ticks (one split across chunks) + heartbeat, then the server drops the connection
+    2) one tick + heartbeat, then silence (the watchdog must give up on it)
+    3) the last tick, then the connection stays open until the client leaves
+    """
+    protocol_version = 'HTTP/1.1'
+    connections = []
+
+    def log_message(self, *args):
+        pass
+
+    def _chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_GET(self):
+        _StandInStream.connections.append((self.path, self.headers.get('Authorization')))
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        try:
+            n = len(_StandInStream.connections)
+            if n == 1:
+                first = _line(RECORDED[0])
+                self._chunk(first[:40])
+                self._chunk(first[40:] + _line(RECORDED[1]))
+                self._chunk(_line(RECORDED[2]) + _line(RECORDED[3]))
+                self._chunk(b'')  # Clean end of body: server-side disconnect
+            elif n == 2:
+                self._chunk(_line(RECORDED[4]) + _line(RECORDED[5]))
+                time.sleep(2.0)
+            else:
+                self._chunk(_line(RECORDED[6]))
+                time.sleep(2.0)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class _CandleClient:
+    """REST stand-in for the gap backfill (M1 bid/ask candles)"""
+
+    def __init__(self):
+        self.requests = []
+
+    def get_candles(self, instrument, granularity='M1', count=50, price='BA', from_time=None, to_time=None):
+        self.requests.append((instrument, granularity, from_time))
+        if instrument != 'EUR_USD' or granularity != 'M1':
+            return {'candles': []}
+        return {'candles': [
+            {'time': '2025-11-03T09:01:00.000000000Z', 'complete': True, 'volume': 41,
+             'bid': {'o': '1.15322', 'h': '1.15330', 'l': '1.15305', 'c': '1.15310'},
+             'ask': {'o': '1.15335', 'h': '1.15343', 'l': '1.15318', 'c': '1.15323'}},
+            {'time': '2025-11-03T09:02:00.000000000Z', 'complete': False, 'volume': 37,
+             'bid': {'o': '1.15311', 'h': '1.15315', 'l': '1.15296', 'c': '1.15301'},
+             'ask': {'o': '1.15324', 'h': '1.15328', 'l': '1.15309', 'c': '1.15314'}},
+        ]}
+
+
+def test_parser_handles_split_and_malformed_lines():
+    parser = StreamLineParser()
+    payload = _line(RECORDED[0]) + b'\n' + b'{not json}\n' + _line(RECORDED[3])
+    messages = []
+    for i in range(0, len(payload), 7):
+        messages.extend(parser.feed(payload[i:i + 7]))
+    assert [m['type'] for m in messages] == ['PRICE', 'HEARTBEAT']
+    assert parser.parse_errors == 1
+
+
+def test_stream_reconnects_after_drop_and_stall_and_backfills_gap():
+    _StandInStream.connections = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _StandInStream)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    client = _CandleClient()
+    feed = StreamingDataFeed('101-004-0000000-001', ['EUR_USD', 'XAU_USD'], 'token', 'practice',
+                             stream_base_url=f'http://127.0.0.1:{server.server_address[1]}', oanda_client=client)
+    feed.stream.stale_after = 0.5
+    feed.stream.backoff_initial = 0.05
+    new_candles = []
+    feed.on_new_candle = lambda instrument, md: new_candles.append(instrument)
+
+    try:
+        feed.start_streaming()
+        deadline = time.time() + 10
+        while feed.stream.stats['prices'] < 5 and time.time() < deadline:
+            time.sleep(0.05)
+    finally:
+        feed.stop_streaming()
+        server.shutdown()
+        server.server_close()
+
+    stats = feed.get_api_usage_stats()['stream']
+    assert stats['prices'] == 5 and stats['heartbeats'] == 2
+    assert stats['connects'] == 3 and stats['reconnects'] >= 2
+    assert stats['stale_timeouts'] == 1
+    assert stats['last_heartbeat'] == RECORDED[5]['time']
+
+    path, auth = _StandInStream.connections[0]
+    assert path == '/v3/accounts/101-004-0000000-001/pricing/stream?instruments=EUR_USD%2CXAU_USD'
+    assert auth == 'Bearer token'
+
+    # After reconnect #1 the gap from the last EUR_USD tick was backfilled before new ticks
+    assert client.requests[0] == ('EUR_USD', 'M1', '2025-11-03T09:00:00.000000000Z')
+    eur = feed.get_price_arrays('EUR_USD', 10)
+    assert eur['time'].tolist() == [to_ns(RECORDED[0]['time']), to_ns(RECORDED[2]['time']),
+                                    to_ns('2025-11-03T09:01:00Z'),
+                                    to_ns(RECORDED[4]['time']), to_ns(RECORDED[6]['time'])]
+    assert feed.get_latest_prices()['EUR_USD'].bid == 1.15287
+    assert feed.get_latest_prices()['XAU_USD'].ask == 4001.455
+    # EUR_USD's 09:00 bar closed at the reconnect, its 09:02 bar on the 09:04 tick;
+    # XAU_USD had no second tick, so the 09:02:15 heartbeat closed its 09:00 bar
+    assert new_candles == ['EUR_USD', 'XAU_USD', 'EUR_USD']
+    xau = feed.get_bars('XAU_USD', 'M1')
+    assert [bar['time'][11:16] for bar in xau] == ['09:00'] and xau[0]['bid']['c'] == 4001.115
+    bars = feed.get_bars('EUR_USD', 'M1')
+    assert [bar['time'][11:16] for bar in bars] == ['09:00', '09:01', '09:02']
+    assert bars[2]['volume'] == 38 and bars[2]['bid']['l'] == 1.15296  # OANDA's partial bar + one tick
+
+
+if __name__ == '__main__':
+    test_parser_handles_split_and_malformed_lines()
+    test_stream_reconnects_after_drop_and_stall_and_backfills_gap()
+    print("✅ Pricing stream tests passed")
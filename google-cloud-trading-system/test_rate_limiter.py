@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test shared token-bucket rate limiter - rate, priority lanes, histograms
+"""
+
+import os
+import sys
+import time
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.core.rate_limiter import (
+    TokenBucketLimiter, get_rate_limiter,
+    PRIORITY_ORDER, PRIORITY_PRICE, PRIORITY_DASHBOARD
+)
+
+
+def test_rate_is_enforced_across_threads():
+    limiter = TokenBucketLimiter(rate=50, capacity=5)
+    start = time.monotonic()
+
+    def worker():
+        for _ in range(5):
+            limiter.acquire(PRIORITY_PRICE)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # 20 tokens, 5 burst, 15 more at 50/s -> at least ~0.3s
+    assert time.monotonic() - start >= 0.25
+    assert limiter.get_stats()['wait_histograms']['prices']['count'] == 20
+
+
+def test_orders_jump_ahead_of_dashboard_reads():
+    limiter = TokenBucketLimiter(rate=20, capacity=1)
+    limiter.acquire(PRIORITY_DASHBOARD)  # drain the bucket
+    served = []
+
+    def take(priority, label):
+        limiter.acquire(priority)
+        served.append(label)
+
+    dashboards = [threading.Thread(target=take, args=(PRIORITY_DASHBOARD, 'dashboard')) for _ in range(3)]
+    for t in dashboards:
+        t.start()
+    time.sleep(0.01)
+    order = threading.Thread(target=take, args=(PRIORITY_ORDER, 'order'))
+    order.start()
+
+    for t in dashboards + [order]:
+        t.join()
+    assert served.index('order') <= 1
+
+
+def test_timeout_returns_false():
+    limiter = TokenBucketLimiter(rate=1, capacity=1)
+    assert limiter.acquire(PRIORITY_ORDER)
+    assert limiter.acquire(PRIORITY_ORDER, timeout=0.05) is False
+    assert limiter.get_stats()['timeouts'] == 1
+
+
+def test_registry_is_keyed_by_token():
+    assert get_rate_limiter('token-a') is get_rate_limiter('token-a')
+    assert get_rate_limiter('token-a') is not get_rate_limiter('token-b')
+    assert 'token-a' not in get_rate_limiter('token-a').name
+
+
+if __name__ == '__main__':
+    test_rate_is_enforced_across_threads()
+    test_orders_jump_ahead_of_dashboard_reads()
+    test_timeout_returns_false()
+    test_registry_is_keyed_by_token()
+    print("✅ Rate limiter tests passed")
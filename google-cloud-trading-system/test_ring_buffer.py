@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test ring-buffer price histories - wraparound, zero-copy views, quote records, strategy/persistence wiring
+"""
+
+import os
+import sys
+import json
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.core.ring_buffer import RingBuffer, QUOTE_DTYPE, as_ring
+from src.core.data_feed import MarketData
+from src.core.persistent_history import PersistentHistoryManager
+from src.strategies.momentum_trading import MomentumTradingStrategy
+from test_support import pandas_close_atr
+
+
+def test_wraparound_keeps_last_values_as_contiguous_view():
+    ring = RingBuffer(5)
+    reference = []
+    for i in range(23):
+        ring.append(float(i))
+        reference = (reference + [float(i)])[-5:]
+        assert ring.tolist() == reference
+        assert len(ring) == len(reference)
+
+    assert ring.total == 23
+    assert ring[0] == 18.0 and ring[-1] == 22.0
+    assert isinstance(ring[-1], float)
+    assert ring[-3:].tolist() == [20.0, 21.0, 22.0]
+
+    view = ring.view()
+    assert view.flags['C_CONTIGUOUS'] and not view.flags.writeable
+    assert np.shares_memory(view, ring._data)  # No copy on read
+    assert pd.Series(ring).tolist() == reference
+    assert np.isclose(np.mean(ring), np.mean(reference))
+
+    try:
+        ring[5]
+        assert False, "index past the window should raise"
+    except IndexError:
+        pass
+
+    ring.clear()
+    assert len(ring) == 0 and ring.total == 0
+    ring.append(1.0)
+    assert ring.tolist() == [1.0] and ring.total == 1
+
+
+def test_structured_quotes_and_as_ring():
+    quotes = RingBuffer(3, dtype=QUOTE_DTYPE)
+    for i in range(5):
+        quotes.append((1.1 + i, 1.2 + i, i))
+    assert quotes.view()['bid'].tolist() == [3.1, 4.1, 5.1]
+    assert quotes[-1] == (5.1, 5.2, 4)
+
+    ring = as_ring([1.0, 2.0, 3.0, 4.0], 3)
+    assert ring.tolist() == [2.0, 3.0, 4.0]
+    assert as_ring(ring, 3) is ring
+    assert as_ring(None, 3).tolist() == []
+    assert as_ring(ring, 2).tolist() == [3.0, 4.0]
+
+
+def test_strategy_history_stays_bounded():
+    strategy = MomentumTradingStrategy.__new__(MomentumTradingStrategy)
+    strategy.instruments, strategy.history_limit = ['EUR_USD'], 100
+    strategy.momentum_period, strategy.adx_period = 40, 14
+    strategy.indicators, strategy.backtest_indicators = {}, {}
+    strategy.price_history = {'EUR_USD': [1.0] * 120}  # A driver that reset it to a list
+    for i in range(300):
+        price = 1.1 + i * 1e-5
+        strategy._update_price_history({'EUR_USD': MarketData(
+            pair='EUR_USD', bid=price, ask=price, timestamp='2025-01-02T00:00:00Z', is_live=False,
+            data_source='test', spread=0.0, last_update_age=0)})
+
+    history = strategy.price_history['EUR_USD']
+    assert isinstance(history, RingBuffer) and len(history) == 100
+    assert np.isclose(history[-1], 1.1 + 299 * 1e-5)
+    atr, _ = strategy._streaming_atr_adx('EUR_USD')
+    assert np.isclose(atr, pandas_close_atr(history.tolist(), 40), rtol=1e-9)
+
+
+def test_persistent_history_ring_and_disk_format():
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = PersistentHistoryManager(tmp)
+        manager.max_history = 25
+        for i in range(40):
+            manager.save_price_history('EUR_USD', MarketData(
+                pair='EUR_USD', bid=1.1 + i * 1e-4, ask=1.1002 + i * 1e-4,
+                timestamp=f'2025-01-02T00:00:{i:02d}.000000000Z', is_live=True,
+                data_source='test', spread=2e-4, last_update_age=0))
+
+        # Written on the 10th, 20th, 30th and 40th tick, not on every tick once the buffer is full
+        with open(os.path.join(tmp, 'EUR_USD.json')) as f:
+            records = json.load(f)
+        assert len(records) == 25
+        assert records[-1]['timestamp'] == '2025-01-02T00:00:39.000000000Z'
+        assert set(records[0]) == {'instrument', 'bid', 'ask', 'timestamp', 'spread', 'saved_at'}
+
+        latest = manager.get_latest_prices('EUR_USD', 5)
+        assert [md.pair for md in latest] == ['EUR_USD'] * 5
+        assert np.isclose(latest[-1].bid, 1.1 + 39 * 1e-4)
+
+
+if __name__ == '__main__':
+    test_wraparound_keeps_last_values_as_contiguous_view()
+    test_structured_quotes_and_as_ring()
+    test_strategy_history_stays_bounded()
+    test_persistent_history_ring_and_disk_format()
+    print("✅ Ring buffer tests passed")
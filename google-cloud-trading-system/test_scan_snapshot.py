@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test SimpleTimerScanner's batched scan - one pricing call and one calendar check per instrument per scan
+"""
+
+import os
+import sys
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from test_support import StubCalendar, StubStrategy, stub_scanner
+
+INSTRUMENTS = ['EUR_USD', 'GBP_USD', 'USD_JPY', 'AUD_USD', 'USD_CAD', 'NZD_USD', 'XAU_USD']
+
+
+def _scanner(accounts=10, paused=()):
+    strategies = {f'acct-{i}': StubStrategy(INSTRUMENTS[i % 3:] if i % 2 else INSTRUMENTS) for i in range(accounts)}
+    return stub_scanner(strategies, calendar=StubCalendar(paused))
+
+
+def test_one_pricing_call_for_ten_accounts_by_seven_instruments():
+    scanner = _scanner()
+    logging.disable(logging.WARNING)
+    try:
+        scanner._run_scan()
+    finally:
+        logging.disable(logging.NOTSET)
+
+    assert scanner.oanda.pricing_requests == [INSTRUMENTS]
+    assert scanner.pricing_calls == 1
+    assert sorted(scanner.economic_calendar.checks) == sorted(INSTRUMENTS)
+    for strategy in scanner.strategies.values():
+        assert len(strategy.seen) == 1 and list(strategy.seen[0]) == strategy.instruments
+
+    # All strategies share the same price objects
+    first, last = scanner.strategies['acct-0'].seen[0], scanner.strategies['acct-9'].seen[0]
+    assert first['XAU_USD'] is last['XAU_USD']
+
+    phases = scanner.scan_phase_timings[-1]
+    assert phases['instruments'] == 7 and phases['priced'] == 7
+    assert set(phases) >= {'prices_ms', 'calendar_ms', 'strategies_ms', 'total_ms'}
+
+
+def test_calendar_pause_skips_only_affected_strategies():
+    scanner = _scanner(accounts=4, paused=['EUR_USD'])
+    logging.disable(logging.WARNING)
+    try:
+        scanner._run_scan()
+    finally:
+        logging.disable(logging.NOTSET)
+    # Only acct-1 (INSTRUMENTS[1:]) does not trade EUR_USD
+    assert [name for name, s in scanner.strategies.items() if s.seen] == ['acct-1']
+    assert scanner.economic_calendar.checks.count('EUR_USD') == 1
+
+
+if __name__ == '__main__':
+    test_one_pricing_call_for_ten_accounts_by_seven_instruments()
+    test_calendar_pause_skips_only_affected_strategies()
+    print("✅ Scan snapshot tests passed")
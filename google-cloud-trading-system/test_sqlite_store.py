@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test the shared SQLite store - WAL mode, group-committed writes with per-write savepoints, pooled readers, store ports
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import logging
+import tempfile
+import threading
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.core.sqlite_store import SQLiteStore, get_sqlite_store
+from src.core.trade_tracker import TradeTracker, SignalEntry, SignalStatus, TradeEntry, TradeStatus
+from src.analytics.trade_database import TradeDatabase, TradeRecord
+from analytics.database.models import PerformanceDatabase
+
+
+def test_concurrent_writes_share_commits_and_failures_stay_isolated():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteStore(os.path.join(tmp, 'group.db'), batch_wait=0.02)
+        try:
+            assert store.journal_mode == 'wal'
+            store.executescript("CREATE TABLE signals (id TEXT PRIMARY KEY, n INTEGER);")
+            barrier = threading.Barrier(16)
+            failures = []
+
+            def insert(i):
+                barrier.wait()
+                try:
+                    store.execute("INSERT INTO signals VALUES (?, ?)", (f's{i % 15}', i))  # s0 is inserted twice
+                except sqlite3.IntegrityError as e:
+                    failures.append(e)
+
+            threads = [threading.Thread(target=insert, args=(i,)) for i in range(16)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            # One duplicate rolled back on its own; the other fifteen were committed
+            assert len(failures) == 1
+            assert store.query_one("SELECT COUNT(*) AS n FROM signals")['n'] == 15
+            stats = store.get_stats()
+            assert stats['writes'] == 17 and stats['failed_writes'] == 1
+            assert stats['commits'] <= 8  # Sixteen inserts shared a handful of commits
+
+            pending = [store.execute("INSERT INTO signals VALUES (?, ?)", (f'q{i}', i), wait=False) for i in range(50)]
+            store.flush()
+            assert all(item.done.is_set() and item.wait() == 1 for item in pending)
+            with store.read() as conn:
+                try:
+                    conn.execute("DELETE FROM signals")
+                    raise AssertionError('pooled readers must be read-only')
+                except sqlite3.OperationalError:
+                    pass
+        finally:
+            store.close()
+
+
+def test_readers_are_not_blocked_by_a_long_write():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteStore(os.path.join(tmp, 'wal.db'))
+        try:
+            store.execute("CREATE TABLE t (n INTEGER)")
+            store.execute("INSERT INTO t VALUES (1)")
+            writing = threading.Event()
+
+            def slow_write(conn):
+                conn.execute("INSERT INTO t VALUES (2)")
+                writing.set()
+                time.sleep(0.3)  # Write transaction held open
+
+            item = store.write(slow_write, wait=False)
+            writing.wait(2)
+            started = time.perf_counter()
+            assert store.query_one("SELECT COUNT(*) AS n FROM t")['n'] == 1  # Last committed state
+            assert time.perf_counter() - started < 0.1
+            item.wait(2)
+            assert store.query_one("SELECT COUNT(*) AS n FROM t")['n'] == 2
+        finally:
+            store.close()
+
+
+def test_trade_stores_run_on_the_shared_store():
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            path = os.path.join(tmp, 'trading.db')
+            db = TradeDatabase(path)
+            assert db.store is get_sqlite_store(path)
+            trade = TradeRecord('t1', '101-004-1', 'momentum', 1, 'EUR_USD', 'BUY', 1000, 1.1, '2025-11-03T09:00:00')
+            assert db.insert_trade(trade) and not db.insert_trade(trade)  # Duplicate still reported, not raised
+            assert db.update_trade_exit('t1', 1.102, '2025-11-03T10:00:00', 'TP', 2.0, 20, 3600)
+            assert not db.update_trade_exit('missing', 1.0, '', 'SL', 0, 0, 0)
+            assert db.get_trade('t1')['is_closed'] == 1 and db.get_database_stats()['storage']['journal_mode'] == 'wal'
+
+            tracker = TradeTracker(os.path.join(tmp, 'tracker.db'))
+            now = datetime.now()
+            assert tracker.log_trade(TradeEntry('t2', now, '101-004-1', 'EUR_USD', 'BUY', 'MARKET', 1000, 1.1, 1.099,
+                                                1.102, 'momentum', 0.8, 'london', TradeStatus.PENDING))
+            assert tracker.log_signal(SignalEntry('s1', now, 'EUR_USD', 'BUY', 1.1, 1.099, 1.102, 0.8, 'momentum',
+                                                  'breakout', 'london', SignalStatus.GENERATED))
+            assert tracker.update_trade_status('t2', TradeStatus.FILLED, fill_price=1.1001)
+            assert not tracker.update_trade_status('missing', TradeStatus.FILLED, fill_price=1.0)
+            tracker.log_system_event('status', 'INFO', 'scan complete')
+            tracker.store.flush()
+            assert [t['trade_id'] for t in tracker.get_active_trades()] == ['t2']
+            assert tracker.get_active_trades()[0]['fill_price'] == 1.1001
+            assert tracker.store.query_one("SELECT COUNT(*) AS n FROM system_logs")['n'] == 1
+
+            analytics = PerformanceDatabase(os.path.join(tmp, 'analytics.db'))
+            analytics.store_trade({'trade_id': 'a1', 'account_id': '101-004-1', 'account_name': 'Demo',
+                                   'instrument': 'EUR_USD', 'strategy_name': 'momentum', 'entry_time': '2025-11-03T09:00:00',
+                                   'entry_price': 1.1, 'units': 1000, 'side': 'BUY', 'net_pl': 5.0})
+            assert [t['trade_id'] for t in analytics.get_trades()] == ['a1']
+            assert analytics.conn.execute("SELECT COUNT(*) FROM trades").fetchone()[0] == 1
+            assert analytics.get_database_stats()['total_trades'] == 1
+            for store in (analytics, db.store, tracker.store):
+                store.close()
+        finally:
+            logging.disable(logging.NOTSET)
+
+
+if __name__ == '__main__':
+    test_concurrent_writes_share_commits_and_failures_stay_isolated()
+    test_readers_are_not_blocked_by_a_long_write()
+    test_trade_stores_run_on_the_shared_store()
+    print("✅ SQLite store tests passed")
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Test parallel strategy evaluation - fastest-first results, deadlines, late drops, latency percentiles
+"""
+
+import os
+import sys
+import time
+import logging
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.core.strategy_evaluator import StrategyEvaluator
+from test_support import StubStrategy, stub_scanner
+
+
+def _sleeper(seconds, result):
+    def run():
+        time.sleep(seconds)
+        return result
+    return run
+
+
+def test_fast_strategies_are_not_held_up_by_a_slow_one():
+    evaluator = StrategyEvaluator(max_workers=4, deadline=0.3)
+    logging.disable(logging.WARNING)
+    try:
+        started = time.perf_counter()
+        arrivals = []
+        for evaluation in evaluator.evaluate([('slow', _sleeper(0.8, ['late'])),
+                                              ('fast', _sleeper(0.01, ['a'])),
+                                              ('medium', _sleeper(0.1, ['b']))]):
+            arrivals.append((evaluation.name, evaluation.result, time.perf_counter() - started))
+        waited = time.perf_counter() - started
+
+        assert [(name, result) for name, result, _ in arrivals] == [('fast', ['a']), ('medium', ['b'])]
+        assert arrivals[0][2] < 0.1  # Available long before the slow strategy finishes
+        assert waited < 0.5  # The scan gave up at the deadline instead of waiting 0.8s
+
+        # Still running from the last scan: skipped, not queued behind itself
+        assert [e.name for e in evaluator.evaluate([('slow', _sleeper(0, [])), ('fast', _sleeper(0, []))])] == ['fast']
+
+        time.sleep(0.7)
+        stats = evaluator.get_stats()
+        assert stats['late'] == 1 and stats['late_dropped'] == 1 and stats['skipped_busy'] == 1
+        assert stats['inflight'] == []
+        assert stats['strategies']['slow']['late'] == 1 and stats['strategies']['slow']['runs'] == 1
+        assert stats['strategies']['fast']['runs'] == 2
+        assert stats['strategies']['slow']['p50_ms'] >= 700
+        assert stats['strategies']['medium']['p99_ms'] >= 90
+    finally:
+        logging.disable(logging.NOTSET)
+        evaluator.shutdown(wait=True)
+
+
+def test_errors_shared_objects_and_sequential_mode():
+    evaluator = StrategyEvaluator(max_workers=4, deadline=2)
+    running, overlaps = [0], []
+    lock = threading.Lock()
+
+    def shared():
+        with lock:
+            running[0] += 1
+            overlaps.append(running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        return []
+
+    def broken():
+        raise ValueError('no history')
+
+    results = {e.name: e for e in evaluator.evaluate([('gold-1', shared, 'gold'), ('gold-2', shared, 'gold'),
+                                                       ('broken', broken)])}
+    evaluator.shutdown(wait=True)
+    assert max(overlaps) == 1  # Same strategy object behind two accounts never runs twice at once
+    assert isinstance(results['broken'].error, ValueError) and results['gold-1'].result == []
+    assert evaluator.get_stats()['errors'] == 1
+
+    sequential = StrategyEvaluator(max_workers=0)
+    order = [e.name for e in sequential.evaluate([('a', _sleeper(0.02, 1)), ('b', _sleeper(0, 2))])]
+    assert order == ['a', 'b'] and not sequential.parallel
+    assert sequential.get_stats()['strategies']['a']['p50_ms'] >= 15
+
+
+def test_deadline_starts_when_the_task_runs_and_handoffs_do_not_block_collection():
+    evaluator = StrategyEvaluator(max_workers=1, deadline=0.3)
+    logging.disable(logging.WARNING)
+    try:
+        # 'queued' waits 0.2s for the only worker, then runs 0.2s: 0.4s after submission but inside
+        # its own deadline, so it is not late
+        started = time.perf_counter()
+        names = [e.name for e in evaluator.evaluate([('first', _sleeper(0.2, [])), ('queued', _sleeper(0.2, []))])]
+        assert names == ['first', 'queued'] and time.perf_counter() - started >= 0.4
+        assert evaluator.get_stats()['late'] == 0 and evaluator.get_stats()['late_dropped'] == 0
+
+        # A slow order placement handed off from the loop does not push 'next' past its deadline
+        placed = []
+        orders = []
+        for evaluation in evaluator.evaluate([('signals', _sleeper(0, ['buy'])), ('next', _sleeper(0.05, []))]):
+            if evaluation.result:
+                orders.append(evaluator.handoff(lambda: (time.sleep(0.5), placed.append('buy'))))
+        assert placed == [] and evaluator.get_stats()['late'] == 0
+        evaluator.wait_handoffs(orders)
+        assert placed == ['buy']
+
+        # Handed-off calls run one at a time, in hand-off order, and a failure is contained
+        order = []
+        futures = [evaluator.handoff(order.append, 1), evaluator.handoff(lambda: 1 / 0),
+                   evaluator.handoff(order.append, 2)]
+        evaluator.wait_handoffs(futures)
+        assert order == [1, 2] and futures[1].result() is None
+    finally:
+        logging.disable(logging.NOTSET)
+        evaluator.shutdown(wait=True)
+
+
+def test_timer_scan_executes_fast_signals_before_slow_strategy_finishes():
+    signal = {'instrument': 'EUR_USD', 'direction': 'BUY', 'confidence': 0.8}
+    scanner = stub_scanner({name: StubStrategy(delay=delay, signals=[signal])
+                            for name, delay in (('slow', 1.0), ('fast', 0.0), ('steady', 0.05))},
+                           evaluator=StrategyEvaluator(max_workers=4, deadline=0.4))
+    scanner._assess_validate_classify_and_report = lambda signals: None
+
+    started = time.perf_counter()
+    executed = []
+    scanner._execute_signals = lambda name, account, signals, *args: executed.append(
+        (name, account, time.perf_counter() - started))
+
+    logging.disable(logging.WARNING)
+    try:
+        scanner._run_scan()
+    finally:
+        logging.disable(logging.NOTSET)
+        scanner.evaluator.shutdown()
+
+    assert [(name, account) for name, account, _ in executed] == [('fast', '101-004-1'), ('steady', '101-004-2')]
+    assert executed[0][2] < 0.1
+    assert scanner.scan_phase_timings[-1]['strategies_ms'] < 800
+    assert scanner.evaluator.get_stats()['strategies']['slow']['late'] == 1
+
+
+if __name__ == '__main__':
+    test_fast_strategies_are_not_held_up_by_a_slow_one()
+    test_errors_shared_objects_and_sequential_mode()
+    test_deadline_starts_when_the_task_runs_and_handoffs_do_not_block_collection()
+    test_timer_scan_executes_fast_signals_before_slow_strategy_finishes()
+    print("✅ Strategy evaluator tests passed")
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Test lazy, parallel strategy loading - deferred optional imports, import-time report, concurrent preload with batched prefill
+"""
+
+import os
+import sys
+import time
+import logging
+import tempfile
+import threading
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.core.lazy_imports import lazy_import, module_available, resolve, ImportTimer, lazy_load_times
+from src.core.strategy_factory import StrategyFactory, STRATEGY_OVERRIDES, build_concurrently
+from src.core.strategy_base import prefill_price_history_batch
+from src.core.warm_start import prefill_deferred, get_warm_start_store
+from src.core.ring_buffer import RingBuffer
+from src.strategies.breakout_strategy import BreakoutStrategy
+from src.strategies.momentum_trading import MomentumTradingStrategy
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _write_package(root, name, modules):
+    package = os.path.join(root, name)
+    os.makedirs(package)
+    open(os.path.join(package, '__init__.py'), 'w').close()
+    for module, source in modules.items():
+        with open(os.path.join(package, f'{module}.py'), 'w') as f:
+            f.write(source)
+
+
+def test_lazy_import_defers_until_first_use_and_import_timer_reports():
+    with tempfile.TemporaryDirectory() as tmp:
+        _write_package(tmp, 'lazy_pkg', {
+            'heavy': "import time\nfrom . import leaf\ntime.sleep(0.05)\nLOADED = True\ndef get_thing():\n    return 'thing'\n",
+            'leaf': "import time\ntime.sleep(0.02)\n",
+        })
+        sys.path.insert(0, tmp)
+        timer = ImportTimer()
+        sys.meta_path.insert(0, timer)
+        try:
+            assert module_available('lazy_pkg.heavy') and not module_available('lazy_pkg.missing')
+            assert module_available('.heavy', 'lazy_pkg')
+            get_thing = lazy_import('.heavy', 'lazy_pkg', 'get_thing')
+            heavy = lazy_import('lazy_pkg.heavy')
+            assert 'lazy_pkg.heavy' not in sys.modules  # Found, not executed
+            assert 'not loaded' in repr(get_thing)
+
+            assert get_thing() == 'thing'  # First call imports
+            assert 'lazy_pkg.heavy' in sys.modules and heavy.LOADED
+            assert resolve(heavy) is sys.modules['lazy_pkg.heavy'] and resolve(42) == 42
+            assert lazy_load_times()['lazy_pkg.heavy']['ms'] >= 60
+        finally:
+            sys.meta_path.remove(timer)
+            sys.path.remove(tmp)
+            for name in [m for m in sys.modules if m.startswith('lazy_pkg')]:
+                del sys.modules[name]
+
+        report = timer.report()
+        timings = {entry['module']: entry for entry in report['slowest']}
+        assert timings['lazy_pkg.heavy']['cumulative_ms'] >= 65  # Includes the nested leaf import
+        assert 45 <= timings['lazy_pkg.heavy']['self_ms'] < timings['lazy_pkg.heavy']['cumulative_ms'] - 15
+        assert timings['lazy_pkg.leaf']['self_ms'] >= 15
+        text = timer.format_report()
+        assert text.splitlines()[0] == "import time: self [us] | cumulative | imported package"
+        assert any(line.endswith('  lazy_pkg.leaf') for line in text.splitlines())  # Indented under its importer
+
+
+def test_scanner_import_leaves_strategies_and_news_unloaded():
+    code = ("import sys; import src.core.simple_timer_scanner; "
+            "print(sum(m.startswith('src.strategies.') for m in sys.modules), 'src.core.news_integration' in sys.modules)")
+    output = subprocess.run([sys.executable, '-c', code], cwd=HERE, capture_output=True, text=True, timeout=120)
+    assert output.stdout.split()[-2:] == ['0', 'False'], output.stderr[-2000:]
+
+
+def test_build_concurrently_serialises_shared_getters():
+    running, peak, order = {}, {}, []
+    lock = threading.Lock()
+
+    def build(group, key, fail=False):
+        def run():
+            with lock:
+                running[group] = running.get(group, 0) + 1
+                peak[group] = max(peak.get(group, 0), running[group])
+                order.append(key)
+            time.sleep(0.1)
+            with lock:
+                running[group] -= 1
+            if fail:
+                raise ValueError(key)
+            return key
+        return run
+
+    jobs = [('gold-1', 'gold', build('gold', 'gold-1')), ('eur', 'eur', build('eur', 'eur')),
+            ('gold-2', 'gold', build('gold', 'gold-2')), ('bad', 'bad', build('bad', 'bad', fail=True))]
+    started = time.perf_counter()
+    results = build_concurrently(jobs, max_workers=4)
+    elapsed = time.perf_counter() - started
+
+    assert list(results) == ['gold-1', 'eur', 'gold-2', 'bad']
+    assert results['gold-2'] == ('gold-2', None) and isinstance(results['bad'][1], ValueError)
+    assert peak['gold'] == 1 and order.index('gold-1') < order.index('gold-2')  # Shared getter never entered twice
+    assert elapsed < 0.3  # Groups overlap: 0.2s for gold, not 0.4s for everything
+
+
+def test_preload_builds_in_parallel_with_prefill_deferred():
+    with tempfile.TemporaryDirectory() as tmp:
+        _write_package(tmp, 'preload_pkg', {
+            'slow_strategy': ("import time\nfrom src.core.warm_start import prefill_deferred\n"
+                              "class SlowStrategy:\n"
+                              "    def __init__(self, instruments=None):\n"
+                              "        self.deferred = prefill_deferred()\n"
+                              "        time.sleep(0.15)  # Stands in for per-strategy network setup\n"),
+        })
+        sys.path.insert(0, tmp)
+        names = [f'slow_{i}' for i in range(4)]
+        for name in names:
+            STRATEGY_OVERRIDES[name] = {'module': 'preload_pkg.slow_strategy', 'class': 'SlowStrategy'}
+        logging.disable(logging.WARNING)
+        try:
+            factory = StrategyFactory()
+            started = time.perf_counter()
+            factory.preload_strategies(names + ['no_such_strategy'], max_workers=4)
+            elapsed = time.perf_counter() - started
+            assert not prefill_deferred()
+
+            assert sorted(factory.get_loaded_strategies()) == names
+            assert all(factory.get_strategy(name).deferred for name in names)
+            assert elapsed < 0.45  # Four 0.15s builds overlapped
+            report = factory.get_load_report()
+            assert report['module_imports_ms']['preload_pkg.slow_strategy'] >= 0
+            assert len({report['strategies'][name]['thread'] for name in names}) > 1
+            assert report['errors'] == 1
+        finally:
+            logging.disable(logging.NOTSET)
+            for name in names:
+                STRATEGY_OVERRIDES.pop(name)
+            sys.path.remove(tmp)
+            for name in [m for m in sys.modules if m.startswith('preload_pkg')]:
+                del sys.modules[name]
+
+
+class _Store:
+    def __init__(self):
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def get_recent_candles(self, instrument, granularity, count, price='M'):
+        with self.lock:
+            self.requests.append((instrument, granularity, count, price))
+        return [{'time': f'2025-11-03T09:{i:02d}:00.000000000Z', 'complete': True, 'mid': {'c': str(1.1 + i / 1000)}}
+                for i in range(count)]
+
+
+class _Strategy:
+    def __init__(self, instruments):
+        self.instruments = instruments
+        self.price_history = {inst: RingBuffer(100) for inst in instruments}
+
+
+def test_batch_prefill_reads_each_instrument_once_and_keeps_restored_history():
+    store = _Store()
+    a, b, restored = _Strategy(['EUR_USD', 'GBP_USD']), _Strategy(['EUR_USD', 'XAU_USD']), _Strategy(['USD_JPY'])
+    restored.price_history['USD_JPY'].append(150.0)
+    logging.disable(logging.INFO)
+    try:
+        loaded = prefill_price_history_batch([a, b, restored, object()], count=5, store=store)
+    finally:
+        logging.disable(logging.NOTSET)
+
+    assert sorted(r[0] for r in store.requests) == ['EUR_USD', 'GBP_USD', 'XAU_USD']
+    assert all(r[1:] == ('M15', 5, 'M') for r in store.requests)
+    assert loaded == 20
+    assert a.price_history['EUR_USD'].tolist() == b.price_history['EUR_USD'].tolist() == [1.1, 1.101, 1.102, 1.103, 1.104]
+    assert restored.price_history['USD_JPY'].tolist() == [150.0]
+
+
+def test_batch_prefill_leaves_candle_history_strategies_to_their_own_prefill():
+    with get_warm_start_store().defer_prefill(True):
+        breakout = build_concurrently([('breakout', 'breakout', lambda: BreakoutStrategy(['EUR_USD']))])['breakout'][0]
+    momentum = MomentumTradingStrategy.__new__(MomentumTradingStrategy)  # Opts in: float closes, defers its prefill
+    momentum.instruments, momentum.price_history = ['EUR_USD'], {'EUR_USD': RingBuffer(100)}
+    store = _Store()
+    logging.disable(logging.INFO)
+    try:
+        loaded = prefill_price_history_batch([breakout, momentum], count=5, store=store)
+    finally:
+        logging.disable(logging.NOTSET)
+
+    assert loaded == 5 and len(momentum.price_history['EUR_USD']) == 5
+    # Float closes would break breakout's candle dicts (['volume']) and keep its lazy prefill from running
+    assert breakout.price_history['EUR_USD'] == []
+    assert not any(breakout.price_history.values())
+
+
+if __name__ == '__main__':
+    test_lazy_import_defers_until_first_use_and_import_timer_reports()
+    test_scanner_import_leaves_strategies_and_news_unloaded()
+    test_build_concurrently_serialises_shared_getters()
+    test_preload_builds_in_parallel_with_prefill_deferred()
+    test_batch_prefill_reads_each_instrument_once_and_keeps_restored_history()
+    test_batch_prefill_leaves_candle_history_strategies_to_their_own_prefill()
+    print("✅ Strategy loading tests passed")
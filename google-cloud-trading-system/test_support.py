@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Shared test helpers - reference indicator implementations, SimpleTimerScanner stubs
+"""
+
+import os
+import time
+import tempfile
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, List
+
+import pandas as pd
+
+from src.core.oanda_client import OandaPrice
+from src.core.simple_timer_scanner import SimpleTimerScanner
+from src.core.strategy_evaluator import StrategyEvaluator
+from src.core.warm_start import WarmStartStore
+
+
+def pandas_close_atr(prices: List[float], period: int = 14) -> float:
+    """Per-scan pandas ATR from closes, as MomentumTradingStrategy computed it before streaming"""
+    if len(prices) < period + 1:
+        return 0.001
+
+    df = pd.Series(prices)
+    atr = df.diff().abs().rolling(window=period).mean().iloc[-1]
+    if not pd.isna(atr) and atr > 0:
+        return atr
+
+    vol_estimate = df.pct_change().abs().rolling(period).std().iloc[-1] * df.iloc[-1]
+    return vol_estimate if (not pd.isna(vol_estimate) and vol_estimate > 0) else 0.001
+
+
+def pandas_close_adx(prices: List[float], period: int = 14) -> float:
+    """Per-scan pandas ADX from closes (high = low = close), as MomentumTradingStrategy computed it"""
+    if len(prices) < period * 2:
+        return 0.0
+
+    df = pd.Series(prices)
+    high = low = df
+    close = df.shift(1)
+    tr = pd.concat([high - low, abs(high - close), abs(low - close)], axis=1).max(axis=1)
+
+    dm_plus = high.diff()
+    dm_minus = -low.diff()
+    dm_plus = dm_plus.where((dm_plus > dm_minus) & (dm_plus > 0), 0)
+    dm_minus = dm_minus.where((dm_minus > dm_plus) & (dm_minus > 0), 0)
+
+    tr_smooth = tr.rolling(window=period).mean()
+    di_plus = 100 * (dm_plus.rolling(window=period).mean() / tr_smooth)
+    di_minus = 100 * (dm_minus.rolling(window=period).mean() / tr_smooth)
+    dx = 100 * abs(di_plus - di_minus) / (di_plus + di_minus)
+    adx = dx.rolling(window=period).mean().iloc[-1]
+    return adx if not pd.isna(adx) else 0.0
+
+
+class StubOanda:
+    """Serves one live price per instrument and records each pricing request"""
+
+    def __init__(self):
+        self.pricing_requests = []
+
+    def get_current_prices(self, instruments, force_refresh=False):
+        self.pricing_requests.append(list(instruments))
+        now = datetime.now(timezone.utc)
+        return {inst: OandaPrice(instrument=inst, bid=1.0 + i, ask=1.0002 + i, timestamp=now, spread=2e-4, is_live=True)
+                for i, inst in enumerate(instruments)}
+
+
+class StubCalendar:
+    """Pauses the given instruments and records each check"""
+
+    def __init__(self, paused=()):
+        self.checks = []
+        self.paused = set(paused)
+
+    def should_avoid_trading(self, pair):
+        self.checks.append(pair)
+        return (pair in self.paused, 'NFP in 10 minutes')
+
+
+class StubStrategy:
+    """Records the market data it sees, optionally sleeping and returning fixed signals"""
+
+    def __init__(self, instruments=('EUR_USD',), delay=0.0, signals=()):
+        self.instruments = list(instruments)
+        self.delay = delay
+        self.signals = list(signals)
+        self.seen = []
+
+    def analyze_market(self, market_data):
+        self.seen.append(market_data)
+        time.sleep(self.delay)
+        return list(self.signals)
+
+
+class Quiet:
+    """Trump planner / notifier that never signals or sends"""
+
+    def get_entry_signal(self, *args):
+        return None
+
+    def send_message(self, *args):
+        pass
+
+
+def stub_scanner(strategies: Dict, oanda=None, calendar=None, evaluator=None, warm_start=None) -> SimpleTimerScanner:
+    """SimpleTimerScanner without running __init__ (no accounts.yaml, no network)"""
+    scanner = SimpleTimerScanner.__new__(SimpleTimerScanner)
+    scanner.oanda = oanda if oanda is not None else StubOanda()
+    scanner.economic_calendar = calendar if calendar is not None else StubCalendar()
+    scanner.trump_planner = scanner.notifier = Quiet()
+    scanner.scan_count, scanner.pricing_calls, scanner.scan_phase_timings = 0, 0, deque(maxlen=100)
+    scanner.evaluator = evaluator if evaluator is not None else StrategyEvaluator(max_workers=4, deadline=5)
+    if warm_start is None:
+        warm_start = WarmStartStore(path=os.path.join(tempfile.mkdtemp(), 'strategies.pkl.gz'))
+    scanner.warm_start = warm_start
+    scanner.init_started, scanner.first_scan_seconds, scanner.warm_start_mode = time.perf_counter(), None, 'cold'
+    scanner._check_and_adapt_thresholds = lambda: None
+    scanner._incremental_loosen_small = lambda: None
+    scanner.strategies = strategies
+    scanner.accounts = {name: f'101-004-{i}' for i, name in enumerate(strategies)}
+    return scanner
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test parallel parameter sweep engine - worker fan-out, failures, checkpoint/resume
+"""
+
+import os
+import sys
+import json
+import random
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.core.sweep_engine import SweepEngine, params_key
+
+
+def score(params):
+    if params['x'] == 3:
+        raise ValueError("bad combination")
+    return {'params': params, 'score': params['x'] * params['y'], 'pid': os.getpid()}
+
+
+def test_parallel_matches_serial_and_skips_failures():
+    grid = [{'x': x, 'y': y} for x in range(6) for y in range(4)]
+    serial = SweepEngine(score, workers=1).run(grid)
+    parallel_engine = SweepEngine(score, workers=3)
+    parallel = parallel_engine.run(grid)
+
+    assert [r['score'] for r in parallel] == [r['score'] for r in serial]
+    assert len(parallel) == len(grid) - 4
+    assert parallel_engine.stats['failed'] == 4
+    assert len({r['pid'] for r in parallel} - {os.getpid()}) >= 1
+
+
+def test_unpicklable_evaluator_is_inherited_by_workers():
+    lock = threading.Lock()  # closures over locks cannot be pickled
+    offset = 100
+
+    def evaluate(params):
+        with lock:
+            return params['x'] + offset
+
+    assert SweepEngine(evaluate, workers=2).run([{'x': i} for i in range(8)]) == list(range(100, 108))
+
+
+def test_checkpoint_resume():
+    grid = [{'x': x, 'y': 1} for x in range(10) if x != 3]
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, 'sweep.jsonl')
+        SweepEngine(score, workers=2, checkpoint_path=path).run(grid[:5])
+
+        # Simulate an interrupted write
+        with open(path, 'a') as f:
+            f.write('{"key": "trunc')
+
+        seen = []
+        engine = SweepEngine(score, workers=1, checkpoint_path=path)
+        results = engine.run(grid, on_result=lambda i, params, result: seen.append(params['x']))
+
+        assert [r['score'] for r in results] == [p['x'] for p in grid]
+        assert engine.stats['resumed'] == 5
+        assert sorted(seen) == [p['x'] for p in grid[5:]]
+        with open(path) as f:
+            keys = [json.loads(line)['key'] for line in f if line.startswith('{"key": "{')]
+        assert sorted(keys) == sorted(params_key(p) for p in grid)
+
+
+def test_sampled_plan_survives_a_restart():
+    def sample():
+        return [{'x': random.uniform(0, 10), 'y': 1} for _ in range(6)]
+
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, 'sweep.jsonl')
+        first = SweepEngine(score, workers=1, checkpoint_path=path)
+        planned = first.plan(sample)
+        first.run(planned[:4])  # Interrupted after four
+
+        # A restart samples nothing new: the plan comes back from the checkpoint and only the rest run
+        restarted = SweepEngine(score, workers=1, checkpoint_path=path)
+        replanned = restarted.plan(sample)
+        assert replanned == planned
+        results = restarted.run(replanned)
+        assert restarted.stats['resumed'] == 4 and restarted.stats['completed'] == 2
+        assert [r['score'] for r in results] == [p['x'] for p in planned]
+
+        assert len(SweepEngine(score, workers=1).plan(sample)) == 6  # No checkpoint: just sampled
+
+
+if __name__ == '__main__':
+    test_parallel_matches_serial_and_skips_failures()
+    test_unpicklable_evaluator_is_inherited_by_workers()
+    test_checkpoint_resume()
+    test_sampled_plan_survives_a_restart()
+    print("✅ Sweep engine tests passed")
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Test the binary tick journal - fixed-width records, daily segments, torn-tail recovery, bus recording and replay
+"""
+
+import os
+import sys
+import time
+import logging
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.core.tick_journal import (TickJournal, JournalReplay, iter_journal, list_segments,
+                                   RECORD_HEADER, TICK_RECORD, FILE_HEADER)
+from src.core.market_data_bus import MarketDataBus, TICK, BAR
+from src.core.bar_aggregator import Bar
+from src.core.data_feed import MarketData
+from src.core.candle_store import to_ns
+from src.core.persistent_history import PersistentHistoryManager
+
+DAY1 = to_ns('2025-11-03T23:59:58.000000000Z')
+DAY2 = to_ns('2025-11-04T00:00:01.000000000Z')
+
+
+def _tick(instrument, bid, timestamp):
+    return MarketData(pair=instrument, bid=bid, ask=bid + 2e-4, timestamp=timestamp, is_live=True,
+                      data_source='test', spread=2e-4, last_update_age=0)
+
+
+def test_records_rotate_daily_and_survive_a_torn_tail():
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = TickJournal(tmp, flush_interval=0)
+        journal.append_tick('EUR_USD', 1.1, 1.1002, DAY1)
+        journal.append_tick('XAU_USD', 2650.5, 2651.0, DAY1 + 10**9)
+        bar = Bar('EUR_USD', 'M1', DAY1 - 58 * 10**9, [1.1, 1.2, 1.0, 1.15], [1.1002] * 4, [1.1001] * 4,
+                  volume=42, complete=True, source='candles')
+        journal.append_bar(bar)
+        journal.append_tick('EUR_USD', 1.2, 1.2002, DAY2)
+        journal.close()
+
+        segments = [os.path.basename(path) for path in list_segments(tmp)]
+        assert segments == ['20251103.ticks', '20251104.ticks']
+        # Day two: header, one instrument definition, one fixed-width tick
+        assert os.path.getsize(list_segments(tmp)[1]) == FILE_HEADER.size + 2 * RECORD_HEADER.size + 18 + TICK_RECORD.size
+
+        events = list(iter_journal(tmp))
+        assert [(e.kind, e.instrument) for e in events] == [(TICK, 'EUR_USD'), (TICK, 'XAU_USD'), (BAR, 'EUR_USD'),
+                                                            (TICK, 'EUR_USD')]
+        assert events[1].data == (2650.5, 2651.0) and events[3].time_ns == DAY2
+        replayed = events[2].data
+        assert (replayed.granularity, replayed.volume, replayed.bid, replayed.complete, replayed.source) == \
+            ('M1', 42, [1.1, 1.2, 1.0, 1.15], True, 'candles')
+        assert [e.instrument for e in iter_journal(tmp, start=DAY1 + 1, instruments=['EUR_USD'])] == ['EUR_USD']
+
+        # A crash mid-record leaves a partial tail: readers stop before it, the writer truncates it
+        with open(list_segments(tmp)[1], 'ab') as f:
+            f.write(RECORD_HEADER.pack(TICK_RECORD.size, 1) + b'\x01\x02')
+        assert len(list(iter_journal(tmp))) == 4
+        logging.disable(logging.WARNING)
+        try:
+            journal = TickJournal(tmp, flush_interval=0)
+            journal.append_tick('GBP_USD', 1.3, 1.3002, DAY2 + 10**9)
+            journal.close()
+        finally:
+            logging.disable(logging.NOTSET)
+        assert journal.stats['truncated_bytes'] == RECORD_HEADER.size + 2
+        assert [e.instrument for e in iter_journal(tmp, start=DAY2)] == ['EUR_USD', 'GBP_USD']
+
+
+def test_bus_is_recorded_and_history_manager_appends_instead_of_rewriting():
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = TickJournal(os.path.join(tmp, 'journal'), flush_interval=0)
+        bus = MarketDataBus()
+        logging.disable(logging.INFO)
+        try:
+            journal.attach(bus)
+            bus.publish_ticks({'EUR_USD': _tick('EUR_USD', 1.1, '2025-11-03T09:00:00.000000000Z'),
+                               'GBP_USD': _tick('GBP_USD', 1.3, '2025-11-03T09:00:00.500000000Z')})
+            bus.publish_bar(Bar.from_tick('EUR_USD', 'M5', to_ns('2025-11-03T09:00:00Z'), 1.1, 1.1002))
+            deadline = time.time() + 2
+            while journal.stats['ticks'] + journal.stats['bars'] < 3 and time.time() < deadline:
+                time.sleep(0.01)
+            journal.detach()
+
+            manager = PersistentHistoryManager(os.path.join(tmp, 'history'), journal=journal)
+            for i in range(20):
+                manager.save_price_history('USD_JPY', _tick('USD_JPY', 150 + i / 100, f'2025-11-03T09:01:{i:02d}.000000000Z'))
+        finally:
+            logging.disable(logging.NOTSET)
+        journal.close()
+
+        events = list(iter_journal(journal.directory))
+        assert [(e.kind, e.instrument) for e in events[:3]] == [(TICK, 'EUR_USD'), (TICK, 'GBP_USD'), (BAR, 'EUR_USD')]
+        assert events[1].time_ns == to_ns('2025-11-03T09:00:00.500000000Z')
+        assert sum(e.instrument == 'USD_JPY' for e in events) == 20
+        assert not os.listdir(os.path.join(tmp, 'history'))  # No JSON rewrites while journaling
+        assert manager.get_storage_stats()['journal']['ticks'] == 22
+
+
+def test_attached_journal_records_each_tick_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = TickJournal(os.path.join(tmp, 'journal'), flush_interval=0)
+        bus = MarketDataBus()
+        manager = PersistentHistoryManager(os.path.join(tmp, 'history'), journal=journal)
+        logging.disable(logging.INFO)
+        try:
+            journal.attach(bus)
+            for i in range(5):
+                tick = _tick('EUR_USD', 1.1 + i / 1000, f'2025-11-03T09:00:{i:02d}.000000000Z')
+                bus.publish_ticks({'EUR_USD': tick})  # A feed publishes the tick and keeps its history
+                manager.save_price_history('EUR_USD', tick)
+            deadline = time.time() + 2
+            while journal.stats['ticks'] < 5 and time.time() < deadline:
+                time.sleep(0.01)
+            time.sleep(0.05)
+            journal.detach()
+        finally:
+            logging.disable(logging.NOTSET)
+        journal.close()
+
+        events = list(iter_journal(journal.directory))
+        assert [e.data[0] for e in events] == [1.1 + i / 1000 for i in range(5)]
+        assert journal.stats['ticks'] == 5 and len(manager.history_files['EUR_USD']) == 5
+
+
+class _Scanner:
+    """Just enough of SimpleTimerScanner: one scan reads prices and hands signals to _execute_signals"""
+
+    def __init__(self):
+        self.oanda = None
+        self.notifier = None
+        self.seen = []
+
+    def _run_scan(self):
+        prices = self.oanda.get_current_prices(['EUR_USD'])
+        self.seen.append(prices['EUR_USD'].bid)
+        if prices['EUR_USD'].bid > 1.104:
+            self._execute_signals('momentum', '101-004-1', ['BUY EUR_USD'], ['EUR_USD'], {})
+            self.notifier.send_message('🎯 signal', 'trade_signal')
+
+    def _execute_signals(self, *args):
+        raise AssertionError('replay must not place orders')
+
+
+def test_replay_drives_scanner_on_journal_time_at_speed():
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = TickJournal(tmp, flush_interval=0)
+        start = to_ns('2025-11-03T09:00:00Z')
+        for second in range(0, 600, 10):  # Ten minutes of ticks
+            journal.append_tick('EUR_USD', 1.1 + second / 100000, 1.1002 + second / 100000, start + second * 10**9)
+        journal.close()
+
+        bus = MarketDataBus()
+        subscription = bus.subscribe('replay-test', kinds=(TICK,), maxsize=1000, policy='drop_oldest')
+        scanner = _Scanner()
+        original_notifier = scanner.notifier
+        replay = JournalReplay(tmp, bus=bus, speed=2000)
+        logging.disable(logging.INFO)
+        try:
+            stats = replay.run(scanner, scan_interval=300)
+        finally:
+            logging.disable(logging.NOTSET)
+
+        assert stats['ticks'] == 60 and stats['journal_seconds'] == 590
+        assert 0.25 <= stats['wall_seconds'] < 2  # 590s of journal at 2000x
+        # Scan at +300s, then a final one at the end of the journal, each seeing the prices of that moment
+        assert stats['scans'] == 2 and scanner.seen == [1.1 + 290 / 100000, 1.1 + 590 / 100000]
+        assert [s['time_ns'] for s in replay.signals] == [start + 590 * 10**9]
+        assert scanner.notifier is original_notifier and '_execute_signals' not in vars(scanner)
+        replayed = subscription.drain()
+        assert len(replayed) == 60 and replayed[-1].data.timestamp == '2025-11-03T09:09:50.000000000Z'
+        assert replayed[0].data.data_source == 'TickJournal'
+
+
+if __name__ == '__main__':
+    test_records_rotate_daily_and_survive_a_torn_tail()
+    test_bus_is_recorded_and_history_manager_appends_instead_of_rewriting()
+    test_attached_journal_records_each_tick_once()
+    test_replay_drives_scanner_on_journal_time_at_speed()
+    print("✅ Tick journal tests passed")
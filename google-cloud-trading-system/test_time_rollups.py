@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Test the time-bucket rollups - parity with the Python breakdowns, incremental upkeep, backfill, snapshot curves
+"""
+
+import os
+import sys
+import random
+import logging
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.core.time_rollups import period_key, equity_from_breakdown
+from src.core.performance_tracker import PerformanceTracker
+from src.analytics.metrics_calculator import MetricsCalculator
+from src.analytics.trade_database import TradeDatabase, TradeRecord
+from src.analytics.data_archiver import DataArchiver
+from analytics.database.models import PerformanceDatabase
+
+
+def _totals(breakdown):
+    return [(row['period'], row['trades'], row['wins'], round(row['pnl'], 6)) for row in breakdown]
+
+
+def test_trade_rollups_match_python_breakdowns():
+    logging.disable(logging.WARNING)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'trading.db')
+            db = TradeDatabase(path)
+            rng = random.Random(3)
+            start = datetime.now() - timedelta(days=40)
+            for i in range(120):
+                entry = (start + timedelta(hours=i * 7)).isoformat()
+                db.insert_trade(TradeRecord(f't{i}', f'101-004-{i % 2}', ('momentum', 'gold')[i % 2], 1,
+                                            ('EUR_USD', 'XAU_USD')[i % 2], 'BUY', 1000, 1.1, entry, commission=0.25))
+                if i < 110:
+                    db.update_trade_exit(f't{i}', 1.1, entry, 'TP', round(rng.gauss(2, 20), 2), 0, 600)
+            db.update_trade_exit('t0', 1.1, start.isoformat(), 'SL', -50.0, 0, 600)  # Re-close replaces, not adds
+
+            closed = [t for t in db.get_closed_trades_by() if t['strategy_id'] == 'momentum']
+            calc = MetricsCalculator()
+            expected = {
+                'day': calc.calculate_daily_breakdown(closed),
+                'week': calc.calculate_weekly_breakdown(closed),
+                'month': calc.calculate_monthly_breakdown(closed),
+            }
+            for bucket, python in expected.items():
+                rolled = {row['period']: row for row in db.rollups.breakdown(bucket, strategy_id='momentum')}
+                assert sorted(rolled) == sorted(python), bucket
+                for period, metrics in python.items():
+                    assert rolled[period]['trades'] == metrics['total_trades']
+                    assert abs(rolled[period]['pnl'] - metrics['total_pnl']) < 1e-9
+                    assert abs(rolled[period]['win_rate'] - metrics['win_rate']) < 1e-9
+
+            hourly = db.rollups.breakdown('hour')
+            assert sum(row['trades'] for row in hourly) == 110 and all(len(row['period']) == 13 for row in hourly)
+            curve = db.rollups.equity_curve('day', account_id='101-004-0')
+            assert abs(curve[-1]['cumulative_pnl'] - sum(t['realized_pnl'] for t in closed)) < 1e-9
+            assert min(point['drawdown'] for point in curve) <= 0
+            recent = db.rollups.breakdown('day', days=10)
+            assert recent[0]['period'] >= period_key(datetime.now() - timedelta(days=10), 'day')
+
+            # Tables created on an existing database are backfilled from its trades
+            before = db.rollups.breakdown('month')
+            db.store.executescript("DROP TABLE trade_rollups; DROP TABLE snapshot_rollups;")
+            reopened = TradeDatabase(path)
+            assert _totals(reopened.rollups.breakdown('month')) == _totals(before)
+            assert reopened.rebuild_rollups() == 110 and _totals(reopened.rollups.breakdown('month')) == _totals(before)
+            db.store.close()
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def test_rollups_rebuild_keeps_archived_trades():
+    logging.disable(logging.WARNING)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = TradeDatabase(os.path.join(tmp, 'trading.db'))
+            start = datetime.now() - timedelta(days=200)
+            for i in range(30):
+                entry = (start + timedelta(days=i * 6)).isoformat()
+                db.insert_trade(TradeRecord(f't{i}', '101-004-0', 'momentum', 1, 'EUR_USD', 'BUY', 1000, 1.1, entry))
+                db.update_trade_exit(f't{i}', 1.1, entry, 'TP', float(i % 7 - 3), 0, 600)
+            before = db.rollups.breakdown('month')
+
+            result = DataArchiver(os.path.join(tmp, 'archives'), db=db).archive_old_trades(90)
+            assert result['deleted_count'] > 0 and len(db.get_closed_trades_by()) == 30 - result['deleted_count']
+            assert _totals(db.rollups.breakdown('month')) == _totals(before)  # Archival keeps rollups
+
+            assert db.rebuild_rollups() == 30
+            assert _totals(db.rollups.breakdown('month')) == _totals(before)
+            curve = db.rollups.equity_curve('month')
+            assert curve == equity_from_breakdown(before)
+            assert curve[-1]['cumulative_pnl'] == sum(float(i % 7 - 3) for i in range(30))
+            assert min(point['drawdown'] for point in curve) <= 0
+            db.store.close()
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def test_analytics_database_serves_curves_from_rollups():
+    logging.disable(logging.WARNING)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = PerformanceDatabase(os.path.join(tmp, 'analytics.db'))
+            now = datetime.now().replace(minute=50, second=0, microsecond=0)
+            for i in range(12):  # Every 20 minutes over four hours
+                db.store_snapshot({'account_id': 'acc', 'account_name': 'Demo', 'balance': 1000 + i,
+                                   'equity': 1000 + i * (-1) ** i, 'timestamp': (now - timedelta(minutes=20 * i)).isoformat()})
+            curve = db.get_equity_curve('acc', days=1)
+            assert len(curve) == 4
+            assert curve[-1] == (now.isoformat(), 1000)  # Latest snapshot closes the newest hour
+
+            for i in range(6):
+                db.store_trade({'trade_id': f'a{i}', 'account_id': 'acc', 'account_name': 'Demo', 'instrument': 'EUR_USD',
+                                'strategy_name': 'momentum', 'entry_time': (now - timedelta(days=i % 3)).isoformat(),
+                                'entry_price': 1.1, 'units': 1000, 'side': 'BUY', 'net_pl': 10.0 * (i + 1)})
+            db.store_trade({'trade_id': 'a5', 'account_id': 'acc', 'account_name': 'Demo', 'instrument': 'EUR_USD',
+                            'strategy_name': 'momentum', 'entry_time': now.isoformat(), 'entry_price': 1.1,
+                            'units': 1000, 'side': 'BUY', 'net_pl': -5.0})  # Replaces: moves day and P&L
+            db.store_trade({'trade_id': 'open', 'account_id': 'acc', 'account_name': 'Demo', 'instrument': 'EUR_USD',
+                            'strategy_name': 'momentum', 'entry_time': now.isoformat(), 'entry_price': 1.1,
+                            'units': 1000, 'side': 'BUY', 'status': 'open'})
+            assert db.get_daily_returns(strategy_name='momentum', days=7) == [30.0 + 0, 20.0 + 50, 10.0 + 40 - 5]
+            weeks = db.get_period_breakdown('week', account_id='acc', days=7)
+            assert sum(w['trades'] for w in weeks) == 6 and weeks[-1]['cumulative_pnl'] == 145.0
+            db.close()
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def test_strategy_history_reads_hourly_snapshot_rollups():
+    logging.disable(logging.WARNING)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'performance_history.db')
+            tracker = PerformanceTracker(path)
+            for nav in (1000, 1010, 1005):
+                assert tracker.capture_snapshot({'account_id': 'acc', 'strategy_name': 'momentum', 'nav': nav,
+                                                 'balance': 1000, 'pl': nav - 1000, 'status': 'active'})
+            history = tracker.get_strategy_history('acc', days=7)
+            assert len(history) == 1 and history[0]['nav'] == 1005 and history[0]['pl'] == 5
+            assert history[0]['timestamp'][:13] == datetime.utcnow().strftime('%Y-%m-%d %H')  # Row's own UTC format
+
+            # An older database gets its rollups backfilled from the raw snapshots
+            import sqlite3
+            conn = sqlite3.connect(path)
+            conn.execute("DROP TABLE trade_rollups")
+            conn.execute("DROP TABLE snapshot_rollups")
+            yesterday = (datetime.utcnow() - timedelta(days=1)).strftime('%Y-%m-%d %H:%M:%S')
+            conn.execute("INSERT INTO strategy_snapshots (timestamp, account_id, strategy_name, nav, pl, status) "
+                         "VALUES (?, 'acc', 'momentum', 990, -10, 'active')", (yesterday,))
+            conn.commit()
+            conn.close()
+            history = PerformanceTracker(path).get_strategy_history('acc', days=7)
+            assert [point['nav'] for point in history] == [990, 1005]
+            assert tracker.get_comparison_data(['acc'])['acc']['change'] == 15
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+if __name__ == '__main__':
+    test_trade_rollups_match_python_breakdowns()
+    test_rollups_rebuild_keeps_archived_trades()
+    test_analytics_database_serves_curves_from_rollups()
+    test_strategy_history_reads_hourly_snapshot_rollups()
+    print("✅ Time rollup tests passed")
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Test the columnar trade archive - month/strategy partitions, append-only parts, pruned reads, metrics and restore
+"""
+
+import os
+import sys
+import gzip
+import json
+import random
+import logging
+import tempfile
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.analytics.trade_archive import TradeArchive, METRIC_COLUMNS
+from src.analytics.metrics_accumulator import MetricsAccumulator, MetricsAccumulatorManager
+from src.analytics.trade_database import TradeDatabase, TradeRecord
+from src.analytics.data_archiver import DataArchiver
+
+
+def _trades(n, start, seed=5):
+    rng = random.Random(seed)
+    trades = []
+    for i in range(n):
+        entry = start + timedelta(hours=i * 9)
+        trades.append({'trade_id': f't{i}', 'account_id': '101-004-1', 'strategy_id': ('momentum', 'gold')[i % 2],
+                       'strategy_version': 2, 'instrument': ('EUR_USD', 'XAU_USD', 'USD_JPY')[i % 3],
+                       'direction': 'BUY', 'position_size': 1000.0, 'entry_price': 1.1, 'entry_time': entry.isoformat(),
+                       'stop_loss': 1.09 if i % 4 else None, 'take_profit': 1.12, 'exit_price': 1.11,
+                       'exit_time': (entry + timedelta(hours=3)).isoformat(), 'exit_reason': 'TP',
+                       'realized_pnl': round(rng.gauss(3, 25), 2), 'pnl_pips': 10.0, 'commission': 0.5,
+                       'execution_slippage': 0.1, 'trade_duration_seconds': 10800, 'is_closed': 1,
+                       'tags': None, 'notes': None, 'oanda_trade_id': None})
+    return trades
+
+
+def test_partitions_prune_and_project():
+    logging.disable(logging.WARNING)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            archive = TradeArchive(tmp)
+            trades = _trades(240, datetime(2025, 6, 1))  # 90 days: June to August
+            assert archive.append(trades[:160])['written'] == 160
+            appended = archive.append(trades[150:])  # Overlaps the first batch by ten trades
+            assert appended['written'] == 80 and appended['skipped'] == 10
+            assert archive.months() == ['2025-06', '2025-07', '2025-08']
+            assert [len(m['parts']) for m in archive.partitions(month='2025-07')] == [2, 2]
+
+            # Round trip: every column comes back as it went in
+            assert sorted(archive.iter_trades(), key=lambda t: int(t['trade_id'][1:])) == [
+                dict(t, created_at=None, updated_at=None) for t in trades]
+
+            archive.stats.update(parts_read=0, parts_skipped=0)
+            july = archive.scan(strategy_id='gold', instrument='XAU_USD', start='2025-07-01', end='2025-07-31T23:59',
+                                columns=['trade_id', 'realized_pnl'])
+            expected = [t for t in trades if t['strategy_id'] == 'gold' and t['instrument'] == 'XAU_USD'
+                        and '2025-07-01' <= t['entry_time'] <= '2025-07-31T23:59']
+            assert list(july) == ['trade_id', 'realized_pnl']
+            assert july['trade_id'].tolist() == [t['trade_id'] for t in expected]
+            assert july['realized_pnl'].tolist() == [t['realized_pnl'] for t in expected]
+            assert archive.stats['parts_read'] == 1  # Other months and strategies never opened
+
+            late = archive.scan(start='2025-08-30', columns=['trade_id'])
+            assert archive.stats['parts_skipped'] > 0 and len(late['trade_id']) == sum(
+                t['entry_time'] >= '2025-08-30' for t in trades)
+            assert archive.scan(instrument='GBP_USD')['trade_id'].size == 0
+
+            metrics = archive.metrics(strategy_id='momentum')
+            full = MetricsAccumulator.from_trades([t for t in trades if t['strategy_id'] == 'momentum']).metrics()
+            assert metrics == full and metrics['closed_trades'] == 120
+            assert set(METRIC_COLUMNS) < set(trades[0])
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def test_archiver_archives_restores_and_reads_legacy_files():
+    logging.disable(logging.WARNING)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = TradeDatabase(os.path.join(tmp, 'trading.db'))
+            archiver = DataArchiver(os.path.join(tmp, 'archives'), db=db)
+            old = _trades(20, datetime.now() - timedelta(days=200))
+            recent = _trades(4, datetime.now() - timedelta(days=2), seed=9)
+            for trade in recent:
+                trade['trade_id'] = 'r' + trade['trade_id']
+            for trade in old + recent:
+                db.insert_trade(TradeRecord(**trade))
+
+            result = archiver.archive_old_trades(90)
+            assert result['success'] and result['archived_count'] == 20 and result['deleted_count'] == 20
+            assert {t['trade_id'] for t in db.get_closed_trades_by()} == {t['trade_id'] for t in recent}
+
+            month = old[0]['entry_time'][:7]
+            columns = archiver.query_archive(strategy_id='gold', columns=['realized_pnl'], as_arrays=True)
+            assert abs(columns['realized_pnl'].sum() - sum(t['realized_pnl'] for t in old if t['strategy_id'] == 'gold')) < 1e-9
+            assert archiver.get_archive_metrics()['closed_trades'] == 20
+
+            # A pre-columnar file is listed, restorable and migratable
+            legacy = dict(recent[0], trade_id='legacy-1', entry_time='2024-01-05T10:00:00', created_at='2024-01-05')
+            with gzip.open(os.path.join(archiver.archive_dir, 'trades_2024-01.json.gz'), 'wt', encoding='utf-8') as f:
+                json.dump({'month': '2024-01', 'archived_at': '', 'trade_count': 1, 'trades': [legacy]}, f)
+            listed = {a['month']: a for a in archiver.list_archives()}
+            assert listed['2024-01']['format'] == 'json' and listed[month]['format'] == 'columnar'
+            assert archiver.get_archive_stats()['total_trades_archived'] == 21
+
+            restored = archiver.restore_trades_from_archive('2024-01')
+            assert restored['restored_count'] == 1 and db.get_trade('legacy-1')['realized_pnl'] == legacy['realized_pnl']
+            assert archiver.migrate_legacy_archives()['migrated'] == {'2024-01': 1}
+            assert [a['format'] for a in archiver.list_archives()].count('json') == 0
+
+            restored = archiver.restore_trades_from_archive(month, strategy_id='momentum')
+            assert restored['success'] and restored['restored_count'] == restored['total_trades'] > 0
+            first = [t for t in old if t['strategy_id'] == 'momentum' and t['entry_time'][:7] == month][0]
+            assert db.get_trade(first['trade_id'])['is_closed'] == 1
+
+            csv_path = archiver.export_archive_to_csv(month)
+            with open(csv_path) as f:
+                assert len(f.read().splitlines()) == 1 + sum(t['entry_time'][:7] == month for t in old)
+            assert archiver.delete_archive(month) and month not in archiver.archive.months()
+            db.store.close()
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def test_metrics_rebuilds_include_archived_trades():
+    logging.disable(logging.WARNING)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = TradeDatabase(os.path.join(tmp, 'trading.db'))
+            manager = MetricsAccumulatorManager(db)  # Created before the archive directory exists
+            old = _trades(20, datetime.now() - timedelta(days=200))
+            recent = _trades(4, datetime.now() - timedelta(days=2), seed=9)
+            for trade in recent:
+                trade['trade_id'] = 'r' + trade['trade_id']
+            for trade in old + recent:
+                db.insert_trade(TradeRecord(**trade))
+            DataArchiver(os.path.join(tmp, 'archives'), db=db).archive_old_trades(90)
+            # Restored copies sit in both places and count once
+            db.insert_trade(TradeRecord(**old[0]))
+
+            everything = old + recent
+            manager.rebuild_scopes(recent)
+            for scope, column, scope_id in (('strategy', 'strategy_id', 'gold'), ('account', 'account_id', '101-004-1'),
+                                            ('instrument', 'instrument', 'XAU_USD')):
+                expected = MetricsAccumulator.from_trades([t for t in everything if t[column] == scope_id]).metrics()
+                assert manager.get_metrics(scope, scope_id) == expected, scope
+            assert manager.get_metrics('account', '101-004-1')['closed_trades'] == 24
+
+            fresh = MetricsAccumulatorManager(db)
+            assert fresh.rebuild_all() == 24
+            assert fresh.get_metrics('strategy', 'momentum') == \
+                MetricsAccumulator.from_trades([t for t in everything if t['strategy_id'] == 'momentum']).metrics()
+            db.store.close()
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def test_unarchivable_trades_do_not_stall_retention_and_oanda_ids_are_kept():
+    logging.disable(logging.WARNING)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = TradeDatabase(os.path.join(tmp, 'trading.db'))
+            archiver = DataArchiver(os.path.join(tmp, 'archives'), db=db)
+            old = _trades(6, datetime.now() - timedelta(days=200))
+            for i, trade in enumerate(old):
+                trade['oanda_trade_id'] = str(9000 + i)
+            broken = dict(old[0], trade_id='no-entry-time', entry_time='')  # Sorts before any cutoff
+            for trade in old + [broken]:
+                db.insert_trade(TradeRecord(**trade))
+
+            result = archiver.archive_old_trades(90)
+            assert result['archived_count'] == 6 and result['deleted_count'] == 6
+            assert [t['trade_id'] for t in db.get_closed_trades_by()] == ['no-entry-time']
+            archived = {t['trade_id']: t['oanda_trade_id'] for t in archiver.archive.iter_trades()}
+            assert archived == {t['trade_id']: t['oanda_trade_id'] for t in old}
+
+            month = old[0]['entry_time'][:7]
+            assert archiver.restore_trades_from_archive(month)['restored_count'] > 0
+            assert db.get_trade('t0')['oanda_trade_id'] == '9000'
+
+            # Parts written before the column existed read it as missing
+            partition = archiver.archive.partitions(month=month)[0]
+            part = os.path.join(partition['path'], partition['parts'][0]['file'])
+            with np.load(part) as data:
+                columns = {name: data[name] for name in data.files if name != 'oanda_trade_id'}
+            with open(part, 'wb') as f:
+                np.savez_compressed(f, **columns)
+            ids = archiver.archive.scan(month=month, strategy_id=partition['strategy_id'],
+                                        columns=['trade_id', 'oanda_trade_id'])
+            assert len(ids['trade_id']) == partition['parts'][0]['rows'] and set(ids['oanda_trade_id']) == {''}
+            db.store.close()
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+if __name__ == '__main__':
+    test_partitions_prune_and_project()
+    test_archiver_archives_restores_and_reads_legacy_files()
+    test_metrics_rebuilds_include_archived_trades()
+    test_unarchivable_trades_do_not_stall_retention_and_oanda_ids_are_kept()
+    print("✅ Trade archive tests passed")
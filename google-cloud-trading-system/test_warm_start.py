@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Test warm-start snapshots - state round trip, staleness, and delta-only concurrent candle fetch on restore
+"""
+
+import os
+import sys
+import time
+import logging
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.core.warm_start import WarmStartStore, prefill_deferred, get_warm_start_store
+from src.core.candle_store import to_ns, ns_to_oanda
+from src.core.ring_buffer import RingBuffer
+from src.core.data_feed import MarketData
+from src.core.strategy_factory import build_concurrently
+from src.strategies.momentum_trading import MomentumTradingStrategy
+from test_support import stub_scanner
+
+
+def _momentum(instruments=('EUR_USD',)):
+    strategy = MomentumTradingStrategy.__new__(MomentumTradingStrategy)
+    strategy.instruments, strategy.history_limit = list(instruments), 100
+    strategy.momentum_period, strategy.adx_period = 40, 14
+    strategy.indicators, strategy.backtest_indicators = {}, {}
+    strategy.price_history = {inst: RingBuffer(100) for inst in instruments}
+    strategy.daily_trade_count, strategy.last_trade_time = 0, None
+    return strategy
+
+
+def _feed(strategy, prices):
+    for price in prices:
+        strategy._update_price_history({inst: MarketData(
+            pair=inst, bid=price, ask=price, timestamp='2025-11-03T09:00:00Z', is_live=False,
+            data_source='test', spread=0.0, last_update_age=0) for inst in strategy.instruments})
+
+
+def test_snapshot_round_trip_and_staleness():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = WarmStartStore(path=os.path.join(tmp, 'strategies.pkl.gz'), max_age=3600)
+        live = _momentum()
+        _feed(live, [1.10 + i * 1e-4 for i in range(60)])
+        live._streaming_atr_adx('EUR_USD')  # Builds incremental indicator state
+        live.daily_trade_count, live.last_trade_time = 3, datetime(2025, 11, 3, 9, 30)
+        assert store.save({'Momentum EUR': live, 'Gold': _momentum(['XAU_USD'])})
+        assert store.has_snapshot()
+
+        fresh, moved = _momentum(), _momentum(['GBP_USD'])
+        result = store.restore({'Momentum EUR': fresh, 'Gold': moved, 'New account': _momentum()})
+        assert result['restored'] == ['Momentum EUR']
+        assert result['missing'] == ['Gold', 'New account']  # Instruments changed / not in snapshot
+        assert fresh.price_history['EUR_USD'].tolist() == live.price_history['EUR_USD'].tolist()
+        assert fresh.daily_trade_count == 3 and fresh.last_trade_time == live.last_trade_time
+        # Indicator state continues where it left off rather than replaying
+        _feed(live, [1.2]), _feed(fresh, [1.2])
+        assert fresh._streaming_atr_adx('EUR_USD') == live._streaming_atr_adx('EUR_USD')
+        assert fresh.indicators['EUR_USD'].replays == live.indicators['EUR_USD'].replays
+
+        old = time.time() - 7200
+        os.utime(store.path, (old, old))
+        assert not store.has_snapshot()
+        time.sleep(0.01)
+        store.max_age = 0.005  # Snapshot content is older than this too
+        assert store.restore({'Momentum EUR': _momentum()}) is None
+
+
+def test_rejected_snapshot_is_known_before_prefill_is_deferred():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = WarmStartStore(path=os.path.join(tmp, 'strategies.pkl.gz'), max_age=3600)
+        live = _momentum()
+        _feed(live, [1.1, 1.1001])
+        store.save({'Momentum EUR': live})
+
+        # A fresh but unreadable file passes the mtime check; only load() shows it cannot be restored
+        broken = WarmStartStore(path=os.path.join(tmp, 'broken.pkl.gz'), max_age=3600)
+        with open(broken.path, 'wb') as f:
+            f.write(b'not a snapshot')
+        logging.disable(logging.WARNING)
+        try:
+            assert broken.has_snapshot() and broken.load() is None
+        finally:
+            logging.disable(logging.NOTSET)
+
+        # A snapshot loaded up front is restored as-is, without reading the file again
+        payload = store.load()
+        os.remove(store.path)
+        fresh = _momentum()
+        assert store.restore({'Momentum EUR': fresh}, payload)['restored'] == ['Momentum EUR']
+        assert fresh.price_history['EUR_USD'].tolist() == [1.1, 1.1001]
+
+
+class _CandleClient:
+    """Records candle requests and how many run at once"""
+
+    def __init__(self, now):
+        self.now = now
+        self.requests = []
+        self.active = self.peak = 0
+        self.lock = threading.Lock()
+
+    def get_candles(self, instrument, granularity='M1', count=50, price='BA', from_time=None, to_time=None):
+        with self.lock:
+            self.requests.append((instrument, granularity, price, from_time, count if not from_time else None, to_time))
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+        start = to_ns(from_time) if from_time else to_ns(self.now) - count * 300 * 10**9
+        start += (-start) % (300 * 10**9)  # OANDA returns bars aligned at or after from_time
+        candles, t = [], start
+        while t < to_ns(self.now) and len(candles) < count:
+            candles.append({'time': ns_to_oanda(t), 'complete': t + 300 * 10**9 <= to_ns(self.now),
+                            'volume': 10, 'mid': {'o': '1.1', 'h': '1.2', 'l': '1.0', 'c': '1.15'}})
+            t += 300 * 10**9
+        return {'candles': candles}
+
+
+def test_restore_fetches_only_delta_in_one_concurrent_batch():
+    instruments = ['EUR_USD', 'GBP_USD', 'USD_JPY', 'AUD_USD', 'USD_CAD', 'NZD_USD', 'XAU_USD']
+    with tempfile.TemporaryDirectory() as tmp:
+        store = WarmStartStore(path=os.path.join(tmp, 'strategies.pkl.gz'), max_age=3600)
+        before = {f'acct-{i}': _momentum(instruments[i % 3:]) for i in range(10)}
+        for strategy in before.values():
+            _feed(strategy, [1.1, 1.1001, 1.1002])
+        store.save(before)
+        saved_at = store.load()['saved_at_ns']
+
+        # Restart 20 minutes later: 4 bars completed since the snapshot's M5 bucket opened
+        now = datetime.fromtimestamp(saved_at / 1e9, timezone.utc) + timedelta(minutes=20)
+        client = _CandleClient(now)
+        after = {name: _momentum(s.instruments) for name, s in before.items()}
+        scanner = stub_scanner(after, oanda=client, warm_start=store)
+        logging.disable(logging.WARNING)
+        try:
+            scanner._warm_start()
+            scanner._after_scan()
+        finally:
+            logging.disable(logging.NOTSET)
+
+        assert scanner.warm_start_mode == 'warm (10/10 restored)'
+        assert sorted(r[0] for r in client.requests) == sorted(instruments)  # One request per instrument
+        assert all(r[1] == 'M5' and r[2] == 'M' and r[3] is not None for r in client.requests)
+        assert all(r[5] is None for r in client.requests)  # Open-ended: a to_time ahead of OANDA's clock is rejected
+        assert client.peak > 1  # Issued concurrently, not one after another
+        history = after['acct-0'].price_history['EUR_USD'].tolist()
+        assert history[:3] == [1.1, 1.1001, 1.1002] and set(history[3:]) == {1.15}
+        assert 3 <= len(history) - 3 <= 4  # Only candles opened after the snapshot
+        assert scanner.first_scan_seconds is not None and scanner.first_scan_seconds < 5
+
+        # No snapshot: cold start backfills the last 60 candles for every instrument (still one batch)
+        cold_client = _CandleClient(now)
+        cold = stub_scanner({name: _momentum(s.instruments) for name, s in before.items()}, oanda=cold_client,
+                            warm_start=WarmStartStore(path=os.path.join(tmp, 'missing.pkl.gz')))
+        logging.disable(logging.WARNING)
+        try:
+            cold._warm_start()
+        finally:
+            logging.disable(logging.NOTSET)
+        assert cold.warm_start_mode == 'cold'
+        assert sorted(r[0] for r in cold_client.requests) == sorted(instruments)
+        assert all(r[4] == 60 for r in cold_client.requests) and cold_client.peak > 1
+
+
+def test_prefill_deferred_only_inside_scanner_construction():
+    store = get_warm_start_store()
+    assert not prefill_deferred()
+    with store.defer_prefill(True):
+        assert prefill_deferred()
+        strategy = _momentum()
+        strategy._prefill_price_history()  # Returns before touching the network
+        assert len(strategy.price_history['EUR_USD']) == 0
+    with store.defer_prefill(False):
+        assert not prefill_deferred()
+    assert not prefill_deferred()
+
+    # Strategies built on unrelated threads meanwhile still prefill; the scanner's own builders skip it
+    seen = {}
+    with store.defer_prefill(True):
+        other = threading.Thread(target=lambda: seen.setdefault('other', prefill_deferred()))
+        other.start()
+        other.join()
+        built = build_concurrently([(i, i, prefill_deferred) for i in range(4)], max_workers=4)
+    assert seen['other'] is False
+    assert all(deferred for deferred, _ in built.values())
+
+
+if __name__ == '__main__':
+    test_snapshot_round_trip_and_staleness()
+    test_rejected_snapshot_is_known_before_prefill_is_deferred()
+    test_restore_fetches_only_delta_in_one_concurrent_batch()
+    test_prefill_deferred_only_inside_scanner_construction()
+    print("✅ Warm start tests passed")
@@ -20,6 +20,7 @@ import logging
 import json
 from datetime import datetime, timedelta
 from collections import Counter
+import numpy as np
 import pytz
 from typing import Dict, List, Any, Optional
 
@@ -32,6 +33,9 @@ logger = logging.getLogger(__name__)
 # Import required modules
 from src.core.oanda_client import OandaClient
 from src.core.data_feed import MarketData
+from src.core.candle_store import get_candle_store, to_ns, OHLC
+from src.core.ohlcv_arrays import OHLCVArrays
+from src.core.bar_iterator import AlignedBarIterator
 
 def load_credentials():
     """Load OANDA credentials from config files"""
@@ -66,18 +70,13 @@ def get_historical_data(client, instrument, days=14, granularity='M5'):
         candles_per_day = 288 if granularity == 'M5' else 24 if granularity == 'H1' else 1
         count = min(5000, days * candles_per_day)
         
-        # Use the correct method name
-        response = client.get_candles(
-            instrument=instrument,
-            granularity=granularity,
-            count=count
-        )
+        # Local candle store: only candles missing since the last run hit OANDA
+        candles = get_candle_store(client).get_recent_candles(instrument, granularity, count, price='BA')
         
-        if not response or 'candles' not in response:
+        if not candles:
             logger.error(f"    ❌ No data returned for {instrument}")
             return None
         
-        candles = response['candles']
         logger.info(f"    ✅ {len(candles)} candles retrieved")
         
         # Process candles into a list of dictionaries with standardized format
@@ -182,6 +181,18 @@ def create_market_data(candle, instrument):
         logger.error(f"Error creating MarketData: {e}")
         return None
 
+def candles_to_arrays(instrument, candles):
+    """Parse processed candle dictionaries once into OHLCVArrays for AlignedBarIterator"""
+    ordered = sorted(candles, key=lambda c: c['timestamp'])
+    columns = {
+        'time': np.array([to_ns(c['timestamp']) for c in ordered], dtype=np.int64),
+        'volume': np.array([int(c.get('volume', 0)) for c in ordered], dtype=np.int64)
+    }
+    for side in ('bid', 'ask', 'mid'):
+        for field, name in zip(OHLC, ('open', 'high', 'low', 'close')):
+            columns[f"{side}_{field}"] = np.array([c[f"{side}_{name}"] for c in ordered], dtype=np.float64)
+    return OHLCVArrays.from_columns(instrument, None, columns)
+
 def prefill_strategy_price_history(strategy, historical_data, instrument, bars=100):
     """Prefill strategy price history with historical data"""
     if not historical_data or not historical_data[instrument]:
@@ -237,14 +248,14 @@ def run_backtest(strategy, historical_data, days=14):
     trades = []
     open_trades = {}
     
-    # Create a unified timeline from all instruments
-    all_timestamps = set()
-    for instrument, candles in historical_data.items():
-        for candle in candles:
-            all_timestamps.add(candle['timestamp'])
-    
-    sorted_timestamps = sorted(all_timestamps)
-    total_timestamps = len(sorted_timestamps)
+    # Merge the instruments' timelines once; each step then reads its bars by index
+    bars = AlignedBarIterator(
+        {instrument: candles_to_arrays(instrument, candles)
+         for instrument, candles in historical_data.items() if candles},
+        list(historical_data.keys()),
+        data_source='backtest'
+    )
+    total_timestamps = len(bars)
     
     # Skip the first 100 timestamps to allow for indicator calculation
     start_idx = 100
@@ -263,22 +274,18 @@ def run_backtest(strategy, historical_data, days=14):
     
     # Process each timestamp
     skip_reasons = Counter()
+    timestamp = None
 
-    for i, timestamp in enumerate(sorted_timestamps[start_idx:], start=start_idx):
+    for i, bar in enumerate(bars):
+        if i < start_idx:
+            continue
         if i % 1000 == 0 or i == start_idx:
             logger.info(f"  Progress: {i}/{total_timestamps} timestamps ({i*100//total_timestamps}%)")
         
-        # Build market data for all instruments at this timestamp
-        market_data_dict = {}
-        for instrument, candles in historical_data.items():
-            # Find candle for this timestamp
-            matching_candles = [c for c in candles if c['timestamp'] == timestamp]
-            if matching_candles:
-                candle = matching_candles[0]
-                # Create market data
-                market_data = create_market_data(candle, instrument)
-                if market_data:
-                    market_data_dict[instrument] = market_data
+        timestamp = datetime.fromtimestamp(bar.time_ns // 10**9, tz=pytz.UTC)
+        
+        # Market data for every instrument with a bar at this timestamp
+        market_data_dict = bars.market_data(bar)
         
         # Generate signals
         try:
@@ -380,7 +387,7 @@ def run_backtest(strategy, historical_data, days=14):
                 status = 'win' if profit_pips > 0 else 'loss'
             
             trade['exit_price'] = last_price
-            trade['exit_time'] = sorted_timestamps[-1]
+            trade['exit_time'] = timestamp
             trade['profit_pips'] = profit_pips
             trade['status'] = status
             trades.append(trade)
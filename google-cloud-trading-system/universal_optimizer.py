@@ -10,14 +10,20 @@ import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Any
 import itertools
+import functools
 import json
 import yaml
+import numpy as np
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from src.core.oanda_client import OandaClient
-from src.core.data_feed import MarketData
+from src.core.candle_store import get_candle_store
+from src.core.ohlcv_arrays import OHLCVArrays, load_ohlcv
+from src.core.bar_iterator import AlignedBarIterator
+from src.core.batch_indicators import interleaved_closes
+from src.core.sweep_engine import SweepEngine
 
 
 def load_credentials_from_yaml():
@@ -77,16 +83,13 @@ class UniversalOptimizer:
         start_time = end_time - timedelta(days=days)
         
         historical_data = {}
+        store = get_candle_store(self.oanda_client)
         
         for instrument in self.instruments:
             logger.info(f"  Fetching {instrument}...")
             try:
-                result = self.oanda_client.get_candles(
-                    instrument=instrument,
-                    granularity='M5',
-                    count=days * 288  # 288 M5 candles per day
-                )
-                candles = result.get('candles', []) if result else []
+                # Local candle store: only candles newer than the last run hit OANDA
+                candles = store.get_candles(instrument, 'M5', start_time, end_time, price='BA')
                 
                 if candles:
                     historical_data[instrument] = candles
@@ -99,6 +102,27 @@ class UniversalOptimizer:
                 
         return historical_data
     
+    def load_ohlcv_arrays(self, days: int = 7) -> Dict[str, OHLCVArrays]:
+        """Load candle history once as memory-mapped NumPy arrays for all instruments"""
+        logger.info(f"📥 Loading {days} days of historical data for {len(self.instruments)} instruments...")
+        
+        end_time = datetime.utcnow()
+        start_time = end_time - timedelta(days=days)
+        store = get_candle_store(self.oanda_client)
+        
+        arrays = {}
+        for instrument in self.instruments:
+            try:
+                data = load_ohlcv(instrument, 'M5', start_time, end_time, price='BA', store=store)
+                if len(data):
+                    arrays[instrument] = data
+                    logger.info(f"  ✅ {instrument}: {len(data)} bars")
+                else:
+                    logger.warning(f"  ⚠️ {instrument}: No data received")
+            except Exception as e:
+                logger.error(f"  ❌ {instrument}: {str(e)}")
+        return arrays
+    
     def create_param_combinations(self, param_ranges: Dict[str, List]) -> List[Dict]:
         """Generate all combinations of parameters for Monte Carlo simulation"""
         keys = list(param_ranges.keys())
@@ -115,9 +139,17 @@ class UniversalOptimizer:
     def backtest_with_params(
         self,
         params: Dict[str, Any],
-        historical_data: Dict[str, List[Dict]]
+        historical_data: Dict[str, OHLCVArrays]
     ) -> Dict[str, Any]:
-        """Run backtest with specific parameter set"""
+        """Run backtest with specific parameter set
+        
+        historical_data maps instrument -> OHLCVArrays (raw candle lists are
+        converted once for backwards compatibility).
+        """
+        historical_data = {
+            inst: data if isinstance(data, OHLCVArrays) else OHLCVArrays.from_candles(inst, 'M5', data)
+            for inst, data in historical_data.items()
+        }
         
         # Create strategy instance with custom parameters
         strategy = self.strategy_class()
@@ -135,62 +167,37 @@ class UniversalOptimizer:
         # Initialize price history
         strategy.price_history = {inst: [] for inst in self.instruments}
         
-        # Collect all timestamps across instruments
-        all_timestamps = set()
-        for instrument, candles in historical_data.items():
-            for candle in candles:
-                all_timestamps.add(candle['time'])
-        
-        sorted_timestamps = sorted(all_timestamps)
-        
         # Results tracking
         trades = []
         open_positions = {}
         total_signals_seen = 0
         
-        # Process each timestamp
-        for timestamp in sorted_timestamps:
-            # Build market data for this timestamp
-            market_data_dict = {}
+        # Walk all instruments on one merged timeline
+        bars = AlignedBarIterator(historical_data, self.instruments)
+        
+        # Backtest mode: precompute indicator columns over the exact series the strategy
+        # sees - per bar this loop appends the bid close, then the strategy appends the mid
+        backtest_mode = hasattr(strategy, 'enable_backtest_mode')
+        if backtest_mode:
+            series = {}
+            for inst in bars.instruments:
+                bid = np.asarray(bars.series[inst].bid_c, dtype=np.float64)
+                ask = np.maximum(np.asarray(bars.series[inst].ask_c, dtype=np.float64), bid + bars.min_spread)
+                series[inst] = interleaved_closes(bid, (bid + ask) / 2)
+            strategy.enable_backtest_mode(series)
+        
+        for bar, market_data_dict in bars.snapshots():
+            timestamp = bar.timestamp
+            if backtest_mode:
+                strategy.set_backtest_positions({inst: 2 * i + 1 for inst, i in bar.indices.items()})
             
-            for instrument in self.instruments:
-                if instrument not in historical_data:
-                    continue
-                    
-                # Find candle for this timestamp
-                candle = None
-                for c in historical_data[instrument]:
-                    if c['time'] == timestamp:
-                        candle = c
-                        break
+            for instrument, market_data in market_data_dict.items():
+                # Update price history (history is loaded as bid/ask, so the bid close)
+                strategy.price_history[instrument].append(market_data.bid)
                 
-                if candle:
-                    # Extract close price from OANDA format
-                    close_price = float(candle.get('mid', {}).get('c') or candle.get('bid', {}).get('c', 0))
-                    if close_price == 0:  # Fallback if mid/bid not available
-                        close_price = (float(candle.get('bid', {}).get('c', 0)) + float(candle.get('ask', {}).get('c', 0))) / 2
-                    
-                    # Update price history
-                    strategy.price_history[instrument].append(close_price)
-                    
-                    # Keep only recent history
-                    if len(strategy.price_history[instrument]) > 200:
-                        strategy.price_history[instrument] = strategy.price_history[instrument][-200:]
-                    
-                    # Create market data
-                    bid_price = float(candle.get('bid', {}).get('c', close_price))
-                    ask_price = float(candle.get('ask', {}).get('c', close_price))
-                    
-                    market_data_dict[instrument] = MarketData(
-                        pair=instrument,
-                        bid=bid_price,
-                        ask=ask_price,
-                        spread=ask_price - bid_price,
-                        timestamp=timestamp,
-                        is_live=False,
-                        data_source='OANDA_Historical',
-                        last_update_age=0
-                    )
+                # Keep only recent history
+                if len(strategy.price_history[instrument]) > 200:
+                    strategy.price_history[instrument] = strategy.price_history[instrument][-200:]
             
             # Generate signals
             if market_data_dict:
@@ -341,16 +348,23 @@ class UniversalOptimizer:
         self,
         param_ranges: Dict[str, List],
         days: int = 7,
-        top_n: int = 5
+        top_n: int = 5,
+        workers: int = None,
+        checkpoint_path: str = None
     ) -> List[Dict]:
-        """Run Monte Carlo optimization"""
+        """Run Monte Carlo optimization
+        
+        Parameter sets are evaluated on a process pool (workers defaults to
+        SWEEP_WORKERS or the CPU count); pass checkpoint_path to make a long
+        sweep resumable.
+        """
         
         logger.info(f"\n{'='*70}")
         logger.info(f"🎯 OPTIMIZING STRATEGY: {self.strategy_name}")
         logger.info(f"{'='*70}\n")
         
-        # Step 1: Download historical data
-        historical_data = self.download_historical_data(days)
+        # Step 1: Load historical data once as memory-mapped arrays
+        historical_data = self.load_ohlcv_arrays(days)
         
         if not historical_data:
             logger.error("❌ No historical data available!")
@@ -361,18 +375,13 @@ class UniversalOptimizer:
         
         # Step 3: Run Monte Carlo simulation
         logger.info(f"\n🔬 Running {len(param_combinations)} simulations...")
-        results = []
-        
-        for i, params in enumerate(param_combinations, 1):
-            if i % 10 == 0:
-                logger.info(f"  Progress: {i}/{len(param_combinations)} ({i/len(param_combinations)*100:.1f}%)")
-            
-            try:
-                result = self.backtest_with_params(params, historical_data)
-                results.append(result)
-            except Exception as e:
-                logger.debug(f"  Simulation {i} failed: {str(e)}")
-                continue
+        engine = SweepEngine(
+            functools.partial(self.backtest_with_params, historical_data=historical_data),
+            workers=workers,
+            checkpoint_path=checkpoint_path,
+            name=self.strategy_name
+        )
+        results = engine.run(param_combinations)
         
         # Step 4: Rank results
         results.sort(key=lambda x: x['score'], reverse=True)